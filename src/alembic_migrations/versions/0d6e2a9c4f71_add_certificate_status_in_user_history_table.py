@@ -0,0 +1,45 @@
+"""add certificate status in user history table
+
+Revision ID: 0d6e2a9c4f71
+Revises: f3c9d2b7a1e5
+Create Date: 2026-10-20 09:12:40.318274
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0d6e2a9c4f71"
+down_revision: Union[str, None] = "f3c9d2b7a1e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_history",
+        sa.Column(
+            "certificate_status", sa.String(), nullable=False, server_default="ready"
+        ),
+    )
+    op.alter_column(
+        "user_history", "certificate", existing_type=sa.String(), nullable=True
+    )
+    op.create_index(
+        "ix_user_history_pending_certificates",
+        "user_history",
+        ["attempted_at"],
+        postgresql_where=sa.text("certificate_status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_history_pending_certificates", table_name="user_history")
+    op.execute("UPDATE user_history SET certificate = '' WHERE certificate IS NULL")
+    op.alter_column(
+        "user_history", "certificate", existing_type=sa.String(), nullable=False
+    )
+    op.drop_column("user_history", "certificate_status")
@@ -5,6 +5,7 @@ Revises: 96cd159c6b79
 Create Date: 2025-01-20 20:28:01.258686
 
 """
+
 import uuid
 from typing import Sequence, Union
 
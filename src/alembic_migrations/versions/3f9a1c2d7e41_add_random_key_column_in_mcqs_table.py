@@ -0,0 +1,36 @@
+"""add random_key column in mcqs table
+
+Revision ID: 3f9a1c2d7e41
+Revises: 8af2b7fef7bd
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c2d7e41"
+down_revision: Union[str, None] = "8af2b7fef7bd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "mcqs",
+        sa.Column(
+            "random_key",
+            sa.Float(),
+            nullable=False,
+            server_default=sa.func.random(),
+        ),
+    )
+    op.create_index("ix_mcqs_type_random_key", "mcqs", ["type", "random_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mcqs_type_random_key", table_name="mcqs")
+    op.drop_column("mcqs", "random_key")
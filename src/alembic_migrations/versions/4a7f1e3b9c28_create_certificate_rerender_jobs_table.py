@@ -0,0 +1,56 @@
+"""create certificate_rerender_jobs table
+
+Revision ID: 4a7f1e3b9c28
+Revises: 0d6e2a9c4f71
+Create Date: 2026-10-20 14:47:21.506193
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "4a7f1e3b9c28"
+down_revision: Union[str, None] = "0d6e2a9c4f71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "certificate_rerender_jobs",
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "created_by",
+            postgresql.UUID(),
+            sa.ForeignKey("users.user_id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("total_rows", sa.Integer(), nullable=True),
+        sa.Column("rows_processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rendered_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_history_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+        sa.Column(
+            "updated_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+        sa.Column("heartbeat_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index(
+        "ix_certificate_rerender_jobs_status", "certificate_rerender_jobs", ["status"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_certificate_rerender_jobs_status", table_name="certificate_rerender_jobs"
+    )
+    op.drop_table("certificate_rerender_jobs")
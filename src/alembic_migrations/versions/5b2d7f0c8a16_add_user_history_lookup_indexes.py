@@ -0,0 +1,35 @@
+"""add user history lookup indexes
+
+Revision ID: 5b2d7f0c8a16
+Revises: a4c8e2f19b35
+Create Date: 2026-10-17 14:05:52.630911
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2d7f0c8a16"
+down_revision: Union[str, None] = "a4c8e2f19b35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_user_history_user_id", "user_history", ["user_id"])
+    op.create_index(
+        "ix_user_history_details_history_id", "user_history_details", ["history_id"]
+    )
+    op.create_index(
+        "ix_user_history_details_mcq_id", "user_history_details", ["mcq_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_history_details_mcq_id", table_name="user_history_details")
+    op.drop_index(
+        "ix_user_history_details_history_id", table_name="user_history_details"
+    )
+    op.drop_index("ix_user_history_user_id", table_name="user_history")
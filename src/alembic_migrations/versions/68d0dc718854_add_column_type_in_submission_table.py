@@ -5,6 +5,7 @@ Revises: cc71eb328f03
 Create Date: 2025-02-04 13:21:47.864301
 
 """
+
 from typing import Sequence, Union
 
 import sqlalchemy as sa
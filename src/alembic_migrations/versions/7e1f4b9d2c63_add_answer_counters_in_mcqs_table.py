@@ -0,0 +1,49 @@
+"""add answer counters in mcqs table
+
+Revision ID: 7e1f4b9d2c63
+Revises: 5b2d7f0c8a16
+Create Date: 2026-10-17 16:22:47.118530
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e1f4b9d2c63"
+down_revision: Union[str, None] = "5b2d7f0c8a16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "mcqs",
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "mcqs",
+        sa.Column("correct_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        UPDATE mcqs
+        SET attempt_count = counts.attempts, correct_count = counts.correct
+        FROM (
+            SELECT mcq_id,
+                   count(*) AS attempts,
+                   count(*) FILTER (WHERE is_correct) AS correct
+            FROM user_history_details
+            GROUP BY mcq_id
+        ) AS counts
+        WHERE mcqs.mcq_id = counts.mcq_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("mcqs", "correct_count")
+    op.drop_column("mcqs", "attempt_count")
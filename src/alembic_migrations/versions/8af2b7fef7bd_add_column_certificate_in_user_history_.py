@@ -5,6 +5,7 @@ Revises: 68d0dc718854
 Create Date: 2025-02-04 19:15:28.968007
 
 """
+
 from typing import Sequence, Union
 
 import sqlalchemy as sa
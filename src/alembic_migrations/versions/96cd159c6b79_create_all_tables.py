@@ -5,6 +5,7 @@ Revises:
 Create Date: 2025-01-07 15:02:41.852803
 
 """
+
 from typing import Sequence, Union
 
 import sqlalchemy as sa
@@ -0,0 +1,38 @@
+"""add full text index on mcq question
+
+Revision ID: 9c3e5a7b1d84
+Revises: 7e1f4b9d2c63
+Create Date: 2026-10-18 09:31:14.562087
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3e5a7b1d84"
+down_revision: Union[str, None] = "7e1f4b9d2c63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "mcqs",
+        sa.Column(
+            "question_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', question)", persisted=True),
+        ),
+    )
+    op.create_index(
+        "ix_mcqs_question_tsv", "mcqs", ["question_tsv"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mcqs_question_tsv", table_name="mcqs")
+    op.drop_column("mcqs", "question_tsv")
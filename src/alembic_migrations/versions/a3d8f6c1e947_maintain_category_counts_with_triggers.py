@@ -0,0 +1,111 @@
+"""maintain category counts with triggers
+
+Revision ID: a3d8f6c1e947
+Revises: c7f1a3e9d582
+Create Date: 2026-10-24 18:02:44.381096
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3d8f6c1e947"
+down_revision: Union[str, None] = "c7f1a3e9d582"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Statement-level with transition tables, so a bulk insert or a cascade
+    # delete of a user's MCQs adjusts each category once. Triggers with
+    # transition tables take a single event, hence three of them. The update
+    # branch only writes when an MCQ changed type, since any statement on
+    # mcq_categories bumps the question bank version.
+    op.execute(
+        """
+        CREATE FUNCTION count_category_questions() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO mcq_categories AS c (name, question_count)
+                SELECT type, count(*) FROM new_mcqs GROUP BY type ORDER BY type
+                ON CONFLICT (name) DO UPDATE
+                SET question_count = c.question_count + EXCLUDED.question_count;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE mcq_categories AS c
+                SET question_count = c.question_count - d.removed
+                FROM (
+                    SELECT type, count(*) AS removed FROM old_mcqs GROUP BY type
+                ) AS d
+                WHERE c.name = d.type;
+            ELSIF EXISTS (
+                SELECT 1 FROM old_mcqs AS o JOIN new_mcqs AS n USING (mcq_id)
+                WHERE o.type <> n.type
+            ) THEN
+                INSERT INTO mcq_categories AS c (name, question_count)
+                SELECT type, sum(delta)
+                FROM (
+                    SELECT n.type, 1 AS delta
+                    FROM old_mcqs AS o JOIN new_mcqs AS n USING (mcq_id)
+                    WHERE o.type <> n.type
+                    UNION ALL
+                    SELECT o.type, -1
+                    FROM old_mcqs AS o JOIN new_mcqs AS n USING (mcq_id)
+                    WHERE o.type <> n.type
+                ) AS moved
+                GROUP BY type
+                ORDER BY type
+                ON CONFLICT (name) DO UPDATE
+                SET question_count = c.question_count + EXCLUDED.question_count;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER mcqs_category_count_insert
+        AFTER INSERT ON mcqs REFERENCING NEW TABLE AS new_mcqs
+        FOR EACH STATEMENT EXECUTE FUNCTION count_category_questions()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER mcqs_category_count_delete
+        AFTER DELETE ON mcqs REFERENCING OLD TABLE AS old_mcqs
+        FOR EACH STATEMENT EXECUTE FUNCTION count_category_questions()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER mcqs_category_count_update
+        AFTER UPDATE ON mcqs
+        REFERENCING OLD TABLE AS old_mcqs NEW TABLE AS new_mcqs
+        FOR EACH STATEMENT EXECUTE FUNCTION count_category_questions()
+        """
+    )
+
+    # Repair the counts that drifted while they were maintained by the
+    # application.
+    op.execute(
+        """
+        INSERT INTO mcq_categories (name, question_count)
+        SELECT type, 0 FROM mcqs GROUP BY type
+        ON CONFLICT (name) DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        UPDATE mcq_categories AS c
+        SET question_count = (SELECT count(*) FROM mcqs WHERE mcqs.type = c.name)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER mcqs_category_count_update ON mcqs")
+    op.execute("DROP TRIGGER mcqs_category_count_delete ON mcqs")
+    op.execute("DROP TRIGGER mcqs_category_count_insert ON mcqs")
+    op.execute("DROP FUNCTION count_category_questions()")
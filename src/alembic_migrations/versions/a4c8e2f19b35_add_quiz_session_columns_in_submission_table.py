@@ -0,0 +1,28 @@
+"""add quiz session columns in submission table
+
+Revision ID: a4c8e2f19b35
+Revises: 3f9a1c2d7e41
+Create Date: 2026-10-17 11:40:05.217764
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4c8e2f19b35"
+down_revision: Union[str, None] = "3f9a1c2d7e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("submissions", sa.Column("seed", sa.BigInteger(), nullable=True))
+    op.add_column("submissions", sa.Column("question_order", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("submissions", "question_order")
+    op.drop_column("submissions", "seed")
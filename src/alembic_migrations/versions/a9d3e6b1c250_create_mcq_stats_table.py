@@ -0,0 +1,42 @@
+"""create mcq_stats table
+
+Revision ID: a9d3e6b1c250
+Revises: f7a2d9c6e814
+Create Date: 2026-10-22 16:41:53.207394
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d3e6b1c250"
+down_revision: Union[str, None] = "f7a2d9c6e814"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mcq_stats",
+        sa.Column(
+            "mcq_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("mcqs.mcq_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("responses", sa.BigInteger(), nullable=False),
+        sa.Column("difficulty", sa.Float(), nullable=True),
+        sa.Column("discrimination", sa.Float(), nullable=True),
+        sa.Column("option_counts", sa.JSON(), nullable=False),
+        sa.Column(
+            "computed_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mcq_stats")
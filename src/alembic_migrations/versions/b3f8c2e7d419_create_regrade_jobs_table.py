@@ -0,0 +1,55 @@
+"""create regrade_jobs table
+
+Revision ID: b3f8c2e7d419
+Revises: a9d3e6b1c250
+Create Date: 2026-10-23 10:12:37.581046
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f8c2e7d419"
+down_revision: Union[str, None] = "a9d3e6b1c250"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "regrade_jobs",
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "created_by",
+            postgresql.UUID(),
+            sa.ForeignKey("users.user_id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column(
+            "mcq_ids", postgresql.ARRAY(postgresql.UUID(as_uuid=True)), nullable=False
+        ),
+        sa.Column("details_changed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "histories_changed", sa.Integer(), nullable=False, server_default="0"
+        ),
+        sa.Column("users_changed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+        sa.Column(
+            "updated_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+        sa.Column("heartbeat_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index("ix_regrade_jobs_status", "regrade_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_regrade_jobs_status", table_name="regrade_jobs")
+    op.drop_table("regrade_jobs")
@@ -0,0 +1,47 @@
+"""create mcq_categories table
+
+Revision ID: b6d0f3a8e527
+Revises: 9c3e5a7b1d84
+Create Date: 2026-10-18 11:48:36.904215
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b6d0f3a8e527"
+down_revision: Union[str, None] = "9c3e5a7b1d84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mcq_categories",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("question_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+    )
+
+    op.execute(
+        """
+        INSERT INTO mcq_categories (name, question_count)
+        SELECT type, count(*) FROM mcqs GROUP BY type
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO mcq_categories (name)
+        VALUES ('python'), ('java'), ('csharp')
+        ON CONFLICT (name) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("mcq_categories")
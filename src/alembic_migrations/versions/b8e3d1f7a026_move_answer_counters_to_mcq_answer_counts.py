@@ -0,0 +1,68 @@
+"""move answer counters to mcq_answer_counts
+
+Revision ID: b8e3d1f7a026
+Revises: d2b6f9a4e107
+Create Date: 2026-10-24 15:12:36.504218
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e3d1f7a026"
+down_revision: Union[str, None] = "d2b6f9a4e107"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mcq_answer_counts",
+        sa.Column(
+            "mcq_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("mcqs.mcq_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("correct_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO mcq_answer_counts (mcq_id, attempt_count, correct_count)
+        SELECT mcq_id, attempt_count, correct_count
+        FROM mcqs
+        WHERE attempt_count > 0
+        """
+    )
+
+    op.drop_column("mcqs", "correct_count")
+    op.drop_column("mcqs", "attempt_count")
+
+
+def downgrade() -> None:
+    op.add_column(
+        "mcqs",
+        sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "mcqs",
+        sa.Column("correct_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        UPDATE mcqs
+        SET attempt_count = counts.attempt_count,
+            correct_count = counts.correct_count
+        FROM mcq_answer_counts AS counts
+        WHERE mcqs.mcq_id = counts.mcq_id
+        """
+    )
+
+    op.drop_table("mcq_answer_counts")
@@ -0,0 +1,37 @@
+"""add user history keyset indexes
+
+Revision ID: c5e8a1d4b7f2
+Revises: 4a7f1e3b9c28
+Create Date: 2026-10-21 09:12:41.385127
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a1d4b7f2"
+down_revision: Union[str, None] = "4a7f1e3b9c28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_user_history_user_attempted_at",
+        "user_history",
+        ["user_id", "attempted_at", "history_id"],
+    )
+    op.create_index(
+        "ix_user_history_user_percentage",
+        "user_history",
+        ["user_id", "percentage", "history_id"],
+    )
+    op.drop_index("ix_user_history_user_id", table_name="user_history")
+
+
+def downgrade() -> None:
+    op.create_index("ix_user_history_user_id", "user_history", ["user_id"])
+    op.drop_index("ix_user_history_user_percentage", table_name="user_history")
+    op.drop_index("ix_user_history_user_attempted_at", table_name="user_history")
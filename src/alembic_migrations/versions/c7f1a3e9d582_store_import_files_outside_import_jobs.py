@@ -0,0 +1,34 @@
+"""store import files outside import_jobs
+
+Revision ID: c7f1a3e9d582
+Revises: e4a9c7f2b315
+Create Date: 2026-10-24 17:28:03.915562
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7f1a3e9d582"
+down_revision: Union[str, None] = "e4a9c7f2b315"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("import_jobs", sa.Column("content_key", sa.String(), nullable=True))
+    op.alter_column(
+        "import_jobs", "content", existing_type=sa.LargeBinary(), nullable=True
+    )
+
+
+def downgrade() -> None:
+    # Files uploaded since the upgrade are not in the table.
+    op.execute("DELETE FROM import_jobs WHERE content IS NULL")
+    op.alter_column(
+        "import_jobs", "content", existing_type=sa.LargeBinary(), nullable=False
+    )
+    op.drop_column("import_jobs", "content_key")
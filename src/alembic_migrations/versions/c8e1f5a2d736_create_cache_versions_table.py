@@ -0,0 +1,65 @@
+"""create cache_versions table
+
+Revision ID: c8e1f5a2d736
+Revises: b3f8c2e7d419
+Create Date: 2026-10-23 14:26:08.417352
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e1f5a2d736"
+down_revision: Union[str, None] = "b3f8c2e7d419"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute("INSERT INTO cache_versions (name) VALUES ('question_bank')")
+
+    # Statement-level, so a bulk insert bumps the version once. The answer
+    # counters are left out of the UPDATE column list, so grading a submission
+    # does not invalidate every process's cache.
+    op.execute(
+        """
+        CREATE FUNCTION bump_question_bank_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE cache_versions SET version = version + 1
+            WHERE name = 'question_bank';
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER mcqs_question_bank_version
+        AFTER INSERT OR DELETE OR TRUNCATE
+            OR UPDATE OF type, question, options, correct_option
+        ON mcqs
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_question_bank_version()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER mcq_categories_question_bank_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON mcq_categories
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_question_bank_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER mcq_categories_question_bank_version ON mcq_categories")
+    op.execute("DROP TRIGGER mcqs_question_bank_version ON mcqs")
+    op.execute("DROP FUNCTION bump_question_bank_version()")
+    op.drop_table("cache_versions")
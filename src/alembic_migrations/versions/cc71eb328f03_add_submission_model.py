@@ -5,6 +5,7 @@ Revises: 15f7c001ff58
 Create Date: 2025-02-04 08:06:50.901997
 
 """
+
 import uuid
 from typing import Sequence, Union
 
@@ -0,0 +1,53 @@
+"""create import_jobs table
+
+Revision ID: d2a7c5e9f013
+Revises: b6d0f3a8e527
+Create Date: 2026-10-18 15:21:07.418630
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a7c5e9f013"
+down_revision: Union[str, None] = "b6d0f3a8e527"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_jobs",
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "created_by",
+            postgresql.UUID(),
+            sa.ForeignKey("users.user_id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("content", sa.LargeBinary(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("total_rows", sa.Integer(), nullable=True),
+        sa.Column("rows_processed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("added_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("skipped_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+        sa.Column(
+            "updated_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+        sa.Column("heartbeat_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.create_index("ix_import_jobs_status", "import_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_import_jobs_status", table_name="import_jobs")
+    op.drop_table("import_jobs")
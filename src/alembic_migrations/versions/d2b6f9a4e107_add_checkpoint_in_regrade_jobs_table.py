@@ -0,0 +1,43 @@
+"""add checkpoint in regrade_jobs table
+
+Revision ID: d2b6f9a4e107
+Revises: c8e1f5a2d736
+Create Date: 2026-10-24 09:41:17.263508
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d2b6f9a4e107"
+down_revision: Union[str, None] = "c8e1f5a2d736"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "regrade_jobs",
+        sa.Column("last_history_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    # Regrade pages walk the answers to each MCQ in history id order.
+    op.create_index(
+        "ix_user_history_details_mcq_history",
+        "user_history_details",
+        ["mcq_id", "history_id"],
+    )
+    op.drop_index("ix_user_history_details_mcq_id", table_name="user_history_details")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_user_history_details_mcq_id", "user_history_details", ["mcq_id"]
+    )
+    op.drop_index(
+        "ix_user_history_details_mcq_history", table_name="user_history_details"
+    )
+    op.drop_column("regrade_jobs", "last_history_id")
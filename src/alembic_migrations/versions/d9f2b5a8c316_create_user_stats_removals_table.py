@@ -0,0 +1,66 @@
+"""create user_stats_removals table
+
+Revision ID: d9f2b5a8c316
+Revises: a3d8f6c1e947
+Create Date: 2026-10-25 10:41:09.207314
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d9f2b5a8c316"
+down_revision: Union[str, None] = "a3d8f6c1e947"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # No foreign key: the rows outlive the users they record.
+    op.create_table(
+        "user_stats_removals",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("type", sa.String(), primary_key=True),
+        sa.Column("removed_at", sa.TIMESTAMP(), nullable=False),
+    )
+    op.create_index(
+        "ix_user_stats_removals_removed_at", "user_stats_removals", ["removed_at"]
+    )
+
+    # Covers the cascade from a deleted user as well as the delete-and-insert
+    # of a rebuild. `removed_at` is the time of the delete rather than the
+    # start of the transaction, like the `updated_at` of rebuilt rows, so the
+    # rows a rebuild inserts are never older than its removals.
+    op.execute(
+        """
+        CREATE FUNCTION record_user_stats_removals() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO user_stats_removals AS r (user_id, type, removed_at)
+            SELECT DISTINCT user_id, type, clock_timestamp()
+            FROM old_user_stats
+            ORDER BY user_id, type
+            ON CONFLICT (user_id, type) DO UPDATE
+            SET removed_at = EXCLUDED.removed_at;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER user_stats_record_removals
+        AFTER DELETE ON user_stats REFERENCING OLD TABLE AS old_user_stats
+        FOR EACH STATEMENT EXECUTE FUNCTION record_user_stats_removals()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER user_stats_record_removals ON user_stats")
+    op.execute("DROP FUNCTION record_user_stats_removals()")
+    op.drop_index("ix_user_stats_removals_removed_at", table_name="user_stats_removals")
+    op.drop_table("user_stats_removals")
@@ -0,0 +1,51 @@
+"""create user_stats table
+
+Revision ID: e1b7c4f9a305
+Revises: c5e8a1d4b7f2
+Create Date: 2026-10-21 15:26:09.741358
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b7c4f9a305"
+down_revision: Union[str, None] = "c5e8a1d4b7f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.user_id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("type", sa.String(), primary_key=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("score_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("percentage_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("best_percentage", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latest_percentage", sa.Float(), nullable=True),
+        sa.Column("latest_attempted_at", sa.TIMESTAMP(), nullable=True),
+        sa.Column(
+            "recent_percentages",
+            postgresql.ARRAY(sa.Float()),
+            nullable=False,
+            server_default="{}",
+        ),
+        sa.Column(
+            "updated_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
@@ -0,0 +1,50 @@
+"""add certificate claim in user history table
+
+Revision ID: e4a9c7f2b315
+Revises: b8e3d1f7a026
+Create Date: 2026-10-24 16:05:19.742810
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a9c7f2b315"
+down_revision: Union[str, None] = "b8e3d1f7a026"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_history",
+        sa.Column("certificate_claimed_at", sa.TIMESTAMP(), nullable=True),
+    )
+    op.drop_index("ix_user_history_pending_certificates", table_name="user_history")
+    op.create_index(
+        "ix_user_history_unfinished_certificates",
+        "user_history",
+        ["attempted_at"],
+        postgresql_where=sa.text("certificate_status IN ('pending', 'rendering')"),
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        UPDATE user_history
+        SET certificate_status = 'pending'
+        WHERE certificate_status = 'rendering'
+        """
+    )
+    op.drop_index("ix_user_history_unfinished_certificates", table_name="user_history")
+    op.create_index(
+        "ix_user_history_pending_certificates",
+        "user_history",
+        ["attempted_at"],
+        postgresql_where=sa.text("certificate_status = 'pending'"),
+    )
+    op.drop_column("user_history", "certificate_claimed_at")
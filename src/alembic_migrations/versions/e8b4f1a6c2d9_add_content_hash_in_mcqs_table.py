@@ -0,0 +1,102 @@
+"""add content hash in mcqs table
+
+Revision ID: e8b4f1a6c2d9
+Revises: d2a7c5e9f013
+Create Date: 2026-10-19 10:04:52.671203
+
+"""
+
+import hashlib
+from typing import Mapping, Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b4f1a6c2d9"
+down_revision: Union[str, None] = "d2a7c5e9f013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5_000
+
+
+# A frozen copy of `app.utils.content_hash` as of this revision, so the
+# backfill keeps producing the hashes this schema was written with.
+def normalize_text(text: str) -> str:
+    return " ".join(str(text).split()).casefold()
+
+
+def mcq_content_hash(question: str, options: Mapping[str, str]) -> bytes:
+    parts = [normalize_text(question)]
+    parts += sorted(normalize_text(option) for option in options.values())
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()[:16]
+
+
+def upgrade() -> None:
+    op.add_column("mcqs", sa.Column("content_hash", sa.LargeBinary(16), nullable=True))
+
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        rows = connection.execute(
+            sa.text(
+                """
+                SELECT mcq_id, question, options FROM mcqs
+                WHERE CAST(:last_id AS uuid) IS NULL OR mcq_id > CAST(:last_id AS uuid)
+                ORDER BY mcq_id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        hashes = sa.values(
+            sa.column("mcq_id", postgresql.UUID(as_uuid=True)),
+            sa.column("content_hash", sa.LargeBinary()),
+            name="hashes",
+        ).data(
+            [
+                (mcq_id, mcq_content_hash(question, options))
+                for mcq_id, question, options in rows
+            ]
+        )
+        mcqs = sa.table(
+            "mcqs", sa.column("mcq_id"), sa.column("content_hash", sa.LargeBinary())
+        )
+        connection.execute(
+            mcqs.update()
+            .where(mcqs.c.mcq_id == hashes.c.mcq_id)
+            .values(content_hash=hashes.c.content_hash)
+        )
+        last_id = str(rows[-1][0])
+
+    # Rows that only differed by whitespace, case or option order become
+    # duplicates; the oldest copy keeps the hash, later ones are left unhashed.
+    op.execute(
+        """
+        UPDATE mcqs SET content_hash = NULL
+        WHERE mcq_id IN (
+            SELECT mcq_id FROM (
+                SELECT mcq_id,
+                       row_number() OVER (
+                           PARTITION BY content_hash ORDER BY created_at, mcq_id
+                       ) AS copy
+                FROM mcqs
+            ) AS copies
+            WHERE copy > 1
+        )
+        """
+    )
+
+    op.create_index("ix_mcqs_content_hash", "mcqs", ["content_hash"], unique=True)
+    op.drop_constraint("mcqs_question_key", "mcqs", type_="unique")
+
+
+def downgrade() -> None:
+    op.create_unique_constraint("mcqs_question_key", "mcqs", ["question"])
+    op.drop_index("ix_mcqs_content_hash", table_name="mcqs")
+    op.drop_column("mcqs", "content_hash")
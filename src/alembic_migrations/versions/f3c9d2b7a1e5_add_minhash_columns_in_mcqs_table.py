@@ -0,0 +1,143 @@
+"""add minhash columns in mcqs table
+
+Revision ID: f3c9d2b7a1e5
+Revises: e8b4f1a6c2d9
+Create Date: 2026-10-19 16:38:14.902516
+
+"""
+
+import hashlib
+import re
+from typing import List, Sequence, Union
+
+import numpy as np
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f3c9d2b7a1e5"
+down_revision: Union[str, None] = "e8b4f1a6c2d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5_000
+
+# A frozen copy of `app.utils.minhash` as of this revision, so the backfill
+# keeps producing the signatures and buckets this schema was written with.
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_BYTES = 4
+
+_rng = np.random.default_rng(0x6D637173)
+_MULTIPLIERS = _rng.integers(1, 2**64, NUM_PERMUTATIONS, dtype=np.uint64) | 1
+_OFFSETS = _rng.integers(0, 2**64, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> np.ndarray:
+    text = " ".join(re.sub(r"[^\w\s]", " ", str(text)).split()).casefold()
+    data = np.frombuffer(text.encode("utf-8").ljust(SHINGLE_BYTES), dtype=np.uint8)
+    data = data.astype(np.uint32)
+    count = len(data) - SHINGLE_BYTES + 1
+    values = np.zeros(count, dtype=np.uint32)
+    for offset in range(SHINGLE_BYTES):
+        values = (values << 8) | data[offset : offset + count]
+    return np.unique(values)
+
+
+def minhash_signature(question: str) -> bytes:
+    values = shingles(question).astype(np.uint64)
+    hashed = (_MULTIPLIERS[:, None] * values[None, :] + _OFFSETS[:, None]) >> 32
+    return hashed.min(axis=1).astype("<u4").tobytes()
+
+
+def lsh_buckets(signature: bytes) -> List[int]:
+    band_size = LSH_ROWS * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                bytes([band]) + signature[band * band_size : (band + 1) * band_size],
+                digest_size=8,
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+def upgrade() -> None:
+    op.add_column("mcqs", sa.Column("minhash", sa.LargeBinary(), nullable=True))
+    op.add_column(
+        "mcqs",
+        sa.Column("lsh_buckets", postgresql.ARRAY(sa.BigInteger()), nullable=True),
+    )
+    op.add_column(
+        "import_jobs",
+        sa.Column(
+            "near_duplicate_mode", sa.String(), nullable=False, server_default="off"
+        ),
+    )
+    op.add_column(
+        "import_jobs",
+        sa.Column(
+            "near_duplicate_count", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+
+    connection = op.get_bind()
+    last_id = None
+    while True:
+        rows = connection.execute(
+            sa.text(
+                """
+                SELECT mcq_id, question FROM mcqs
+                WHERE CAST(:last_id AS uuid) IS NULL OR mcq_id > CAST(:last_id AS uuid)
+                ORDER BY mcq_id
+                LIMIT :limit
+                """
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        signatures = [
+            (mcq_id, minhash_signature(question)) for mcq_id, question in rows
+        ]
+        minhashes = sa.values(
+            sa.column("mcq_id", postgresql.UUID(as_uuid=True)),
+            sa.column("minhash", sa.LargeBinary()),
+            sa.column("lsh_buckets", postgresql.ARRAY(sa.BigInteger())),
+            name="minhashes",
+        ).data(
+            [
+                (mcq_id, signature, lsh_buckets(signature))
+                for mcq_id, signature in signatures
+            ]
+        )
+        mcqs = sa.table(
+            "mcqs",
+            sa.column("mcq_id"),
+            sa.column("minhash", sa.LargeBinary()),
+            sa.column("lsh_buckets", postgresql.ARRAY(sa.BigInteger())),
+        )
+        connection.execute(
+            mcqs.update()
+            .where(mcqs.c.mcq_id == minhashes.c.mcq_id)
+            .values(minhash=minhashes.c.minhash, lsh_buckets=minhashes.c.lsh_buckets)
+        )
+        last_id = str(rows[-1][0])
+
+    op.create_index(
+        "ix_mcqs_lsh_buckets", "mcqs", ["lsh_buckets"], postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mcqs_lsh_buckets", table_name="mcqs")
+    op.drop_column("import_jobs", "near_duplicate_count")
+    op.drop_column("import_jobs", "near_duplicate_mode")
+    op.drop_column("mcqs", "lsh_buckets")
+    op.drop_column("mcqs", "minhash")
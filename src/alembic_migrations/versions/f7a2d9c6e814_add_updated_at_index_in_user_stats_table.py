@@ -0,0 +1,25 @@
+"""add updated_at index in user_stats table
+
+Revision ID: f7a2d9c6e814
+Revises: e1b7c4f9a305
+Create Date: 2026-10-22 11:03:27.518640
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f7a2d9c6e814"
+down_revision: Union[str, None] = "e1b7c4f9a305"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_user_stats_updated_at", "user_stats", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_stats_updated_at", table_name="user_stats")
@@ -4,17 +4,22 @@ from uuid import uuid4
 from sqlalchemy import (
     JSON,
     TIMESTAMP,
+    BigInteger,
     Boolean,
     Column,
+    Computed,
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.config.database import Base
 
@@ -24,6 +29,20 @@ class UserRole(str, PyEnum):
     user = "user"
 
 
+class ImportJobStatus(str, PyEnum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class CertificateStatus(str, PyEnum):
+    pending = "pending"
+    rendering = "rendering"
+    ready = "ready"
+    failed = "failed"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -57,7 +76,11 @@ class UserHistory(Base):
     submission_id = Column(
         UUID, ForeignKey("submissions.submission_id"), nullable=False
     )
-    certificate = Column(String, nullable=False)
+    certificate = Column(String, nullable=True)
+    certificate_status = Column(
+        String, nullable=False, server_default=CertificateStatus.ready.value
+    )
+    certificate_claimed_at = Column(TIMESTAMP, nullable=True)
 
     user = relationship("User", back_populates="history")
     details = relationship(
@@ -65,6 +88,21 @@ class UserHistory(Base):
     )
     submission = relationship("Submission", back_populates="histories")
 
+    __table_args__ = (
+        Index(
+            "ix_user_history_user_attempted_at",
+            "user_id",
+            "attempted_at",
+            "history_id",
+        ),
+        Index("ix_user_history_user_percentage", "user_id", "percentage", "history_id"),
+        Index(
+            "ix_user_history_unfinished_certificates",
+            "attempted_at",
+            postgresql_where=text("certificate_status IN ('pending', 'rendering')"),
+        ),
+    )
+
 
 class UserHistoryDetail(Base):
     __tablename__ = "user_history_details"
@@ -78,20 +116,66 @@ class UserHistoryDetail(Base):
     user_history = relationship("UserHistory", back_populates="details")
     mcq = relationship("MCQ")
 
+    __table_args__ = (
+        Index("ix_user_history_details_history_id", "history_id"),
+        Index("ix_user_history_details_mcq_history", "mcq_id", "history_id"),
+    )
+
 
 class MCQ(Base):
     __tablename__ = "mcqs"
 
     mcq_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     type = Column(String, nullable=False)
-    question = Column(String, nullable=False, unique=True)
+    question = Column(String, nullable=False)
     options = Column(JSON, nullable=False)
     correct_option = Column(String, nullable=False)
     created_by = Column(UUID, ForeignKey("users.user_id"), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    random_key = Column(Float, nullable=False, server_default=func.random())
+    question_tsv = Column(
+        TSVECTOR, Computed("to_tsvector('english', question)", persisted=True)
+    )
+    content_hash = Column(LargeBinary(16), nullable=True)
+    minhash = deferred(Column(LargeBinary, nullable=True))
+    lsh_buckets = deferred(Column(ARRAY(BigInteger), nullable=True))
 
     creator = relationship("User", back_populates="created_mcqs")
 
+    __table_args__ = (
+        Index("ix_mcqs_type_random_key", "type", "random_key"),
+        Index("ix_mcqs_question_tsv", "question_tsv", postgresql_using="gin"),
+        Index("ix_mcqs_content_hash", "content_hash", unique=True),
+        Index("ix_mcqs_lsh_buckets", "lsh_buckets", postgresql_using="gin"),
+    )
+
+
+class MCQAnswerCounts(Base):
+    __tablename__ = "mcq_answer_counts"
+
+    mcq_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("mcqs.mcq_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    attempt_count = Column(Integer, nullable=False, server_default="0")
+    correct_count = Column(Integer, nullable=False, server_default="0")
+
+
+class MCQCategory(Base):
+    __tablename__ = "mcq_categories"
+
+    name = Column(String, primary_key=True)
+    question_count = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+
 
 class Submission(Base):
     __tablename__ = "submissions"
@@ -101,6 +185,129 @@ class Submission(Base):
     total_questions = Column(Integer, nullable=False)
     type = Column(String, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    seed = Column(BigInteger, nullable=True)
+    question_order = Column(JSON, nullable=True)
 
     user = relationship("User", back_populates="submissions")
     histories = relationship("UserHistory", back_populates="submission")
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    created_by = Column(
+        UUID, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    filename = Column(String, nullable=False)
+    content = deferred(Column(LargeBinary, nullable=True))
+    content_key = Column(String, nullable=True)
+    status = Column(
+        String, nullable=False, server_default=ImportJobStatus.pending.value
+    )
+    total_rows = Column(Integer, nullable=True)
+    rows_processed = Column(Integer, nullable=False, server_default="0")
+    added_count = Column(Integer, nullable=False, server_default="0")
+    skipped_count = Column(Integer, nullable=False, server_default="0")
+    near_duplicate_mode = Column(String, nullable=False, server_default="off")
+    near_duplicate_count = Column(Integer, nullable=False, server_default="0")
+    errors = Column(JSON, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    heartbeat_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (Index("ix_import_jobs_status", "status"),)
+
+
+class CertificateRerenderJob(Base):
+    __tablename__ = "certificate_rerender_jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    created_by = Column(
+        UUID, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    status = Column(
+        String, nullable=False, server_default=ImportJobStatus.pending.value
+    )
+    total_rows = Column(Integer, nullable=True)
+    rows_processed = Column(Integer, nullable=False, server_default="0")
+    rendered_count = Column(Integer, nullable=False, server_default="0")
+    failed_count = Column(Integer, nullable=False, server_default="0")
+    last_history_id = Column(UUID(as_uuid=True), nullable=True)
+    errors = Column(JSON, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    heartbeat_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (Index("ix_certificate_rerender_jobs_status", "status"),)
+
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    type = Column(String, primary_key=True)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    score_sum = Column(Float, nullable=False, server_default="0")
+    percentage_sum = Column(Float, nullable=False, server_default="0")
+    best_percentage = Column(Float, nullable=False, server_default="0")
+    latest_percentage = Column(Float, nullable=True)
+    latest_attempted_at = Column(TIMESTAMP, nullable=True)
+    recent_percentages = Column(ARRAY(Float), nullable=False, server_default="{}")
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+    __table_args__ = (Index("ix_user_stats_updated_at", "updated_at"),)
+
+
+class UserStatsRemoval(Base):
+    __tablename__ = "user_stats_removals"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    type = Column(String, primary_key=True)
+    removed_at = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (Index("ix_user_stats_removals_removed_at", "removed_at"),)
+
+
+class MCQStats(Base):
+    __tablename__ = "mcq_stats"
+
+    mcq_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("mcqs.mcq_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    responses = Column(BigInteger, nullable=False)
+    difficulty = Column(Float, nullable=True)
+    discrimination = Column(Float, nullable=True)
+    option_counts = Column(JSON, nullable=False)
+    computed_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+
+    mcq = relationship("MCQ")
+
+
+class RegradeJob(Base):
+    __tablename__ = "regrade_jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    created_by = Column(
+        UUID, ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True
+    )
+    status = Column(
+        String, nullable=False, server_default=ImportJobStatus.pending.value
+    )
+    mcq_ids = Column(ARRAY(UUID(as_uuid=True)), nullable=False)
+    details_changed = Column(Integer, nullable=False, server_default="0")
+    histories_changed = Column(Integer, nullable=False, server_default="0")
+    users_changed = Column(Integer, nullable=False, server_default="0")
+    last_history_id = Column(UUID(as_uuid=True), nullable=True)
+    errors = Column(JSON, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    updated_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    heartbeat_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (Index("ix_regrade_jobs_status", "status"),)
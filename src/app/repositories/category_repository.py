@@ -0,0 +1,57 @@
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.models.data_models import MCQCategory
+from app.repositories.base_repository import BaseRepository
+
+
+class CategoryRepository(BaseRepository[MCQCategory]):
+    """
+    A repository class for managing `MCQCategory` objects in the database.
+
+    `question_count` is maintained by triggers on `mcqs`, so it follows every
+    insert, type change and delete, including cascades from deleted users.
+    """
+
+    def __init__(self, session: Session):
+        """
+        Initialize the CategoryRepository with a database session.
+
+        Parameters: session : Session(SQLAlchemy session object)
+        """
+        self.session = session
+
+    def get(self, name: str) -> MCQCategory:
+        """
+        Retrieve a single category by its name.
+
+        Parameters: name : str
+
+        Returns: MCQCategory
+            The MCQCategory object
+        """
+        return self.session.query(MCQCategory).filter(MCQCategory.name == name).first()
+
+    def get_all(self) -> List[MCQCategory]:
+        """
+        Retrieve all categories ordered by name.
+
+        Returns: List[MCQCategory]
+            A list of MCQCategory objects.
+        """
+        return self.session.query(MCQCategory).order_by(MCQCategory.name).all()
+
+    def add(self, category: MCQCategory) -> None:
+        """
+        Add a new category to the database.
+
+        Parameters: category : MCQCategory
+        """
+        self.session.add(category)
+
+    def update(self, name: str, **kwargs) -> None:
+        pass
+
+    def delete(self, name: str) -> None:
+        pass
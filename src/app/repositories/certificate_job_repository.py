@@ -0,0 +1,186 @@
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.data_models import CertificateRerenderJob, ImportJobStatus
+from app.repositories.base_repository import BaseRepository
+
+
+class CertificateJobRepository(BaseRepository[CertificateRerenderJob]):
+    """A repository class for managing `CertificateRerenderJob` objects in the database."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the CertificateJobRepository with a database session.
+
+        Parameters: session : Session(SQLAlchemy session object)
+        """
+        self.session = session
+
+    def get(self, job_id: UUID) -> CertificateRerenderJob:
+        """
+        Retrieve a single re-render job by its UUID.
+
+        Parameters: job_id : UUID
+
+        Returns: CertificateRerenderJob
+            The CertificateRerenderJob object
+        """
+        return (
+            self.session.query(CertificateRerenderJob)
+            .filter(CertificateRerenderJob.job_id == job_id)
+            .first()
+        )
+
+    def get_all(self, status: Optional[str] = None) -> List[CertificateRerenderJob]:
+        """
+        Retrieve re-render jobs, newest first.
+
+        Parameters: status : Optional[str]
+            Only return jobs in this status.
+
+        Returns: List[CertificateRerenderJob]
+            A list of CertificateRerenderJob objects.
+        """
+        query = self.session.query(CertificateRerenderJob)
+        if status:
+            query = query.filter(CertificateRerenderJob.status == status)
+        return query.order_by(CertificateRerenderJob.created_at.desc()).all()
+
+    def get_active(self) -> Optional[CertificateRerenderJob]:
+        """
+        Retrieve the job that is pending or running, if any.
+        """
+        return (
+            self.session.query(CertificateRerenderJob)
+            .filter(
+                CertificateRerenderJob.status.in_(
+                    [ImportJobStatus.pending.value, ImportJobStatus.running.value]
+                )
+            )
+            .first()
+        )
+
+    def add(self, job: CertificateRerenderJob) -> None:
+        """
+        Add a new re-render job to the database.
+
+        Parameters: job : CertificateRerenderJob
+        """
+        self.session.add(job)
+
+    def update(self, job_id: UUID, **kwargs) -> None:
+        """
+        Update a re-render job with given fields.
+
+        Parameters:
+            job_id : UUID
+            **kwargs : dict
+                Key-value pairs of the attributes to update.
+        """
+        self.session.execute(
+            update(CertificateRerenderJob)
+            .where(CertificateRerenderJob.job_id == job_id)
+            .values(updated_at=func.now(), heartbeat_at=func.now(), **kwargs)
+        )
+
+    def delete(self, job_id: UUID) -> None:
+        pass
+
+    def record_batch(
+        self,
+        job_id: UUID,
+        checkpoint: Optional[UUID],
+        last_history_id: UUID,
+        processed: int,
+        rendered: int,
+        failed: int,
+        errors: Optional[List[str]] = None,
+    ) -> bool:
+        """
+        Move the checkpoint of a job past a batch, in the same transaction as
+        the batch's certificate updates.
+
+        Parameters:
+            job_id : UUID
+            checkpoint : Optional[UUID]
+                The last history handled before this batch.
+            last_history_id : UUID
+                The last history of this batch.
+            processed : int
+            rendered : int
+            failed : int
+            errors : Optional[List[str]]
+                The job's error list including this batch.
+
+        Returns: bool
+            False if the job's checkpoint is no longer at `checkpoint`, meaning
+            another worker has taken it over.
+        """
+        values = dict(
+            last_history_id=last_history_id,
+            rows_processed=CertificateRerenderJob.rows_processed + processed,
+            rendered_count=CertificateRerenderJob.rendered_count + rendered,
+            failed_count=CertificateRerenderJob.failed_count + failed,
+            updated_at=func.now(),
+            heartbeat_at=func.now(),
+        )
+        if errors is not None:
+            values["errors"] = errors
+        recorded = self.session.execute(
+            update(CertificateRerenderJob)
+            .where(
+                CertificateRerenderJob.job_id == job_id,
+                CertificateRerenderJob.last_history_id.is_not_distinct_from(checkpoint),
+            )
+            .values(**values)
+            .returning(CertificateRerenderJob.job_id)
+        ).first()
+        return recorded is not None
+
+    def claim(self, job_id: UUID, stale_seconds: float) -> bool:
+        """
+        Mark a job as running if it is pending, or running without a heartbeat
+        for `stale_seconds` because its worker went away.
+
+        Returns: bool
+            True if this caller now owns the job.
+        """
+        claimed = self.session.execute(
+            update(CertificateRerenderJob)
+            .where(
+                CertificateRerenderJob.job_id == job_id,
+                self._resumable(stale_seconds),
+            )
+            .values(
+                status=ImportJobStatus.running.value,
+                updated_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .returning(CertificateRerenderJob.job_id)
+        ).first()
+        return claimed is not None
+
+    def get_resumable_ids(self, stale_seconds: float) -> List[UUID]:
+        """
+        Retrieve the ids of jobs that are waiting for a worker, oldest first.
+        """
+        return self.session.scalars(
+            select(CertificateRerenderJob.job_id)
+            .where(self._resumable(stale_seconds))
+            .order_by(CertificateRerenderJob.created_at)
+        ).all()
+
+    @staticmethod
+    def _resumable(stale_seconds: float):
+        return or_(
+            CertificateRerenderJob.status == ImportJobStatus.pending.value,
+            and_(
+                CertificateRerenderJob.status == ImportJobStatus.running.value,
+                CertificateRerenderJob.heartbeat_at
+                < func.now() - timedelta(seconds=stale_seconds),
+            ),
+        )
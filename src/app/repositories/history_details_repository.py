@@ -1,9 +1,10 @@
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
 
-from app.models.data_models import UserHistoryDetail
+from app.models.data_models import MCQ, MCQAnswerCounts, UserHistory, UserHistoryDetail
 from app.repositories.base_repository import BaseRepository
 from app.schemas.mcq_schemas import HistoryDetailsInput
 
@@ -50,6 +51,131 @@ class HistoryDetailsRepository(BaseRepository[UserHistoryDetail]):
 
         return query.all()
 
+    def get_seen_mcq_ids(self, user_id: UUID, type_: str) -> List[UUID]:
+        """
+        Retrieve the ids of every MCQ of a type the user has answered before.
+
+        Parameters:
+            user_id : UUID
+            type_ : str
+
+        Returns: List[UUID]
+            Distinct MCQ ids.
+        """
+        rows = (
+            self.session.query(UserHistoryDetail.mcq_id)
+            .join(UserHistory, UserHistory.history_id == UserHistoryDetail.history_id)
+            .join(MCQ, MCQ.mcq_id == UserHistoryDetail.mcq_id)
+            .filter(UserHistory.user_id == user_id, MCQ.type == type_)
+            .distinct()
+            .all()
+        )
+        return [row[0] for row in rows]
+
+    def get_regrade_page(
+        self, mcq_ids: List[UUID], after_id: Optional[UUID], limit: int
+    ) -> List[UUID]:
+        """
+        Retrieve the next `limit` ids of the histories with an answer to one of
+        the given MCQs, in history id order, starting after `after_id`.
+
+        Each MCQ reads at most `limit` entries of `ix_user_history_details_mcq_history`
+        from the checkpoint on, so a page costs the same at the end of a
+        regrade as at its start.
+
+        Parameters:
+            mcq_ids : List[UUID]
+            after_id : Optional[UUID]
+                The last history of the previous page.
+            limit : int
+
+        Returns: List[UUID]
+        """
+        return self.session.scalars(
+            text(
+                """
+                SELECT DISTINCT p.history_id
+                FROM unnest(CAST(:mcq_ids AS uuid[])) AS m(mcq_id)
+                CROSS JOIN LATERAL (
+                    SELECT d.history_id FROM user_history_details AS d
+                    WHERE d.mcq_id = m.mcq_id
+                      AND (CAST(:after AS uuid) IS NULL
+                           OR d.history_id > CAST(:after AS uuid))
+                    ORDER BY d.history_id
+                    LIMIT :limit
+                ) AS p
+                ORDER BY p.history_id
+                LIMIT :limit
+                """
+            ),
+            {
+                "mcq_ids": [str(mcq_id) for mcq_id in mcq_ids],
+                "after": str(after_id) if after_id else None,
+                "limit": limit,
+            },
+        ).all()
+
+    def regrade(
+        self, mcq_ids: List[UUID], history_ids: List[UUID]
+    ) -> Tuple[int, List[UUID]]:
+        """
+        Regrade the answers of some histories to the given MCQs against their
+        current answer key.
+
+        One set-based UPDATE flips the answers whose grade changed and moves the
+        `correct_count` of their MCQs in `mcq_answer_counts` by the difference.
+        The counter rows are locked in `mcq_id` order first, the order
+        `McqRepository.record_answers` flushes them in, so a regrade and a
+        flush never wait on each other's rows in opposite orders.
+
+        Parameters:
+            mcq_ids : List[UUID]
+            history_ids : List[UUID]
+                A page from `get_regrade_page`.
+
+        Returns: Tuple[int, List[UUID]]
+            The number of answers regraded and the ids of their histories.
+        """
+        if not history_ids:
+            return 0, []
+        self.session.execute(
+            select(MCQAnswerCounts.mcq_id)
+            .where(MCQAnswerCounts.mcq_id.in_(sorted(mcq_ids)))
+            .order_by(MCQAnswerCounts.mcq_id)
+            .with_for_update()
+        )
+        details_changed, regraded = self.session.execute(
+            text(
+                """
+                WITH changed AS (
+                    UPDATE user_history_details AS d
+                    SET is_correct = NOT d.is_correct
+                    FROM mcqs AS m
+                    WHERE m.mcq_id = ANY(CAST(:mcq_ids AS uuid[]))
+                      AND d.mcq_id = m.mcq_id
+                      AND d.history_id = ANY(CAST(:history_ids AS uuid[]))
+                      AND d.is_correct <> (d.user_answer = m.correct_option)
+                    RETURNING d.history_id, d.mcq_id, d.is_correct
+                ), counters AS (
+                    INSERT INTO mcq_answer_counts AS m (mcq_id, correct_count)
+                    SELECT mcq_id, sum(CASE WHEN is_correct THEN 1 ELSE -1 END)
+                    FROM changed
+                    GROUP BY mcq_id
+                    ORDER BY mcq_id
+                    ON CONFLICT (mcq_id) DO UPDATE
+                    SET correct_count = m.correct_count + EXCLUDED.correct_count
+                )
+                SELECT (SELECT count(*) FROM changed),
+                       ARRAY(SELECT DISTINCT CAST(history_id AS text) FROM changed)
+                """
+            ),
+            {
+                "mcq_ids": [str(mcq_id) for mcq_id in mcq_ids],
+                "history_ids": [str(history_id) for history_id in history_ids],
+            },
+        ).one()
+        return details_changed, [UUID(history_id) for history_id in regraded]
+
     def add(self, history: HistoryDetailsInput):
         """
         Add a new History to the database.
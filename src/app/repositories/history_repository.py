@@ -1,13 +1,39 @@
-from typing import List
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    String,
+    and_,
+    column,
+    desc,
+    func,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, joinedload
 
-from app.models.data_models import UserHistory
+from app.models.data_models import (
+    MCQ,
+    CertificateStatus,
+    Submission,
+    User,
+    UserHistory,
+    UserHistoryDetail,
+)
 from app.repositories.base_repository import BaseRepository
 from app.schemas.mcq_schemas import UserHistoryInput
 
+UNFINISHED_CERTIFICATES = (
+    CertificateStatus.pending.value,
+    CertificateStatus.rendering.value,
+)
+
 
 class HistoryRepository(BaseRepository[UserHistory]):
     """A repository class for managing `UserHistory` objects in the database."""
@@ -37,6 +63,71 @@ class HistoryRepository(BaseRepository[UserHistory]):
         )
         return submission
 
+    def get_with_details(self, history_id) -> Optional[UserHistory]:
+        """
+        Retrieve a History together with its details and the MCQ of each detail.
+
+        Everything is loaded with one joined SELECT through the
+        `UserHistory.details` and `UserHistoryDetail.mcq` relationships, so
+        reading `detail.mcq` afterwards does not query the database again.
+
+        Parameters: history_id : UUID
+
+        Returns: Optional[UserHistory]
+            The UserHistory object, or None if it does not exist
+        """
+        return (
+            self.session.query(UserHistory)
+            .options(
+                joinedload(UserHistory.details)
+                .joinedload(UserHistoryDetail.mcq)
+                .load_only(MCQ.type, MCQ.question, MCQ.options, MCQ.correct_option)
+            )
+            .filter(UserHistory.history_id == history_id)
+            .one_or_none()
+        )
+
+    def get_page(
+        self,
+        user_id,
+        sort_by: str,
+        descending: bool,
+        after: Optional[Tuple[Any, UUID]],
+        limit: int,
+    ) -> List[UserHistory]:
+        """
+        Retrieve one page of a user's History ordered by `sort_by`, then history_id.
+
+        The page starts right after the `(sort value, history_id)` position in
+        `after`, so reading any page is a range scan of the
+        `ix_user_history_user_<sort_by>` index of at most `limit` rows, however
+        long the history is.
+
+        Parameters:
+            user_id : UUID
+            sort_by : str
+                "attempted_at" or "percentage".
+            descending : bool
+            after : Optional[Tuple[Any, UUID]]
+                The position of the last row of the previous page, None for the first page.
+            limit : int
+
+        Returns: List[UserHistory]
+            At most `limit` UserHistory objects.
+        """
+        column = getattr(UserHistory, sort_by)
+        query = self.session.query(UserHistory).filter(UserHistory.user_id == user_id)
+        if after is not None:
+            position = tuple_(column, UserHistory.history_id)
+            query = query.filter(
+                position < tuple_(*after) if descending else position > tuple_(*after)
+            )
+        if descending:
+            query = query.order_by(desc(column), desc(UserHistory.history_id))
+        else:
+            query = query.order_by(column, UserHistory.history_id)
+        return query.limit(limit).all()
+
     def get_all(
         self,
         user_id,
@@ -63,6 +154,211 @@ class HistoryRepository(BaseRepository[UserHistory]):
 
         return query.all()
 
+    def get_recent_percentages(
+        self, user_id: UUID, type_: str, limit: int = 5
+    ) -> List[float]:
+        """
+        Retrieve the percentages of the user's latest attempts of a type.
+
+        Returns: List[float]
+            Newest first.
+        """
+        rows = (
+            self.session.query(UserHistory.percentage)
+            .join(Submission, Submission.submission_id == UserHistory.submission_id)
+            .filter(UserHistory.user_id == user_id, Submission.type == type_)
+            .order_by(desc(UserHistory.attempted_at))
+            .limit(limit)
+            .all()
+        )
+        return [row[0] for row in rows]
+
+    def claim_certificate(
+        self, history_id: UUID, stale_seconds: float
+    ) -> Optional[tuple]:
+        """
+        Mark a certificate as rendering if it is pending, or rendering without
+        an outcome for `stale_seconds` because its worker went away.
+
+        The claim is one conditional UPDATE, so of several workers handed the
+        same history only one renders it.
+
+        Returns: Optional[tuple]
+            `(username, type, percentage)` to render the certificate from if
+            this caller now owns it, else None.
+        """
+        return self.session.execute(
+            update(UserHistory)
+            .where(
+                UserHistory.history_id == history_id,
+                User.user_id == UserHistory.user_id,
+                Submission.submission_id == UserHistory.submission_id,
+                or_(
+                    UserHistory.certificate_status == CertificateStatus.pending.value,
+                    self._stale_rendering(stale_seconds),
+                ),
+            )
+            .values(
+                certificate_status=CertificateStatus.rendering.value,
+                certificate_claimed_at=func.now(),
+            )
+            .returning(User.username, Submission.type, UserHistory.percentage)
+        ).first()
+
+    def set_certificate(
+        self, history_id: UUID, certificate: Optional[str], status: CertificateStatus
+    ) -> bool:
+        """
+        Record the outcome of rendering a claimed certificate.
+
+        Returns: bool
+            False if the certificate was no longer rendering, e.g. because a
+            regrade changed its score meanwhile and it is pending again.
+        """
+        recorded = self.session.execute(
+            update(UserHistory)
+            .where(
+                UserHistory.history_id == history_id,
+                UserHistory.certificate_status == CertificateStatus.rendering.value,
+            )
+            .values(certificate=certificate, certificate_status=status.value)
+            .returning(UserHistory.history_id)
+        ).first()
+        return recorded is not None
+
+    def get_pending_certificate_ids(self, stale_seconds: float) -> List[UUID]:
+        """
+        Retrieve the ids of histories whose certificate has been pending for
+        at least `stale_seconds`, or claimed that long ago without an outcome,
+        oldest first.
+        """
+        return self.session.scalars(
+            select(UserHistory.history_id)
+            .where(
+                or_(
+                    and_(
+                        UserHistory.certificate_status
+                        == CertificateStatus.pending.value,
+                        UserHistory.attempted_at
+                        < func.now() - timedelta(seconds=stale_seconds),
+                    ),
+                    self._stale_rendering(stale_seconds),
+                )
+            )
+            .order_by(UserHistory.attempted_at)
+        ).all()
+
+    @staticmethod
+    def _stale_rendering(stale_seconds: float):
+        return and_(
+            UserHistory.certificate_status == CertificateStatus.rendering.value,
+            UserHistory.certificate_claimed_at
+            < func.now() - timedelta(seconds=stale_seconds),
+        )
+
+    def count_certificates(self) -> int:
+        """
+        Count the histories whose certificate is ready or failed.
+        """
+        return self.session.scalar(
+            select(func.count()).where(
+                UserHistory.certificate_status.notin_(UNFINISHED_CERTIFICATES)
+            )
+        )
+
+    def get_certificate_page(self, after_id: Optional[UUID], limit: int) -> List[tuple]:
+        """
+        Retrieve the next page of certificates to re-render, in history id
+        order, starting after `after_id`.
+
+        Histories whose certificate is still pending or rendering are left to
+        the certificate worker.
+
+        Returns: List[tuple]
+            `(history_id, username, type, percentage)` rows.
+        """
+        query = (
+            select(
+                UserHistory.history_id,
+                User.username,
+                Submission.type,
+                UserHistory.percentage,
+            )
+            .join(User, User.user_id == UserHistory.user_id)
+            .join(Submission, Submission.submission_id == UserHistory.submission_id)
+            .where(UserHistory.certificate_status.notin_(UNFINISHED_CERTIFICATES))
+        )
+        if after_id is not None:
+            query = query.where(UserHistory.history_id > after_id)
+        return self.session.execute(
+            query.order_by(UserHistory.history_id).limit(limit)
+        ).all()
+
+    def set_certificates(self, certificates: Dict[UUID, str]) -> None:
+        """
+        Store the object names of several re-rendered certificates in one
+        UPDATE.
+
+        Parameters: certificates : Dict[UUID, str]
+            Maps history ids to certificate object names.
+        """
+        if not certificates:
+            return
+        rendered = values(
+            column("history_id", PG_UUID(as_uuid=True)),
+            column("certificate", String),
+            name="rendered",
+        ).data(list(certificates.items()))
+        self.session.execute(
+            update(UserHistory)
+            .where(UserHistory.history_id == rendered.c.history_id)
+            .values(
+                certificate=rendered.c.certificate,
+                certificate_status=CertificateStatus.ready.value,
+            )
+        )
+
+    def rescore(self, history_ids: List[UUID]) -> List[UUID]:
+        """
+        Recompute the score and percentage of several histories from their
+        answers in one UPDATE. Histories whose score changed get their
+        certificate re-rendered by the certificate worker.
+
+        Parameters: history_ids : List[UUID]
+
+        Returns: List[UUID]
+            The user of each history whose score changed.
+        """
+        if not history_ids:
+            return []
+        return self.session.scalars(
+            text(
+                """
+                WITH scores AS (
+                    SELECT history_id, count(*) FILTER (WHERE is_correct) AS score
+                    FROM user_history_details
+                    WHERE history_id = ANY(CAST(:history_ids AS uuid[]))
+                    GROUP BY history_id
+                )
+                UPDATE user_history AS h
+                SET total_score = s.score,
+                    percentage = CASE
+                        WHEN h.total_attempts > 0
+                        THEN CAST(s.score AS float8) / h.total_attempts * 100
+                        ELSE 0
+                    END,
+                    certificate_status = :pending
+                FROM scores AS s
+                WHERE h.history_id = s.history_id AND h.total_score <> s.score
+                RETURNING h.user_id
+                """
+            ),
+            {
+                "history_ids": [str(history_id) for history_id in history_ids],
+                "pending": CertificateStatus.pending.value,
+            },
+        ).all()
+
     def add(self, history: UserHistoryInput):
         """
         Add a new History to the database.
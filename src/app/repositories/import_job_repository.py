@@ -0,0 +1,193 @@
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session, undefer
+
+from app.models.data_models import ImportJob, ImportJobStatus
+from app.repositories.base_repository import BaseRepository
+
+
+class ImportJobRepository(BaseRepository[ImportJob]):
+    """A repository class for managing `ImportJob` objects in the database."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the ImportJobRepository with a database session.
+
+        Parameters: session : Session(SQLAlchemy session object)
+        """
+        self.session = session
+
+    def get(self, job_id: UUID) -> ImportJob:
+        """
+        Retrieve a single import job by its UUID, without the uploaded file.
+
+        Parameters: job_id : UUID
+
+        Returns: ImportJob
+            The ImportJob object
+        """
+        return self.session.query(ImportJob).filter(ImportJob.job_id == job_id).first()
+
+    def get_with_content(self, job_id: UUID) -> ImportJob:
+        """
+        Retrieve a single import job together with the uploaded file, for jobs
+        queued before uploads were kept in `import_file_storage`.
+
+        Parameters: job_id : UUID
+
+        Returns: ImportJob
+            The ImportJob object
+        """
+        return (
+            self.session.query(ImportJob)
+            .options(undefer(ImportJob.content))
+            .filter(ImportJob.job_id == job_id)
+            .first()
+        )
+
+    def get_all(self, status: Optional[str] = None) -> List[ImportJob]:
+        """
+        Retrieve import jobs, newest first.
+
+        Parameters: status : Optional[str]
+            Only return jobs in this status.
+
+        Returns: List[ImportJob]
+            A list of ImportJob objects.
+        """
+        query = self.session.query(ImportJob)
+        if status:
+            query = query.filter(ImportJob.status == status)
+        return query.order_by(ImportJob.created_at.desc()).all()
+
+    def add(self, job: ImportJob) -> None:
+        """
+        Add a new import job to the database.
+
+        Parameters: job : ImportJob
+        """
+        self.session.add(job)
+
+    def update(self, job_id: UUID, **kwargs) -> None:
+        """
+        Update an import job with given fields.
+
+        Parameters:
+            job_id : UUID
+            **kwargs : dict
+                Key-value pairs of the attributes to update.
+        """
+        self.session.execute(
+            update(ImportJob)
+            .where(ImportJob.job_id == job_id)
+            .values(updated_at=func.now(), heartbeat_at=func.now(), **kwargs)
+        )
+
+    def delete(self, job_id: UUID) -> None:
+        pass
+
+    def record_chunk(
+        self,
+        job_id: UUID,
+        start: int,
+        stop: int,
+        added: int,
+        skipped: int,
+        near_duplicates: int = 0,
+    ) -> bool:
+        """
+        Record a chunk of rows, in the same transaction as its inserts.
+
+        Parameters:
+            job_id : UUID
+            start : int
+                Rows of the file handled before this chunk.
+            stop : int
+                Rows of the file handled including this chunk.
+            added : int
+            skipped : int
+            near_duplicates : int
+                Near duplicates rejected or flagged in this chunk.
+
+        Returns: bool
+            False if the job's progress is no longer at `start`, meaning
+            another worker has taken it over.
+        """
+        recorded = self.session.execute(
+            update(ImportJob)
+            .where(ImportJob.job_id == job_id, ImportJob.rows_processed == start)
+            .values(
+                rows_processed=stop,
+                added_count=ImportJob.added_count + added,
+                skipped_count=ImportJob.skipped_count + skipped,
+                near_duplicate_count=ImportJob.near_duplicate_count + near_duplicates,
+                updated_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .returning(ImportJob.job_id)
+        ).first()
+        return recorded is not None
+
+    def heartbeat(self, job_id: UUID, rows_processed: int) -> bool:
+        """
+        Show that the worker of a running job is alive while it is not
+        committing chunks, e.g. while it validates the file.
+
+        Returns: bool
+            False if the job is no longer running at `rows_processed`, meaning
+            another worker has taken it over.
+        """
+        alive = self.session.execute(
+            update(ImportJob)
+            .where(
+                ImportJob.job_id == job_id,
+                ImportJob.status == ImportJobStatus.running.value,
+                ImportJob.rows_processed == rows_processed,
+            )
+            .values(heartbeat_at=func.now())
+            .returning(ImportJob.job_id)
+        ).first()
+        return alive is not None
+
+    def claim(self, job_id: UUID, stale_seconds: float) -> bool:
+        """
+        Mark a job as running if it is pending, or running without a heartbeat
+        for `stale_seconds` because its worker went away.
+
+        Returns: bool
+            True if this caller now owns the job.
+        """
+        claimed = self.session.execute(
+            update(ImportJob)
+            .where(ImportJob.job_id == job_id, self._resumable(stale_seconds))
+            .values(
+                status=ImportJobStatus.running.value,
+                updated_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .returning(ImportJob.job_id)
+        ).first()
+        return claimed is not None
+
+    def get_resumable_ids(self, stale_seconds: float) -> List[UUID]:
+        """
+        Retrieve the ids of jobs that are waiting for a worker, oldest first.
+        """
+        return self.session.scalars(
+            select(ImportJob.job_id)
+            .where(self._resumable(stale_seconds))
+            .order_by(ImportJob.created_at)
+        ).all()
+
+    @staticmethod
+    def _resumable(stale_seconds: float):
+        return or_(
+            ImportJob.status == ImportJobStatus.pending.value,
+            and_(
+                ImportJob.status == ImportJobStatus.running.value,
+                ImportJob.heartbeat_at < func.now() - timedelta(seconds=stale_seconds),
+            ),
+        )
@@ -0,0 +1,138 @@
+from typing import Iterator, List, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.data_models import MCQ, MCQStats
+from app.repositories.base_repository import BaseRepository
+
+INSERT_BATCH_SIZE = 5_000
+
+
+class ItemStatsRepository(BaseRepository[MCQStats]):
+    """A repository class for managing `MCQStats` objects in the database."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the ItemStatsRepository with a database session.
+
+        Parameters: session : Session(SQLAlchemy session object)
+        """
+        self.session = session
+
+    def get(self, mcq_id: UUID) -> Optional[MCQStats]:
+        """
+        Retrieve the statistics of one MCQ.
+
+        Parameters: mcq_id : UUID
+
+        Returns: Optional[MCQStats]
+            The MCQStats object, or None if it was never answered
+        """
+        return self.session.get(MCQStats, mcq_id)
+
+    def get_all(
+        self,
+        type_: Optional[str] = None,
+        sort_by: str = "discrimination",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[MCQStats]:
+        """
+        Retrieve MCQ statistics with their question, lowest `sort_by` first.
+
+        Parameters:
+            type_ : Optional[str]
+                Only return MCQs of this type.
+            sort_by : str
+                "difficulty" or "discrimination". Undefined values come last.
+            limit : int
+            offset : int
+
+        Returns: List[MCQStats]
+            MCQStats objects with `mcq` loaded.
+        """
+        query = (
+            self.session.query(MCQStats)
+            .join(MCQStats.mcq)
+            .options(
+                joinedload(MCQStats.mcq).load_only(MCQ.mcq_id, MCQ.type, MCQ.question)
+            )
+        )
+        if type_:
+            query = query.filter(MCQ.type == type_)
+        column = getattr(MCQStats, sort_by)
+        return (
+            query.order_by(column.asc().nulls_last(), MCQStats.mcq_id)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+
+    def add(self, stats: MCQStats) -> None:
+        pass
+
+    def update(self, mcq_id: UUID, **kwargs) -> None:
+        pass
+
+    def delete(self, mcq_id: UUID) -> None:
+        pass
+
+    def get_item_ids(self) -> List[UUID]:
+        """
+        Retrieve every MCQ id in the order `stream_responses` numbers them.
+
+        Returns: List[UUID]
+        """
+        return self.session.scalars(select(MCQ.mcq_id).order_by(MCQ.mcq_id)).all()
+
+    def stream_responses(self, chunk_rows: int) -> Iterator[np.ndarray]:
+        """
+        Stream every answer with the score of its submission, `chunk_rows` at a time.
+
+        The rows are read through a server-side cursor, so at most one chunk is
+        held in memory. MCQs are numbered in SQL by their position in
+        `get_item_ids`, which must be read in the same REPEATABLE READ
+        transaction for the numbers to match.
+
+        Parameters: chunk_rows : int
+
+        Returns: Iterator[np.ndarray]
+            Float arrays of shape `(rows, 5)` holding the item number, the index
+            of the chosen option (0 for "a"), 1 if correct, the submission's
+            score and its number of questions.
+        """
+        result = self.session.execute(
+            text(
+                """
+                SELECT m.item, ascii(d.user_answer) - 97, d.is_correct::int,
+                       h.total_score, h.total_attempts
+                FROM user_history_details AS d
+                JOIN user_history AS h ON h.history_id = d.history_id
+                JOIN (
+                    SELECT mcq_id, row_number() OVER (ORDER BY mcq_id) - 1 AS item
+                    FROM mcqs
+                ) AS m ON m.mcq_id = d.mcq_id
+                """
+            ),
+            execution_options={"yield_per": chunk_rows},
+        )
+        for partition in result.partitions():
+            yield np.array(partition, dtype=np.float64)
+
+    def replace_all(self, rows: List[dict]) -> None:
+        """
+        Replace every statistics row, in batches of `INSERT_BATCH_SIZE`.
+
+        Readers keep seeing the previous statistics until the transaction commits.
+
+        Parameters: rows : List[dict]
+            `mcq_id`, `responses`, `difficulty`, `discrimination` and `option_counts` of each MCQ.
+        """
+        self.session.execute(delete(MCQStats))
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            self.session.execute(
+                insert(MCQStats), rows[start : start + INSERT_BATCH_SIZE]
+            )
@@ -1,12 +1,68 @@
-from typing import List, Optional
-from uuid import UUID
+import heapq
+import random
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
 
-from sqlalchemy import distinct
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    BigInteger,
+    Float,
+    Integer,
+    cast,
+    column,
+    desc,
+    func,
+    literal,
+    literal_column,
+    select,
+    true,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.orm import Session, aliased
 
-from app.models.data_models import MCQ
+from app.models.data_models import MCQ, CacheVersion, MCQAnswerCounts
 from app.repositories.base_repository import BaseRepository
-from app.schemas.mcq_schemas import MCQCreate
+from app.repositories.category_repository import CategoryRepository
+from app.schemas.mcq_schemas import MCQCreate, NearDuplicateMode
+from app.utils.content_hash import mcq_content_hash
+from app.utils.minhash import lsh_buckets, minhash_signature, signature_similarity
+
+QUESTION_BANK_VERSION = "question_bank"
+INGEST_BATCH_SIZE = 5_000
+NEAR_DUPLICATE_THRESHOLD = 0.7
+MAX_REPORT_BUCKET_SIZE = 100
+REPORT_PAGE_SIZE = 5_000
+MAX_SEARCH_CANDIDATES = 5_000
+
+
+class NearDuplicate(NamedTuple):
+    """A question and the most similar MCQ found for it."""
+
+    mcq_id: Optional[UUID]
+    question: str
+    duplicate_of: UUID
+    duplicate_question: str
+    similarity: float
+
+
+class _Candidate(NamedTuple):
+    mcq_id: UUID
+    question: str
+    content_hash: bytes
+    minhash: bytes
+    lsh_buckets: List[int]
+
+
+class IngestResult(NamedTuple):
+    added: int
+    skipped: int
+    near_duplicates: List[NearDuplicate]
 
 
 class McqRepository(BaseRepository[MCQ]):
@@ -19,6 +75,7 @@ class McqRepository(BaseRepository[MCQ]):
         Parameters: session : Session(SQLAlchemy session object)
         """
         self.session = session
+        self.categories = CategoryRepository(session)
 
     def get(self, mcq_id: UUID) -> MCQ:
         """
@@ -32,6 +89,53 @@ class McqRepository(BaseRepository[MCQ]):
         """
         return self.session.query(MCQ).filter(MCQ.mcq_id == mcq_id).first()
 
+    def get_by_content_hash(self, content_hash: bytes) -> Optional[MCQ]:
+        """
+        Retrieve the MCQ with the given content hash, if any.
+
+        Parameters: content_hash : bytes
+            As computed by `mcq_content_hash`.
+
+        Returns: Optional[MCQ]
+            The MCQ object
+        """
+        return self.session.query(MCQ).filter(MCQ.content_hash == content_hash).first()
+
+    def get_many(self, mcq_ids: Iterable[UUID]) -> List[MCQ]:
+        """
+        Retrieve several MCQs by their UUIDs in a single query.
+
+        Parameters: mcq_ids : Iterable[UUID]
+
+        Returns: List[MCQ]
+            The MCQ objects that exist, in no particular order.
+        """
+        mcq_ids = list(mcq_ids)
+        if not mcq_ids:
+            return []
+        return self.session.query(MCQ).filter(MCQ.mcq_id.in_(mcq_ids)).all()
+
+    def get_answer_keys(self, mcq_ids: Iterable[UUID]) -> List[tuple]:
+        """
+        Retrieve the columns needed to grade several MCQs in a single query.
+
+        Parameters: mcq_ids : Iterable[UUID]
+
+        Returns: List[tuple]
+            `(mcq_id, type, question, options, correct_option)` rows for the
+            MCQs that exist, in no particular order.
+        """
+        mcq_ids = list(mcq_ids)
+        if not mcq_ids:
+            return []
+        return (
+            self.session.query(
+                MCQ.mcq_id, MCQ.type, MCQ.question, MCQ.options, MCQ.correct_option
+            )
+            .filter(MCQ.mcq_id.in_(mcq_ids))
+            .all()
+        )
+
     def get_all(
         self,
         type_: Optional[str] = None,
@@ -54,6 +158,98 @@ class McqRepository(BaseRepository[MCQ]):
 
         return query.all()
 
+    def sample(
+        self,
+        type_: str,
+        k: int,
+        exclude_ids: Optional[Iterable[UUID]] = None,
+    ) -> List[MCQ]:
+        """
+        Pick up to `k` random MCQs of a type inside the database.
+
+        Every MCQ carries an indexed uniformly distributed `random_key`. For each
+        of `2 * k` random pivots the first MCQ at or after the pivot, wrapping
+        around past the highest key, is looked up through the
+        `(type, random_key)` index, so the cost depends on `k` and not on the
+        size of the category. If the pivots land on too few distinct rows the
+        result is topped up with the rows that follow another random pivot, also
+        wrapping around, so no part of the key range is favoured.
+
+        Parameters:
+            type_ : str
+                The MCQ type to sample from.
+            k : int
+                The number of MCQs wanted.
+            exclude_ids : Iterable[UUID], optional
+                MCQ ids that must not be returned.
+
+        Returns: List[MCQ]
+            At most `k` distinct MCQ objects in random order.
+        """
+        if k <= 0:
+            return []
+
+        exclude_ids = list(exclude_ids or [])
+        conditions = [MCQ.type == type_]
+        if exclude_ids:
+            conditions.append(MCQ.mcq_id.notin_(exclude_ids))
+
+        pivots = values(column("pivot", Float), name="pivots").data(
+            [(random.random(),) for _ in range(2 * k)]
+        )
+        picked = (
+            select(MCQ.mcq_id)
+            .where(*conditions, MCQ.random_key >= pivots.c.pivot)
+            .order_by(MCQ.random_key)
+            .limit(1)
+            .lateral("picked")
+        )
+        picked_ids = self.session.scalars(
+            select(picked.c.mcq_id).select_from(pivots).outerjoin(picked, true())
+        ).all()
+        if None in picked_ids:
+            # A pivot after the highest key wraps around to the lowest one.
+            lowest_id = self.session.scalar(
+                select(MCQ.mcq_id).where(*conditions).order_by(MCQ.random_key).limit(1)
+            )
+            picked_ids = [mcq_id or lowest_id for mcq_id in picked_ids]
+        mcq_ids = [mcq_id for mcq_id in dict.fromkeys(picked_ids) if mcq_id][:k]
+
+        if len(mcq_ids) < k:
+            mcq_ids += self._top_up(conditions, mcq_ids, k - len(mcq_ids))
+
+        if not mcq_ids:
+            return []
+
+        mcqs = self.session.query(MCQ).filter(MCQ.mcq_id.in_(mcq_ids)).all()
+        random.shuffle(mcqs)
+        return mcqs
+
+    def _top_up(self, conditions: list, picked_ids: List[UUID], limit: int) -> list:
+        """
+        Return up to `limit` MCQ ids, other than `picked_ids`, in key order from a
+        random pivot, continuing from the lowest keys once the range ends.
+        """
+        if picked_ids:
+            conditions = [*conditions, MCQ.mcq_id.notin_(picked_ids)]
+        pivot = random.random()
+        after = (
+            select(MCQ.mcq_id, literal(0).label("part"), MCQ.random_key)
+            .where(*conditions, MCQ.random_key >= pivot)
+            .order_by(MCQ.random_key)
+            .limit(limit)
+        )
+        wrapped = (
+            select(MCQ.mcq_id, literal(1).label("part"), MCQ.random_key)
+            .where(*conditions, MCQ.random_key < pivot)
+            .order_by(MCQ.random_key)
+            .limit(limit)
+        )
+        rows = union_all(after, wrapped).subquery()
+        return self.session.scalars(
+            select(rows.c.mcq_id).order_by(rows.c.part, rows.c.random_key).limit(limit)
+        ).all()
+
     def add(self, mcq: MCQCreate) -> None:
         """
         Add a new MCQ to the database.
@@ -61,8 +257,222 @@ class McqRepository(BaseRepository[MCQ]):
         Parameters: user : MCQCreate
             The mcq details for MCQCreate.
         """
+        mcq.content_hash = mcq_content_hash(mcq.question, mcq.options)
+        mcq.minhash = minhash_signature(mcq.question)
+        mcq.lsh_buckets = lsh_buckets(mcq.minhash)
         self.session.add(mcq)
 
+    def bulk_ingest(
+        self,
+        payloads: Iterable[dict],
+        batch_size: int = INGEST_BATCH_SIZE,
+        near_duplicates: NearDuplicateMode = NearDuplicateMode.off,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        max_bucket_size: int = MAX_REPORT_BUCKET_SIZE,
+    ) -> IngestResult:
+        """
+        Insert MCQs in multi-row batches, skipping questions that already exist.
+
+        Each batch is sent as multi-row `INSERT ... ON CONFLICT (content_hash)
+        DO NOTHING RETURNING mcq_id, type` statements, so existing questions and
+        repeats within the upload are detected by the unique content hash index
+        in the same round trip as the insert. The category counts follow
+        from the rows actually inserted, through database triggers.
+
+        Unless `near_duplicates` is off, every batch is also matched against the
+        LSH buckets of the stored questions and of the batch itself. In reject
+        mode near duplicates are left out and counted as skipped, in flag mode
+        they are inserted and reported.
+
+        Parameters:
+            payloads : Iterable[dict]
+                MCQ column values keyed by column name.
+            batch_size : int
+                Rows per batch.
+            near_duplicates : NearDuplicateMode
+            threshold : float
+                The estimated Jaccard similarity from which a question counts
+                as a near duplicate.
+            max_bucket_size : int
+                Buckets with more questions are ignored, like in
+                `near_duplicate_pairs`.
+
+        Returns: IngestResult
+            The number of MCQs added and skipped, and the near duplicates
+            rejected or flagged.
+        """
+        added = Counter()
+        total = 0
+        found = []
+        batch = []
+        for payload in payloads:
+            minhash = minhash_signature(payload["question"])
+            batch.append(
+                {
+                    "mcq_id": uuid4(),
+                    "content_hash": mcq_content_hash(
+                        payload["question"], payload["options"]
+                    ),
+                    "minhash": minhash,
+                    "lsh_buckets": lsh_buckets(minhash),
+                    **payload,
+                }
+            )
+            if len(batch) >= batch_size:
+                added.update(
+                    self._ingest_batch(
+                        batch, near_duplicates, threshold, max_bucket_size, found
+                    )
+                )
+                total += len(batch)
+                batch = []
+        if batch:
+            added.update(
+                self._ingest_batch(
+                    batch, near_duplicates, threshold, max_bucket_size, found
+                )
+            )
+            total += len(batch)
+
+        added_count = sum(added.values())
+        return IngestResult(added_count, total - added_count, found)
+
+    def _ingest_batch(
+        self,
+        batch: List[dict],
+        near_duplicates: NearDuplicateMode,
+        threshold: float,
+        max_bucket_size: int,
+        found: List[NearDuplicate],
+    ) -> List[str]:
+        if near_duplicates == NearDuplicateMode.off:
+            return [type_ for _, type_ in self._insert_batch(batch)]
+
+        matches = self._match_batch(batch, threshold, max_bucket_size)
+        if near_duplicates == NearDuplicateMode.reject:
+            for row, match in zip(batch, matches):
+                if match:
+                    found.append(NearDuplicate(None, row["question"], *match))
+            batch = [row for row, match in zip(batch, matches) if not match]
+            return [type_ for _, type_ in self._insert_batch(batch)]
+
+        inserted = self._insert_batch(batch)
+        inserted_ids = {mcq_id for mcq_id, _ in inserted}
+        for row, match in zip(batch, matches):
+            if match and row["mcq_id"] in inserted_ids:
+                found.append(NearDuplicate(row["mcq_id"], row["question"], *match))
+        return [type_ for _, type_ in inserted]
+
+    def _match_batch(
+        self, batch: List[dict], threshold: float, max_bucket_size: int
+    ) -> List[Optional[Tuple[UUID, str, float]]]:
+        """
+        Find the most similar stored or earlier question of the batch for each
+        row, as `(mcq_id, question, similarity)`.
+
+        Candidates share at least one LSH bucket with the row. The members of
+        each bucket of the batch are looked up through the GIN index, at most
+        `max_bucket_size + 1` per bucket, and buckets with more than
+        `max_bucket_size` questions are ignored, so a boilerplate question
+        shared by a large part of the bank cannot make every row of the batch
+        compare against all of them. Earlier rows of the batch are only
+        candidates if they had no match and no exact copy themselves, and
+        count towards the size of their buckets. Exact copies are left to the
+        content hash index.
+        """
+        candidates = []
+        by_bucket = defaultdict(list)
+        oversized = set()
+        if batch:
+            keys = (
+                func.unnest(
+                    cast(
+                        sorted({key for row in batch for key in row["lsh_buckets"]}),
+                        ARRAY(BigInteger),
+                    )
+                )
+                .table_valued("key")
+                .render_derived(name="keys")
+            )
+            members = (
+                select(MCQ.mcq_id)
+                .where(MCQ.lsh_buckets.contains(array([keys.c.key])))
+                .limit(max_bucket_size + 1)
+                .lateral("members")
+            )
+            bucket_members = defaultdict(list)
+            for key, mcq_id in self.session.execute(
+                select(keys.c.key, members.c.mcq_id).join(members, true())
+            ):
+                bucket_members[key].append(mcq_id)
+            oversized = {
+                key
+                for key, mcq_ids in bucket_members.items()
+                if len(mcq_ids) > max_bucket_size
+            }
+            mcq_ids = {
+                mcq_id
+                for key, mcq_ids in bucket_members.items()
+                if key not in oversized
+                for mcq_id in mcq_ids
+            }
+            stored = self.session.execute(
+                select(
+                    MCQ.mcq_id,
+                    MCQ.question,
+                    MCQ.content_hash,
+                    MCQ.minhash,
+                    MCQ.lsh_buckets,
+                ).where(MCQ.mcq_id.in_(mcq_ids))
+            ).all()
+            for candidate in stored:
+                for key in candidate.lsh_buckets:
+                    if key not in oversized:
+                        by_bucket[key].append(len(candidates))
+                candidates.append(_Candidate(*candidate))
+
+        matches = []
+        for row in batch:
+            best = None
+            exact = False
+            seen = set()
+            for key in row["lsh_buckets"]:
+                for position in by_bucket.get(key, ()):
+                    if position in seen:
+                        continue
+                    seen.add(position)
+                    candidate = candidates[position]
+                    if candidate.content_hash == row["content_hash"]:
+                        exact = True
+                        continue
+                    similarity = signature_similarity(row["minhash"], candidate.minhash)
+                    if similarity >= threshold and (
+                        best is None or similarity > best[2]
+                    ):
+                        best = (candidate.mcq_id, candidate.question, similarity)
+            matches.append(best)
+            if best is None and not exact:
+                for key in row["lsh_buckets"]:
+                    if key in oversized:
+                        continue
+                    by_bucket[key].append(len(candidates))
+                    if len(by_bucket[key]) > max_bucket_size:
+                        oversized.add(key)
+                        del by_bucket[key]
+                candidates.append(_Candidate(*(row[k] for k in _Candidate._fields)))
+        return matches
+
+    def _insert_batch(self, batch: List[dict]) -> List[tuple]:
+        if not batch:
+            return []
+        table = MCQ.__table__
+        statement = (
+            insert(table)
+            .on_conflict_do_nothing(index_elements=[table.c.content_hash])
+            .returning(table.c.mcq_id, table.c.type)
+        )
+        return self.session.execute(statement, batch).all()
+
     def update(self, mcq_id: UUID, **kwargs) -> None:
         """
         Update an MCQ with given fields.
@@ -77,6 +487,11 @@ class McqRepository(BaseRepository[MCQ]):
         if mcq:
             for key, value in kwargs.items():
                 setattr(mcq, key, value)
+            if "question" in kwargs or "options" in kwargs:
+                mcq.content_hash = mcq_content_hash(mcq.question, mcq.options)
+            if "question" in kwargs:
+                mcq.minhash = minhash_signature(mcq.question)
+                mcq.lsh_buckets = lsh_buckets(mcq.minhash)
 
     def delete(self, mcq_id: UUID) -> bool:
         """
@@ -91,11 +506,294 @@ class McqRepository(BaseRepository[MCQ]):
         self.session.delete(mcq)
         return True
 
-    def get_mcq_types(self) -> list[str]:
+    def get_question_bank(self, type_: str, limit: Optional[int] = None) -> List[tuple]:
+        """
+        Retrieve the columns needed to display and grade every MCQ of a type.
+
+        Parameters:
+            type_ : str
+                The MCQ type.
+            limit : int, optional
+                The maximum number of rows to return.
+
+        Returns: List[tuple]
+            `(mcq_id, question, options, correct_option)` rows in a stable order.
+        """
+        query = (
+            self.session.query(
+                MCQ.mcq_id, MCQ.question, MCQ.options, MCQ.correct_option
+            )
+            .filter(MCQ.type == type_)
+            .order_by(MCQ.created_at, MCQ.mcq_id)
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def count_questions(self, type_: str) -> int:
+        """
+        Return the number of MCQs of a type from the category registry, without
+        scanning the MCQs.
+        """
+        category = self.categories.get(type_)
+        return category.question_count if category else 0
+
+    def get_question_bank_version(self) -> int:
+        """
+        Return the shared question bank version, which database triggers bump
+        whenever MCQs or categories are written by any process.
+        """
+        return (
+            self.session.scalar(
+                select(CacheVersion.version).where(
+                    CacheVersion.name == QUESTION_BANK_VERSION
+                )
+            )
+            or 0
+        )
+
+    def bump_question_bank_version(self) -> None:
+        """
+        Move the shared question bank version, so every process drops its cached
+        question bank on its next version check.
+        """
+        self.session.execute(
+            update(CacheVersion)
+            .where(CacheVersion.name == QUESTION_BANK_VERSION)
+            .values(version=CacheVersion.version + 1)
+        )
+
+    def get_difficulty_counts(self, type_: str) -> List[tuple]:
+        """
+        Retrieve the answer counters of every MCQ of a type.
+
+        Returns: List[tuple]
+            `(mcq_id, attempt_count, correct_count)` rows, zero for MCQs that
+            were never answered.
         """
-        Retrieve distinct types of MCQs.
+        return (
+            self.session.query(
+                MCQ.mcq_id,
+                func.coalesce(MCQAnswerCounts.attempt_count, 0),
+                func.coalesce(MCQAnswerCounts.correct_count, 0),
+            )
+            .outerjoin(MCQAnswerCounts, MCQAnswerCounts.mcq_id == MCQ.mcq_id)
+            .filter(MCQ.type == type_)
+            .all()
+        )
 
-        Returns:
-            list[str]: List of distinct MCQ types.
+    def record_answers(self, counts: Dict[UUID, Tuple[int, int]]) -> None:
         """
-        return self.session.query(distinct(MCQ.type)).all()
+        Add to the answer counters of several MCQs in one upsert.
+
+        The counters live in the narrow `mcq_answer_counts` table and are
+        written in batches by `AnswerCountBuffer`, after the submissions
+        commit, never by the submission transactions themselves. The rows are
+        inserted in `mcq_id` order, so two processes flushing overlapping
+        MCQs lock them in the same order instead of deadlocking, and MCQs
+        deleted since they were answered are skipped.
+
+        Parameters:
+            counts : Dict[UUID, Tuple[int, int]]
+                Maps MCQ ids to the number of new attempts and correct answers.
+        """
+        if not counts:
+            return
+        increments = values(
+            column("mcq_id", PG_UUID(as_uuid=True)),
+            column("attempts", Integer),
+            column("correct", Integer),
+            name="increments",
+        ).data([(mcq_id, *counts[mcq_id]) for mcq_id in sorted(counts)])
+        statement = insert(MCQAnswerCounts).from_select(
+            ["mcq_id", "attempt_count", "correct_count"],
+            select(increments.c.mcq_id, increments.c.attempts, increments.c.correct)
+            .join(MCQ, MCQ.mcq_id == increments.c.mcq_id)
+            .order_by(increments.c.mcq_id),
+        )
+        self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[MCQAnswerCounts.mcq_id],
+                set_={
+                    "attempt_count": MCQAnswerCounts.attempt_count
+                    + statement.excluded.attempt_count,
+                    "correct_count": MCQAnswerCounts.correct_count
+                    + statement.excluded.correct_count,
+                },
+            )
+        )
+
+    def search(
+        self,
+        text: str,
+        type_: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+        max_matches: int = 1000,
+        max_candidates: int = MAX_SEARCH_CANDIDATES,
+    ) -> Tuple[List[MCQ], int]:
+        """
+        Full-text search over MCQ questions.
+
+        The words of `text` are stemmed and matched against the stored
+        `question_tsv` column through its GIN index, the last one as a prefix so partially
+        typed words match too. At most `max_candidates` matches are taken from the index
+        and only those are ranked with `ts_rank`, so a short prefix matching much of the
+        bank does not rank every match; the ids of the `max_matches` most relevant
+        candidates are read in one query and only the requested page of MCQs is loaded.
+        Misspelled words do not match: typo tolerance would need a `pg_trgm` trigram
+        index and is deliberately left out.
+
+        Parameters:
+            text : str
+                The words to look for.
+            type_ : str, optional
+                Restrict the search to one MCQ type.
+            limit : int
+            offset : int
+            max_matches : int
+                The number of most relevant matches that can be paged through.
+            max_candidates : int
+                The number of matches ranked. When more questions match, the
+                ranking only covers an arbitrary subset of them.
+
+        Returns: Tuple[List[MCQ], int]
+            One page of matching MCQs, most relevant first, and the number of
+            matches, capped at `max_matches`.
+        """
+        words = re.findall(r"\w+", text)
+        if not words:
+            return [], 0
+
+        document = MCQ.question_tsv
+        tsquery = func.to_tsquery(
+            literal_column("'english'"), " & ".join(words[:-1] + [f"{words[-1]}:*"])
+        )
+        conditions = [document.op("@@")(tsquery)]
+        if type_:
+            conditions.append(MCQ.type == type_)
+
+        candidates = (
+            select(MCQ.mcq_id, document.label("document"))
+            .where(*conditions)
+            .limit(max_candidates)
+            .subquery()
+        )
+        ranked = self.session.scalars(
+            select(candidates.c.mcq_id)
+            .order_by(
+                desc(func.ts_rank(candidates.c.document, tsquery)),
+                candidates.c.mcq_id,
+            )
+            .limit(max_matches)
+        ).all()
+        page = ranked[offset : offset + limit]
+        if not page:
+            return [], len(ranked)
+        mcqs = {
+            mcq.mcq_id: mcq
+            for mcq in self.session.query(MCQ).filter(MCQ.mcq_id.in_(page))
+        }
+        return [mcqs[mcq_id] for mcq_id in page if mcq_id in mcqs], len(ranked)
+
+    def near_duplicate_pairs(
+        self,
+        type_: Optional[str] = None,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        limit: int = 100,
+        max_bucket_size: int = MAX_REPORT_BUCKET_SIZE,
+        page_size: int = REPORT_PAGE_SIZE,
+    ) -> List[NearDuplicate]:
+        """
+        Find pairs of stored MCQs whose questions are near duplicates.
+
+        Candidate pairs are MCQs that share an LSH bucket, found with one
+        self-join of the unnested `lsh_buckets` arrays, so questions that share
+        no bucket are never compared. Buckets with more than `max_bucket_size`
+        members are left out of the join, which bounds the candidates to
+        `max_bucket_size ** 2` per bucket however the bank is worded; a near
+        duplicate pair almost always shares several of its `LSH_BANDS` buckets,
+        so it is still found through a smaller one. The candidates are streamed
+        from a server-side cursor in pages of `page_size` pairs, each checked
+        against the MinHash signatures loaded for that page only, while the
+        `limit` most similar pairs are kept.
+
+        Parameters:
+            type_ : str, optional
+                Restrict the report to one MCQ type.
+            threshold : float
+                The estimated Jaccard similarity from which a pair is reported.
+            limit : int
+                The number of pairs to return.
+            max_bucket_size : int
+            page_size : int
+
+        Returns: List[NearDuplicate]
+            The most similar pairs first, the newer MCQ of each pair as
+            `mcq_id`.
+        """
+        buckets = select(
+            MCQ.mcq_id, func.unnest(MCQ.lsh_buckets).label("bucket")
+        ).where(MCQ.lsh_buckets.isnot(None))
+        if type_:
+            buckets = buckets.where(MCQ.type == type_)
+        buckets = buckets.cte("buckets")
+        small = (
+            select(buckets.c.bucket)
+            .group_by(buckets.c.bucket)
+            .having(func.count().between(2, max_bucket_size))
+            .subquery("small")
+        )
+        other = aliased(buckets, name="other")
+        pages = self.session.execute(
+            select(buckets.c.mcq_id, other.c.mcq_id)
+            .join(small, small.c.bucket == buckets.c.bucket)
+            .join(
+                other,
+                (other.c.bucket == buckets.c.bucket)
+                & (other.c.mcq_id > buckets.c.mcq_id),
+            )
+            .distinct(),
+            execution_options={"stream_results": True},
+        ).partitions(page_size)
+
+        top: List[Tuple[float, Tuple[UUID, UUID], NearDuplicate]] = []
+        for pairs in pages:
+            mcq_ids = {mcq_id for pair in pairs for mcq_id in pair}
+            mcqs = {
+                row.mcq_id: row
+                for row in self.session.execute(
+                    select(MCQ.mcq_id, MCQ.question, MCQ.minhash, MCQ.created_at).where(
+                        MCQ.mcq_id.in_(mcq_ids)
+                    )
+                )
+            }
+            for first_id, second_id in pairs:
+                first, second = mcqs[first_id], mcqs[second_id]
+                similarity = signature_similarity(first.minhash, second.minhash)
+                if similarity < threshold:
+                    continue
+                if (first.created_at, first.mcq_id) > (
+                    second.created_at,
+                    second.mcq_id,
+                ):
+                    first, second = second, first
+                entry = (
+                    similarity,
+                    (first_id, second_id),
+                    NearDuplicate(
+                        second.mcq_id,
+                        second.question,
+                        first.mcq_id,
+                        first.question,
+                        similarity,
+                    ),
+                )
+                if len(top) < limit:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
+        return [
+            pair
+            for _, _, pair in sorted(top, key=lambda entry: entry[:2], reverse=True)
+        ]
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.data_models import ImportJobStatus, RegradeJob
+from app.repositories.base_repository import BaseRepository
+
+REGRADE_LOCK_ID = 0x72656772  # "regr"
+
+
+class RegradeJobRepository(BaseRepository[RegradeJob]):
+    """A repository class for managing `RegradeJob` objects in the database."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the RegradeJobRepository with a database session.
+
+        Parameters: session : Session(SQLAlchemy session object)
+        """
+        self.session = session
+
+    def get(self, job_id: UUID) -> RegradeJob:
+        """
+        Retrieve a single regrade job by its UUID.
+
+        Parameters: job_id : UUID
+
+        Returns: RegradeJob
+            The RegradeJob object
+        """
+        return (
+            self.session.query(RegradeJob).filter(RegradeJob.job_id == job_id).first()
+        )
+
+    def get_all(self, status: Optional[str] = None) -> List[RegradeJob]:
+        """
+        Retrieve regrade jobs, newest first.
+
+        Parameters: status : Optional[str]
+            Only return jobs in this status.
+
+        Returns: List[RegradeJob]
+            A list of RegradeJob objects.
+        """
+        query = self.session.query(RegradeJob)
+        if status:
+            query = query.filter(RegradeJob.status == status)
+        return query.order_by(RegradeJob.created_at.desc()).all()
+
+    def add(self, job: RegradeJob) -> None:
+        """
+        Add a new regrade job to the database.
+
+        Parameters: job : RegradeJob
+        """
+        self.session.add(job)
+
+    def update(self, job_id: UUID, **kwargs) -> None:
+        """
+        Update a regrade job with given fields.
+
+        Parameters:
+            job_id : UUID
+            **kwargs : dict
+                Key-value pairs of the attributes to update.
+        """
+        self.session.execute(
+            update(RegradeJob)
+            .where(RegradeJob.job_id == job_id)
+            .values(updated_at=func.now(), heartbeat_at=func.now(), **kwargs)
+        )
+
+    def delete(self, job_id: UUID) -> None:
+        pass
+
+    def lock(self) -> None:
+        """
+        Take the transaction-level advisory lock that runs regrade batches one
+        at a time, so two jobs never move the answer counters of the same MCQs
+        in different orders.
+        """
+        self.session.execute(select(func.pg_advisory_xact_lock(REGRADE_LOCK_ID)))
+
+    def record_batch(
+        self,
+        job_id: UUID,
+        checkpoint: Optional[UUID],
+        last_history_id: UUID,
+        details_changed: int,
+        histories_changed: int,
+        users_changed: int,
+    ) -> bool:
+        """
+        Move the checkpoint of a job past a batch, in the same transaction as
+        the batch's regrade.
+
+        Parameters:
+            job_id : UUID
+            checkpoint : Optional[UUID]
+                The last history handled before this batch.
+            last_history_id : UUID
+                The last history of this batch.
+            details_changed : int
+            histories_changed : int
+            users_changed : int
+
+        Returns: bool
+            False if the job's checkpoint is no longer at `checkpoint`, meaning
+            another worker has taken it over.
+        """
+        recorded = self.session.execute(
+            update(RegradeJob)
+            .where(
+                RegradeJob.job_id == job_id,
+                RegradeJob.last_history_id.is_not_distinct_from(checkpoint),
+            )
+            .values(
+                last_history_id=last_history_id,
+                details_changed=RegradeJob.details_changed + details_changed,
+                histories_changed=RegradeJob.histories_changed + histories_changed,
+                users_changed=RegradeJob.users_changed + users_changed,
+                updated_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .returning(RegradeJob.job_id)
+        ).first()
+        return recorded is not None
+
+    def claim(self, job_id: UUID, stale_seconds: float) -> bool:
+        """
+        Mark a job as running if it is pending, or running without a heartbeat
+        for `stale_seconds` because its worker went away.
+
+        Returns: bool
+            True if this caller now owns the job.
+        """
+        claimed = self.session.execute(
+            update(RegradeJob)
+            .where(RegradeJob.job_id == job_id, self._resumable(stale_seconds))
+            .values(
+                status=ImportJobStatus.running.value,
+                updated_at=func.now(),
+                heartbeat_at=func.now(),
+            )
+            .returning(RegradeJob.job_id)
+        ).first()
+        return claimed is not None
+
+    def get_resumable_ids(self, stale_seconds: float) -> List[UUID]:
+        """
+        Retrieve the ids of jobs that are waiting for a worker, oldest first.
+        """
+        return self.session.scalars(
+            select(RegradeJob.job_id)
+            .where(self._resumable(stale_seconds))
+            .order_by(RegradeJob.created_at)
+        ).all()
+
+    @staticmethod
+    def _resumable(stale_seconds: float):
+        return or_(
+            RegradeJob.status == ImportJobStatus.pending.value,
+            and_(
+                RegradeJob.status == ImportJobStatus.running.value,
+                RegradeJob.heartbeat_at < func.now() - timedelta(seconds=stale_seconds),
+            ),
+        )
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import Dict, Iterable, List, Union
 from uuid import UUID
 
 from passlib.context import CryptContext
@@ -45,6 +45,25 @@ class UserRepository(BaseRepository[User]):
         users = self.session.query(User).all()
         return users
 
+    def get_usernames(self, user_ids: Iterable[UUID]) -> Dict[UUID, str]:
+        """
+        Retrieve the usernames of several users in one query.
+
+        Parameters: user_ids : Iterable[UUID]
+
+        Returns: Dict[UUID, str]
+            Maps the ids of the users that exist to their usernames.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        rows = (
+            self.session.query(User.user_id, User.username)
+            .filter(User.user_id.in_(user_ids))
+            .all()
+        )
+        return {user_id: username for user_id, username in rows}
+
     def add(self, user: UserRegisterInput) -> None:
         """
         Add a new user to the database.
@@ -0,0 +1,268 @@
+from datetime import datetime
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import Row, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.data_models import UserStats, UserStatsRemoval
+from app.repositories.base_repository import BaseRepository
+
+
+class UserStatsRepository(BaseRepository[UserStats]):
+    """A repository class for managing `UserStats` objects in the database."""
+
+    def __init__(self, session: Session):
+        """
+        Initialize the UserStatsRepository with a database session.
+
+        Parameters: session : Session(SQLAlchemy session object)
+        """
+        self.session = session
+
+    def get(self, user_id: UUID, type_: str) -> Optional[UserStats]:
+        """
+        Retrieve the statistics of a user for one MCQ type by primary key.
+
+        Parameters:
+            user_id : UUID
+            type_ : str
+
+        Returns: Optional[UserStats]
+            The UserStats object, or None if the user never submitted that type
+        """
+        return self.session.get(UserStats, (user_id, type_))
+
+    def get_all(self, user_id: UUID) -> List[UserStats]:
+        """
+        Retrieve the statistics of a user for every MCQ type they submitted.
+
+        Parameters: user_id : UUID
+
+        Returns: List[UserStats]
+            A list of UserStats objects ordered by type.
+        """
+        return (
+            self.session.query(UserStats)
+            .filter(UserStats.user_id == user_id)
+            .order_by(UserStats.type)
+            .all()
+        )
+
+    def get_changed_since(self, since: Optional[datetime]) -> List[Row]:
+        """
+        Retrieve the ranking fields of the rows updated after `since`, or of every row.
+
+        Parameters: since : Optional[datetime]
+
+        Returns: List[Row]
+            `(user_id, type, attempts, percentage_sum, best_percentage, updated_at)` rows.
+        """
+        query = select(
+            UserStats.user_id,
+            UserStats.type,
+            UserStats.attempts,
+            UserStats.percentage_sum,
+            UserStats.best_percentage,
+            UserStats.updated_at,
+        )
+        if since is not None:
+            query = query.where(UserStats.updated_at > since)
+        return self.session.execute(query).all()
+
+    def get_removed_since(self, since: datetime) -> List[Row]:
+        """
+        Retrieve the rows removed after `since`, with the ranking fields of the
+        row that replaced them, if any.
+
+        Removals are recorded by a trigger, for a deleted user as well as for
+        a rebuild, which deletes and inserts the rows of its users again.
+
+        Parameters: since : datetime
+
+        Returns: List[Row]
+            `(user_id, type, removed_at, attempts, percentage_sum, best_percentage)`
+            rows, the last three None when the row is gone.
+        """
+        return self.session.execute(
+            select(
+                UserStatsRemoval.user_id,
+                UserStatsRemoval.type,
+                UserStatsRemoval.removed_at,
+                UserStats.attempts,
+                UserStats.percentage_sum,
+                UserStats.best_percentage,
+            )
+            .outerjoin(
+                UserStats,
+                (UserStats.user_id == UserStatsRemoval.user_id)
+                & (UserStats.type == UserStatsRemoval.type),
+            )
+            .where(UserStatsRemoval.removed_at > since)
+        ).all()
+
+    def add(self, stats: UserStats) -> None:
+        pass
+
+    def update(self, user_id: UUID, **kwargs) -> None:
+        pass
+
+    def delete(self, user_id: UUID) -> None:
+        pass
+
+    def record(
+        self, user_id: UUID, type_: str, score: float, percentage: float, window: int
+    ) -> Row:
+        """
+        Add one submission to the statistics of a user in one statement.
+
+        The row is created on the first submission of a type. The latest
+        submission is stamped with the transaction time, like the history row
+        written in the same transaction, and only the last `window`
+        percentages are kept.
+
+        Parameters:
+            user_id : UUID
+            type_ : str
+            score : float
+            percentage : float
+            window : int
+                Number of recent percentages to keep.
+
+        Returns: Row
+            The updated `(attempts, percentage_sum, best_percentage)`.
+        """
+        statement = insert(UserStats).values(
+            user_id=user_id,
+            type=type_,
+            attempts=1,
+            score_sum=score,
+            percentage_sum=percentage,
+            best_percentage=percentage,
+            latest_percentage=percentage,
+            latest_attempted_at=func.current_timestamp(),
+            recent_percentages=[percentage],
+            updated_at=func.current_timestamp(),
+        )
+        kept = UserStats.recent_percentages[
+            func.greatest(
+                func.cardinality(UserStats.recent_percentages) - window + 2, 1
+            ) : func.cardinality(UserStats.recent_percentages)
+        ]
+        return self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[UserStats.user_id, UserStats.type],
+                set_={
+                    "attempts": UserStats.attempts + 1,
+                    "score_sum": UserStats.score_sum + statement.excluded.score_sum,
+                    "percentage_sum": UserStats.percentage_sum
+                    + statement.excluded.percentage_sum,
+                    "best_percentage": func.greatest(
+                        UserStats.best_percentage, statement.excluded.best_percentage
+                    ),
+                    "latest_percentage": statement.excluded.latest_percentage,
+                    "latest_attempted_at": statement.excluded.latest_attempted_at,
+                    "recent_percentages": func.array_cat(
+                        kept, statement.excluded.recent_percentages
+                    ),
+                    "updated_at": statement.excluded.updated_at,
+                },
+            ).returning(
+                UserStats.attempts, UserStats.percentage_sum, UserStats.best_percentage
+            )
+        ).one()
+
+    def rebuild(
+        self, after_user_id: Optional[UUID], limit: int, window: int
+    ) -> Optional[UUID]:
+        """
+        Recompute the statistics of the next `limit` users from their history.
+
+        Users are walked in user_id order, so a backfill resumes from the last
+        user id it returned. Existing rows of those users are replaced.
+
+        Parameters:
+            after_user_id : Optional[UUID]
+                The last user of the previous batch, None to start from the first user.
+            limit : int
+                Number of users in the batch.
+            window : int
+                Number of recent percentages to keep.
+
+        Returns: Optional[UUID]
+            The last user of the batch, or None when there are no users left.
+        """
+        user_ids = self.session.scalars(
+            text(
+                """
+                SELECT user_id FROM users
+                WHERE CAST(:after AS uuid) IS NULL OR user_id > CAST(:after AS uuid)
+                ORDER BY user_id
+                LIMIT :limit
+                """
+            ),
+            {"after": str(after_user_id) if after_user_id else None, "limit": limit},
+        ).all()
+        if not user_ids:
+            return None
+
+        self.rebuild_users(user_ids, window)
+        return UUID(str(user_ids[-1]))
+
+    def rebuild_users(self, user_ids: Iterable[UUID], window: int) -> None:
+        """
+        Recompute the statistics of the given users from their history,
+        replacing their existing rows.
+
+        `updated_at` is the time of the rebuild rather than the start of the
+        transaction, so a long transaction does not hide the new rows from a
+        leaderboard refresh that already moved past its start.
+
+        Parameters:
+            user_ids : Iterable[UUID]
+            window : int
+                Number of recent percentages to keep.
+        """
+        parameters = {
+            "user_ids": [str(user_id) for user_id in user_ids],
+            "window": window,
+        }
+        self.session.execute(
+            text(
+                "DELETE FROM user_stats WHERE user_id = ANY(CAST(:user_ids AS uuid[]))"
+            ),
+            parameters,
+        )
+        self.session.execute(
+            text(
+                """
+                WITH ranked AS (
+                    SELECT h.user_id, s.type, h.total_score, h.percentage,
+                           h.attempted_at,
+                           row_number() OVER (
+                               PARTITION BY h.user_id, s.type
+                               ORDER BY h.attempted_at DESC, h.history_id DESC
+                           ) AS recency
+                    FROM user_history AS h
+                    JOIN submissions AS s ON s.submission_id = h.submission_id
+                    WHERE h.user_id = ANY(CAST(:user_ids AS uuid[]))
+                )
+                INSERT INTO user_stats (
+                    user_id, type, attempts, score_sum, percentage_sum,
+                    best_percentage, latest_percentage, latest_attempted_at,
+                    recent_percentages, updated_at
+                )
+                SELECT user_id, type, count(*), sum(total_score), sum(percentage),
+                       max(percentage),
+                       max(percentage) FILTER (WHERE recency = 1),
+                       max(attempted_at) FILTER (WHERE recency = 1),
+                       array_agg(percentage ORDER BY recency DESC)
+                           FILTER (WHERE recency <= :window),
+                       clock_timestamp()
+                FROM ranked
+                GROUP BY user_id, type
+                """
+            ),
+            parameters,
+        )
@@ -1,17 +1,32 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile
 
 from app.schemas.mcq_schemas import (
+    CategoryCreate,
+    CategoryOutput,
+    CertificateRerenderJobOutput,
+    ImportJobOutput,
+    ItemStatsOutput,
+    ItemStatsSortKey,
     MCQCreate,
+    NearDuplicateMode,
+    NearDuplicateOutput,
+    PaginatedResponse,
+    RegradeJobInput,
+    RegradeJobOutput,
     UserCreate,
     UserOutput,
+    UserStatsOutput,
     UserUpdate,
     UserUpdateOutput,
 )
 from app.services import (
+    CertificateUnitOfWork,
+    HistoryUnitOfWork,
     McqUnitOfWork,
+    RegradeUnitOfWork,
     UserUnitOfWork,
     aws_services,
     mcq_services,
@@ -48,6 +63,24 @@ def get_one_user(
     return user
 
 
+@router.get("/users/{user_id}/stats", response_model=List[UserStatsOutput])
+def get_user_stats(
+    user_id: UUID,
+    type: Optional[str] = Query(None, description="MCQ type to get statistics of"),
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Get the best, average and latest scores of one user per MCQ type
+    """
+    unit_of_work = HistoryUnitOfWork()
+    return mcq_services.view_user_stats(
+        unit_of_work=unit_of_work,
+        current_user=current_user,
+        user_id=user_id,
+        type=type,
+    )
+
+
 @router.post("/users", status_code=201)
 def add_user(
     user_details: UserCreate,
@@ -100,7 +133,15 @@ def delete_user(
 
 @router.post("/bulk-upload", status_code=201)
 def bulk_upload_mcqs(
+    response: Response,
     file: UploadFile = File(...),
+    background: bool = Query(
+        False, description="Import as a background job polled via its job_id"
+    ),
+    near_duplicates: NearDuplicateMode = Query(
+        NearDuplicateMode.off,
+        description="Reject or flag questions that are near duplicates of existing ones",
+    ),
     current_user: UserOutput = Depends(user_services.get_current_user),
 ):
     """
@@ -108,21 +149,58 @@ def bulk_upload_mcqs(
 
     Args:
         file (UploadFile): Excel file containing MCQ data.
+        background (bool): Queue the import as a job and return it right away.
+        near_duplicates (NearDuplicateMode): Reject or flag near-duplicate questions.
         current_user (UserOutput): Current authenticated user.
 
     Returns:
-        dict: Response message with the count of MCQs successfully added.
+        dict: Response message with the count of MCQs successfully added and
+        any near duplicates found, or the queued import job in background mode.
     """
     unit_of_work = McqUnitOfWork()
-    added_count, skipped_count = mcq_services.bulk_add_mcqs(
-        unit_of_work=unit_of_work, file=file, current_user=current_user
+    if background:
+        response.status_code = 202
+        return mcq_services.create_import_job(
+            unit_of_work=unit_of_work,
+            file=file,
+            current_user=current_user,
+            near_duplicates=near_duplicates,
+        )
+
+    added_count, skipped_count, near_duplicate_count, found = (
+        mcq_services.bulk_add_mcqs(
+            unit_of_work=unit_of_work,
+            file=file,
+            current_user=current_user,
+            near_duplicates=near_duplicates,
+        )
     )
     if skipped_count:
-        return {
-            "message": f"{added_count} unique MCQs added and {skipped_count} duplicate MCQs skipped."
-        }
+        message = f"{added_count} unique MCQs added and {skipped_count} duplicate MCQs skipped."
     else:
-        return {"message": f"{added_count} unique MCQs added."}
+        message = f"{added_count} unique MCQs added."
+    if near_duplicates == NearDuplicateMode.off:
+        return {"message": message}
+
+    action = "rejected" if near_duplicates == NearDuplicateMode.reject else "flagged"
+    return {
+        "message": f"{message} {near_duplicate_count} near-duplicate MCQs {action}.",
+        "near_duplicates": found,
+    }
+
+
+@router.get("/bulk-upload/{job_id}", response_model=ImportJobOutput)
+def get_bulk_upload_job(
+    job_id: UUID,
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to poll the progress of a background bulk-upload job.
+    """
+    unit_of_work = McqUnitOfWork()
+    return mcq_services.get_import_job(
+        unit_of_work=unit_of_work, job_id=job_id, current_user=current_user
+    )
 
 
 @router.post("/mcq", status_code=201)
@@ -139,6 +217,139 @@ def create_mcq(
     )
 
 
+@router.get("/mcq/categories", response_model=List[CategoryOutput])
+def get_categories(
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to list MCQ categories with their question counts.
+    """
+    unit_of_work = McqUnitOfWork()
+    return mcq_services.get_categories(
+        unit_of_work=unit_of_work, current_user=current_user
+    )
+
+
+@router.post("/mcq/categories", status_code=201, response_model=CategoryOutput)
+def create_category(
+    category: CategoryCreate,
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to register a new MCQ category.
+    """
+    unit_of_work = McqUnitOfWork()
+    return mcq_services.add_category(
+        unit_of_work=unit_of_work, category=category, current_user=current_user
+    )
+
+
+@router.get("/mcq/search", response_model=PaginatedResponse)
+def search_mcqs(
+    q: str = Query(..., min_length=1, description="Words to search for"),
+    type: Optional[str] = Query(None, description="MCQ type to filter by"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(20, ge=1, le=100, description="Number of MCQs per page"),
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to search MCQ questions by words, most relevant first.
+    """
+    unit_of_work = McqUnitOfWork()
+    return mcq_services.search_mcqs(
+        unit_of_work=unit_of_work,
+        current_user=current_user,
+        text=q,
+        type=type,
+        page=page,
+        page_size=page_size,
+    )
+
+
+@router.get("/mcq/near-duplicates", response_model=List[NearDuplicateOutput])
+def get_near_duplicates(
+    type: Optional[str] = Query(None, description="MCQ type to filter by"),
+    threshold: Optional[float] = Query(
+        None, gt=0, le=1, description="Minimum estimated similarity of a pair"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Number of pairs to return"),
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to report pairs of MCQs whose questions are near duplicates, most similar first.
+    """
+    unit_of_work = McqUnitOfWork()
+    return mcq_services.get_near_duplicates(
+        unit_of_work=unit_of_work,
+        current_user=current_user,
+        type=type,
+        threshold=threshold,
+        limit=limit,
+    )
+
+
+@router.post("/mcq/item-stats", status_code=202)
+def analyze_items(
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to recompute the difficulty, discrimination and option shares of every MCQ in the background.
+    """
+    return mcq_services.start_item_analysis(current_user=current_user)
+
+
+@router.get("/mcq/item-stats", response_model=List[ItemStatsOutput])
+def get_item_stats(
+    type: Optional[str] = Query(None, description="MCQ type"),
+    sort_by: ItemStatsSortKey = Query(
+        ItemStatsSortKey.discrimination, description="Lowest first"
+    ),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to see the item statistics of MCQs from the last analysis.
+    """
+    unit_of_work = McqUnitOfWork()
+    return mcq_services.get_item_stats(
+        unit_of_work=unit_of_work,
+        current_user=current_user,
+        type=type,
+        sort_by=sort_by,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.post("/mcq/regrade", status_code=202, response_model=RegradeJobOutput)
+def regrade_mcqs(
+    regrade: RegradeJobInput,
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to regrade every past answer to MCQs whose answer key changed, in the background.
+    """
+    unit_of_work = RegradeUnitOfWork()
+    return mcq_services.create_regrade_job(
+        unit_of_work=unit_of_work, mcq_ids=regrade.mcq_ids, current_user=current_user
+    )
+
+
+@router.get("/mcq/regrade/{job_id}", response_model=RegradeJobOutput)
+def get_regrade_job(
+    job_id: UUID,
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to poll a regrade job and see how many histories it changed.
+    """
+    unit_of_work = RegradeUnitOfWork()
+    return mcq_services.get_regrade_job(
+        unit_of_work=unit_of_work, job_id=job_id, current_user=current_user
+    )
+
+
 @router.post("/upload-template", status_code=201)
 def upload_template(
     file: UploadFile = File(...),
@@ -148,3 +359,46 @@ def upload_template(
     Upload a .jpg file to S3 as a template for certificate generation
     """
     return aws_services.upload_template(file=file, current_user=current_user)
+
+
+@router.post(
+    "/certificates/rerender",
+    status_code=202,
+    response_model=CertificateRerenderJobOutput,
+)
+def rerender_certificates(
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to re-render every certificate in the background, e.g. after uploading a new template.
+    """
+    unit_of_work = CertificateUnitOfWork()
+    return mcq_services.create_certificate_rerender_job(
+        unit_of_work=unit_of_work, current_user=current_user
+    )
+
+
+@router.get(
+    "/certificates/rerender/{job_id}", response_model=CertificateRerenderJobOutput
+)
+def get_rerender_certificates_job(
+    job_id: UUID,
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to poll the progress of a certificate re-render job.
+    """
+    unit_of_work = CertificateUnitOfWork()
+    return mcq_services.get_certificate_rerender_job(
+        unit_of_work=unit_of_work, job_id=job_id, current_user=current_user
+    )
+
+
+@router.get("/metrics")
+def get_metrics(
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to inspect in-process cache counters such as question bank cache hits and misses.
+    """
+    return mcq_services.get_metrics(current_user=current_user)
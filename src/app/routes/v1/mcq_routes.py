@@ -1,15 +1,19 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from app.schemas.mcq_schemas import (
+    HistorySortKey,
+    LeaderboardOutput,
     PaginatedResponse,
+    QuizMode,
+    SortOrder,
     SubmissionInput,
     SubmissionOutput,
-    TypeEnum,
-    UserHistoryInput,
+    UserHistoryPage,
     UserOutput,
+    UserStatsOutput,
 )
 from app.services import (
     HistoryUnitOfWork,
@@ -22,10 +26,10 @@ from app.services import (
 router = APIRouter(tags=["MCQ Routes"])
 
 
-@router.get("/mcq/types", response_model=list[TypeEnum])
+@router.get("/mcq/types", response_model=list[str])
 def get_mcq_types(current_user: UserOutput = Depends(user_services.get_current_user)):
     """
-    Endpoint to fetch distinct MCQ types.
+    Endpoint to fetch the MCQ types that have questions.
     """
     unit_of_work = McqUnitOfWork()
     return mcq_services.fetch_mcq_types(unit_of_work=unit_of_work)
@@ -33,29 +37,48 @@ def get_mcq_types(current_user: UserOutput = Depends(user_services.get_current_u
 
 @router.get("/mcq/", response_model=PaginatedResponse)
 async def get_random_mcqs(
-    type: str = Query(..., description="MCQ type to filter by"),
-    page_size: int = Query(10, le=100, description="Number of MCQs to attempt"),
-    page: int = Query(1, ge=1, description="Page number for pagination"),
+    response: Response,
+    type: Optional[str] = Query(None, description="MCQ type to start a quiz with"),
+    page_size: int = Query(10, ge=1, le=100, description="Number of MCQs per page"),
+    total_questions: Optional[int] = Query(
+        None,
+        ge=1,
+        le=100,
+        description="Number of MCQs to attempt, defaults to page_size",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="nextCursor of the previous page to continue a quiz"
+    ),
+    mode: QuizMode = Query(
+        QuizMode.random, description="random, or adaptive to match your accuracy"
+    ),
     current_user: UserOutput = Depends(user_services.get_current_user),
 ):
     """
-    Fetches random MCQs of a chosen type, paginated by the given limit.
+    Starts a quiz of random MCQs of a chosen type, or continues one by cursor.
 
     Parameters:
-    - type: MCQ type to filter the MCQs.
-    - limit: Number of MCQs to return in the response (pagination).
+    - type: MCQ type to start a quiz with.
+    - page_size: Number of MCQs to return in the response (pagination).
+    - total_questions: Number of MCQs in the quiz.
+    - cursor: Cursor returned by the previous page of the same quiz.
+    - mode: random, or adaptive to pick questions by difficulty.
 
     Returns:
-    - List of MCQs based on the given type, paginated by the limit.
+    - A page of the quiz's MCQs and the cursor of the next page.
     """
     unit_of_work = McqUnitOfWork()
     mcqs = mcq_services.get_all(
         unit_of_work=unit_of_work,
         type=type,
         page_size=page_size,
-        page=page,
+        total_questions=total_questions,
+        cursor=cursor,
+        mode=mode,
         current_user=current_user,
     )
+    if cursor:
+        response.headers["Cache-Control"] = "private, max-age=3600"
     return mcqs
 
 
@@ -89,14 +112,20 @@ def generate_certificate(
     return result
 
 
-@router.get("/mcq/history", response_model=List[UserHistoryInput])
+@router.get("/mcq/history", response_model=UserHistoryPage)
 def user_submission_history(
-    sort_by: str = Query(None, description="History to sort by"),
-    order: str = Query("asc", description="sort order (asc/desc)"),
+    sort_by: HistorySortKey = Query(
+        HistorySortKey.attempted_at, description="History to sort by"
+    ),
+    order: SortOrder = Query(SortOrder.asc, description="sort order (asc/desc)"),
+    page_size: int = Query(
+        20, ge=1, le=100, description="Number of histories per page"
+    ),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
     current_user: UserOutput = Depends(user_services.get_current_user),
 ):
     """
-    Endpoint to see user's submissions history.
+    Endpoint to see user's submissions history, one page at a time.
     """
     unit_of_work = HistoryUnitOfWork()
     result = mcq_services.view_history_of_submission_of_user(
@@ -104,10 +133,41 @@ def user_submission_history(
         current_user=current_user,
         sort_by=sort_by,
         order=order,
+        page_size=page_size,
+        cursor=cursor,
     )
     return result
 
 
+@router.get("/mcq/stats", response_model=List[UserStatsOutput])
+def user_stats(
+    type: Optional[str] = Query(None, description="MCQ type to get statistics of"),
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to see the user's best, average and latest scores per MCQ type.
+    """
+    unit_of_work = HistoryUnitOfWork()
+    return mcq_services.view_user_stats(
+        unit_of_work=unit_of_work, current_user=current_user, type=type
+    )
+
+
+@router.get("/mcq/leaderboard", response_model=LeaderboardOutput)
+def leaderboard(
+    type: str = Query(..., description="MCQ type to rank users in"),
+    limit: int = Query(10, ge=1, le=100, description="Number of top users"),
+    current_user: UserOutput = Depends(user_services.get_current_user),
+):
+    """
+    Endpoint to see the top users of an MCQ type and the user's own rank.
+    """
+    unit_of_work = HistoryUnitOfWork()
+    return mcq_services.view_leaderboard(
+        unit_of_work=unit_of_work, current_user=current_user, type=type, limit=limit
+    )
+
+
 @router.get("/mcq/history/{history_id}", response_model=SubmissionOutput)
 def user_submission_history_by_id(
     history_id: UUID,
@@ -126,13 +186,16 @@ def user_submission_history_by_id(
 @router.get("/mcq/history/{history_id}/certificate")
 def fetch_certificate(
     history_id: UUID,
+    response: Response,
     current_user: UserOutput = Depends(user_services.get_current_user),
 ):
     """
-    Endpoint to fetch particular submission certificate
+    Endpoint to fetch particular submission certificate, 202 while it is still being generated
     """
     unit_of_work = HistoryUnitOfWork()
     result = mcq_services.generate_certificate_presigned_url(
         unit_of_work=unit_of_work, current_user=current_user, history_id=history_id
     )
+    if result["status"] == "pending":
+        response.status_code = 202
     return result
@@ -1,8 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import UUID4, BaseModel, EmailStr
+from pydantic import UUID4, BaseModel, EmailStr, Field
 
 
 class UserRole(str, Enum):
@@ -133,19 +133,114 @@ class OptionEnum(str, Enum):
     d = "d"
 
 
-class TypeEnum(str, Enum):
-    python = "python"
-    java = "java"
-    csharp = "csharp"
+class QuizMode(str, Enum):
+    random = "random"
+    adaptive = "adaptive"
+
+
+class HistorySortKey(str, Enum):
+    attempted_at = "attempted_at"
+    percentage = "percentage"
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class ItemStatsSortKey(str, Enum):
+    difficulty = "difficulty"
+    discrimination = "discrimination"
+
+
+class NearDuplicateMode(str, Enum):
+    off = "off"
+    flag = "flag"
+    reject = "reject"
 
 
 class MCQTypes(BaseModel):
-    types: List[TypeEnum]
+    types: List[str]
 
     class Config:
         json_schema_extra = {"example": {"types": ["python", "csharp", "java"]}}
 
 
+class CategoryCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50, pattern=r"^[a-z0-9_+#.-]+$")
+
+    class Config:
+        json_schema_extra = {"example": {"name": "golang"}}
+
+
+class CategoryOutput(BaseModel):
+    name: str
+    question_count: int
+    created_at: Optional[datetime] = None
+
+
+class ImportJobOutput(BaseModel):
+    job_id: UUID4
+    filename: str
+    status: str
+    total_rows: Optional[int] = None
+    rows_processed: int = 0
+    added_count: int = 0
+    skipped_count: int = 0
+    near_duplicate_mode: NearDuplicateMode = NearDuplicateMode.off
+    near_duplicate_count: int = 0
+    errors: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class CertificateRerenderJobOutput(BaseModel):
+    job_id: UUID4
+    status: str
+    total_rows: Optional[int] = None
+    rows_processed: int = 0
+    rendered_count: int = 0
+    failed_count: int = 0
+    errors: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class RegradeJobInput(BaseModel):
+    mcq_ids: List[UUID4] = Field(..., min_length=1, max_length=1000)
+
+
+class RegradeJobOutput(BaseModel):
+    job_id: UUID4
+    status: str
+    mcq_ids: List[UUID4]
+    details_changed: int = 0
+    histories_changed: int = 0
+    users_changed: int = 0
+    errors: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class NearDuplicateOutput(BaseModel):
+    mcq_id: Optional[UUID4] = None
+    question: str
+    duplicate_of: UUID4
+    duplicate_question: str
+    similarity: float
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "mcq_id": "72ed3e01-ea48-481e-b060-d31ee8a74177",
+                "question": "Which one of these is a mutable data type in Python?",
+                "duplicate_of": "341458b1-87b5-440b-8324-8f013b353ade",
+                "duplicate_question": "Which of the following is a mutable data type in Python?",
+                "similarity": 0.78125,
+            }
+        }
+
+
 class MCQBase(BaseModel):
     type: str
     question: str
@@ -189,17 +284,19 @@ class AttemptedMcq(BaseModel):
 
 
 class SubmissionInput(BaseModel):
+    submissionId: Optional[UUID4] = None
     attempted: List[AttemptedMcq]
 
     class Config:
         json_schema_extra = {
             "example": {
+                "submissionId": "0f6b3c1e-8a52-4d7e-9c1a-3b2d5e6f7a80",
                 "attempted": [
                     {
                         "mcq_id": "72ed3e01-ea48-481e-b060-d31ee8a74177",
                         "user_answer": "a",
                     }
-                ]
+                ],
             }
         }
 
@@ -284,11 +381,129 @@ class UserHistoryInput(BaseModel):
         }
 
 
+class UserHistoryPage(BaseModel):
+    data: List[UserHistoryInput]
+    nextCursor: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "data": [
+                    {
+                        "history_id": "53cbd4eb-740f-4bbe-8e85-02db29d4218b",
+                        "user_id": "9fbd245b-20b3-45a3-b81b-d3a32926981f",
+                        "total_score": 1,
+                        "percentage": 100,
+                        "total_attempts": 1,
+                        "attempted_at": "2025-01-09T13:32:09.883204",
+                    }
+                ],
+                "nextCursor": "WyJhdHRlbXB0ZWRfYXQiLCAiZGVzYyIsIC4uLl0=",
+            }
+        }
+
+
+class UserStatsOutput(BaseModel):
+    type: str
+    attempts: int
+    average_score: float
+    average_percentage: float
+    best_percentage: float
+    latest_percentage: Optional[float] = None
+    latest_attempted_at: Optional[datetime] = None
+    recent_percentages: List[float]
+    recent_average_percentage: Optional[float] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "type": "python",
+                "attempts": 12,
+                "average_score": 7.5,
+                "average_percentage": 75,
+                "best_percentage": 100,
+                "latest_percentage": 80,
+                "latest_attempted_at": "2025-01-09T13:32:09.883204",
+                "recent_percentages": [60, 90, 80],
+                "recent_average_percentage": 76.67,
+            }
+        }
+
+
+class LeaderboardEntryOutput(BaseModel):
+    rank: int
+    user_id: UUID4
+    username: Optional[str] = None
+    best_percentage: float
+    average_percentage: float
+    attempts: int
+
+
+class LeaderboardOutput(BaseModel):
+    type: str
+    total_users: int
+    data: List[LeaderboardEntryOutput]
+    me: Optional[LeaderboardEntryOutput] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "type": "python",
+                "total_users": 1250,
+                "data": [
+                    {
+                        "rank": 1,
+                        "user_id": "9fbd245b-20b3-45a3-b81b-d3a32926981f",
+                        "username": "kamalesh",
+                        "best_percentage": 100,
+                        "average_percentage": 92.5,
+                        "attempts": 8,
+                    }
+                ],
+                "me": {
+                    "rank": 42,
+                    "user_id": "53cbd4eb-740f-4bbe-8e85-02db29d4218b",
+                    "username": "learner",
+                    "best_percentage": 90,
+                    "average_percentage": 71.25,
+                    "attempts": 4,
+                },
+            }
+        }
+
+
+class ItemStatsOutput(BaseModel):
+    mcq_id: UUID4
+    type: str
+    question: str
+    responses: int
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+    option_shares: Dict[str, float]
+    computed_at: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "mcq_id": "53cbd4eb-740f-4bbe-8e85-02db29d4218b",
+                "type": "python",
+                "question": "What is the output of print(2 ** 3)?",
+                "responses": 1840,
+                "difficulty": 0.82,
+                "discrimination": 0.31,
+                "option_shares": {"a": 0.05, "b": 0.82, "c": 0.1, "d": 0.03},
+                "computed_at": "2025-01-09T13:32:09.883204",
+            }
+        }
+
+
 class PaginatedResponse(BaseModel):
     currentPage: int
     totalPage: int
     nextPage: Optional[int]
     totalCount: int
+    submissionId: Optional[UUID4] = None
+    nextCursor: Optional[str] = None
     data: List[Any]
 
     class Config:
@@ -298,6 +513,8 @@ class PaginatedResponse(BaseModel):
                 "totalPage": 5,
                 "nextPage": 2,
                 "totalCount": 80,
+                "submissionId": "0b1c6f0e-5c3a-4a55-9d1f-2f7f8b7f8c11",
+                "nextCursor": "MGIxYzZmMGUtNWMzYS00YTU1LTlkMWYtMmY3ZjhiN2Y4YzExOjE2",
                 "data": [
                     {
                         "type": "python",
@@ -1,6 +1,8 @@
 from .unit_of_work import (
-    UserUnitOfWork,
-    McqUnitOfWork,
+    CertificateUnitOfWork,
     HistoryUnitOfWork,
+    McqUnitOfWork,
+    RegradeUnitOfWork,
     SubmissionUnitOfWork,
-    )
+    UserUnitOfWork,
+)
@@ -0,0 +1,113 @@
+import time
+from threading import Lock, Thread
+from typing import Callable, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.unit_of_work import McqUnitOfWork
+
+ANSWER_COUNTS_FLUSH_SECONDS = float(app_config.get("ANSWER_COUNTS_FLUSH_SECONDS", 2))
+
+Counts = Dict[UUID, Tuple[int, int]]
+
+
+class AnswerCountBuffer:
+    """
+    Per-process buffer of the answer counters of committed submissions.
+
+    `process_submission` adds its answers after its transaction commits, so
+    submissions never lock counter rows, and a background thread writes
+    everything added since the last flush in one upsert every
+    `flush_seconds`. A failed flush puts its counts back to be written with
+    the next one. Counts added since the last flush are lost if the process
+    dies; they only feed the difficulty estimates of adaptive quizzes, and
+    `user_history_details` still records every answer.
+    """
+
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self.flushes = 0
+        self.answers_written = 0
+        self.errors = 0
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._pending: Counts = {}
+        self._flusher: Optional[Thread] = None
+
+    def start(self, writer: Callable[[Counts], None]) -> None:
+        """
+        Start the flush thread, once.
+        """
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = Thread(
+                target=self._flush_loop,
+                args=(writer,),
+                name="answer-counts",
+                daemon=True,
+            )
+        self._flusher.start()
+
+    def add(self, counts: Counts) -> None:
+        """
+        Add the new attempts and correct answers of some MCQs.
+        """
+        with self._lock:
+            self._add(counts)
+
+    def flush(self, writer: Callable[[Counts], None]) -> None:
+        """
+        Write the counts added since the last flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                counts, self._pending = self._pending, {}
+            if not counts:
+                return
+            try:
+                writer(counts)
+            except Exception:
+                with self._lock:
+                    self._add(counts)
+                    self.errors += 1
+                raise
+            with self._lock:
+                self.flushes += 1
+                self.answers_written += sum(attempts for attempts, _ in counts.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending_mcqs": len(self._pending),
+                "flushes": self.flushes,
+                "answers_written": self.answers_written,
+                "errors": self.errors,
+            }
+
+    def _add(self, counts: Counts) -> None:
+        for mcq_id, (attempts, correct) in counts.items():
+            pending_attempts, pending_correct = self._pending.get(mcq_id, (0, 0))
+            self._pending[mcq_id] = (
+                pending_attempts + attempts,
+                pending_correct + correct,
+            )
+
+    def _flush_loop(self, writer: Callable[[Counts], None]) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.flush(writer)
+            except Exception:
+                pass
+
+
+def write_answer_counts(counts: Counts) -> None:
+    """
+    Add buffered counts to `mcq_answer_counts`.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        unit_of_work.mcq.record_answers(counts)
+
+
+answer_counts = AnswerCountBuffer(flush_seconds=ANSWER_COUNTS_FLUSH_SECONDS)
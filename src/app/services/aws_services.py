@@ -1,13 +1,29 @@
+import io
 import json
+import re
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from tempfile import TemporaryFile
+from threading import Lock
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
 
 import boto3
 from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageDraw, ImageFont
 
 from app.config.settings import app_config
 from app.schemas.mcq_schemas import UserOutput
+from app.services.presigned_url_cache import make_presigned_url_cache
 
 s3_client = boto3.client("s3")
 lambda_client = boto3.client("lambda", region_name=app_config["REGION_NAME"])
+presigned_url_cache = make_presigned_url_cache(s3_client)
+
+FILES_DIR = Path(__file__).resolve().parents[3] / "files"
+TEMPLATE_KEY = "image_template/template_ui.jpg"
+MEDAL_THRESHOLDS = [(90, "gold"), (75, "silver"), (50, "bronze")]
 
 
 def upload_template(file: UploadFile, current_user: UserOutput):
@@ -24,50 +40,452 @@ def upload_template(file: UploadFile, current_user: UserOutput):
             status_code=400, detail="Invalid file type. Please upload a .jpg file."
         )
 
-    file_name = "image_template/template_ui.jpg"
+    file_name = TEMPLATE_KEY
 
     s3_client.upload_fileobj(file.file, app_config["BUCKET_NAME"], file_name)
+    certificate_renderer.invalidate()
 
     return {"message": f"File uploaded successfully to {file_name}"}
 
 
-def generate_certificate(data: dict):
+class CertificateStorage:
+    """Where rendered certificates are written, keyed by object name."""
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        raise NotImplementedError
+
+
+class S3CertificateStorage(CertificateStorage):
+    """Writes certificates to the S3 bucket presigned URLs are generated for."""
+
+    def __init__(self, bucket: str, client=s3_client):
+        self.bucket = bucket
+        self.client = client
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(
+            Bucket=self.bucket, Key=key, Body=data, ContentType=content_type
+        )
+
+
+class LocalCertificateStorage(CertificateStorage):
+    """Writes certificates to a local directory, for development and tests."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self.directory / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+class ImportFileStorage:
     """
-    Sends a POST request to generate a certificate and retrieves the certificate URL.
+    Where uploaded import files wait for their worker, keyed by object name.
+
+    Files are copied in and out as streams, so neither the upload request nor
+    the worker holds a whole file in memory.
     """
-    try:
-        response = lambda_client.invoke(
-            FunctionName=app_config["LAMBDA_FUNCTION_NAME"],
-            InvocationType="RequestResponse",
-            Payload=json.dumps(data),
+
+    def save(self, key: str, file: BinaryIO) -> None:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """
+        Open a stored file for reading. The caller closes it.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class S3ImportFileStorage(ImportFileStorage):
+    """Keeps import files in an S3 bucket, shared by every worker process."""
+
+    def __init__(self, bucket: str, client=s3_client):
+        self.bucket = bucket
+        self.client = client
+
+    def save(self, key: str, file: BinaryIO) -> None:
+        self.client.upload_fileobj(file, self.bucket, key)
+
+    def open(self, key: str) -> BinaryIO:
+        # The readers seek, so the object is spooled to a temporary file.
+        file = TemporaryFile()
+        try:
+            self.client.download_fileobj(self.bucket, key, file)
+        except Exception:
+            file.close()
+            raise
+        file.seek(0)
+        return file
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+
+class LocalImportFileStorage(ImportFileStorage):
+    """Keeps import files in a local directory, for development and tests."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def save(self, key: str, file: BinaryIO) -> None:
+        path = self.directory / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as stored:
+            shutil.copyfileobj(file, stored)
+
+    def open(self, key: str) -> BinaryIO:
+        return (self.directory / key).open("rb")
+
+    def delete(self, key: str) -> None:
+        (self.directory / key).unlink(missing_ok=True)
+
+
+def make_import_file_storage() -> ImportFileStorage:
+    """
+    Build the storage selected by IMPORT_FILE_DIR, or the S3 bucket named in
+    IMPORT_FILE_BUCKET_NAME (BUCKET_NAME by default) when it is not set.
+    """
+    directory = app_config.get("IMPORT_FILE_DIR")
+    if directory:
+        return LocalImportFileStorage(directory)
+    return S3ImportFileStorage(
+        app_config.get("IMPORT_FILE_BUCKET_NAME", app_config.get("BUCKET_NAME"))
+    )
+
+
+import_file_storage = make_import_file_storage()
+
+
+class CertificateRenderer:
+    """
+    Renders a certificate from `{"name", "type", "percentage"}` and returns
+    `{"body": {"object_name": ...}}`, the payload of the certificate Lambda.
+    """
+
+    def render(self, data: dict) -> dict:
+        raise NotImplementedError
+
+    def invalidate(self) -> None:
+        """
+        Drop anything cached from the template. Called after it is replaced.
+        """
+
+
+class LambdaCertificateRenderer(CertificateRenderer):
+    """Renders each certificate with one synchronous Lambda invocation."""
+
+    def __init__(self, function_name: str, client=lambda_client):
+        self.function_name = function_name
+        self.client = client
+
+    def render(self, data: dict) -> dict:
+        try:
+            response = self.client.invoke(
+                FunctionName=self.function_name,
+                InvocationType="RequestResponse",
+                Payload=json.dumps(data),
+            )
+            response_payload = json.loads(response["Payload"].read().decode("utf-8"))
+
+            if response.get("StatusCode") == 200:
+                return response_payload
+            else:
+                raise HTTPException(
+                    status_code=response.get("StatusCode"),
+                    detail="Certificate generation failed",
+                )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Lambda invocation error: {str(e)}"
+            )
+
+
+class JpegRows:
+    """
+    A baseline JPEG encoded with a restart marker after every row of MCUs,
+    split into the entropy-coded data of each row.
+
+    Restart markers reset the DC predictors, so the data of a row depends only
+    on its own pixels: rows encoded from a strip of the image with the same
+    settings can replace the rows of the full image without re-encoding the
+    rest.
+    """
+
+    def __init__(self, data: bytes):
+        sos = data.index(b"\xff\xda")
+        start = sos + 2 + int.from_bytes(data[sos + 2 : sos + 4], "big")
+        self.header = data[:start]
+        self.rows = re.split(
+            rb"\xff[\xd0-\xd7]", data[start : data.rindex(b"\xff\xd9")]
         )
-        response_payload = json.loads(response["Payload"].read().decode("utf-8"))
 
-        if response.get("StatusCode") == 200:
-            return response_payload
-        else:
+    def join(self, rows: List[bytes]) -> bytes:
+        parts = [self.header]
+        for n, row in enumerate(rows):
+            if n:
+                parts.append(bytes((0xFF, 0xD0 + (n - 1) % 8)))
+            parts.append(row)
+        parts.append(b"\xff\xd9")
+        return b"".join(parts)
+
+
+class PillowCertificateRenderer(CertificateRenderer):
+    """
+    Renders certificates in process with Pillow.
+
+    The template, the medals and the fixed wording are decoded and drawn once
+    into one base image per medal, which is kept in memory until `invalidate`
+    together with its JPEG encoding split into MCU rows (see `JpegRows`). A
+    certificate only draws and encodes the rows its three lines of text cover
+    and splices them into the encoded base. The rows of the type and
+    percentage lines only take a few distinct values and are cached, so most
+    certificates draw and encode the name rows only.
+    """
+
+    WIDTH = 806
+    TEXT_COLOR = (255, 255, 255)
+    MEDAL_SIZE = 150
+    MCU_HEIGHT = 16
+
+    def __init__(
+        self,
+        template_loader: Callable[[], bytes],
+        storage: CertificateStorage,
+        medals_dir: Path = FILES_DIR / "medals",
+        font_path: Optional[str] = None,
+        quality: int = 85,
+        max_cached_rows: int = 2_000,
+    ):
+        self.template_loader = template_loader
+        self.storage = storage
+        self.medals_dir = Path(medals_dir)
+        self.font_path = font_path
+        self.quality = quality
+        self.max_cached_rows = max_cached_rows
+        self._lock = Lock()
+        self._bases: Optional[Dict[Optional[str], Tuple[Image.Image, JpegRows]]] = None
+        self._generation = 0
+        self._rows: "OrderedDict[tuple, List[bytes]]" = OrderedDict()
+        self._fonts: Dict[int, ImageFont.ImageFont] = {}
+
+    def render(self, data: dict) -> dict:
+        try:
+            body = self.encode(data)
+            object_name = f"certificates/{uuid4().hex}.jpg"
+            self.storage.put(object_name, body, "image/jpeg")
+        except Exception as e:
             raise HTTPException(
-                status_code=response.get("StatusCode"),
-                detail="Certificate generation failed",
+                status_code=500, detail=f"Certificate rendering error: {str(e)}"
             )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Lambda invocation error: {str(e)}"
+        return {"body": {"object_name": object_name}}
+
+    def draw(self, data: dict) -> Image.Image:
+        """
+        Draw a certificate on a copy of the cached base for its medal.
+        """
+        percentage = float(data["percentage"])
+        image = self._get_bases()[medal_for(percentage)][0].copy()
+        draw = ImageDraw.Draw(image)
+        for y, text, size, _ in self._lines(data):
+            self._centered(draw, y, text, size)
+        return image
+
+    def encode(self, data: dict) -> bytes:
+        """
+        Encode a certificate as JPEG, byte for byte what encoding `draw(data)`
+        with `_save` produces.
+        """
+        medal = medal_for(float(data["percentage"]))
+        with self._lock:
+            generation = self._generation
+        base, encoded = self._get_bases()[medal]
+        rows = list(encoded.rows)
+        spans = []
+        for y, text, size, cached in self._lines(data):
+            _, top, _, bottom = self._font(size).getbbox(text, anchor="mm")
+            first = max(y + top, 0) // self.MCU_HEIGHT
+            last = min(-(-(y + bottom) // self.MCU_HEIGHT), len(rows))
+            if last <= first:
+                continue
+            if spans and first < spans[-1]:
+                # Lines closer than an MCU row cannot be spliced separately.
+                return self._save(self.draw(data))
+            spans.append(last)
+            key = (generation, medal, y, size, text)
+            strip = self._cached_rows(key) if cached else None
+            if strip is None:
+                strip = self._encode_rows(base, first, last, y, text, size)
+                if cached:
+                    self._cache_rows(key, strip)
+            rows[first:last] = strip
+        return encoded.join(rows)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._bases = None
+            self._generation += 1
+            self._rows.clear()
+
+    def _lines(self, data: dict) -> List[Tuple[int, str, int, bool]]:
+        """The `(y, text, size, cacheable)` lines that differ between certificates."""
+        return [
+            (350, str(data["name"]), 56, False),
+            (490, f"{str(data['type']).upper()} QUIZ", 40, True),
+            (600, f"{float(data['percentage']):.0f}%", 48, True),
+        ]
+
+    def _save(self, image: Image.Image) -> bytes:
+        output = io.BytesIO()
+        image.save(
+            output,
+            format="JPEG",
+            quality=self.quality,
+            subsampling=2,
+            restart_marker_rows=1,
         )
+        return output.getvalue()
+
+    def _encode_rows(
+        self,
+        base: Image.Image,
+        first: int,
+        last: int,
+        y: int,
+        text: str,
+        size: int,
+    ) -> List[bytes]:
+        top = first * self.MCU_HEIGHT
+        strip = base.crop(
+            (0, top, base.width, min(last * self.MCU_HEIGHT, base.height))
+        )
+        self._centered(ImageDraw.Draw(strip), y - top, text, size)
+        return JpegRows(self._save(strip)).rows
+
+    def _cached_rows(self, key: tuple) -> Optional[List[bytes]]:
+        with self._lock:
+            rows = self._rows.get(key)
+            if rows is not None:
+                self._rows.move_to_end(key)
+            return rows
+
+    def _cache_rows(self, key: tuple, rows: List[bytes]) -> None:
+        with self._lock:
+            self._rows[key] = rows
+            while len(self._rows) > self.max_cached_rows:
+                self._rows.popitem(last=False)
+
+    def _get_bases(self) -> Dict[Optional[str], Tuple[Image.Image, JpegRows]]:
+        with self._lock:
+            if self._bases is None:
+                self._bases = {
+                    medal: (base, JpegRows(self._save(base)))
+                    for medal, base in self._build_bases().items()
+                }
+            return self._bases
+
+    def _build_bases(self) -> Dict[Optional[str], Image.Image]:
+        template = Image.open(io.BytesIO(self.template_loader())).convert("RGB")
+        draw = ImageDraw.Draw(template)
+        self._centered(draw, 110, "CERTIFICATE", 64)
+        self._centered(draw, 190, "OF ACHIEVEMENT", 32)
+        self._centered(draw, 290, "This certifies that", 26)
+        self._centered(draw, 440, "has completed the", 26)
+        self._centered(draw, 550, "with a score of", 26)
+
+        bases = {None: template}
+        for _, medal in MEDAL_THRESHOLDS:
+            icon = Image.open(self.medals_dir / f"{medal}.png").convert("RGBA")
+            icon = icon.resize((self.MEDAL_SIZE, self.MEDAL_SIZE), Image.LANCZOS)
+            base = template.copy()
+            base.paste(icon, ((self.WIDTH - self.MEDAL_SIZE) // 2, 650), icon)
+            bases[medal] = base
+        return bases
+
+    def _font(self, size: int) -> ImageFont.ImageFont:
+        font = self._fonts.get(size)
+        if font is None:
+            font = (
+                ImageFont.truetype(self.font_path, size)
+                if self.font_path
+                else ImageFont.load_default(size=size)
+            )
+            self._fonts[size] = font
+        return font
+
+    def _centered(self, draw: ImageDraw.ImageDraw, y: int, text: str, size: int):
+        draw.text(
+            (self.WIDTH // 2, y),
+            text,
+            fill=self.TEXT_COLOR,
+            font=self._font(size),
+            anchor="mm",
+        )
+
+
+def medal_for(percentage: float) -> Optional[str]:
+    """
+    Return the medal earned with a percentage, None below the lowest threshold.
+    """
+    for threshold, medal in MEDAL_THRESHOLDS:
+        if percentage >= threshold:
+            return medal
+    return None
+
+
+def load_template() -> bytes:
+    """
+    Read the certificate template from the template bucket, or from
+    `files/image_template` when CERTIFICATE_TEMPLATE_SOURCE is "local".
+    """
+    if app_config.get("CERTIFICATE_TEMPLATE_SOURCE", "s3") == "local":
+        return (FILES_DIR / TEMPLATE_KEY).read_bytes()
+    response = s3_client.get_object(Bucket=app_config["BUCKET_NAME"], Key=TEMPLATE_KEY)
+    return response["Body"].read()
+
+
+def make_certificate_renderer() -> CertificateRenderer:
+    """
+    Build the renderer selected by CERTIFICATE_RENDERER, "lambda" or "local".
+    """
+    if app_config.get("CERTIFICATE_RENDERER", "lambda") != "local":
+        return LambdaCertificateRenderer(app_config.get("LAMBDA_FUNCTION_NAME"))
+
+    output_dir = app_config.get("CERTIFICATE_OUTPUT_DIR")
+    storage = (
+        LocalCertificateStorage(output_dir)
+        if output_dir
+        else S3CertificateStorage(app_config.get("CERTIFICATE_OUTPUT_BUCKET_NAME"))
+    )
+    return PillowCertificateRenderer(
+        template_loader=load_template,
+        storage=storage,
+        font_path=app_config.get("CERTIFICATE_FONT_PATH"),
+    )
+
+
+certificate_renderer = make_certificate_renderer()
+
+
+def generate_certificate(data: dict):
+    """
+    Renders a certificate with the configured renderer and returns its object name.
+    """
+    return certificate_renderer.render(data)
 
 
 def generate_presigned_url_func(file_key: str):
     """
-    Fetches an object from S3 and returns its content.
+    Returns a presigned URL for a certificate, reusing a cached one while it is
+    still valid for longer than the cache margin.
     """
     try:
-        presigned_url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={
-                "Bucket": app_config["CERTIFICATE_OUTPUT_BUCKET_NAME"],
-                "Key": file_key,
-            },
-            ExpiresIn=300,
+        presigned_url = presigned_url_cache.get_url(
+            app_config["CERTIFICATE_OUTPUT_BUCKET_NAME"], file_key
         )
 
         return {"message": "Presigned URL generated successfully", "url": presigned_url}
@@ -0,0 +1,64 @@
+from typing import Iterable
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.models.data_models import CertificateStatus
+from app.services.aws_services import generate_certificate
+from app.services.job_queue import JobQueue
+from app.services.unit_of_work import HistoryUnitOfWork
+
+CERTIFICATE_STALE_SECONDS = float(app_config.get("CERTIFICATE_STALE_SECONDS", 300))
+
+
+def render_certificate(history_id: UUID) -> None:
+    """
+    Render the certificate of a submission and store its object name.
+
+    Runs after the submission is committed, so the render neither holds a
+    database connection nor delays the submit response. The certificate is
+    claimed first, so a history handed to several workers, e.g. by the
+    submission and by a sweeper, is rendered once; a certificate that is no
+    longer pending is left alone. A failed render is recorded as failed.
+    """
+    with HistoryUnitOfWork() as unit_of_work:
+        claimed = unit_of_work.history.claim_certificate(
+            history_id, CERTIFICATE_STALE_SECONDS
+        )
+    if claimed is None:
+        return
+    username, type_, percentage = claimed
+
+    try:
+        data = {"name": username, "type": type_, "percentage": percentage}
+        certificate = generate_certificate(data=data).get("body").get("object_name")
+    except Exception:
+        with HistoryUnitOfWork() as unit_of_work:
+            unit_of_work.history.set_certificate(
+                history_id, None, CertificateStatus.failed
+            )
+        raise
+
+    with HistoryUnitOfWork() as unit_of_work:
+        unit_of_work.history.set_certificate(
+            history_id, certificate, CertificateStatus.ready
+        )
+
+
+def load_pending_certificates() -> Iterable[UUID]:
+    """
+    Load the ids of certificates left pending, or rendering, by a worker that
+    went away.
+    """
+    with HistoryUnitOfWork() as unit_of_work:
+        return unit_of_work.history.get_pending_certificate_ids(
+            CERTIFICATE_STALE_SECONDS
+        )
+
+
+certificate_queue = JobQueue(
+    name="certificate",
+    process=render_certificate,
+    loader=load_pending_certificates,
+    max_workers=int(app_config.get("CERTIFICATE_WORKERS", 4)),
+    sweep_seconds=float(app_config.get("CERTIFICATE_SWEEP_SECONDS", 60)),
+)
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.models.data_models import ImportJobStatus
+from app.services.job_queue import JobQueue
+from app.services.unit_of_work import CertificateUnitOfWork
+
+RERENDER_BATCH_SIZE = int(app_config.get("CERTIFICATE_RERENDER_BATCH_SIZE", 500))
+RERENDER_PROCESSES = int(
+    app_config.get("CERTIFICATE_RERENDER_PROCESSES", os.cpu_count() or 1)
+)
+RERENDER_STALE_SECONDS = float(
+    app_config.get("CERTIFICATE_RERENDER_STALE_SECONDS", 300)
+)
+MAX_REPORTED_ERRORS = 100
+
+
+class RerenderJobLost(Exception):
+    """Raised when another worker has taken over a job mid-run."""
+
+
+def render_in_worker(data: dict) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Render one certificate in a pool process.
+
+    The renderer is imported in the worker, so each process builds its own
+    template cache once and reuses it for every certificate it renders.
+
+    Returns: Tuple[Optional[str], Optional[str]]
+        The object name, or the error if rendering failed.
+    """
+    from app.services.aws_services import generate_certificate
+
+    try:
+        return generate_certificate(data=data).get("body").get("object_name"), None
+    except Exception as e:
+        return None, str(getattr(e, "detail", e))
+
+
+def run_rerender_job(job_id: UUID) -> None:
+    """
+    Re-render every certificate in history id order, one committed batch at a time.
+
+    Each batch is rendered across a pool of at most `RERENDER_PROCESSES`
+    processes, and its object names are stored with one UPDATE in the same
+    transaction that moves the job's checkpoint to the batch's last history, so
+    a worker that restarts continues after the last committed batch. Failed
+    certificates keep their previous file and are counted and reported.
+    """
+    with CertificateUnitOfWork() as unit_of_work:
+        if not unit_of_work.certificate_job.claim(job_id, RERENDER_STALE_SECONDS):
+            return
+        job = unit_of_work.certificate_job.get(job_id)
+        checkpoint, errors = job.last_history_id, list(job.errors or [])
+        if job.total_rows is None:
+            unit_of_work.certificate_job.update(
+                job_id, total_rows=unit_of_work.history.count_certificates()
+            )
+
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=RERENDER_PROCESSES, mp_context=context
+        ) as pool:
+            while True:
+                with CertificateUnitOfWork() as unit_of_work:
+                    page = unit_of_work.history.get_certificate_page(
+                        checkpoint, RERENDER_BATCH_SIZE
+                    )
+                if not page:
+                    break
+
+                results = pool.map(
+                    render_in_worker,
+                    [
+                        {"name": username, "type": type_, "percentage": percentage}
+                        for _, username, type_, percentage in page
+                    ],
+                    chunksize=max(1, len(page) // (RERENDER_PROCESSES * 4)),
+                )
+                certificates = {}
+                failed = 0
+                for (history_id, *_), (certificate, error) in zip(page, results):
+                    if certificate:
+                        certificates[history_id] = certificate
+                        continue
+                    failed += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append(f"History {history_id}: {error}")
+
+                last_history_id = page[-1][0]
+                with CertificateUnitOfWork() as unit_of_work:
+                    unit_of_work.history.set_certificates(certificates)
+                    if not unit_of_work.certificate_job.record_batch(
+                        job_id,
+                        checkpoint,
+                        last_history_id,
+                        len(page),
+                        len(certificates),
+                        failed,
+                        errors if failed else None,
+                    ):
+                        raise RerenderJobLost(job_id)
+                checkpoint = last_history_id
+
+        with CertificateUnitOfWork() as unit_of_work:
+            unit_of_work.certificate_job.update(
+                job_id, status=ImportJobStatus.completed.value
+            )
+
+    except RerenderJobLost:
+        return
+
+    except Exception as e:
+        with CertificateUnitOfWork() as unit_of_work:
+            unit_of_work.certificate_job.update(
+                job_id,
+                status=ImportJobStatus.failed.value,
+                errors=errors + [f"Error re-rendering certificates: {str(e)}"],
+            )
+
+
+def load_resumable_rerender_jobs() -> Iterable[UUID]:
+    """
+    Load the ids of pending jobs and of running jobs whose worker went away.
+    """
+    with CertificateUnitOfWork() as unit_of_work:
+        return unit_of_work.certificate_job.get_resumable_ids(RERENDER_STALE_SECONDS)
+
+
+rerender_job_queue = JobQueue(
+    name="certificate-rerender",
+    process=run_rerender_job,
+    loader=load_resumable_rerender_jobs,
+    max_workers=1,
+    sweep_seconds=float(app_config.get("CERTIFICATE_RERENDER_SWEEP_SECONDS", 60)),
+)
@@ -0,0 +1,105 @@
+import random
+import time
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.question_bank_cache import question_bank_cache
+
+DIFFICULTY_BUCKETS = 5
+
+
+def difficulty_bucket(attempts: int, correct: int) -> int:
+    """
+    Maps answer counters to a bucket, 0 for the easiest questions.
+
+    The correct-answer rate is smoothed with one correct and one wrong pseudo
+    answer so unanswered questions land in the middle bucket.
+    """
+    correct_rate = (correct + 1) / (attempts + 2)
+    return min(int((1 - correct_rate) * DIFFICULTY_BUCKETS), DIFFICULTY_BUCKETS - 1)
+
+
+def target_bucket(recent_percentages: Sequence[float]) -> int:
+    """
+    Picks the bucket matching the user's recent accuracy, the middle one if unknown.
+    """
+    if not recent_percentages:
+        return DIFFICULTY_BUCKETS // 2
+    accuracy = sum(recent_percentages) / len(recent_percentages) / 100
+    return min(int(accuracy * DIFFICULTY_BUCKETS), DIFFICULTY_BUCKETS - 1)
+
+
+class DifficultyIndex:
+    """
+    MCQ ids of one type grouped into difficulty buckets.
+    """
+
+    def __init__(self, version: int, rows: Sequence[tuple]):
+        self.version = version
+        self.built_at = time.monotonic()
+        buckets: List[List[UUID]] = [[] for _ in range(DIFFICULTY_BUCKETS)]
+        for mcq_id, attempts, correct in rows:
+            buckets[difficulty_bucket(attempts, correct)].append(mcq_id)
+        self.buckets: Tuple[Tuple[UUID, ...], ...] = tuple(map(tuple, buckets))
+
+    def sample(self, k: int, bucket: int, rng: random.Random = random) -> List[UUID]:
+        """
+        Pick up to `k` MCQ ids from `bucket`, spilling into the closest buckets.
+
+        Only the buckets that are visited are touched, so the cost depends on `k`
+        and not on the size of the question bank.
+        """
+        picked: List[UUID] = []
+        for distance in range(DIFFICULTY_BUCKETS):
+            for candidate in dict.fromkeys((bucket + distance, bucket - distance)):
+                if 0 <= candidate < DIFFICULTY_BUCKETS and len(picked) < k:
+                    ids = self.buckets[candidate]
+                    picked += rng.sample(ids, min(k - len(picked), len(ids)))
+            if len(picked) >= k:
+                break
+        rng.shuffle(picked)
+        return picked
+
+
+class DifficultyIndexCache:
+    """
+    Per-type difficulty indexes, rebuilt when the question bank changes or the
+    index is older than `ttl_seconds` so it follows the answer counters.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._indexes: Dict[str, DifficultyIndex] = {}
+
+    def get(
+        self, type_: str, loader: Callable[[str], Sequence[tuple]]
+    ) -> DifficultyIndex:
+        """
+        Return the difficulty index of a type, loading it when missing or stale.
+
+        Parameters:
+            type_ : str
+            loader : Callable[[str], Sequence[tuple]]
+                Returns `(mcq_id, attempt_count, correct_count)` rows of a type.
+        """
+        question_bank_cache.sync()
+        version = question_bank_cache.version
+        with self._lock:
+            index: Optional[DifficultyIndex] = self._indexes.get(type_)
+        if (
+            index is None
+            or index.version != version
+            or time.monotonic() - index.built_at > self.ttl_seconds
+        ):
+            index = DifficultyIndex(version, loader(type_))
+            with self._lock:
+                self._indexes[type_] = index
+        return index
+
+
+difficulty_index_cache = DifficultyIndexCache(
+    ttl_seconds=float(app_config.get("DIFFICULTY_INDEX_TTL_SECONDS", 300))
+)
@@ -0,0 +1,160 @@
+import io
+from typing import BinaryIO, Iterable, Optional
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.models.data_models import ImportJobStatus
+from app.schemas.mcq_schemas import NearDuplicateMode
+from app.services.aws_services import import_file_storage
+from app.services.job_queue import JobQueue
+from app.services.mcq_import import (
+    build_mcq_payloads,
+    iter_mcq_chunks,
+    open_mcq_sheet,
+    validate_mcq_file,
+)
+from app.services.question_bank_cache import question_bank_cache
+from app.services.unit_of_work import McqUnitOfWork
+
+IMPORT_JOB_CHUNK_ROWS = int(app_config.get("IMPORT_JOB_CHUNK_ROWS", 5_000))
+IMPORT_JOB_STALE_SECONDS = float(app_config.get("IMPORT_JOB_STALE_SECONDS", 300))
+NEAR_DUPLICATE_THRESHOLD = float(app_config.get("NEAR_DUPLICATE_THRESHOLD", 0.7))
+
+
+class ImportJobLost(Exception):
+    """Raised when another worker has taken over a job mid-run."""
+
+
+def run_import_job(job_id: UUID) -> None:
+    """
+    Validate and ingest the file of an import job in committed chunks.
+
+    Each chunk's inserts and the job's progress are committed in one
+    transaction, so a worker that restarts picks up at `rows_processed` without
+    losing or double-counting rows. A progress update only applies if
+    `rows_processed` still matches what this worker last wrote; otherwise the
+    job was reclaimed as stale and this worker stops. The whole-file
+    validation before the first chunk sends a heartbeat after each of its
+    chunks, so a long validation is not mistaken for a dead worker.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        if not unit_of_work.import_job.claim(job_id, IMPORT_JOB_STALE_SECONDS):
+            return
+        job = unit_of_work.import_job.get_with_content(job_id)
+        content, content_key = job.content, job.content_key
+        created_by, offset = job.created_by, job.rows_processed
+        filename = job.filename
+        near_duplicates = NearDuplicateMode(job.near_duplicate_mode)
+        categories = {category.name for category in unit_of_work.category.get_all()}
+
+    def heartbeat(rows_checked: int) -> None:
+        with McqUnitOfWork() as unit_of_work:
+            if not unit_of_work.import_job.heartbeat(job_id, offset):
+                raise ImportJobLost(job_id)
+
+    try:
+        with open_import_file(content_key, content) as file:
+            del content
+
+            report = validate_mcq_file(
+                file,
+                filename,
+                IMPORT_JOB_CHUNK_ROWS,
+                on_chunk=heartbeat,
+                categories=categories,
+            )
+            invalid_entries = (
+                [f"Missing required columns: {', '.join(report.missing_columns)}"]
+                if report.missing_columns
+                else report.invalid_entries
+            )
+            if invalid_entries:
+                with McqUnitOfWork() as unit_of_work:
+                    unit_of_work.import_job.update(
+                        job_id,
+                        status=ImportJobStatus.failed.value,
+                        total_rows=report.total_rows,
+                        errors=invalid_entries,
+                    )
+                delete_import_file(content_key)
+                return
+
+            with McqUnitOfWork() as unit_of_work:
+                unit_of_work.import_job.update(job_id, total_rows=report.total_rows)
+
+            start = offset
+            sheet = open_mcq_sheet(file, filename)
+            for chunk in iter_mcq_chunks(
+                sheet, IMPORT_JOB_CHUNK_ROWS, skip_rows=offset
+            ):
+                with McqUnitOfWork() as unit_of_work:
+                    added, skipped, found = unit_of_work.mcq.bulk_ingest(
+                        build_mcq_payloads(chunk, created_by),
+                        near_duplicates=near_duplicates,
+                        threshold=NEAR_DUPLICATE_THRESHOLD,
+                    )
+                    if not unit_of_work.import_job.record_chunk(
+                        job_id, start, start + len(chunk), added, skipped, len(found)
+                    ):
+                        raise ImportJobLost(job_id)
+                start += len(chunk)
+                if added:
+                    question_bank_cache.invalidate()
+
+        with McqUnitOfWork() as unit_of_work:
+            unit_of_work.import_job.update(
+                job_id, status=ImportJobStatus.completed.value
+            )
+        delete_import_file(content_key)
+
+    except ImportJobLost:
+        return
+
+    except Exception as e:
+        with McqUnitOfWork() as unit_of_work:
+            unit_of_work.import_job.update(
+                job_id,
+                status=ImportJobStatus.failed.value,
+                errors=[f"Error processing file: {str(e)}"],
+            )
+        delete_import_file(content_key)
+
+
+def open_import_file(content_key: Optional[str], content: Optional[bytes]) -> BinaryIO:
+    """
+    Open the uploaded file of a job from `import_file_storage`, or from the
+    row itself for jobs queued before uploads were stored there.
+    """
+    if content_key is None:
+        return io.BytesIO(content)
+    return import_file_storage.open(content_key)
+
+
+def delete_import_file(content_key: Optional[str]) -> None:
+    """
+    Delete the stored upload of a finished job. A file that cannot be deleted
+    is left behind rather than failing the job.
+    """
+    if content_key is None:
+        return
+    try:
+        import_file_storage.delete(content_key)
+    except Exception:
+        pass
+
+
+def load_resumable_jobs() -> Iterable[UUID]:
+    """
+    Load the ids of pending jobs and of running jobs whose worker went away.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        return unit_of_work.import_job.get_resumable_ids(IMPORT_JOB_STALE_SECONDS)
+
+
+import_job_queue = JobQueue(
+    name="import-job",
+    process=run_import_job,
+    loader=load_resumable_jobs,
+    max_workers=int(app_config.get("IMPORT_JOB_WORKERS", 2)),
+    sweep_seconds=float(app_config.get("IMPORT_JOB_SWEEP_SECONDS", 60)),
+)
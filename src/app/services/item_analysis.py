@@ -0,0 +1,96 @@
+"""
+Item analysis of every MCQ: difficulty, discrimination and option counts.
+
+The answers in `user_history_details` are streamed with the score of their
+submission in chunks of `ITEM_ANALYSIS_CHUNK_ROWS`, folded into per-question
+sums by `ItemAnalysis`, and the results replace the `mcq_stats` table in one
+transaction. Admins queue it through `POST /mcq/item-stats`; it can also be
+run from a scheduler.
+
+Usage (from `src`):
+    python -m app.services.item_analysis --chunk-rows 250000
+"""
+
+import argparse
+import math
+import time
+from uuid import NAMESPACE_URL, UUID, uuid5
+
+from app.config.settings import app_config
+from app.services.job_queue import JobQueue
+from app.services.unit_of_work import McqUnitOfWork
+from app.utils.item_analysis import OPTIONS, ItemAnalysis
+
+ITEM_ANALYSIS_CHUNK_ROWS = int(app_config.get("ITEM_ANALYSIS_CHUNK_ROWS", 250_000))
+# Every request queues the same job, so a run that is queued or in progress
+# absorbs the requests made meanwhile.
+ITEM_ANALYSIS_JOB_ID = uuid5(NAMESPACE_URL, "quizify/item-analysis")
+
+
+def run_item_analysis(
+    job_id: UUID = ITEM_ANALYSIS_JOB_ID, chunk_rows: int = ITEM_ANALYSIS_CHUNK_ROWS
+) -> int:
+    """
+    Recompute the statistics of every answered MCQ.
+
+    The MCQ ids and the answers are read in one REPEATABLE READ transaction so
+    the item numbers assigned in SQL match the ids.
+
+    Returns: int
+        The number of MCQs with statistics.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        unit_of_work.session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        mcq_ids = unit_of_work.item_stats.get_item_ids()
+        analysis = ItemAnalysis(len(mcq_ids))
+        for chunk in unit_of_work.item_stats.stream_responses(chunk_rows):
+            analysis.add(*chunk.T)
+
+    results = analysis.results()
+    rows = [
+        {
+            "mcq_id": mcq_ids[item],
+            "responses": int(results["responses"][item]),
+            "difficulty": finite_or_none(results["difficulty"][item]),
+            "discrimination": finite_or_none(results["discrimination"][item]),
+            "option_counts": dict(
+                zip(OPTIONS, (int(count) for count in results["choices"][item]))
+            ),
+        }
+        for item in results["responses"].nonzero()[0]
+    ]
+    with McqUnitOfWork() as unit_of_work:
+        unit_of_work.item_stats.replace_all(rows)
+    return len(rows)
+
+
+def finite_or_none(value: float):
+    """Map NaN, an undefined statistic, to NULL."""
+    return None if math.isnan(value) else float(value)
+
+
+# Runs are not persisted, a run lost to a restart is simply queued again, so
+# the queue is never started and has nothing to sweep.
+item_analysis_queue = JobQueue(
+    name="item-analysis",
+    process=run_item_analysis,
+    loader=lambda: [],
+    max_workers=1,
+    sweep_seconds=0,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-rows", type=int, default=ITEM_ANALYSIS_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    items = run_item_analysis(chunk_rows=args.chunk_rows)
+    print(f"analysed {items} MCQs in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
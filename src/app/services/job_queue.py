@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+
+class JobQueue:
+    """
+    Worker pool that runs persisted jobs, such as bulk imports, in the background.
+
+    Jobs are persisted before they are submitted, so the queue itself holds
+    nothing that cannot be rebuilt: `start` launches a sweeper that re-submits
+    pending jobs and jobs left running by a worker that died, once at startup
+    and then every `sweep_seconds`.
+
+    With `max_workers` set to 0 jobs run inline in the submitting thread and
+    no sweeper is started, which is what tests and single-process tools use.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[UUID], None],
+        loader: Callable[[], Iterable[UUID]],
+        max_workers: int,
+        sweep_seconds: float,
+    ):
+        self.name = name
+        self.process = process
+        self.loader = loader
+        self.sweep_seconds = sweep_seconds
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            if max_workers > 0
+            else None
+        )
+        self._lock = Lock()
+        self._queued: set = set()
+        self._sweeper: Optional[Thread] = None
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+
+    def submit(self, job_id: UUID) -> None:
+        """
+        Queue a job unless it is already queued or running in this process.
+        """
+        with self._lock:
+            if job_id in self._queued:
+                return
+            self._queued.add(job_id)
+            self.submitted += 1
+        if self._executor is None:
+            self._run(job_id)
+        else:
+            self._executor.submit(self._run, job_id)
+
+    def resume(self) -> int:
+        """
+        Queue every job that is waiting for a worker.
+
+        Returns: int
+            The number of jobs found.
+        """
+        job_ids = list(self.loader())
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def start(self) -> None:
+        """
+        Start the sweeper thread, once.
+        """
+        if self._executor is None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = Thread(
+                target=self._sweep, name=f"{self.name}-sweeper", daemon=True
+            )
+        self._sweeper.start()
+
+    def stats(self) -> dict:
+        """
+        Return the queue counters.
+        """
+        with self._lock:
+            return {
+                "queued": len(self._queued),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "errors": self.errors,
+            }
+
+    def _sweep(self) -> None:
+        while True:
+            try:
+                self.resume()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+            time.sleep(self.sweep_seconds)
+
+    def _run(self, job_id: UUID) -> None:
+        try:
+            self.process(job_id)
+            with self._lock:
+                self.completed += 1
+        except Exception:
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._queued.discard(job_id)
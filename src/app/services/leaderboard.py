@@ -0,0 +1,429 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from itertools import chain
+from tempfile import NamedTemporaryFile
+from threading import Lock, Thread
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.unit_of_work import HistoryUnitOfWork
+from app.utils.ranked_index import RankedIndex
+
+LEADERBOARD_REFRESH_SECONDS = float(app_config.get("LEADERBOARD_REFRESH_SECONDS", 5))
+LEADERBOARD_SNAPSHOT_PATH = app_config.get("LEADERBOARD_SNAPSHOT_PATH", "")
+LEADERBOARD_SNAPSHOT_SECONDS = float(
+    app_config.get("LEADERBOARD_SNAPSHOT_SECONDS", 300)
+)
+# `user_stats.updated_at` is the start time of the writing transaction, so rows
+# committed by a slow transaction can be older than the watermark; re-reading a
+# short overlap picks them up.
+REFRESH_OVERLAP = timedelta(seconds=60)
+# Snapshots of version 1 predate the recorded removals, so they can hold users
+# deleted since; they are ignored and the boards are built from scratch.
+SNAPSHOT_VERSION = 2
+
+
+class LeaderboardEntry(NamedTuple):
+    user_id: UUID
+    best_percentage: float
+    average_percentage: float
+    attempts: int
+
+    @property
+    def key(self) -> tuple:
+        """Best percentage first, then average percentage, then user id."""
+        return (-self.best_percentage, -self.average_percentage, self.user_id)
+
+
+class StatsChanges(NamedTuple):
+    """
+    `user_stats` rows updated since a refresh, as
+    `(user_id, type, attempts, percentage_sum, best_percentage, updated_at)`,
+    and rows removed since, as
+    `(user_id, type, removed_at, attempts, percentage_sum, best_percentage)`
+    with the ranking fields of the row that replaced them, None if none did.
+    """
+
+    rows: Sequence[tuple]
+    removed: Sequence[tuple]
+
+
+def entry_from_stats(
+    user_id: UUID, attempts: int, percentage_sum: float, best_percentage: float
+) -> LeaderboardEntry:
+    """
+    Builds the leaderboard entry of a `user_stats` row.
+    """
+    return LeaderboardEntry(
+        user_id=user_id,
+        best_percentage=best_percentage,
+        average_percentage=percentage_sum / attempts if attempts else 0,
+        attempts=attempts,
+    )
+
+
+class Leaderboard:
+    """
+    Ranked entries of one MCQ type, one per user.
+    """
+
+    def __init__(self, entries: Iterable[LeaderboardEntry] = ()):
+        self.entries: Dict[UUID, LeaderboardEntry] = {
+            entry.user_id: entry for entry in entries
+        }
+        self.index = RankedIndex.from_sorted(
+            (entry.key, entry)
+            for entry in sorted(self.entries.values(), key=lambda entry: entry.key)
+        )
+
+    def set(self, entry: LeaderboardEntry) -> bool:
+        """
+        Insert or move the entry of a user. An entry with fewer attempts than the
+        current one is older and ignored.
+
+        Returns: bool
+            Whether the entry was applied.
+        """
+        current = self.entries.get(entry.user_id)
+        if current is not None:
+            if entry.attempts < current.attempts:
+                return False
+            self.index.remove(current.key)
+        self.entries[entry.user_id] = entry
+        self.index.insert(entry.key, entry)
+        return True
+
+    def remove(self, user_id: UUID) -> None:
+        """
+        Remove the entry of a user, if any.
+        """
+        entry = self.entries.pop(user_id, None)
+        if entry is not None:
+            self.index.remove(entry.key)
+
+    def top(self, limit: int) -> List[LeaderboardEntry]:
+        return [entry for _, entry in self.index.items(0, limit)]
+
+    def rank(self, user_id: UUID) -> Optional[Tuple[int, LeaderboardEntry]]:
+        """
+        Return the 1-based rank and the entry of a user, None if unranked.
+        """
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        return self.index.rank(entry.key) + 1, entry
+
+
+class LeaderboardCache:
+    """
+    In-process leaderboards of every MCQ type, ranked by `RankedIndex`.
+
+    The boards are built once from `user_stats` at startup, or from the last
+    snapshot plus the rows updated since it was written. `process_submission`
+    applies its own submissions as soon as they commit; rows written by other
+    processes are read by `refresh`, at most every `refresh_seconds`, through
+    the `ix_user_stats_updated_at` index, along with the rows removed since,
+    recorded in `user_stats_removals` by a trigger. Top-N and rank lookups are then
+    logarithmic in the number of users of a type. With a `snapshot_path`, a
+    background thread saves the boards every `snapshot_seconds`, off the
+    request path.
+    """
+
+    def __init__(
+        self,
+        refresh_seconds: float,
+        snapshot_path: str,
+        snapshot_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.snapshot_path = snapshot_path
+        self.snapshot_seconds = snapshot_seconds
+        self.clock = clock
+        self.watermark: Optional[datetime] = None
+        self.loaded = False
+        self.refreshes = 0
+        self.rows_applied = 0
+        self.removals_applied = 0
+        self.snapshots_written = 0
+        self.snapshot_loaded = False
+        self.errors = 0
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._snapshot_lock = Lock()
+        self._boards: Dict[str, Leaderboard] = {}
+        self._refreshed_at = float("-inf")
+        self._snapshotter: Optional[Thread] = None
+
+    def start(self, loader: Callable[[Optional[datetime]], StatsChanges]) -> None:
+        """
+        Load the last snapshot, if any, read every row updated since and start
+        the snapshot thread, once.
+        """
+        self.load_snapshot()
+        self.refresh(loader, force=True)
+        if not self.snapshot_path or self.snapshot_seconds <= 0:
+            return
+        with self._lock:
+            if self._snapshotter is not None:
+                return
+            self._snapshotter = Thread(
+                target=self._snapshot_loop, name="leaderboard-snapshot", daemon=True
+            )
+        self._snapshotter.start()
+
+    def apply(self, type_: str, entry: LeaderboardEntry) -> None:
+        """
+        Apply the new statistics of one user.
+        """
+        with self._lock:
+            board = self._boards.setdefault(type_, Leaderboard())
+            board.set(entry)
+
+    def refresh(
+        self,
+        loader: Callable[[Optional[datetime]], StatsChanges],
+        force: bool = False,
+    ) -> None:
+        """
+        Apply the `user_stats` rows updated or removed since the watermark if the
+        boards are older than `refresh_seconds`. Only one caller refreshes at a
+        time, the others keep reading the current boards. A failed read is
+        counted in `errors` and retried by the next call.
+
+        A removed row takes its user off the board of its type before the row
+        that replaced it, if any, is applied, so a rebuild that lowered the
+        attempts of a user is not mistaken for an older entry.
+
+        Parameters:
+            loader : Callable[[Optional[datetime]], StatsChanges]
+                Called with the time to read from, None for every row and no
+                removals.
+            force : bool
+                Refresh even if the boards are recent.
+        """
+        if not force and self.clock() - self._refreshed_at < self.refresh_seconds:
+            return
+        if not self._refresh_lock.acquire(blocking=force):
+            return
+        try:
+            started = self.clock()
+            since = self.watermark - REFRESH_OVERLAP if self.watermark else None
+            try:
+                rows, removed = loader(since)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                return
+            watermark = max(
+                (
+                    changed_at
+                    for changed_at in chain(
+                        (row[5] for row in rows), (row[2] for row in removed)
+                    )
+                    if changed_at is not None
+                ),
+                default=self.watermark,
+            )
+            with self._lock:
+                if not self._boards and since is None:
+                    self._build(rows)
+                else:
+                    for user_id, type_, _, attempts, percentage_sum, best in removed:
+                        self._remove(type_, user_id)
+                        if attempts is not None:
+                            self._boards.setdefault(type_, Leaderboard()).set(
+                                entry_from_stats(
+                                    user_id, attempts, percentage_sum, best
+                                )
+                            )
+                    for user_id, type_, attempts, percentage_sum, best, _ in rows:
+                        self._boards.setdefault(type_, Leaderboard()).set(
+                            entry_from_stats(user_id, attempts, percentage_sum, best)
+                        )
+                self.watermark = watermark
+                self.loaded = True
+                self.refreshes += 1
+                self.rows_applied += len(rows)
+                self.removals_applied += len(removed)
+            self._refreshed_at = started
+        finally:
+            self._refresh_lock.release()
+
+    def top(self, type_: str, limit: int) -> Tuple[List[LeaderboardEntry], int]:
+        """
+        Return the `limit` best entries of a type and the number of ranked users.
+        """
+        with self._lock:
+            board = self._boards.get(type_)
+            if board is None:
+                return [], 0
+            return board.top(limit), len(board.entries)
+
+    def rank(self, type_: str, user_id: UUID) -> Optional[Tuple[int, LeaderboardEntry]]:
+        """
+        Return the 1-based rank and the entry of a user in a type, None if unranked.
+        """
+        with self._lock:
+            board = self._boards.get(type_)
+            return board.rank(user_id) if board else None
+
+    def save_snapshot(self) -> None:
+        """
+        Write every board and the watermark to `snapshot_path`, replacing the
+        previous snapshot atomically. Every writer, in this process or another
+        worker sharing the path, writes its own temporary file, so the last
+        replace wins with a complete snapshot. Does nothing without a path.
+        """
+        if not self.snapshot_path:
+            return
+        directory, name = os.path.split(os.path.abspath(self.snapshot_path))
+        # Serialises the thread and the shutdown save, so an older copy of the
+        # boards never replaces a newer one.
+        with self._snapshot_lock:
+            with self._lock:
+                watermark = self.watermark
+                boards = {
+                    type_: [entry for _, entry in board.index.items()]
+                    for type_, board in self._boards.items()
+                }
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "watermark": watermark.isoformat() if watermark else None,
+                "boards": {
+                    type_: [
+                        [
+                            str(entry.user_id),
+                            entry.best_percentage,
+                            entry.average_percentage,
+                            entry.attempts,
+                        ]
+                        for entry in entries
+                    ]
+                    for type_, entries in boards.items()
+                },
+            }
+            file = NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=directory,
+                prefix=f"{name}.",
+                suffix=".tmp",
+                delete=False,
+            )
+            try:
+                with file:
+                    json.dump(snapshot, file)
+                os.replace(file.name, self.snapshot_path)
+            except BaseException:
+                os.unlink(file.name)
+                raise
+        with self._lock:
+            self.snapshots_written += 1
+
+    def load_snapshot(self) -> bool:
+        """
+        Replace the boards with the snapshot at `snapshot_path`.
+
+        Returns: bool
+            Whether a snapshot was loaded. A missing or unreadable snapshot
+            leaves the boards empty, so the next refresh reads every row.
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                return False
+            # Entries are stored in rank order, so each board is built in O(n).
+            boards = {
+                type_: Leaderboard(
+                    LeaderboardEntry(UUID(user_id), best, average, attempts)
+                    for user_id, best, average, attempts in entries
+                )
+                for type_, entries in snapshot["boards"].items()
+            }
+            watermark = (
+                datetime.fromisoformat(snapshot["watermark"])
+                if snapshot["watermark"]
+                else None
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        with self._lock:
+            self._boards = boards
+            self.watermark = watermark
+            self.snapshot_loaded = True
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+        """
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "types": len(self._boards),
+                "ranked_users": sum(
+                    len(board.entries) for board in self._boards.values()
+                ),
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+                "refreshes": self.refreshes,
+                "rows_applied": self.rows_applied,
+                "removals_applied": self.removals_applied,
+                "snapshot_loaded": self.snapshot_loaded,
+                "snapshots_written": self.snapshots_written,
+                "errors": self.errors,
+            }
+
+    def _snapshot_loop(self) -> None:
+        while True:
+            time.sleep(self.snapshot_seconds)
+            try:
+                self.save_snapshot()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+
+    def _remove(self, type_: str, user_id: UUID) -> None:
+        board = self._boards.get(type_)
+        if board is None:
+            return
+        board.remove(user_id)
+        if not board.entries:
+            del self._boards[type_]
+
+    def _build(self, rows: Sequence[tuple]) -> None:
+        entries: Dict[str, List[LeaderboardEntry]] = {}
+        for user_id, type_, attempts, percentage_sum, best, _ in rows:
+            entries.setdefault(type_, []).append(
+                entry_from_stats(user_id, attempts, percentage_sum, best)
+            )
+        self._boards = {
+            type_: Leaderboard(type_entries) for type_, type_entries in entries.items()
+        }
+
+
+def load_changed_stats(since: Optional[datetime]) -> StatsChanges:
+    """
+    Load the ranking fields of the `user_stats` rows updated after `since`, and
+    the rows removed after it.
+    """
+    with HistoryUnitOfWork() as unit_of_work:
+        user_stats = unit_of_work.user_stats
+        return StatsChanges(
+            user_stats.get_changed_since(since),
+            user_stats.get_removed_since(since) if since is not None else [],
+        )
+
+
+leaderboards = LeaderboardCache(
+    refresh_seconds=LEADERBOARD_REFRESH_SECONDS,
+    snapshot_path=LEADERBOARD_SNAPSHOT_PATH,
+    snapshot_seconds=LEADERBOARD_SNAPSHOT_SECONDS,
+)
@@ -0,0 +1,245 @@
+import codecs
+import csv
+import itertools
+import json
+from typing import (
+    BinaryIO,
+    Callable,
+    Collection,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from uuid import UUID
+
+import pandas as pd
+from openpyxl import load_workbook
+
+REQUIRED_COLUMNS = [
+    "category",
+    "question",
+    "option A",
+    "option B",
+    "option C",
+    "option D",
+    "correct_option",
+]
+VALID_OPTIONS = ["a", "b", "c", "d"]
+SUPPORTED_EXTENSIONS = (".xlsx", ".xls", ".csv", ".jsonl")
+CHUNK_ROWS = 5_000
+
+
+class McqSheet(NamedTuple):
+    """The header of an uploaded sheet and a one-shot iterator over its rows."""
+
+    columns: List[str]
+    rows: Iterator[Tuple[int, List[str]]]
+
+
+class McqFileReport(NamedTuple):
+    missing_columns: List[str]
+    invalid_entries: List[str]
+    total_rows: int
+
+
+def find_missing_columns(columns: Sequence[str]) -> List[str]:
+    """
+    Return the required columns the sheet does not have.
+    """
+    return [column for column in REQUIRED_COLUMNS if column not in columns]
+
+
+def validate_mcq_frame(
+    frame: pd.DataFrame, categories: Optional[Collection[str]] = None
+) -> List[str]:
+    """
+    Validate every required cell of an MCQ sheet with column-wise masks.
+
+    A cell is invalid when it is empty, for `correct_option` when it is not
+    one of a, b, c or d, and for `category` when `categories` is given and
+    does not contain it, so uploads only add to registered categories.
+
+    Returns: List[str]
+        One "Row <n>, Column '<column>'" entry per invalid cell in row-major
+        order, where `n` is the spreadsheet row number (the header is row 1).
+    """
+    invalid = frame[REQUIRED_COLUMNS].eq("")
+    invalid["correct_option"] |= ~frame["correct_option"].isin(VALID_OPTIONS)
+    if categories is not None:
+        invalid["category"] |= ~frame["category"].isin(list(categories))
+
+    rows, columns = invalid.to_numpy().nonzero()
+    if not len(rows):
+        return []
+    labels = frame.index.to_numpy()[rows] + 2
+    return [
+        f"Row {label}, Column '{REQUIRED_COLUMNS[column]}'"
+        for label, column in zip(labels.tolist(), columns.tolist())
+    ]
+
+
+def build_mcq_payloads(frame: pd.DataFrame, created_by: UUID) -> List[dict]:
+    """
+    Build MCQ insert payloads from a validated sheet.
+
+    Columns are read as plain lists and zipped, so no Series object is created
+    per row.
+    """
+    return [
+        {
+            "type": category,
+            "question": question,
+            "options": {"a": option_a, "b": option_b, "c": option_c, "d": option_d},
+            "correct_option": correct_option,
+            "created_by": created_by,
+        }
+        for category, question, option_a, option_b, option_c, option_d, correct_option in zip(
+            *(frame[column].tolist() for column in REQUIRED_COLUMNS)
+        )
+    ]
+
+
+def cell_text(value) -> str:
+    """
+    Convert a cell value to the string `pd.read_excel(dtype=str)` would produce.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def open_mcq_sheet(file: BinaryIO, filename: str) -> McqSheet:
+    """
+    Open an uploaded .xlsx, .xls, .csv or .jsonl file as a stream of rows.
+
+    .xlsx is read with openpyxl's read-only row iterator and .csv and .jsonl
+    line by line, so only the current row is held in memory. Legacy .xls
+    files have no streaming reader and are loaded whole. Rows are numbered as
+    in a spreadsheet with the header on row 1, and blank rows are skipped.
+
+    Parameters:
+        file : BinaryIO
+            The uploaded file, positioned at its start.
+        filename : str
+            Used to pick the format by extension.
+    """
+    if filename.endswith(".xlsx"):
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = [cell_text(value) for value in next(rows, ())]
+        records = (
+            (number, [cell_text(value) for value in row])
+            for number, row in enumerate(rows, start=2)
+        )
+        return McqSheet(columns, _close_after(records, workbook))
+
+    if filename.endswith(".xls"):
+        frame = pd.read_excel(file, dtype=str, keep_default_na=False)
+        records = (
+            (number, list(row))
+            for number, row in enumerate(
+                frame.itertuples(index=False, name=None), start=2
+            )
+        )
+        return McqSheet([str(column) for column in frame.columns], records)
+
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    if filename.endswith(".csv"):
+        reader = csv.reader(lines)
+        columns = next(reader, [])
+        return McqSheet(columns, ((reader.line_num, row) for row in reader))
+
+    records = (
+        (number + 1, json.loads(line))
+        for number, line in enumerate(lines, start=1)
+        if line.strip()
+    )
+    first = next(records, None)
+    columns = list(first[1]) if first else []
+    return McqSheet(
+        columns,
+        (
+            (number, [cell_text(record.get(column)) for column in columns])
+            for number, record in itertools.chain([first] if first else [], records)
+        ),
+    )
+
+
+def iter_mcq_chunks(
+    sheet: McqSheet, chunk_rows: int = CHUNK_ROWS, skip_rows: int = 0
+) -> Iterator[pd.DataFrame]:
+    """
+    Group the rows of a sheet into DataFrames of at most `chunk_rows` rows.
+
+    The index of each chunk is the spreadsheet row number minus 2, so
+    `validate_mcq_frame` reports the same row numbers as for the whole sheet.
+    The first `skip_rows` non-blank rows are dropped, which is how an
+    interrupted import resumes.
+    """
+    width = len(sheet.columns)
+    data, index = [], []
+    position = 0
+    for number, values in sheet.rows:
+        if not any(values):
+            continue
+        position += 1
+        if position <= skip_rows:
+            continue
+        if len(values) != width:
+            values = (values + [""] * width)[:width]
+        data.append(values)
+        index.append(number - 2)
+        if len(data) >= chunk_rows:
+            yield pd.DataFrame(data, columns=sheet.columns, index=index)
+            data, index = [], []
+    if data:
+        yield pd.DataFrame(data, columns=sheet.columns, index=index)
+
+
+def validate_mcq_file(
+    file: BinaryIO,
+    filename: str,
+    chunk_rows: int = CHUNK_ROWS,
+    on_chunk: Optional[Callable[[int], None]] = None,
+    categories: Optional[Collection[str]] = None,
+) -> McqFileReport:
+    """
+    Check an uploaded file chunk by chunk without keeping it in memory, and
+    rewind it so it can be read again for the insert pass.
+
+    `on_chunk`, if given, is called with the number of rows checked so far
+    after every chunk, e.g. to keep a background job's heartbeat fresh; an
+    exception it raises stops the validation. `categories` is passed on to
+    `validate_mcq_frame`.
+
+    Returns: McqFileReport
+        The missing required columns, the invalid cells and the number of
+        non-blank rows.
+    """
+    sheet = open_mcq_sheet(file, filename)
+    missing_columns = find_missing_columns(sheet.columns)
+    invalid_entries: List[str] = []
+    total_rows = 0
+    try:
+        if not missing_columns:
+            for chunk in iter_mcq_chunks(sheet, chunk_rows):
+                invalid_entries += validate_mcq_frame(chunk, categories)
+                total_rows += len(chunk)
+                if on_chunk is not None:
+                    on_chunk(total_rows)
+    finally:
+        sheet.rows.close()
+    file.seek(0)
+    return McqFileReport(missing_columns, invalid_entries, total_rows)
+
+
+def _close_after(records, workbook):
+    try:
+        yield from records
+    finally:
+        workbook.close()
@@ -1,45 +1,183 @@
+import base64
+import binascii
 import json
-import random
-from typing import List
-from uuid import UUID
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+from uuid import UUID, uuid4
 
-import pandas as pd
 from fastapi import HTTPException, UploadFile
 
-from app.models.data_models import MCQ, Submission, UserHistory, UserHistoryDetail
+from app.models.data_models import (
+    MCQ,
+    CertificateRerenderJob,
+    CertificateStatus,
+    ImportJob,
+    ImportJobStatus,
+    MCQCategory,
+    RegradeJob,
+    Submission,
+    UserHistory,
+    UserHistoryDetail,
+    UserStats,
+)
 from app.schemas.mcq_schemas import (
+    AttemptedMcq,
     AttemptedMcqWithAnswer,
+    CategoryCreate,
+    CategoryOutput,
+    CertificateRerenderJobOutput,
+    HistorySortKey,
+    ImportJobOutput,
+    ItemStatsOutput,
+    ItemStatsSortKey,
+    LeaderboardEntryOutput,
+    LeaderboardOutput,
     MCQCreate,
     MCQCreateOutput,
     MCQDisplay,
+    NearDuplicateMode,
+    NearDuplicateOutput,
     PaginatedResponse,
+    QuizMode,
+    RegradeJobOutput,
+    SortOrder,
     SubmissionInput,
     SubmissionOutput,
-    TypeEnum,
     UserHistoryInput,
+    UserHistoryPage,
     UserOutput,
+    UserStatsOutput,
+)
+from app.services.answer_counts import answer_counts
+from app.services.aws_services import (
+    generate_certificate,
+    generate_presigned_url_func,
+    import_file_storage,
+    presigned_url_cache,
+)
+from app.services.certificate_jobs import certificate_queue
+from app.services.certificate_rerender import rerender_job_queue
+from app.services.import_jobs import NEAR_DUPLICATE_THRESHOLD, import_job_queue
+from app.services.item_analysis import ITEM_ANALYSIS_JOB_ID, item_analysis_queue
+from app.services.leaderboard import entry_from_stats, leaderboards, load_changed_stats
+from app.services.mcq_import import (
+    SUPPORTED_EXTENSIONS,
+    build_mcq_payloads,
+    find_missing_columns,
+    iter_mcq_chunks,
+    open_mcq_sheet,
+    validate_mcq_frame,
+)
+from app.services.question_bank_cache import (
+    CachedMcq,
+    QuestionBankSnapshot,
+    question_bank_cache,
 )
-from app.services.aws_services import generate_certificate, generate_presigned_url_func
+from app.services.quiz_session import QuizSession, decode_cursor, paper_pool
+from app.services.regrade import regrade_job_queue
+from app.services.seen_index import seen_index_cache
 from app.services.unit_of_work import (
     BaseUnitOfWork,
     HistoryUnitOfWork,
     SubmissionUnitOfWork,
 )
+from app.services.user_stats import USER_STATS_WINDOW
+from app.utils.content_hash import mcq_content_hash
 
+NEAR_DUPLICATE_REPORT_LIMIT = 1_000
 
-def fetch_mcq_types(unit_of_work: BaseUnitOfWork) -> List[TypeEnum]:
+
+def fetch_mcq_types(unit_of_work: BaseUnitOfWork) -> List[str]:
     """
-    Retrieve distinct MCQ types using Unit of Work.
+    Retrieve the MCQ types that have questions using Unit of Work.
 
     Args:
         unit_of_work (BaseUnitOfWork): UnitOfWork instance.
 
     Returns:
-        list[TypeEnum]: List of MCQ types.
+        list[str]: List of MCQ types.
+    """
+    categories = question_bank_cache.get_categories(
+        lambda: load_categories(unit_of_work)
+    )
+    return [name for name, question_count in categories if question_count > 0]
+
+
+def load_categories(unit_of_work: BaseUnitOfWork) -> List[tuple]:
+    """
+    Load the category registry from the database, used on question bank cache misses.
+    """
+    with unit_of_work:
+        return [
+            (category.name, category.question_count)
+            for category in unit_of_work.category.get_all()
+        ]
+
+
+def get_categories(
+    unit_of_work: BaseUnitOfWork, current_user: UserOutput
+) -> List[CategoryOutput]:
+    """
+    Lists every registered MCQ category with its question count. Only users with the role of "admin" can list them.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+
+    Returns:
+        list[CategoryOutput]: The categories ordered by name.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        return [
+            CategoryOutput(**category.__dict__)
+            for category in unit_of_work.category.get_all()
+        ]
+
+
+def add_category(
+    unit_of_work: BaseUnitOfWork, category: CategoryCreate, current_user: UserOutput
+) -> CategoryOutput:
+    """
+    Registers a new MCQ category. Only users with the role of "admin" can create categories.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        category (CategoryCreate): Category schema
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+
+    Returns:
+        CategoryOutput: The newly created category.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+        HTTPException: If the category already exists.
     """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
     with unit_of_work:
-        types = unit_of_work.mcq.get_mcq_types()
-        return [TypeEnum(str(type_[0])) for type_ in types]
+        if unit_of_work.category.get(category.name):
+            raise HTTPException(status_code=400, detail="Category already exists.")
+
+        created = MCQCategory(name=category.name, question_count=0)
+        unit_of_work.category.add(created)
+        unit_of_work.session.flush()
+        unit_of_work.session.refresh(created)
+        created_category = CategoryOutput(**created.__dict__)
+
+    question_bank_cache.invalidate()
+    return created_category
 
 
 def add_mcq(
@@ -64,39 +202,104 @@ def add_mcq(
         raise HTTPException(
             status_code=401, detail="Access denied. Admin role required."
         )
-    with unit_of_work:
-        existing_types = fetch_mcq_types(unit_of_work=unit_of_work)
-        if mcq.type not in existing_types:
-            raise HTTPException(status_code=400, detail="Invalid MCQ type input.")
+    categories = question_bank_cache.get_categories(
+        lambda: load_categories(unit_of_work)
+    )
+    if mcq.type not in {name for name, _ in categories}:
+        raise HTTPException(status_code=400, detail="Invalid MCQ type input.")
 
-        duplicate_mcq = (
-            unit_of_work.session.query(MCQ).filter_by(question=mcq.question).first()
+    with unit_of_work:
+        duplicate_mcq = unit_of_work.mcq.get_by_content_hash(
+            mcq_content_hash(mcq.question, mcq.options.model_dump())
         )
         if duplicate_mcq:
             raise HTTPException(status_code=400, detail="Duplicate question found.")
 
         mcq_data = mcq.model_dump()
         mcq = MCQ(**mcq_data)
-        unit_of_work.session.add(mcq)
+        unit_of_work.mcq.add(mcq)
         unit_of_work.session.flush()
         unit_of_work.session.refresh(mcq)
+        created_mcq = MCQCreateOutput(**mcq.__dict__)
 
-        return MCQCreateOutput(**mcq.__dict__)
+    question_bank_cache.invalidate()
+    return created_mcq
+
+
+def search_mcqs(
+    unit_of_work: BaseUnitOfWork,
+    current_user: UserOutput,
+    text: str,
+    type: Optional[str],
+    page: int,
+    page_size: int,
+) -> PaginatedResponse:
+    """
+    Searches MCQ questions by words. Only users with the role of "admin" can search.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+        text (str): The words to look for in the questions.
+        type (Optional[str]): Restricts the search to one MCQ type.
+        page (int): Page number.
+        page_size (int): Number of MCQs per page.
+
+    Returns:
+        PaginatedResponse: One page of matching MCQs, most relevant first.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        mcqs, total_count = unit_of_work.mcq.search(
+            text=text,
+            type_=type,
+            limit=page_size,
+            offset=(page - 1) * page_size,
+        )
+        total_pages = (total_count // page_size) + (
+            1 if total_count % page_size > 0 else 0
+        )
+
+        return PaginatedResponse(
+            currentPage=page,
+            totalPage=total_pages,
+            nextPage=page + 1 if page < total_pages else None,
+            totalCount=total_count,
+            data=[MCQCreateOutput(**mcq.__dict__) for mcq in mcqs],
+        )
 
 
 def bulk_add_mcqs(
-    unit_of_work: BaseUnitOfWork, file: UploadFile, current_user: UserOutput
-) -> int:
+    unit_of_work: BaseUnitOfWork,
+    file: UploadFile,
+    current_user: UserOutput,
+    near_duplicates: NearDuplicateMode = NearDuplicateMode.off,
+) -> tuple:
     """
     Bulk adds MCQs from an uploaded file to the database if the question does not exist in database otherwise skips.
 
+    The file is streamed in fixed-size chunks that are validated and inserted one at a
+    time, so memory use does not grow with the file size. Rows of categories that
+    are not registered are invalid, as for `add_mcq`. Once a chunk fails validation
+    nothing more is inserted, the rest is only validated, and the transaction is rolled
+    back.
+
     Args:
         unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
-        file (UploadFile): Uploaded Excel file containing MCQ data.
+        file (UploadFile): Uploaded .xlsx, .xls, .csv or .jsonl file containing MCQ data.
         current_user (UserOutput): Current authenticated user.
+        near_duplicates (NearDuplicateMode): Whether near-duplicate questions are rejected or flagged.
 
     Returns:
-        int: Count of MCQs successfully added.
+        tuple: Counts of MCQs added and skipped, and the near duplicates found,
+        of which at most `NEAR_DUPLICATE_REPORT_LIMIT` are listed.
 
     Raises:
         HTTPException: If the user is not an admin.
@@ -107,79 +310,62 @@ def bulk_add_mcqs(
             status_code=401, detail="Access denied. Admin role required."
         )
 
-    if not file.filename.endswith((".xlsx", ".xls")):
+    if not file.filename.endswith(SUPPORTED_EXTENSIONS):
         raise HTTPException(
-            status_code=400, detail="Invalid file format. Upload an Excel file."
+            status_code=400,
+            detail="Invalid file format. Upload an Excel, CSV or JSON Lines file.",
         )
 
     try:
-        df = pd.read_excel(file.file, dtype=str, keep_default_na=False)
-
-        required_columns = [
-            "category",
-            "question",
-            "option A",
-            "option B",
-            "option C",
-            "option D",
-            "correct_option",
-        ]
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        sheet = open_mcq_sheet(file.file, file.filename)
+        missing_columns = find_missing_columns(sheet.columns)
         if missing_columns:
             raise HTTPException(
                 status_code=400,
                 detail=f"Missing required columns: {', '.join(missing_columns)}",
             )
 
-        invalid_entries = []
-        for index, row in df.iterrows():
-            for column in required_columns:
-                if row[column] in [""] or (
-                    column == "correct_option"
-                    and row[column] not in ["a", "b", "c", "d"]
-                ):
-                    invalid_entries.append(f"Row {index + 2}, Column '{column}'")
-
-        if invalid_entries:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Validation errors in entries: {'; '.join(invalid_entries)}",
+        categories = {
+            name
+            for name, _ in question_bank_cache.get_categories(
+                lambda: load_categories(unit_of_work)
             )
-
+        }
+        invalid_entries = []
         added_count = 0
         skipped_count = 0
+        near_duplicate_count = 0
+        near_duplicate_list = []
         with unit_of_work:
-            for _, row in df.iterrows():
-                question_exist = unit_of_work.mcq.get_all(question=row.get("question"))
-
-                if question_exist:
-                    skipped_count += 1
-                else:
-                    options_dict = {
-                        "a": row.get("option A"),
-                        "b": row.get("option B"),
-                        "c": row.get("option C"),
-                        "d": row.get("option D"),
-                    }
-
-                    # Convert the dictionary to a JSON string
-                    options_json = json.dumps(options_dict)
-
-                    # Parse the JSON string back into a dictionary to avoid escape characters
-                    options_cleaned = json.loads(options_json)
-
-                    mcq_data = {
-                        "type": row.get("category"),
-                        "question": row.get("question"),
-                        "options": options_cleaned,
-                        "correct_option": row["correct_option"],
-                        "created_by": current_user.user_id,
-                    }
-                    mcq = MCQ(**mcq_data)
-                    unit_of_work.mcq.add(mcq)
-                    added_count += 1
-
-        return added_count, skipped_count
+            for chunk in iter_mcq_chunks(sheet):
+                invalid_entries += validate_mcq_frame(chunk, categories)
+                if not invalid_entries:
+                    added, skipped, found = unit_of_work.mcq.bulk_ingest(
+                        build_mcq_payloads(chunk, current_user.user_id),
+                        near_duplicates=near_duplicates,
+                        threshold=NEAR_DUPLICATE_THRESHOLD,
+                    )
+                    added_count += added
+                    skipped_count += skipped
+                    near_duplicate_count += len(found)
+                    near_duplicate_list += found[
+                        : NEAR_DUPLICATE_REPORT_LIMIT - len(near_duplicate_list)
+                    ]
+
+            if invalid_entries:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Validation errors in entries: {'; '.join(invalid_entries)}",
+                )
+
+        if added_count:
+            question_bank_cache.invalidate()
+        return (
+            added_count,
+            skipped_count,
+            near_duplicate_count,
+            [NearDuplicateOutput(**found._asdict()) for found in near_duplicate_list],
+        )
 
     except HTTPException as e:
         raise e
@@ -188,64 +374,308 @@ def bulk_add_mcqs(
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
-def get_all(
+def create_import_job(
     unit_of_work: BaseUnitOfWork,
-    type: str,
-    page: int,
-    page_size: int,
+    file: UploadFile,
     current_user: UserOutput,
-) -> dict:
+    near_duplicates: NearDuplicateMode = NearDuplicateMode.off,
+) -> ImportJobOutput:
     """
-    Retrieve paginated MCQs with optional type filter and pagination.
+    Persists an uploaded MCQ file as an import job and queues it for a background worker.
+
+    The upload is streamed to `import_file_storage`, not read into memory or
+    into the job's row; the job only records where it is.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        file (UploadFile): Uploaded .xlsx, .xls, .csv or .jsonl file containing MCQ data.
+        current_user (UserOutput): Current authenticated user.
+        near_duplicates (NearDuplicateMode): Whether near-duplicate questions are rejected or flagged.
+
+    Returns:
+        ImportJobOutput: The queued job, to be polled with `get_import_job`.
+
+    Raises:
+        HTTPException: If the user is not an admin.
+        HTTPException: If the file format is invalid.
     """
-    with unit_of_work:
-        mcqs = unit_of_work.mcq.get_all(type_=type)
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
 
-        if mcqs is None:
-            raise HTTPException(
-                status_code=404, detail="No MCQs found for the given type"
+    if not file.filename.endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file format. Upload an Excel, CSV or JSON Lines file.",
+        )
+
+    job_id = uuid4()
+    content_key = f"imports/{job_id}{Path(file.filename).suffix}"
+    import_file_storage.save(content_key, file.file)
+    try:
+        with unit_of_work:
+            job = ImportJob(
+                job_id=job_id,
+                filename=file.filename,
+                content_key=content_key,
+                created_by=current_user.user_id,
+                status=ImportJobStatus.pending.value,
+                near_duplicate_mode=near_duplicates.value,
             )
+            unit_of_work.import_job.add(job)
+            unit_of_work.session.flush()
+            unit_of_work.session.refresh(job)
+            created_job = ImportJobOutput.model_validate(job, from_attributes=True)
+    except Exception:
+        import_file_storage.delete(content_key)
+        raise
 
-        mcqs_list_object = []
-        for mcq in mcqs:
-            mcq_dict = {
-                "mcq_id": mcq.mcq_id,
-                "type": mcq.type,
-                "question": mcq.question,
-                "options": mcq.options,
-            }
-            mcqs_list_object.append(MCQDisplay(**mcq_dict))
+    import_job_queue.submit(created_job.job_id)
+    return created_job
 
-        random.shuffle(mcqs_list_object)
 
-        limited_mcqs_list_object = mcqs_list_object[:page_size]
+def get_near_duplicates(
+    unit_of_work: BaseUnitOfWork,
+    current_user: UserOutput,
+    type: Optional[str],
+    threshold: Optional[float],
+    limit: int,
+) -> List[NearDuplicateOutput]:
+    """
+    Reports pairs of stored MCQs whose questions are near duplicates. Only users with the role of "admin" can read it.
 
-        total_count = len(limited_mcqs_list_object)
-        total_pages = (total_count // page_size) + (
-            1 if total_count % page_size > 0 else 0
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+        type (Optional[str]): Restricts the report to one MCQ type.
+        threshold (Optional[float]): Minimum estimated similarity, `NEAR_DUPLICATE_THRESHOLD` by default.
+        limit (int): Number of pairs to return.
+
+    Returns:
+        list[NearDuplicateOutput]: The most similar pairs first, the newer MCQ of each pair as `mcq_id`.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        pairs = unit_of_work.mcq.near_duplicate_pairs(
+            type_=type,
+            threshold=threshold or NEAR_DUPLICATE_THRESHOLD,
+            limit=limit,
         )
+        return [NearDuplicateOutput(**pair._asdict()) for pair in pairs]
+
+
+def get_import_job(
+    unit_of_work: BaseUnitOfWork, job_id: UUID, current_user: UserOutput
+) -> ImportJobOutput:
+    """
+    Retrieves the progress of an import job.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        job_id (UUID): The ID of the import job.
+        current_user (UserOutput): Current authenticated user.
+
+    Returns:
+        ImportJobOutput: Rows processed, added and skipped so far, and any validation errors.
+
+    Raises:
+        HTTPException: If the user is not an admin.
+        HTTPException: If the job does not exist.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        job = unit_of_work.import_job.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Import job not found.")
+        return ImportJobOutput.model_validate(job, from_attributes=True)
 
-        start = (page - 1) * page_size
-        end = start + page_size
 
-        paginated_mcqs_list_object = mcqs_list_object[start:end]
+def get_all(
+    unit_of_work: BaseUnitOfWork,
+    type: Optional[str],
+    page_size: int,
+    current_user: UserOutput,
+    total_questions: Optional[int] = None,
+    cursor: Optional[str] = None,
+    mode: QuizMode = QuizMode.random,
+) -> PaginatedResponse:
+    """
+    Starts a quiz or serves the next page of a quiz in progress.
+
+    Without a cursor a quiz session is created: `total_questions` MCQs (default
+    `page_size`) are drawn once and their order is stored on a new submission.
+    The returned `nextCursor` walks that stored order, so later pages neither
+    reshuffle nor re-read the category and never create another submission.
+    In adaptive mode the questions are chosen by empirical difficulty.
+
+    Raises:
+        HTTPException: If neither a type nor a cursor is given.
+        HTTPException: If the cursor does not belong to a quiz of the user.
+    """
+    with unit_of_work:
+        if cursor:
+            submission_id, offset = decode_cursor(cursor)
+            quiz = QuizSession.resume(
+                unit_of_work, submission_id=submission_id, user_id=current_user.user_id
+            )
+        else:
+            if not type:
+                raise HTTPException(
+                    status_code=400, detail="Either type or cursor is required."
+                )
+            offset = 0
+            quiz = QuizSession.start(
+                unit_of_work,
+                type_=type,
+                total_questions=total_questions or page_size,
+                user_id=current_user.user_id,
+                mode=mode,
+            )
 
-        next_page = page + 1 if page < total_pages else None
+        mcqs_list_object = load_display_mcqs(
+            unit_of_work, quiz.type, quiz.page_ids(offset, page_size)
+        )
 
-        submission = Submission(
-            user_id=current_user.user_id, total_questions=total_count, type=type
+        total_count = len(quiz.question_order)
+        total_pages = (total_count // page_size) + (
+            1 if total_count % page_size > 0 else 0
         )
-        unit_of_work.submission.add(submission)
+        page = offset // page_size + 1
+        next_cursor = quiz.next_cursor(offset, page_size)
 
         return PaginatedResponse(
             currentPage=page,
             totalPage=total_pages,
-            nextPage=next_page,
+            nextPage=page + 1 if next_cursor else None,
             totalCount=total_count,
-            data=paginated_mcqs_list_object,
+            submissionId=quiz.submission_id,
+            nextCursor=next_cursor,
+            data=mcqs_list_object,
         )
 
 
+def load_display_mcqs(
+    unit_of_work: BaseUnitOfWork, type_: str, mcq_ids: List[UUID]
+) -> List[MCQDisplay]:
+    """
+    Builds display models for the given MCQ ids, keeping their order.
+
+    The cached question bank snapshot is used when available, anything it does
+    not hold is read with one batched query.
+    """
+    snapshot = question_bank_cache.get_snapshot(
+        type_, unit_of_work.mcq.get_question_bank, unit_of_work.mcq.count_questions
+    )
+    cached = snapshot.mcqs if snapshot else {}
+    mcqs = {mcq_id: cached[mcq_id] for mcq_id in mcq_ids if mcq_id in cached}
+    missing_ids = [mcq_id for mcq_id in mcq_ids if mcq_id not in mcqs]
+    for mcq in unit_of_work.mcq.get_many(missing_ids):
+        mcqs[mcq.mcq_id] = mcq
+
+    mcqs_list_object = []
+    for mcq_id in mcq_ids:
+        mcq = mcqs.get(mcq_id)
+        if mcq is None:
+            continue
+        mcq_dict = {
+            "mcq_id": mcq.mcq_id,
+            "type": mcq.type,
+            "question": mcq.question,
+            "options": mcq.options,
+        }
+        mcqs_list_object.append(MCQDisplay(**mcq_dict))
+    return mcqs_list_object
+
+
+def grade_answers(
+    unit_of_work: BaseUnitOfWork,
+    snapshot: Optional[QuestionBankSnapshot],
+    attempted: List[AttemptedMcq],
+) -> List[Tuple[CachedMcq, str, bool]]:
+    """
+    Grades the answers of a submission against the answer key of each MCQ.
+
+    The keys come from the cached question bank snapshot and anything it does
+    not hold is read with one batched query, so the number of queries does not
+    depend on the number of answers. An MCQ answered more than once is graded
+    once, on its last answer.
+
+    Returns:
+        list[tuple]: `(mcq, user_answer, is_correct)` in the order the MCQs were first answered.
+
+    Raises:
+        HTTPException: If an MCQ is not found.
+    """
+    answers = {
+        attempted_mcq.mcq_id: attempted_mcq.user_answer.value
+        for attempted_mcq in attempted
+    }
+    cached = snapshot.mcqs if snapshot else {}
+    answer_key = {mcq_id: cached[mcq_id] for mcq_id in answers if mcq_id in cached}
+    missing_ids = [mcq_id for mcq_id in answers if mcq_id not in answer_key]
+    for row in unit_of_work.mcq.get_answer_keys(missing_ids):
+        answer_key[row[0]] = CachedMcq(*row)
+
+    unknown_ids = [mcq_id for mcq_id in answers if mcq_id not in answer_key]
+    if unknown_ids:
+        raise HTTPException(status_code=404, detail=f"MCQ {unknown_ids[0]} not found")
+
+    return [
+        (answer_key[mcq_id], answer, answer == answer_key[mcq_id].correct_option)
+        for mcq_id, answer in answers.items()
+    ]
+
+
+def find_submitted_quiz(
+    unit_of_work: BaseUnitOfWork, submission: SubmissionInput, user_id: UUID
+) -> Submission:
+    """
+    Finds the quiz session a submission answers: the `submissionId` handed out
+    with the quiz, or the user's latest quiz for clients that do not send it.
+
+    Raises:
+        HTTPException: If the quiz does not exist or belongs to another user.
+        HTTPException: If an answered MCQ is not part of the quiz's paper.
+    """
+    if submission.submissionId:
+        quiz = unit_of_work.submission.get(submission_id=submission.submissionId)
+        if quiz is None or str(quiz.user_id) != str(user_id):
+            raise HTTPException(status_code=404, detail="Quiz session not found.")
+    else:
+        quizzes = unit_of_work.submission.get_all(
+            user_id=user_id, sort_by="created_at", order="desc"
+        )
+        if not quizzes:
+            raise HTTPException(status_code=404, detail="Quiz session not found.")
+        quiz = quizzes[0]
+
+    if quiz.question_order:
+        paper = {str(mcq_id) for mcq_id in quiz.question_order}
+        foreign_ids = [
+            attempted_mcq.mcq_id
+            for attempted_mcq in submission.attempted
+            if str(attempted_mcq.mcq_id) not in paper
+        ]
+        if foreign_ids:
+            raise HTTPException(
+                status_code=400,
+                detail=f"MCQ {foreign_ids[0]} is not part of this quiz.",
+            )
+    return quiz
+
+
 def process_submission(
     submission: SubmissionInput,
     unit_of_work: SubmissionUnitOfWork,
@@ -255,6 +685,9 @@ def process_submission(
     Processes the submission of MCQ answers, calculates the score and percentage,
     and updates the user's submission history.
 
+    The certificate is rendered by a background worker once the history is
+    committed, until then its status is pending.
+
     Parameters:
         submission : SubmissionInput
             The submission data containing user ID and attempted MCQs.
@@ -267,6 +700,7 @@ def process_submission(
         SubmissionOutput The output containing user ID, details of the attempted MCQs, and the percentage score.
 
     Raises:
+        HTTPException If the quiz session is not found or does not contain an answered MCQ.
         HTTPException If an MCQ is not found.
     """
     user_id = current_user.user_id
@@ -274,32 +708,33 @@ def process_submission(
     submission_details = []
 
     with unit_of_work as uow:
-        last_submission_total_question = uow.submission.get_all(
-            user_id=user_id, sort_by="created_at", order="desc"
-        )
-        total_questions = last_submission_total_question[0].total_questions
+        quiz = find_submitted_quiz(uow, submission, user_id)
+        total_questions = quiz.total_questions
 
         user_history = UserHistory(
+            history_id=uuid4(),
             user_id=user_id,
             total_score=0,
             percentage=0,
             total_attempts=total_questions,
-            submission_id=last_submission_total_question[0].submission_id,
+            submission_id=quiz.submission_id,
+            certificate_status=CertificateStatus.pending.value,
+        )
+        history_id = user_history.history_id
+        mcq_type = quiz.type
+        snapshot = question_bank_cache.get_snapshot(
+            mcq_type, uow.mcq.get_question_bank, uow.mcq.count_questions
         )
 
-        for attempted_mcq in submission.attempted:
-            mcq = uow.mcq.get(mcq_id=attempted_mcq.mcq_id)
-            if not mcq:
-                raise HTTPException(
-                    status_code=404, detail=f"MCQ {attempted_mcq.mcq_id} not found"
-                )
-            is_correct = attempted_mcq.user_answer.value == mcq.correct_option
-            total_score += 1 if is_correct else 0
+        for mcq, user_answer, is_correct in grade_answers(
+            uow, snapshot, submission.attempted
+        ):
+            total_score += is_correct
 
             detail = UserHistoryDetail(
                 history_id=user_history.history_id,
                 mcq_id=mcq.mcq_id,
-                user_answer=attempted_mcq.user_answer.value,
+                user_answer=user_answer,
                 is_correct=is_correct,
             )
             user_history.details.append(detail)
@@ -311,29 +746,27 @@ def process_submission(
                     question=mcq.question,
                     options=mcq.options,
                     correct_option=mcq.correct_option,
-                    user_answer=attempted_mcq.user_answer.value,
+                    user_answer=user_answer,
                 )
             )
 
+        answered = {
+            detail.mcq_id: (1, int(detail.is_correct))
+            for detail in user_history.details
+        }
+
         percentage = (
             (total_score / total_questions) * 100 if total_questions != 0 else 0
         )
 
-        data = {
-            "name": current_user.username,
-            "type": mcq.type,
-            "percentage": percentage,
-        }
-        generated_certificate_name = (
-            generate_certificate(data=data).get("body").get("object_name")
-        )
-
         user_history.total_score = total_score
         user_history.percentage = percentage
-        user_history.certificate = generated_certificate_name
         uow.history.add(user_history)
+        stats = uow.user_stats.record(
+            user_id, mcq_type, total_score, percentage, USER_STATS_WINDOW
+        )
 
-        return SubmissionOutput(
+        submission_output = SubmissionOutput(
             user_id=user_id,
             data=submission_details,
             total_score=total_score,
@@ -341,33 +774,223 @@ def process_submission(
             percentage=percentage,
         )
 
+    certificate_queue.submit(history_id)
+    answer_counts.add(answered)
+    leaderboards.apply(mcq_type, entry_from_stats(user_id, *stats))
+    seen_index_cache.mark_seen(
+        user_id, snapshot, [detail.mcq_id for detail in submission_details]
+    )
+    return submission_output
+
+
+def user_stats_output(stats: UserStats) -> UserStatsOutput:
+    """
+    Derives the averages of a `user_stats` row from its sums.
+    """
+    recent = list(stats.recent_percentages or [])
+    return UserStatsOutput(
+        type=stats.type,
+        attempts=stats.attempts,
+        average_score=stats.score_sum / stats.attempts if stats.attempts else 0,
+        average_percentage=(
+            stats.percentage_sum / stats.attempts if stats.attempts else 0
+        ),
+        best_percentage=stats.best_percentage,
+        latest_percentage=stats.latest_percentage,
+        latest_attempted_at=stats.latest_attempted_at,
+        recent_percentages=recent,
+        recent_average_percentage=sum(recent) / len(recent) if recent else None,
+    )
+
+
+def view_user_stats(
+    unit_of_work: HistoryUnitOfWork,
+    current_user: UserOutput,
+    user_id: Optional[UUID] = None,
+    type: Optional[str] = None,
+) -> List[UserStatsOutput]:
+    """
+    Retrieves the best, average and latest scores of a user per MCQ type.
+
+    The statistics are read from the `user_stats` rows kept up to date by
+    `process_submission`, one primary key lookup per type, however many
+    submissions the user has.
+
+    Parameters:
+        unit_of_work : HistoryUnitOfWork
+            The Unit of Work instance for managing database transactions.
+        current_user : UserOutput
+            The current logged-in user.
+        user_id : Optional[UUID]
+            The user to read, defaults to the current user. Only admins can read other users.
+        type : Optional[str]
+            Only return the statistics of this MCQ type.
+
+    Returns:
+        List[UserStatsOutput]
+            One entry per MCQ type the user has submitted.
+
+    Raises:
+        HTTPException: If a user who is not an admin reads another user.
+    """
+    user_id = user_id or current_user.user_id
+    if user_id != current_user.user_id and current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work as uow:
+        if type:
+            stats = uow.user_stats.get(user_id, type)
+            rows = [stats] if stats else []
+        else:
+            rows = uow.user_stats.get_all(user_id)
+        return [user_stats_output(stats) for stats in rows]
+
+
+def view_leaderboard(
+    unit_of_work: HistoryUnitOfWork,
+    current_user: UserOutput,
+    type: str,
+    limit: int = 10,
+) -> LeaderboardOutput:
+    """
+    Retrieves the best users of an MCQ type and the rank of the current user.
+
+    Users are ranked by best percentage, then average percentage, from the
+    in-process leaderboards, so both lookups are logarithmic in the number of
+    ranked users. Only the usernames of the returned entries are read from the
+    database.
+
+    Parameters:
+        unit_of_work : HistoryUnitOfWork
+            The Unit of Work instance for managing database transactions.
+        current_user : UserOutput
+            The current logged-in user.
+        type : str
+            The MCQ type.
+        limit : int
+            Number of top entries to return.
+
+    Returns:
+        LeaderboardOutput
+            The top entries, the number of ranked users and the current user's entry.
+    """
+    leaderboards.refresh(load_changed_stats)
+    top, total_users = leaderboards.top(type, limit)
+    ranked = [(rank, entry) for rank, entry in enumerate(top, start=1)]
+    mine = leaderboards.rank(type, current_user.user_id)
+
+    with unit_of_work as uow:
+        usernames = uow.user.get_usernames(
+            {entry.user_id for _, entry in ranked + ([mine] if mine else [])}
+        )
+
+    def output(rank, entry) -> LeaderboardEntryOutput:
+        return LeaderboardEntryOutput(
+            rank=rank,
+            username=usernames.get(entry.user_id),
+            **entry._asdict(),
+        )
+
+    return LeaderboardOutput(
+        type=type,
+        total_users=total_users,
+        data=[output(rank, entry) for rank, entry in ranked],
+        me=output(*mine) if mine else None,
+    )
+
+
+def encode_history_cursor(
+    sort_by: HistorySortKey, order: SortOrder, history: UserHistory
+) -> str:
+    """
+    Encodes the position of the last history of a page into an opaque cursor.
+    """
+    value = getattr(history, sort_by.value)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort_by.value, order.value, value, str(history.history_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_history_cursor(
+    cursor: str, sort_by: HistorySortKey, order: SortOrder
+) -> Tuple[Any, UUID]:
+    """
+    Decodes a cursor created by `encode_history_cursor` into a `(sort value, history_id)` position.
+
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort.
+    """
+    try:
+        cursor_sort, cursor_order, value, history_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        )
+        if (cursor_sort, cursor_order) != (sort_by.value, order.value):
+            raise ValueError(cursor_sort)
+        if sort_by == HistorySortKey.attempted_at:
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value)
+        return value, UUID(history_id)
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
 
 def view_history_of_submission_of_user(
     unit_of_work: HistoryUnitOfWork,
     current_user: UserOutput,
-    sort_by: str = None,
-    order: str = "asc",
-):
+    sort_by: HistorySortKey = HistorySortKey.attempted_at,
+    order: SortOrder = SortOrder.asc,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+) -> UserHistoryPage:
     """
-    Retrieves the submission histories for the current user.
+    Retrieves one page of the submission histories for the current user.
+
+    Pages are read by keyset on `(sort_by, history_id)`, so every page costs the
+    same however many submissions the user has.
 
     Parameters:
         unit_of_work : HistoryUnitOfWork
             The Unit of Work instance for managing database transactions.
         current_user : UserOutput
             The current logged-in user.
+        sort_by : HistorySortKey
+            attempted_at or percentage.
+        order : SortOrder
+            asc or desc.
+        page_size : int
+            Maximum number of histories in the page.
+        cursor : Optional[str]
+            nextCursor of the previous page, with the same sort_by and order.
 
     Returns:
-        List[UserHistoryInput]
-            A list of the user's submission history records.
+        UserHistoryPage
+            The user's submission history records and the cursor of the next page.
     """
+    after = decode_history_cursor(cursor, sort_by, order) if cursor else None
     with unit_of_work as uow:
-        histories = uow.history.get_all(
+        histories = uow.history.get_page(
             user_id=current_user.user_id,
-            sort_by=sort_by,
-            order=order,
+            sort_by=sort_by.value,
+            descending=order == SortOrder.desc,
+            after=after,
+            limit=page_size + 1,
+        )
+        page = histories[:page_size]
+        return UserHistoryPage(
+            data=[
+                UserHistoryInput.model_validate(history, from_attributes=True)
+                for history in page
+            ],
+            nextCursor=(
+                encode_history_cursor(sort_by, order, page[-1])
+                if len(histories) > page_size
+                else None
+            ),
         )
-        return [UserHistoryInput(**history.__dict__) for history in histories]
 
 
 def view_particular_history(
@@ -377,34 +1000,33 @@ def view_particular_history(
 ) -> SubmissionOutput:
     """
     Retrieves a particular submission details.
+
+    The history, its details and their MCQs are read with one query.
     """
     with unit_of_work as uow:
-        history = uow.history.get(history_id=history_id)
-        history_dict = history.__dict__
-
-        details = uow.history_details.get_all(history_id=history_id)
-
-        details_list = []
-        for detail in details:
-            mcq = uow.mcq.get(mcq_id=detail.mcq_id)
-            details_list.append(
-                {
-                    "mcq_id": str(detail.mcq_id),
-                    "type": mcq.type,
-                    "question": mcq.question,
-                    "options": mcq.options,
-                    "correct_option": mcq.correct_option,
-                    "user_answer": detail.user_answer,
-                    "is_correct": detail.is_correct,
-                }
-            )
+        history = uow.history.get_with_details(history_id=history_id)
+        if not history:
+            raise HTTPException(status_code=404, detail="History not found")
+
+        details_list = [
+            {
+                "mcq_id": str(detail.mcq_id),
+                "type": detail.mcq.type,
+                "question": detail.mcq.question,
+                "options": detail.mcq.options,
+                "correct_option": detail.mcq.correct_option,
+                "user_answer": detail.user_answer,
+                "is_correct": detail.is_correct,
+            }
+            for detail in history.details
+        ]
 
         return SubmissionOutput(
-            user_id=history_dict.get("user_id"),
+            user_id=history.user_id,
             data=details_list,
-            total_score=history_dict.get("total_score"),
-            total_attempts=history_dict.get("total_attempts"),
-            percentage=history_dict.get("percentage"),
+            total_score=history.total_score,
+            total_attempts=history.total_attempts,
+            percentage=history.percentage,
         )
 
 
@@ -439,13 +1061,281 @@ def generate_certificate_presigned_url(
 ):
     """
     generates a presigned link of existing certificate
+
+    While the certificate is still being rendered the status is "pending" and no
+    URL is returned. A failed render is queued again and reported as pending.
     """
     with unit_of_work as uow:
         history = uow.history.get(history_id=history_id)
         if not history:
             raise HTTPException(status_code=404, detail="History not found")
+        status = history.certificate_status
         certificate = history.certificate
-        if certificate:
-            return generate_presigned_url_func(file_key=certificate)
-        else:
-            raise HTTPException(status_code=404, detail="Certtificate not found.")
+        if status == CertificateStatus.failed.value:
+            uow.history.update(
+                history_id, certificate_status=CertificateStatus.pending.value
+            )
+
+    if status != CertificateStatus.ready.value:
+        if status == CertificateStatus.failed.value:
+            certificate_queue.submit(history_id)
+        return {
+            "message": "Certificate is being generated",
+            "status": CertificateStatus.pending.value,
+        }
+    if certificate:
+        return {
+            **generate_presigned_url_func(file_key=certificate),
+            "status": CertificateStatus.ready.value,
+        }
+    else:
+        raise HTTPException(status_code=404, detail="Certtificate not found.")
+
+
+def create_certificate_rerender_job(
+    unit_of_work: BaseUnitOfWork, current_user: UserOutput
+) -> CertificateRerenderJobOutput:
+    """
+    Queues a job that re-renders every certificate, e.g. after the template changed. Only users with the role of "admin" can start it.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+
+    Returns:
+        CertificateRerenderJobOutput: The queued job, to be polled with `get_certificate_rerender_job`.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+        HTTPException: If a re-render job is already pending or running.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        if unit_of_work.certificate_job.get_active():
+            raise HTTPException(
+                status_code=409,
+                detail="A certificate re-render job is already running.",
+            )
+        job = CertificateRerenderJob(
+            created_by=current_user.user_id, status=ImportJobStatus.pending.value
+        )
+        unit_of_work.certificate_job.add(job)
+        unit_of_work.session.flush()
+        unit_of_work.session.refresh(job)
+        created_job = CertificateRerenderJobOutput.model_validate(
+            job, from_attributes=True
+        )
+
+    rerender_job_queue.submit(created_job.job_id)
+    return created_job
+
+
+def get_certificate_rerender_job(
+    unit_of_work: BaseUnitOfWork, job_id: UUID, current_user: UserOutput
+) -> CertificateRerenderJobOutput:
+    """
+    Retrieves the progress of a certificate re-render job. Only users with the role of "admin" can read it.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        job_id (UUID): The ID of the re-render job.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+
+    Returns:
+        CertificateRerenderJobOutput: Certificates processed, rendered and failed so far.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+        HTTPException: If the job does not exist.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        job = unit_of_work.certificate_job.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Re-render job not found.")
+        return CertificateRerenderJobOutput.model_validate(job, from_attributes=True)
+
+
+def create_regrade_job(
+    unit_of_work: BaseUnitOfWork, mcq_ids: List[UUID], current_user: UserOutput
+) -> RegradeJobOutput:
+    """
+    Queues a job that regrades every past answer to the given MCQs against their
+    current answer key, e.g. after a `correct_option` was fixed. Only users with
+    the role of "admin" can start it.
+
+    The question bank cache of this process is dropped and the shared question
+    bank version is bumped with the job, so every other process drops its cache
+    on its next version check and new submissions are graded against the new
+    keys too.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        mcq_ids (List[UUID]): The MCQs whose answer key changed.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+
+    Returns:
+        RegradeJobOutput: The queued job, to be polled with `get_regrade_job`.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+        HTTPException: If an MCQ is not found.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    mcq_ids = list(dict.fromkeys(mcq_ids))
+    with unit_of_work:
+        found = {row[0] for row in unit_of_work.mcq.get_answer_keys(mcq_ids)}
+        unknown_ids = [mcq_id for mcq_id in mcq_ids if mcq_id not in found]
+        if unknown_ids:
+            raise HTTPException(
+                status_code=404, detail=f"MCQ {unknown_ids[0]} not found"
+            )
+        job = RegradeJob(
+            created_by=current_user.user_id,
+            status=ImportJobStatus.pending.value,
+            mcq_ids=mcq_ids,
+        )
+        unit_of_work.regrade_job.add(job)
+        unit_of_work.mcq.bump_question_bank_version()
+        unit_of_work.session.flush()
+        unit_of_work.session.refresh(job)
+        created_job = RegradeJobOutput.model_validate(job, from_attributes=True)
+
+    question_bank_cache.invalidate()
+    regrade_job_queue.submit(created_job.job_id)
+    return created_job
+
+
+def get_regrade_job(
+    unit_of_work: BaseUnitOfWork, job_id: UUID, current_user: UserOutput
+) -> RegradeJobOutput:
+    """
+    Retrieves the status of a regrade job and, once completed, how many answers,
+    histories and users it changed. Only users with the role of "admin" can read it.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        job_id (UUID): The ID of the regrade job.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+
+    Returns:
+        RegradeJobOutput: The job and its counts.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+        HTTPException: If the job does not exist.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        job = unit_of_work.regrade_job.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Regrade job not found.")
+        return RegradeJobOutput.model_validate(job, from_attributes=True)
+
+
+def start_item_analysis(current_user: UserOutput) -> dict:
+    """
+    Queues the item analysis of every MCQ. Only users with the role of "admin" can start it.
+
+    A request made while a run is queued or in progress is absorbed by that run.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+    item_analysis_queue.submit(ITEM_ANALYSIS_JOB_ID)
+    return {"message": "Item analysis queued"}
+
+
+def get_item_stats(
+    unit_of_work: BaseUnitOfWork,
+    current_user: UserOutput,
+    type: Optional[str] = None,
+    sort_by: ItemStatsSortKey = ItemStatsSortKey.discrimination,
+    limit: int = 50,
+    offset: int = 0,
+) -> List[ItemStatsOutput]:
+    """
+    Retrieves the difficulty, discrimination and option shares of MCQs from the last
+    item analysis, lowest `sort_by` first so the questions to review come first.
+    Only users with the role of "admin" can read them.
+
+    Args:
+        unit_of_work (BaseUnitOfWork): The unit of work object that manages database transactions and repositories.
+        current_user (UserOutput): The current authenticated user, used to check authorization.
+        type (Optional[str]): Only return MCQs of this type.
+        sort_by (ItemStatsSortKey): difficulty or discrimination.
+        limit (int): Number of MCQs to return.
+        offset (int): Number of MCQs to skip.
+
+    Returns:
+        List[ItemStatsOutput]: The statistics of each MCQ.
+
+    Raises:
+        HTTPException: If the user's role is not "admin".
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+
+    with unit_of_work:
+        return [
+            ItemStatsOutput(
+                mcq_id=stats.mcq_id,
+                type=stats.mcq.type,
+                question=stats.mcq.question,
+                responses=stats.responses,
+                difficulty=stats.difficulty,
+                discrimination=stats.discrimination,
+                option_shares={
+                    option: count / stats.responses
+                    for option, count in stats.option_counts.items()
+                },
+                computed_at=stats.computed_at,
+            )
+            for stats in unit_of_work.item_stats.get_all(
+                type_=type, sort_by=sort_by.value, limit=limit, offset=offset
+            )
+        ]
+
+
+def get_metrics(current_user: UserOutput) -> dict:
+    """
+    Returns the in-process cache, paper pool, import and certificate queue counters. Only admins can read them.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=401, detail="Access denied. Admin role required."
+        )
+    return {
+        "question_bank_cache": question_bank_cache.stats(),
+        "paper_pool": paper_pool.stats(),
+        "import_jobs": import_job_queue.stats(),
+        "certificates": certificate_queue.stats(),
+        "certificate_rerender": rerender_job_queue.stats(),
+        "presigned_urls": presigned_url_cache.stats(),
+        "leaderboards": leaderboards.stats(),
+        "answer_counts": answer_counts.stats(),
+        "item_analysis": item_analysis_queue.stats(),
+        "regrade": regrade_job_queue.stats(),
+    }
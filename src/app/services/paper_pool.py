@@ -0,0 +1,209 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.question_bank_cache import QuestionBankCache, question_bank_cache
+
+
+class QuizPaper(NamedTuple):
+    """A ready-made quiz: the seed and the question order it produced."""
+
+    version: int
+    seed: int
+    mcq_ids: Tuple[UUID, ...]
+
+
+class PaperPool:
+    """
+    Bounded pools of pre-generated quiz papers, one per (type, question count).
+
+    Only the keys returned by the loader given to `warm` get a pool, so the
+    number of pools does not depend on what clients ask for; takes of any other
+    key miss and the caller draws its paper itself. Taking a paper is a deque
+    pop. Every take schedules an asynchronous refill of its pool on a small
+    worker pool, so a burst of quiz starts is served from papers generated
+    ahead of time.
+
+    Papers are stamped with the question bank version they were drawn from.
+    When the version changes all pools are discarded, the keys are loaded
+    again, which picks up new categories, and their pools are refilled right
+    away, so the next burst does not fall back to drawing papers synchronously.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, int], QuizPaper],
+        depth: int,
+        max_workers: int,
+        cache: QuestionBankCache = question_bank_cache,
+    ):
+        self.generate = generate
+        self.depth = depth
+        self.cache = cache
+        self._lock = Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="paper-pool")
+            if depth > 0
+            else None
+        )
+        self._version = cache.version
+        self._pools: Dict[Tuple[str, int], deque] = {}
+        self._refilling: set = set()
+        self._known: set = set()
+        self._keys: Optional[Callable[[], Iterable[Tuple[str, int]]]] = None
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.refill_seconds_total = 0.0
+        self.last_refill_seconds = 0.0
+        if self._executor is not None:
+            cache.add_listener(self._on_invalidate)
+
+    def warm(self, keys: Callable[[], Iterable[Tuple[str, int]]]) -> None:
+        """
+        Fill the pools of the given `(type, question count)` keys in the background.
+
+        Parameters:
+            keys : Callable[[], Iterable[Tuple[str, int]]]
+                Called on a pool worker, so loading the keys from the database does
+                not delay the caller, and again after every invalidation. A
+                failure is counted in `refill_errors`.
+        """
+        if self._executor is not None:
+            self._keys = keys
+            self._executor.submit(self._warm, keys)
+
+    def take(self, type_: str, size: int) -> Optional[QuizPaper]:
+        """
+        Take a paper for the type and question count, if one is ready.
+
+        Returns: Optional[QuizPaper]
+            A paper drawn from the current question bank version, or None when
+            the pool is empty, disabled or the key was not warmed.
+        """
+        if self._executor is None:
+            return None
+
+        self.cache.sync()
+        key = (type_, size)
+        with self._lock:
+            self._discard_stale()
+            if key not in self._known:
+                self.misses += 1
+                return None
+            pool = self._pools.get(key)
+            paper = pool.popleft() if pool else None
+            if paper is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._schedule([key])
+        return paper
+
+    def stats(self) -> dict:
+        """
+        Return pool depths and refill latency.
+        """
+        with self._lock:
+            return {
+                "version": self._version,
+                "depth_limit": self.depth,
+                "known_pools": len(self._known),
+                "hits": self.hits,
+                "misses": self.misses,
+                "refills": self.refills,
+                "refill_errors": self.refill_errors,
+                "last_refill_ms": self.last_refill_seconds * 1000,
+                "avg_refill_ms": (
+                    self.refill_seconds_total / self.refills * 1000
+                    if self.refills
+                    else 0.0
+                ),
+                "depths": {
+                    f"{type_}:{size}": len(pool)
+                    for (type_, size), pool in self._pools.items()
+                },
+            }
+
+    def _discard_stale(self) -> None:
+        if self._version != self.cache.version:
+            self._version = self.cache.version
+            self._pools.clear()
+
+    def _on_invalidate(self, version: int) -> None:
+        with self._lock:
+            self._discard_stale()
+        if self._keys is not None:
+            self._executor.submit(self._warm, self._keys)
+
+    def _warm(self, keys: Callable[[], Iterable[Tuple[str, int]]]) -> None:
+        try:
+            keys = list(keys())
+        except Exception:
+            with self._lock:
+                self.refill_errors += 1
+            return
+        with self._lock:
+            self._known = set(keys)
+            for key in list(self._pools):
+                if key not in self._known:
+                    del self._pools[key]
+        self._schedule(keys)
+
+    def _schedule(self, keys) -> None:
+        with self._lock:
+            keys = [key for key in keys if key not in self._refilling]
+            self._refilling.update(keys)
+        for key in keys:
+            self._executor.submit(self._refill, key)
+
+    def _refill(self, key: Tuple[str, int]) -> None:
+        type_, size = key
+        started = time.perf_counter()
+        stale = False
+        try:
+            papers = []
+            with self._lock:
+                missing = self.depth - len(self._pools.get(key, ()))
+            for _ in range(missing):
+                papers.append(self.generate(type_, size))
+
+            with self._lock:
+                self._discard_stale()
+                fresh = [paper for paper in papers if paper.version == self._version]
+                # Papers drawn before an invalidation that happened mid-refill
+                # are dropped and the pool is refilled again.
+                stale = len(fresh) < len(papers)
+                papers = [paper for paper in fresh if paper.mcq_ids]
+                if papers and key in self._known:
+                    pool = self._pools.setdefault(key, deque(maxlen=self.depth))
+                    pool.extend(papers)
+                elapsed = time.perf_counter() - started
+                self.refills += 1
+                self.refill_seconds_total += elapsed
+                self.last_refill_seconds = elapsed
+        except Exception:
+            with self._lock:
+                self.refill_errors += 1
+        finally:
+            with self._lock:
+                if not stale:
+                    self._refilling.discard(key)
+        if stale:
+            self._executor.submit(self._refill, key)
+
+
+def create_paper_pool(generate: Callable[[str, int], QuizPaper]) -> PaperPool:
+    """
+    Build a paper pool configured from the settings.
+    """
+    return PaperPool(
+        generate=generate,
+        depth=int(app_config.get("PAPER_POOL_DEPTH", 50)),
+        max_workers=int(app_config.get("PAPER_POOL_WORKERS", 2)),
+    )
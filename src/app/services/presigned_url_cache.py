@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, NamedTuple, Tuple
+
+from app.config.settings import app_config
+
+
+class CachedUrl(NamedTuple):
+    url: str
+    expires_at: float
+
+
+class PresignedUrlCache:
+    """
+    In-process cache of presigned `get_object` URLs, keyed by bucket and object key.
+
+    A presigned URL is valid for `expires_in` seconds from the moment it is
+    signed, so a cached URL is handed out again until `margin` seconds before it
+    expires; whoever receives it still has at least `margin` seconds to follow
+    it. At most `max_entries` URLs are kept and the least recently used are
+    evicted first. With a margin as long as the expiry nothing is cached.
+    """
+
+    def __init__(
+        self,
+        client,
+        expires_in: int,
+        margin: int,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.expires_in = expires_in
+        self.margin = margin
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self._lock = Lock()
+        self._urls: "OrderedDict[Tuple[str, str], CachedUrl]" = OrderedDict()
+
+    @property
+    def ttl(self) -> float:
+        """Seconds a URL is served from the cache after it was signed."""
+        return max(0, self.expires_in - self.margin)
+
+    def get_url(self, bucket: str, key: str) -> str:
+        """
+        Return a presigned URL for an object, signing a new one on a miss.
+
+        Parameters:
+            bucket : str
+                The S3 bucket.
+            key : str
+                The object key.
+
+        Returns: str
+            A URL that stays valid for at least `margin` seconds.
+        """
+        now = self.clock()
+        with self._lock:
+            cached = self._urls.get((bucket, key))
+            if cached is not None and cached.expires_at > now:
+                self.hits += 1
+                self._urls.move_to_end((bucket, key))
+                return cached.url
+            if cached is not None:
+                self.expirations += 1
+                del self._urls[(bucket, key)]
+            self.misses += 1
+
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=self.expires_in,
+        )
+        if self.ttl and self.max_entries:
+            with self._lock:
+                self._urls[(bucket, key)] = CachedUrl(url, now + self.ttl)
+                self._urls.move_to_end((bucket, key))
+                self._evict()
+        return url
+
+    def invalidate(self, bucket: str = None, key: str = None) -> None:
+        """
+        Drop the URL of one object, or every URL when no key is given.
+        """
+        with self._lock:
+            if key is None:
+                self._urls.clear()
+            else:
+                self._urls.pop((bucket, key), None)
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "cached_urls": len(self._urls),
+                "max_entries": self.max_entries,
+                "expires_in": self.expires_in,
+                "margin": self.margin,
+            }
+
+    def _evict(self) -> None:
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+            self.evictions += 1
+
+
+def make_presigned_url_cache(client) -> PresignedUrlCache:
+    """
+    Build the cache from `PRESIGNED_URL_EXPIRY_SECONDS`, `PRESIGNED_URL_CACHE_MARGIN_SECONDS`
+    and `PRESIGNED_URL_CACHE_MAX_ENTRIES`.
+    """
+    return PresignedUrlCache(
+        client=client,
+        expires_in=int(app_config.get("PRESIGNED_URL_EXPIRY_SECONDS", 300)),
+        margin=int(app_config.get("PRESIGNED_URL_CACHE_MARGIN_SECONDS", 60)),
+        max_entries=int(app_config.get("PRESIGNED_URL_CACHE_MAX_ENTRIES", 10_000)),
+    )
@@ -0,0 +1,274 @@
+import random
+import time
+from collections import OrderedDict
+from threading import Lock
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.unit_of_work import McqUnitOfWork
+
+
+class CachedMcq(NamedTuple):
+    mcq_id: UUID
+    type: str
+    question: str
+    options: dict
+    correct_option: str
+
+
+class QuestionBankSnapshot(NamedTuple):
+    """Immutable view of every MCQ of one type at a given cache version."""
+
+    type: str
+    version: int
+    mcq_ids: Tuple[UUID, ...]
+    mcqs: Mapping[UUID, CachedMcq]
+    ordinals: Mapping[UUID, int]
+
+    def sample(self, k: int, rng: random.Random = random) -> List[CachedMcq]:
+        """
+        Pick up to `k` distinct MCQs uniformly at random.
+        """
+        picked = rng.sample(self.mcq_ids, min(k, len(self.mcq_ids)))
+        return [self.mcqs[mcq_id] for mcq_id in picked]
+
+
+class QuestionBankCache:
+    """
+    In-process cache of question bank snapshots, one per MCQ type.
+
+    The question bank only changes when an admin writes MCQs, so snapshots are
+    kept until `invalidate` bumps the version. The process that writes calls
+    `invalidate` itself; every other process notices the write through
+    `version_loader`, a version shared in the database that is read at most
+    every `check_seconds`, so its snapshots are at most that old.
+
+    The total number of cached questions is bounded by `max_questions`; the
+    least recently used types are evicted first and a type larger than the
+    bound is never cached, callers fall back to the database for it. Types
+    without questions, including types that do not exist, are not cached
+    either, so they cannot fill the cache outside the bound. Oversized
+    types are remembered across versions and, with a `counter`, re-checked
+    from their question count instead of by reading their questions again.
+    """
+
+    def __init__(
+        self,
+        max_questions: int,
+        version_loader: Optional[Callable[[], int]] = None,
+        check_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_questions = max_questions
+        self.version_loader = version_loader
+        self.check_seconds = check_seconds
+        self.clock = clock
+        self.version = 0
+        self.shared_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.version_errors = 0
+        self._lock = Lock()
+        self._check_lock = Lock()
+        self._checked_at = float("-inf")
+        self._snapshots: "OrderedDict[str, QuestionBankSnapshot]" = OrderedDict()
+        # Type -> the version at which it was found to be oversized.
+        self._oversized: Dict[str, int] = {}
+        self._categories: Optional[List[Tuple[str, int]]] = None
+        self._cached_questions = 0
+        self._listeners: List[Callable[[int], None]] = []
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        """
+        Call `listener` with the new version after every invalidation.
+        """
+        self._listeners.append(listener)
+
+    def sync(self) -> None:
+        """
+        Invalidate the cache if the shared version moved since the last check.
+
+        Reads the shared version at most every `check_seconds` and only from
+        one thread at a time. A failed read is counted in `version_errors` and
+        the current snapshots are kept until the next check.
+        """
+        if self.version_loader is None:
+            return
+        if self.clock() - self._checked_at < self.check_seconds:
+            return
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = self.clock()
+            try:
+                shared_version = self.version_loader()
+            except Exception:
+                with self._lock:
+                    self.version_errors += 1
+                return
+            with self._lock:
+                changed = (
+                    self.shared_version is not None
+                    and shared_version != self.shared_version
+                )
+                self.shared_version = shared_version
+            if changed:
+                self.invalidate()
+        finally:
+            self._check_lock.release()
+
+    def get_snapshot(
+        self,
+        type_: str,
+        loader: Callable[[str, int], Sequence[tuple]],
+        counter: Optional[Callable[[str], int]] = None,
+    ) -> Optional[QuestionBankSnapshot]:
+        """
+        Return the snapshot for a type, loading it on a miss.
+
+        Parameters:
+            type_ : str
+                The MCQ type.
+            loader : Callable[[str, int], Sequence[tuple]]
+                Called with the type and a row limit, returns
+                `(mcq_id, question, options, correct_option)` rows.
+            counter : Optional[Callable[[str], int]]
+                Returns the number of MCQs of a type, used to re-check a type
+                found oversized at an older version without loading it.
+
+        Returns: Optional[QuestionBankSnapshot]
+            The snapshot, or None if the type has more questions than the
+            cache may hold.
+        """
+        self.sync()
+        with self._lock:
+            version = self.version
+            if type_ in self._snapshots:
+                self.hits += 1
+                self._snapshots.move_to_end(type_)
+                return self._snapshots[type_]
+            oversized_at = self._oversized.get(type_)
+            if oversized_at == version:
+                self.hits += 1
+                return None
+            self.misses += 1
+
+        if oversized_at is not None and counter is not None:
+            if counter(type_) > self.max_questions:
+                self._mark_oversized(type_, version)
+                return None
+
+        rows = loader(type_, self.max_questions + 1)
+        if len(rows) > self.max_questions:
+            self._mark_oversized(type_, version)
+            return None
+
+        mcqs = {
+            mcq_id: CachedMcq(mcq_id, type_, question, options, correct_option)
+            for mcq_id, question, options, correct_option in rows
+        }
+        snapshot = QuestionBankSnapshot(
+            type=type_,
+            version=version,
+            mcq_ids=tuple(mcqs),
+            mcqs=MappingProxyType(mcqs),
+            ordinals=MappingProxyType(
+                {mcq_id: ordinal for ordinal, mcq_id in enumerate(mcqs)}
+            ),
+        )
+
+        if not snapshot.mcq_ids:
+            # An empty snapshot costs nothing toward `max_questions`, so caching
+            # it would let made-up types grow the cache without bound.
+            return snapshot
+
+        with self._lock:
+            if version == self.version and type_ not in self._snapshots:
+                self._oversized.pop(type_, None)
+                self._snapshots[type_] = snapshot
+                self._cached_questions += len(snapshot.mcq_ids)
+                self._evict()
+        return snapshot
+
+    def get_categories(
+        self, loader: Callable[[], Sequence[tuple]]
+    ) -> List[Tuple[str, int]]:
+        """
+        Return the cached `(name, question_count)` category rows, loading them on a miss.
+        """
+        self.sync()
+        with self._lock:
+            version = self.version
+            if self._categories is not None:
+                self.hits += 1
+                return list(self._categories)
+            self.misses += 1
+
+        categories = [(name, question_count) for name, question_count in loader()]
+        with self._lock:
+            if version == self.version:
+                self._categories = categories
+        return list(categories)
+
+    def invalidate(self) -> None:
+        """
+        Bump the version and drop every snapshot. Called after MCQs or categories
+        are written, and by `sync` when another process wrote them.
+        """
+        with self._lock:
+            self.version += 1
+            version = self.version
+            self._snapshots.clear()
+            self._categories = None
+            self._cached_questions = 0
+        for listener in self._listeners:
+            listener(version)
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "shared_version": self.shared_version,
+                "version_errors": self.version_errors,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "cached_types": list(self._snapshots),
+                "cached_questions": self._cached_questions,
+                "oversized_types": list(self._oversized),
+                "max_questions": self.max_questions,
+            }
+
+    def _mark_oversized(self, type_: str, version: int) -> None:
+        with self._lock:
+            if version == self.version:
+                self._oversized[type_] = version
+
+    def _evict(self) -> None:
+        while self._cached_questions > self.max_questions and self._snapshots:
+            _, evicted = self._snapshots.popitem(last=False)
+            self._cached_questions -= len(evicted.mcq_ids)
+            self.evictions += 1
+
+
+def load_question_bank_version() -> int:
+    """
+    Load the question bank version shared by every process.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        return unit_of_work.mcq.get_question_bank_version()
+
+
+question_bank_cache = QuestionBankCache(
+    max_questions=int(app_config.get("MCQ_CACHE_MAX_QUESTIONS", 100_000)),
+    version_loader=load_question_bank_version,
+    check_seconds=float(app_config.get("MCQ_CACHE_VERSION_CHECK_SECONDS", 1)),
+)
@@ -0,0 +1,262 @@
+import base64
+import binascii
+import random
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException
+
+from app.config.settings import app_config
+from app.models.data_models import Submission
+from app.schemas.mcq_schemas import QuizMode
+from app.services.difficulty_index import difficulty_index_cache, target_bucket
+from app.services.paper_pool import QuizPaper, create_paper_pool
+from app.services.question_bank_cache import question_bank_cache
+from app.services.seen_index import SeenIndex, seen_index_cache
+from app.services.unit_of_work import BaseUnitOfWork, McqUnitOfWork
+
+
+def encode_cursor(submission_id: UUID, offset: int) -> str:
+    """
+    Encodes a quiz session position into an opaque cursor.
+    """
+    raw = f"{submission_id}:{offset}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[UUID, int]:
+    """
+    Decodes a cursor created by `encode_cursor`.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        submission_id, offset = (
+            base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split(":")
+        )
+        submission_id, offset = UUID(submission_id), int(offset)
+    except (ValueError, UnicodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return submission_id, offset
+
+
+def has_questions(unit_of_work: BaseUnitOfWork, type_: str) -> bool:
+    """
+    Whether the category registry lists questions of a type, read through the
+    question bank cache so a quiz start does not query the registry.
+    """
+    categories = question_bank_cache.get_categories(
+        lambda: [
+            (category.name, category.question_count)
+            for category in unit_of_work.category.get_all()
+        ]
+    )
+    return any(
+        name == type_ and question_count > 0 for name, question_count in categories
+    )
+
+
+def draw_paper(
+    unit_of_work: BaseUnitOfWork,
+    type_: str,
+    size: int,
+    seen: Optional[SeenIndex] = None,
+) -> QuizPaper:
+    """
+    Draws a seeded random question order of `size` MCQs of a type.
+
+    With a seen index, questions the user has not answered yet are preferred.
+    """
+    version = question_bank_cache.version
+    seed = random.getrandbits(63)
+    rng = random.Random(seed)
+
+    snapshot = question_bank_cache.get_snapshot(
+        type_, unit_of_work.mcq.get_question_bank, unit_of_work.mcq.count_questions
+    )
+    if snapshot is not None and seen is not None:
+        mcq_ids = [mcq.mcq_id for mcq in seen.sample(snapshot, size, rng)]
+    elif snapshot is not None:
+        mcq_ids = [mcq.mcq_id for mcq in snapshot.sample(size, rng)]
+    else:
+        mcq_ids = sorted(mcq.mcq_id for mcq in unit_of_work.mcq.sample(type_, size))
+        rng.shuffle(mcq_ids)
+    return QuizPaper(version=version, seed=seed, mcq_ids=tuple(mcq_ids))
+
+
+def draw_adaptive_paper(
+    unit_of_work: BaseUnitOfWork, type_: str, size: int, user_id: UUID
+) -> QuizPaper:
+    """
+    Draws MCQs whose empirical difficulty matches the user's recent accuracy.
+    """
+    version = question_bank_cache.version
+    seed = random.getrandbits(63)
+    rng = random.Random(seed)
+
+    index = difficulty_index_cache.get(type_, unit_of_work.mcq.get_difficulty_counts)
+    bucket = target_bucket(
+        unit_of_work.history.get_recent_percentages(user_id=user_id, type_=type_)
+    )
+    return QuizPaper(
+        version=version, seed=seed, mcq_ids=tuple(index.sample(size, bucket, rng))
+    )
+
+
+def generate_paper(type_: str, size: int) -> QuizPaper:
+    """
+    Draws a paper in its own unit of work, used by the paper pool workers.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        return draw_paper(unit_of_work, type_, size)
+
+
+paper_pool = create_paper_pool(generate_paper)
+
+PAPER_POOL_WARM_SIZES = [
+    int(size)
+    for size in str(app_config.get("PAPER_POOL_WARM_SIZES", "10")).split(",")
+    if size.strip()
+]
+
+
+def load_warm_keys() -> List[Tuple[str, int]]:
+    """
+    Returns the `(type, question count)` pools to fill before the first quiz
+    starts: every category with questions, at each of `PAPER_POOL_WARM_SIZES`.
+    """
+    with McqUnitOfWork() as unit_of_work:
+        types = [
+            category.name
+            for category in unit_of_work.category.get_all()
+            if category.question_count
+        ]
+    return [(type_, size) for type_ in types for size in PAPER_POOL_WARM_SIZES]
+
+
+class QuizSession:
+    """
+    A quiz in progress, backed by its `Submission` row.
+
+    The question order is drawn once from a stored seed when the quiz starts, so
+    every page is a slice of the same order and no page re-reads the category.
+    """
+
+    def __init__(self, submission: Submission):
+        self.submission = submission
+        self.question_order = [
+            UUID(str(mcq_id)) for mcq_id in submission.question_order
+        ]
+
+    @classmethod
+    def start(
+        cls,
+        unit_of_work: BaseUnitOfWork,
+        type_: str,
+        total_questions: int,
+        user_id: UUID,
+        mode: QuizMode = QuizMode.random,
+    ) -> "QuizSession":
+        """
+        Draws the question order for a new quiz and stores it on a new submission.
+
+        In adaptive mode the questions are picked by difficulty. Otherwise users
+        who have answered questions of the type before get a paper drawn against
+        their seen index, and everyone else takes a pre-generated paper from the
+        pool when one is ready.
+
+        A type without questions in the category registry is rejected before
+        any cache, pool or index is touched.
+
+        Raises:
+            HTTPException: If the type has no MCQs.
+        """
+        if not has_questions(unit_of_work, type_):
+            raise HTTPException(
+                status_code=404, detail="No MCQs found for the given type"
+            )
+
+        if mode == QuizMode.adaptive:
+            paper = draw_adaptive_paper(unit_of_work, type_, total_questions, user_id)
+        else:
+            seen = None
+            snapshot = question_bank_cache.get_snapshot(
+                type_,
+                unit_of_work.mcq.get_question_bank,
+                unit_of_work.mcq.count_questions,
+            )
+            if snapshot is not None:
+                seen = seen_index_cache.get(
+                    user_id, snapshot, unit_of_work.history_details.get_seen_mcq_ids
+                )
+
+            paper = None
+            if seen is None or not seen.count:
+                paper = paper_pool.take(type_, total_questions)
+            if paper is None:
+                paper = draw_paper(unit_of_work, type_, total_questions, seen=seen)
+        seed, mcq_ids = paper.seed, paper.mcq_ids
+
+        if not mcq_ids:
+            raise HTTPException(
+                status_code=404, detail="No MCQs found for the given type"
+            )
+
+        submission = Submission(
+            user_id=user_id,
+            total_questions=len(mcq_ids),
+            type=type_,
+            seed=seed,
+            question_order=[str(mcq_id) for mcq_id in mcq_ids],
+        )
+        unit_of_work.submission.add(submission)
+        unit_of_work.session.flush()
+        return cls(submission)
+
+    @classmethod
+    def resume(
+        cls, unit_of_work: BaseUnitOfWork, submission_id: UUID, user_id: UUID
+    ) -> "QuizSession":
+        """
+        Loads the quiz session stored on a submission of the user.
+
+        Raises:
+            HTTPException: If no such session exists for the user.
+        """
+        submission = unit_of_work.submission.get(submission_id=submission_id)
+        if (
+            submission is None
+            or str(submission.user_id) != str(user_id)
+            or not submission.question_order
+        ):
+            raise HTTPException(status_code=404, detail="Quiz session not found.")
+        return cls(submission)
+
+    @property
+    def submission_id(self) -> UUID:
+        return self.submission.submission_id
+
+    @property
+    def type(self) -> str:
+        return self.submission.type
+
+    def page_ids(self, offset: int, page_size: int) -> List[UUID]:
+        """
+        Return the MCQ ids of the page starting at `offset`.
+
+        Raises:
+            HTTPException: If the offset is outside the quiz, which only a
+                forged cursor can produce.
+        """
+        if not 0 <= offset < len(self.question_order):
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        return self.question_order[offset : offset + page_size]
+
+    def next_cursor(self, offset: int, page_size: int) -> Optional[str]:
+        next_offset = offset + page_size
+        if next_offset >= len(self.question_order):
+            return None
+        return encode_cursor(self.submission_id, next_offset)
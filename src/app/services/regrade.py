@@ -0,0 +1,141 @@
+from typing import Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import DBAPIError
+
+from app.config.settings import app_config
+from app.models.data_models import ImportJobStatus
+from app.services.job_queue import JobQueue
+from app.services.unit_of_work import RegradeUnitOfWork
+from app.services.user_stats import USER_STATS_WINDOW
+
+REGRADE_BATCH_SIZE = int(app_config.get("REGRADE_BATCH_SIZE", 5_000))
+REGRADE_STALE_SECONDS = float(app_config.get("REGRADE_STALE_SECONDS", 300))
+REGRADE_RETRIES = int(app_config.get("REGRADE_RETRIES", 3))
+
+# deadlock_detected and serialization_failure
+RETRYABLE_PGCODES = {"40P01", "40001"}
+
+
+class RegradeJobLost(Exception):
+    """Raised when another worker has taken over a job mid-run."""
+
+
+def run_regrade_job(job_id: UUID) -> None:
+    """
+    Regrade every answer to the MCQs of a job against their current answer key,
+    in history id order, one committed batch at a time.
+
+    Each batch covers the next `REGRADE_BATCH_SIZE` histories with an answer to
+    the job's MCQs and runs in one transaction that:
+        - flips the changed answers with one set-based UPDATE, which also
+          corrects the MCQs' `correct_count`,
+        - recomputes the scores of their histories with one UPDATE, and
+          histories whose score changed get their certificate re-rendered,
+        - rebuilds the `user_stats` rows of their users, which the leaderboards
+          pick up on their next refresh,
+        - moves the job's checkpoint to the batch's last history.
+    Locks are held for one batch only, and a batch aborted by a deadlock or a
+    serialization failure is retried. A worker that restarts continues after
+    the last committed batch. A user whose histories span several batches is
+    rebuilt, and counted in `users_changed`, once per batch.
+    """
+    with RegradeUnitOfWork() as unit_of_work:
+        if not unit_of_work.regrade_job.claim(job_id, REGRADE_STALE_SECONDS):
+            return
+        job = unit_of_work.regrade_job.get(job_id)
+        mcq_ids, checkpoint = list(job.mcq_ids), job.last_history_id
+
+    try:
+        while True:
+            last_history_id = regrade_batch(job_id, mcq_ids, checkpoint)
+            if last_history_id is None:
+                break
+            checkpoint = last_history_id
+
+        with RegradeUnitOfWork() as unit_of_work:
+            unit_of_work.regrade_job.update(
+                job_id, status=ImportJobStatus.completed.value
+            )
+
+    except RegradeJobLost:
+        return
+
+    except Exception as e:
+        with RegradeUnitOfWork() as unit_of_work:
+            unit_of_work.regrade_job.update(
+                job_id,
+                status=ImportJobStatus.failed.value,
+                errors=[f"Error regrading answers: {str(e)}"],
+            )
+
+
+def regrade_batch(
+    job_id: UUID, mcq_ids: List[UUID], checkpoint: Optional[UUID]
+) -> Optional[UUID]:
+    """
+    Regrade the next batch of a job after its checkpoint in one transaction.
+
+    The batch runs again from scratch, up to `REGRADE_RETRIES` times, when
+    PostgreSQL aborts it as a deadlock victim or for a serialization failure.
+
+    Returns:
+        The batch's last history id, the job's new checkpoint, or None once
+        every history has been regraded.
+
+    Raises:
+        RegradeJobLost: If another worker moved the job's checkpoint.
+    """
+    for attempt in range(REGRADE_RETRIES + 1):
+        try:
+            with RegradeUnitOfWork() as unit_of_work:
+                unit_of_work.regrade_job.lock()
+                page = unit_of_work.history_details.get_regrade_page(
+                    mcq_ids, checkpoint, REGRADE_BATCH_SIZE
+                )
+                if not page:
+                    return None
+                details_changed, history_ids = unit_of_work.history_details.regrade(
+                    mcq_ids, page
+                )
+                changed = unit_of_work.history.rescore(history_ids)
+                user_ids = sorted(set(changed))
+                unit_of_work.user_stats.rebuild_users(user_ids, USER_STATS_WINDOW)
+                if not unit_of_work.regrade_job.record_batch(
+                    job_id,
+                    checkpoint,
+                    page[-1],
+                    details_changed,
+                    len(changed),
+                    len(user_ids),
+                ):
+                    raise RegradeJobLost(job_id)
+            return page[-1]
+        except DBAPIError as e:
+            if attempt == REGRADE_RETRIES or not is_retryable(e):
+                raise
+
+
+def is_retryable(error: DBAPIError) -> bool:
+    """
+    Whether PostgreSQL aborted the transaction as a deadlock victim or for a
+    serialization failure, which running it again can resolve.
+    """
+    return getattr(error.orig, "pgcode", None) in RETRYABLE_PGCODES
+
+
+def load_resumable_regrade_jobs() -> Iterable[UUID]:
+    """
+    Load the ids of pending jobs and of running jobs whose worker went away.
+    """
+    with RegradeUnitOfWork() as unit_of_work:
+        return unit_of_work.regrade_job.get_resumable_ids(REGRADE_STALE_SECONDS)
+
+
+regrade_job_queue = JobQueue(
+    name="regrade",
+    process=run_regrade_job,
+    loader=load_resumable_regrade_jobs,
+    max_workers=1,
+    sweep_seconds=float(app_config.get("REGRADE_SWEEP_SECONDS", 60)),
+)
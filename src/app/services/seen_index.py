@@ -0,0 +1,135 @@
+import random
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.question_bank_cache import CachedMcq, QuestionBankSnapshot
+
+
+class SeenIndex:
+    """
+    Bitmap of the MCQs of one type a user has already answered.
+
+    Bit `i` stands for the MCQ at ordinal `i` of the question bank snapshot the
+    index was built against, so a 100k-question bank costs 12.5 KB per user.
+    """
+
+    def __init__(self, snapshot: QuestionBankSnapshot):
+        self.version = snapshot.version
+        self.size = len(snapshot.mcq_ids)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, ordinal: int) -> None:
+        mask = 1 << (ordinal & 7)
+        if not self.bits[ordinal >> 3] & mask:
+            self.bits[ordinal >> 3] |= mask
+            self.count += 1
+
+    def __contains__(self, ordinal: int) -> bool:
+        return bool(self.bits[ordinal >> 3] & (1 << (ordinal & 7)))
+
+    def sample(
+        self, snapshot: QuestionBankSnapshot, k: int, rng: random.Random = random
+    ) -> List[CachedMcq]:
+        """
+        Pick up to `k` distinct MCQs, unseen ones first.
+
+        While at least a quarter of the bank is unseen, random ordinals are drawn
+        and seen ones rejected, which takes a handful of draws per question.
+        Past that the unseen ordinals are listed from the bitmap once. Seen
+        MCQs only fill up what the unseen ones cannot.
+        """
+        k = min(k, self.size)
+        unseen_count = self.size - self.count
+
+        if unseen_count >= k and unseen_count * 4 >= self.size:
+            picked = set()
+            while len(picked) < k:
+                ordinal = rng.randrange(self.size)
+                if ordinal not in self:
+                    picked.add(ordinal)
+            ordinals = list(picked)
+            rng.shuffle(ordinals)
+        else:
+            unseen, seen = [], []
+            for ordinal in range(self.size):
+                (seen if ordinal in self else unseen).append(ordinal)
+            ordinals = rng.sample(unseen, min(k, len(unseen)))
+            ordinals += rng.sample(seen, k - len(ordinals))
+
+        return [snapshot.mcqs[snapshot.mcq_ids[ordinal]] for ordinal in ordinals]
+
+
+class SeenIndexCache:
+    """
+    LRU cache of seen indexes keyed by (user, type).
+
+    An index is built once from the user's answered MCQs and then kept up to
+    date by `mark_seen` after each submission; it is rebuilt when the question
+    bank snapshot it was built against is replaced.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._indexes: "OrderedDict[Tuple[str, str], SeenIndex]" = OrderedDict()
+
+    def get(
+        self,
+        user_id: UUID,
+        snapshot: QuestionBankSnapshot,
+        loader: Callable[[UUID, str], Iterable[UUID]],
+    ) -> SeenIndex:
+        """
+        Return the user's seen index for the snapshot's type, building it on a miss.
+
+        Parameters:
+            user_id : UUID
+            snapshot : QuestionBankSnapshot
+            loader : Callable[[UUID, str], Iterable[UUID]]
+                Returns the MCQ ids of a type the user has answered.
+        """
+        key = (str(user_id), snapshot.type)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None and index.version == snapshot.version:
+                self._indexes.move_to_end(key)
+                return index
+
+        index = SeenIndex(snapshot)
+        for mcq_id in loader(user_id, snapshot.type):
+            ordinal = snapshot.ordinals.get(mcq_id)
+            if ordinal is not None:
+                index.add(ordinal)
+
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def mark_seen(
+        self, user_id: UUID, snapshot: Optional[QuestionBankSnapshot], mcq_ids
+    ) -> None:
+        """
+        Add freshly answered MCQs to a cached index, if there is one.
+        """
+        if snapshot is None:
+            return
+        with self._lock:
+            index = self._indexes.get((str(user_id), snapshot.type))
+            if index is None or index.version != snapshot.version:
+                return
+            for mcq_id in mcq_ids:
+                ordinal = snapshot.ordinals.get(mcq_id)
+                if ordinal is not None:
+                    index.add(ordinal)
+
+
+seen_index_cache = SeenIndexCache(
+    max_entries=int(app_config.get("SEEN_INDEX_MAX_ENTRIES", 10_000))
+)
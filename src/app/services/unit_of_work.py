@@ -1,11 +1,17 @@
 from abc import ABC
 
 from app.config.database import get_db
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.certificate_job_repository import CertificateJobRepository
 from app.repositories.history_details_repository import HistoryDetailsRepository
 from app.repositories.history_repository import HistoryRepository
+from app.repositories.import_job_repository import ImportJobRepository
+from app.repositories.item_stats_repository import ItemStatsRepository
 from app.repositories.mcq_repository import McqRepository
+from app.repositories.regrade_job_repository import RegradeJobRepository
 from app.repositories.submission_repository import SubmissionRepository
 from app.repositories.user_repository import UserRepository
+from app.repositories.user_stats_repository import UserStatsRepository
 
 
 class BaseUnitOfWork(ABC):
@@ -45,6 +51,7 @@ class SubmissionUnitOfWork(BaseUnitOfWork):
         self.history = HistoryRepository(self.session)
         self.submission = SubmissionRepository(self.session)
         self.history_details = HistoryDetailsRepository(self.session)
+        self.user_stats = UserStatsRepository(self.session)
         return self
 
 
@@ -52,7 +59,12 @@ class McqUnitOfWork(BaseUnitOfWork):
     def __enter__(self):
         super().__enter__()
         self.mcq = McqRepository(self.session)
+        self.category = CategoryRepository(self.session)
+        self.import_job = ImportJobRepository(self.session)
+        self.item_stats = ItemStatsRepository(self.session)
         self.submission = SubmissionRepository(self.session)
+        self.history = HistoryRepository(self.session)
+        self.history_details = HistoryDetailsRepository(self.session)
         return self
 
 
@@ -60,4 +72,25 @@ class HistoryUnitOfWork(BaseUnitOfWork):
     def __enter__(self):
         super().__enter__()
         self.history = HistoryRepository(self.session)
+        self.user_stats = UserStatsRepository(self.session)
+        self.user = UserRepository(self.session)
+        return self
+
+
+class CertificateUnitOfWork(BaseUnitOfWork):
+    def __enter__(self):
+        super().__enter__()
+        self.history = HistoryRepository(self.session)
+        self.certificate_job = CertificateJobRepository(self.session)
+        return self
+
+
+class RegradeUnitOfWork(BaseUnitOfWork):
+    def __enter__(self):
+        super().__enter__()
+        self.mcq = McqRepository(self.session)
+        self.history = HistoryRepository(self.session)
+        self.history_details = HistoryDetailsRepository(self.session)
+        self.user_stats = UserStatsRepository(self.session)
+        self.regrade_job = RegradeJobRepository(self.session)
         return self
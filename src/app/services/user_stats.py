@@ -0,0 +1,65 @@
+"""
+Per-user, per-type statistics kept in the `user_stats` table.
+
+`process_submission` adds every submission to its row in the same transaction
+that writes the history, so reading them never scans the history. Rows of
+users who submitted before the table existed are built by the backfill, which
+can be run again at any time to recompute every row from the history.
+
+Usage (from `src`):
+    python -m app.services.user_stats --batch-size 1000
+"""
+
+import argparse
+import time
+from typing import Optional
+from uuid import UUID
+
+from app.config.settings import app_config
+from app.services.unit_of_work import HistoryUnitOfWork
+
+USER_STATS_WINDOW = int(app_config.get("USER_STATS_WINDOW", 10))
+USER_STATS_BACKFILL_BATCH_SIZE = 1_000
+
+
+def backfill_user_stats(
+    batch_size: int = USER_STATS_BACKFILL_BATCH_SIZE,
+    after_user_id: Optional[UUID] = None,
+) -> int:
+    """
+    Rebuild the statistics of every user from their history, one committed batch of users at a time.
+
+    Args:
+        batch_size (int): Number of users rebuilt per transaction.
+        after_user_id (Optional[UUID]): Resume after this user, as printed by a previous run.
+
+    Returns:
+        int: The number of batches committed.
+    """
+    batches = 0
+    while True:
+        with HistoryUnitOfWork() as unit_of_work:
+            after_user_id = unit_of_work.user_stats.rebuild(
+                after_user_id, batch_size, USER_STATS_WINDOW
+            )
+        if after_user_id is None:
+            return batches
+        batches += 1
+        print(f"batch {batches}: rebuilt users up to {after_user_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=USER_STATS_BACKFILL_BATCH_SIZE
+    )
+    parser.add_argument("--after", type=UUID, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    batches = backfill_user_stats(args.batch_size, args.after)
+    print(f"rebuilt {batches} batches in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
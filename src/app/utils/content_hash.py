@@ -0,0 +1,30 @@
+import hashlib
+from typing import Mapping
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapses runs of whitespace and case-folds text so trivially different
+    copies of a question compare equal.
+    """
+    return " ".join(str(text).split()).casefold()
+
+
+def mcq_content_hash(question: str, options: Mapping[str, str]) -> bytes:
+    """
+    Computes the 16-byte content hash of an MCQ.
+
+    The hash covers the normalized question and the normalized option texts
+    in sorted order, so it does not depend on whitespace, case or the order
+    the options are listed in.
+
+    Args:
+        question (str): The question text.
+        options (Mapping[str, str]): The options keyed by letter.
+
+    Returns:
+        bytes: The first 16 bytes of a SHA-256 digest.
+    """
+    parts = [normalize_text(question)]
+    parts += sorted(normalize_text(option) for option in options.values())
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).digest()[:16]
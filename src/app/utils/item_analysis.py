@@ -0,0 +1,102 @@
+from typing import Dict
+
+import numpy as np
+
+OPTIONS = "abcd"
+
+
+class ItemAnalysis:
+    """
+    Streaming item statistics of a question bank.
+
+    Responses are added in chunks of parallel NumPy arrays and folded into
+    per-item sums with `np.bincount`, so memory depends on the number of items
+    and the chunk size, not on the number of responses.
+
+    For every item the accumulated sums give:
+        - difficulty: the share of correct responses,
+        - discrimination: the point-biserial correlation between answering the
+          item correctly and the rest score of the submission, i.e. the share of
+          the other questions it got right. Submissions of one question have no
+          rest score and are left out,
+        - the number of times each option was chosen.
+    """
+
+    def __init__(self, items: int):
+        self.items = items
+        self.responses = np.zeros(items, dtype=np.int64)
+        self.correct = np.zeros(items, dtype=np.int64)
+        self.choices = np.zeros((items, len(OPTIONS)), dtype=np.int64)
+        self.rest_count = np.zeros(items)
+        self.rest_correct = np.zeros(items)
+        self.rest_sum = np.zeros(items)
+        self.rest_squares = np.zeros(items)
+        self.rest_products = np.zeros(items)
+
+    def add(
+        self,
+        item: np.ndarray,
+        option: np.ndarray,
+        correct: np.ndarray,
+        score: np.ndarray,
+        attempts: np.ndarray,
+    ) -> None:
+        """
+        Add a chunk of responses.
+
+        Args:
+            item (np.ndarray): Index of the item of each response, in `[0, items)`.
+            option (np.ndarray): Index of the chosen option in `OPTIONS`.
+            correct (np.ndarray): 1 if the response is correct, else 0.
+            score (np.ndarray): Correct answers of the submission the response belongs to.
+            attempts (np.ndarray): Questions of that submission.
+        """
+        item = item.astype(np.int64, copy=False)
+        correct = correct.astype(np.float64, copy=False)
+        size = self.items
+
+        self.responses += np.bincount(item, minlength=size)
+        self.correct += np.bincount(item, weights=correct, minlength=size).astype(
+            np.int64
+        )
+        valid = (option >= 0) & (option < len(OPTIONS))
+        self.choices += np.bincount(
+            item[valid] * len(OPTIONS) + option[valid].astype(np.int64),
+            minlength=size * len(OPTIONS),
+        ).reshape(size, len(OPTIONS))
+
+        has_rest = attempts > 1
+        item = item[has_rest]
+        correct = correct[has_rest]
+        rest = (score[has_rest] - correct) / (attempts[has_rest] - 1)
+        self.rest_count += np.bincount(item, minlength=size)
+        self.rest_correct += np.bincount(item, weights=correct, minlength=size)
+        self.rest_sum += np.bincount(item, weights=rest, minlength=size)
+        self.rest_squares += np.bincount(item, weights=rest * rest, minlength=size)
+        self.rest_products += np.bincount(item, weights=correct * rest, minlength=size)
+
+    def results(self) -> Dict[str, np.ndarray]:
+        """
+        Return the statistics of every item.
+
+        Returns: Dict[str, np.ndarray]
+            `responses`, `difficulty` and `discrimination` of each item, NaN
+            where undefined (no responses, or everyone scored the same), and
+            `choices`, the number of times each option was chosen.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            difficulty = np.where(
+                self.responses > 0, self.correct / self.responses, np.nan
+            )
+            n = self.rest_count
+            covariance = n * self.rest_products - self.rest_correct * self.rest_sum
+            correct_variance = n * self.rest_correct - self.rest_correct**2
+            rest_variance = n * self.rest_squares - self.rest_sum**2
+            denominator = np.sqrt(correct_variance * rest_variance)
+            discrimination = np.where(denominator > 0, covariance / denominator, np.nan)
+        return {
+            "responses": self.responses,
+            "difficulty": difficulty,
+            "discrimination": np.clip(discrimination, -1, 1),
+            "choices": self.choices,
+        }
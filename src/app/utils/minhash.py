@@ -0,0 +1,88 @@
+import hashlib
+import re
+from typing import List
+
+import numpy as np
+
+from app.utils.content_hash import normalize_text
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_BYTES = 4
+
+_rng = np.random.default_rng(0x6D637173)
+_MULTIPLIERS = _rng.integers(1, 2**64, NUM_PERMUTATIONS, dtype=np.uint64) | 1
+_OFFSETS = _rng.integers(0, 2**64, NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> np.ndarray:
+    """
+    Returns the distinct 4-byte shingles of a question as 32-bit integers.
+
+    The text is normalized and stripped of punctuation first, so copies that
+    only differ in spacing, case or punctuation have the same shingles.
+    """
+    text = normalize_text(re.sub(r"[^\w\s]", " ", str(text)))
+    data = np.frombuffer(text.encode("utf-8").ljust(SHINGLE_BYTES), dtype=np.uint8)
+    data = data.astype(np.uint32)
+    count = len(data) - SHINGLE_BYTES + 1
+    values = np.zeros(count, dtype=np.uint32)
+    for offset in range(SHINGLE_BYTES):
+        values = (values << 8) | data[offset : offset + count]
+    return np.unique(values)
+
+
+def minhash_signature(question: str) -> bytes:
+    """
+    Computes the MinHash signature of a question.
+
+    Each of the `NUM_PERMUTATIONS` hash functions is a multiply-shift hash of
+    the shingles, and the signature keeps the smallest value of each. The share
+    of equal positions in two signatures estimates the Jaccard similarity of
+    the two shingle sets.
+
+    Args:
+        question (str): The question text.
+
+    Returns:
+        bytes: `NUM_PERMUTATIONS` little-endian unsigned 32-bit integers.
+    """
+    values = shingles(question).astype(np.uint64)
+    hashed = (_MULTIPLIERS[:, None] * values[None, :] + _OFFSETS[:, None]) >> 32
+    return hashed.min(axis=1).astype("<u4").tobytes()
+
+
+def lsh_buckets(signature: bytes) -> List[int]:
+    """
+    Splits a signature into `LSH_BANDS` bands and hashes each to a bucket key.
+
+    The band number is part of the key, so the keys of all bands can share one
+    index. Two questions with Jaccard similarity `s` share at least one key with
+    probability `1 - (1 - s ** LSH_ROWS) ** LSH_BANDS`, about 0.99 at 0.7 and
+    0.12 at 0.3.
+
+    Returns:
+        List[int]: Signed 64-bit bucket keys, one per band.
+    """
+    band_size = LSH_ROWS * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                bytes([band]) + signature[band * band_size : (band + 1) * band_size],
+                digest_size=8,
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+def signature_similarity(first: bytes, second: bytes) -> float:
+    """
+    Estimates the Jaccard similarity of two questions from their signatures.
+    """
+    return float(
+        np.mean(np.frombuffer(first, dtype="<u4") == np.frombuffer(second, dtype="<u4"))
+    )
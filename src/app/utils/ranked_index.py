@@ -0,0 +1,144 @@
+import random
+from typing import Any, Iterator, List, Optional, Tuple
+
+MAX_LEVEL = 16
+LEVEL_PROBABILITY = 0.25
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, level: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class RankedIndex:
+    """
+    Indexable skip list of unique, comparable keys.
+
+    Every link also stores how many positions it skips, so the position of a
+    key and the key at a position are found along the same O(log n) expected
+    search path as inserts and removals. With `MAX_LEVEL` 16 and one node in
+    four promoted a level, that stays logarithmic up to about 4 billion keys.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng or random.Random()
+        self._head = _Node(None, None, MAX_LEVEL)
+        self._size = 0
+
+    @classmethod
+    def from_sorted(
+        cls, items: Iterator[Tuple], rng: Optional[random.Random] = None
+    ) -> "RankedIndex":
+        """
+        Build an index from `(key, value)` pairs already in ascending key order, in O(n).
+        """
+        index = cls(rng)
+        last = [index._head] * MAX_LEVEL
+        last_position = [0] * MAX_LEVEL
+        position = 0
+        for key, value in items:
+            position += 1
+            node = _Node(key, value, index._random_level())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+        for level in range(MAX_LEVEL):
+            last[level].width[level] = position + 1 - last_position[level]
+        index._size = position
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, key, value: Any = None) -> None:
+        """
+        Insert a key that is not in the index yet.
+        """
+        chain = [self._head] * MAX_LEVEL
+        steps_at_level = [0] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new = _Node(key, value, self._random_level())
+        steps = 0
+        for level in range(len(new.next)):
+            previous = chain[level]
+            new.next[level] = previous.next[level]
+            previous.next[level] = new
+            new.width[level] = previous.width[level] - steps
+            previous.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(len(new.next), MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key) -> None:
+        """
+        Remove a key.
+
+        Raises:
+            KeyError: If the key is not in the index.
+        """
+        chain = [self._head] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        for level in range(len(target.next)):
+            previous = chain[level]
+            previous.width[level] += target.width[level] - 1
+            previous.next[level] = target.next[level]
+        for level in range(len(target.next), MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key) -> int:
+        """
+        Return the number of keys smaller than `key`, its 0-based position if present.
+        """
+        position = 0
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def items(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Yield the `(key, value)` pairs at positions `start` to `stop` in key order.
+        """
+        stop = self._size if stop is None else min(stop, self._size)
+        if start >= stop:
+            return
+        position = -1
+        node = self._head
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and position + node.width[level] < start:
+                position += node.width[level]
+                node = node.next[level]
+        for _ in range(stop - start):
+            node = node.next[0]
+            yield node.key, node.value
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and self._rng.random() < LEVEL_PROBABILITY:
+            level += 1
+        return level
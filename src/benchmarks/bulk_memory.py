@@ -0,0 +1,91 @@
+"""
+Benchmark peak memory of reading bulk-upload MCQ files.
+
+Generates workbooks, and CSV files with the same rows, and measures the
+tracemalloc peak of validating them and building their insert payloads:
+    - whole: `pd.read_excel` of the full workbook, as `bulk_add_mcqs` used to do
+    - stream: the chunk-by-chunk validation and payload building of
+      `bulk_add_mcqs`, for .xlsx and .csv
+The database is not touched; payloads of a chunk are dropped once built.
+
+Usage (from `src`):
+    python -m benchmarks.bulk_memory --sizes 10000 100000
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import tracemalloc
+import uuid
+
+import pandas as pd
+
+from app.services.mcq_import import (
+    REQUIRED_COLUMNS,
+    build_mcq_payloads,
+    iter_mcq_chunks,
+    open_mcq_sheet,
+    validate_mcq_frame,
+)
+from benchmarks.bulk_validation import generate_workbook
+
+
+def whole(path: str, created_by) -> None:
+    df = pd.read_excel(path, dtype=str, keep_default_na=False)
+    validate_mcq_frame(df)
+    build_mcq_payloads(df, created_by)
+
+
+def stream(path: str, created_by) -> None:
+    with open(path, "rb") as file:
+        for chunk in iter_mcq_chunks(open_mcq_sheet(file, path)):
+            validate_mcq_frame(chunk)
+            build_mcq_payloads(chunk, created_by)
+
+
+def measure(func, *args) -> float:
+    """Return the tracemalloc peak of `func` in MB."""
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    created_by = uuid.uuid4()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(
+            f"{'rows':>8} {'file (MB)':>10} {'whole xlsx peak (MB)':>21}"
+            f" {'stream xlsx peak (MB)':>22} {'stream csv peak (MB)':>21}"
+        )
+        for size in sorted(args.sizes):
+            xlsx_path = os.path.join(directory, f"mcqs_{size}.xlsx")
+            csv_path = os.path.join(directory, f"mcqs_{size}.csv")
+            generate_workbook(xlsx_path, size)
+            with open(csv_path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(REQUIRED_COLUMNS)
+                for chunk in iter_mcq_chunks(open_mcq_sheet(xlsx_path, xlsx_path)):
+                    writer.writerows(chunk.itertuples(index=False, name=None))
+
+            results = [
+                measure(whole, xlsx_path, created_by),
+                measure(stream, xlsx_path, created_by),
+                measure(stream, csv_path, created_by),
+            ]
+            print(
+                f"{size:>8} {os.path.getsize(xlsx_path) / 2**20:10.1f}"
+                + "".join(
+                    f" {peak:{width}.1f}" for peak, width in zip(results, (21, 22, 21))
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark validation of bulk-upload MCQ workbooks.
+
+Generates workbooks of the given sizes, with a few invalid cells sprinkled in,
+and compares the column-wise validation and payload building in
+`app.services.mcq_import` with the per-row `iterrows` loops `bulk_add_mcqs`
+used before. Both must produce the same error report and payloads.
+
+Usage (from `src`):
+    python -m benchmarks.bulk_validation --sizes 10000 100000 500000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+
+import pandas as pd
+from openpyxl import Workbook
+
+from app.services.mcq_import import (
+    REQUIRED_COLUMNS,
+    build_mcq_payloads,
+    validate_mcq_frame,
+)
+
+INVALID_EVERY = 997
+
+
+def generate_workbook(path: str, size: int) -> None:
+    """Write a `size`-row MCQ workbook with an invalid cell every INVALID_EVERY rows."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(REQUIRED_COLUMNS)
+    for n in range(size):
+        correct_option = "abcd"[n % 4]
+        option_a = f"option a {n}"
+        if n % INVALID_EVERY == 1:
+            correct_option = "e"
+        if n % INVALID_EVERY == 2:
+            option_a = ""
+        sheet.append(
+            [
+                "python",
+                f"benchmark question {n}",
+                option_a,
+                f"option b {n}",
+                f"option c {n}",
+                f"option d {n}",
+                correct_option,
+            ]
+        )
+    workbook.save(path)
+
+
+def legacy_validate(df: pd.DataFrame) -> list:
+    invalid_entries = []
+    for index, row in df.iterrows():
+        for column in REQUIRED_COLUMNS:
+            if row[column] in [""] or (
+                column == "correct_option" and row[column] not in ["a", "b", "c", "d"]
+            ):
+                invalid_entries.append(f"Row {index + 2}, Column '{column}'")
+    return invalid_entries
+
+
+def legacy_build(df: pd.DataFrame, created_by) -> list:
+    payloads = []
+    for _, row in df.iterrows():
+        options_dict = {
+            "a": row.get("option A"),
+            "b": row.get("option B"),
+            "c": row.get("option C"),
+            "d": row.get("option D"),
+        }
+        payloads.append(
+            {
+                "type": row.get("category"),
+                "question": row.get("question"),
+                "options": json.loads(json.dumps(options_dict)),
+                "correct_option": row["correct_option"],
+                "created_by": created_by,
+            }
+        )
+    return payloads
+
+
+def timed(func):
+    """Return the result of `func` and its latency in milliseconds."""
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000]
+    )
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=100_000,
+        help="Skip the iterrows baseline above this size.",
+    )
+    args = parser.parse_args()
+    created_by = uuid.uuid4()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(
+            f"{'rows':>8} {'read (ms)':>10} {'validate (ms)':>14} {'build (ms)':>11}"
+            f" {'legacy validate (ms)':>21} {'legacy build (ms)':>18} {'errors':>7}"
+        )
+        for size in sorted(args.sizes):
+            path = os.path.join(directory, f"mcqs_{size}.xlsx")
+            generate_workbook(path, size)
+            df, read_ms = timed(
+                lambda: pd.read_excel(path, dtype=str, keep_default_na=False)
+            )
+
+            errors, validate_ms = timed(lambda: validate_mcq_frame(df))
+            payloads, build_ms = timed(lambda: build_mcq_payloads(df, created_by))
+
+            if size <= args.legacy_limit:
+                legacy_errors, legacy_validate_ms = timed(lambda: legacy_validate(df))
+                legacy_payloads, legacy_build_ms = timed(
+                    lambda: legacy_build(df, created_by)
+                )
+                assert errors == legacy_errors
+                assert payloads == legacy_payloads
+                legacy = f"{legacy_validate_ms:21.1f} {legacy_build_ms:18.1f}"
+            else:
+                legacy = f"{'skipped':>21} {'skipped':>18}"
+
+            print(
+                f"{size:>8} {read_ms:10.1f} {validate_ms:14.1f} {build_ms:11.1f}"
+                f" {legacy} {len(errors):>7}"
+            )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark in-process certificate rendering.
+
+Renders certificates with `PillowCertificateRenderer` from the template and
+medals in `files`, once into memory and once into a local directory, and
+reports certificates per second on a single core, against drawing and
+encoding every certificate as a whole image. The first render, which decodes
+the images and draws the fixed wording, is timed separately.
+
+Usage (from `src`):
+    python -m benchmarks.certificate_rendering --count 2000
+"""
+
+import argparse
+import tempfile
+import time
+
+from app.services.aws_services import (
+    FILES_DIR,
+    TEMPLATE_KEY,
+    CertificateStorage,
+    LocalCertificateStorage,
+    PillowCertificateRenderer,
+)
+
+
+class MemoryStorage(CertificateStorage):
+    """Keeps only the size of what is written."""
+
+    def __init__(self):
+        self.written = 0
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        self.written += len(data)
+
+
+def run(renderer: PillowCertificateRenderer, count: int) -> float:
+    """Return the number of certificates rendered per second."""
+    start = time.perf_counter()
+    for n in range(count):
+        renderer.render({"name": f"user {n}", "type": "python", "percentage": n % 101})
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2_000)
+    args = parser.parse_args()
+
+    def template_loader():
+        return (FILES_DIR / TEMPLATE_KEY).read_bytes()
+
+    memory = MemoryStorage()
+    renderer = PillowCertificateRenderer(template_loader, memory)
+    start = time.perf_counter()
+    renderer.render({"name": "warm up", "type": "python", "percentage": 100})
+    print(f"first render (cold cache): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rate = run(renderer, args.count)
+    print(
+        f"in memory: {rate:,.0f} certificates/s, "
+        f"{memory.written / (args.count + 1) / 1024:.0f} KB each"
+    )
+
+    start = time.perf_counter()
+    for n in range(args.count):
+        renderer._save(
+            renderer.draw(
+                {"name": f"user {n}", "type": "python", "percentage": n % 101}
+            )
+        )
+    print(
+        f"whole image: {args.count / (time.perf_counter() - start):,.0f} certificates/s"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        renderer = PillowCertificateRenderer(
+            template_loader, LocalCertificateStorage(directory)
+        )
+        print(f"local directory: {run(renderer, args.count):,.0f} certificates/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the streaming item analysis as the number of answers grows.
+
+Feeds generated answers to `ItemAnalysis` in chunks of the size the job reads
+from the database, without touching it, and reports answers per second and the
+peak memory allocated while folding them, which depends on the chunk size and
+the number of questions but not on the number of answers. The time for 100 million
+answers is extrapolated from the measured rate.
+
+Usage (from `src`):
+    python -m benchmarks.item_analysis --answers 1000000 10000000 --items 20000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.services.item_analysis import ITEM_ANALYSIS_CHUNK_ROWS
+from app.utils.item_analysis import OPTIONS, ItemAnalysis
+
+
+def make_chunk(rows: int, items: int, rng: np.random.Generator) -> np.ndarray:
+    """Build `rows` answers of submissions of 10 questions, as the job reads them."""
+    item = rng.integers(0, items, rows)
+    option = rng.integers(0, len(OPTIONS), rows)
+    correct = (option == item % len(OPTIONS)).astype(np.int64)
+    attempts = np.full(rows, 10)
+    score = np.minimum(correct + rng.binomial(9, 0.5, rows), attempts)
+    return np.column_stack([item, option, correct, score, attempts])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--answers", type=int, nargs="+", default=[1_000_000, 10_000_000]
+    )
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--chunk-rows", type=int, default=ITEM_ANALYSIS_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Generating answers is not what is measured, so one chunk is reused.
+    chunk = make_chunk(args.chunk_rows, args.items, rng)
+    print(
+        f"{'answers':>11} {'seconds':>8} {'answers/s':>12} {'peak MiB':>9} "
+        f"{'100M answers (s)':>17}"
+    )
+    for answers in args.answers:
+        analysis = ItemAnalysis(args.items)
+        tracemalloc.start()
+        start = time.perf_counter()
+        for offset in range(0, answers, args.chunk_rows):
+            analysis.add(*chunk[: answers - offset].T)
+        analysis.results()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rate = answers / elapsed
+        print(
+            f"{answers:>11,} {elapsed:>8.2f} {rate:>12,.0f} "
+            f"{peak / 2**20:>9.1f} {100_000_000 / rate:>17.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
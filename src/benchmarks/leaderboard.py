@@ -0,0 +1,85 @@
+"""
+Benchmark the in-process leaderboard as the number of ranked users grows.
+
+Builds a `Leaderboard` of generated entries without touching the database and
+times moving users after a submission, top-10 reads and rank-of-user lookups.
+Moving users in a plain sorted list, which has to shift every entry after the
+old and new positions, is timed for comparison.
+
+Usage (from `src`):
+    python -m benchmarks.leaderboard --users 10000 100000 1000000
+"""
+
+import argparse
+import bisect
+import random
+import time
+from uuid import uuid4
+
+from app.services.leaderboard import Leaderboard, LeaderboardEntry
+
+
+def make_entries(users: int, rng: random.Random) -> list:
+    """Build `users` entries with random best and average percentages."""
+    return [
+        LeaderboardEntry(
+            uuid4(), rng.randint(0, 100), rng.random() * 100, rng.randint(1, 50)
+        )
+        for _ in range(users)
+    ]
+
+
+def rate(func, count: int) -> float:
+    """Return how many times per second `func` runs."""
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--users", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(
+        f"{'users':>9} {'build (s)':>10} {'updates/s':>10} {'top-10/s':>10} "
+        f"{'ranks/s':>10} {'sorted list updates/s':>22}"
+    )
+    for users in args.users:
+        entries = make_entries(users, rng)
+        start = time.perf_counter()
+        board = Leaderboard(entries)
+        build = time.perf_counter() - start
+
+        def update():
+            entry = rng.choice(entries)
+            board.set(
+                entry._replace(
+                    best_percentage=rng.randint(0, 100), attempts=entry.attempts + 1
+                )
+            )
+
+        def rank():
+            board.rank(rng.choice(entries).user_id)
+
+        keys = sorted(entry.key for entry in board.entries.values())
+
+        def sorted_update():
+            key = keys.pop(rng.randrange(len(keys)))
+            bisect.insort(keys, (-rng.randint(0, 100), key[1], key[2]))
+
+        print(
+            f"{users:>9} {build:>10.2f} {rate(update, args.lookups):>10,.0f} "
+            f"{rate(lambda: board.top(10), args.lookups):>10,.0f} "
+            f"{rate(rank, args.lookups):>10,.0f} "
+            f"{rate(sorted_update, args.lookups):>22,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark random MCQ sampling as a category grows.
+
+Seeds a throwaway category in the database configured by CONNECTION_URL and
+compares `McqRepository.sample` with loading the whole category through
+`McqRepository.get_all`, which is what `GET /mcq/` used to do.
+
+Usage (from `src`):
+    python -m benchmarks.mcq_sampling --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.config.database import SessionLocal
+from app.repositories.mcq_repository import McqRepository
+
+BENCHMARK_TYPE = "benchmark_sampling"
+
+
+def seed(session, size: int) -> None:
+    """Grow the benchmark category to `size` rows."""
+    current = session.execute(
+        text("SELECT count(*) FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+    ).scalar()
+    if current >= size:
+        return
+    session.execute(
+        text(
+            """
+            INSERT INTO mcqs (mcq_id, type, question, options, correct_option)
+            SELECT gen_random_uuid(), :type, 'benchmark question ' || n,
+                   '{"a": "1", "b": "2", "c": "3", "d": "4"}', 'a'
+            FROM generate_series(:start, :stop) AS n
+            """
+        ),
+        {"type": BENCHMARK_TYPE, "start": current + 1, "stop": size},
+    )
+    session.commit()
+    with session.get_bind().connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+            text("VACUUM ANALYZE mcqs")
+        )
+
+
+def time_call(func, repeat: int) -> float:
+    """Return the median latency of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--full-scan-limit",
+        type=int,
+        default=100_000,
+        help="Skip the full-category baseline above this size.",
+    )
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    repository = McqRepository(session)
+    try:
+        print(f"{'rows':>10} {'sample (ms)':>12} {'get_all (ms)':>13}")
+        for size in sorted(args.sizes):
+            seed(session, size)
+            sample_ms = time_call(
+                lambda: repository.sample(type_=BENCHMARK_TYPE, k=args.k), args.repeat
+            )
+            if size <= args.full_scan_limit:
+                full_ms = time_call(lambda: repository.get_all(type_=BENCHMARK_TYPE), 3)
+                full = f"{full_ms:13.2f}"
+            else:
+                full = f"{'skipped':>13}"
+            session.expunge_all()
+            print(f"{size:>10} {sample_ms:12.2f} {full}")
+    finally:
+        session.rollback()
+        session.execute(
+            text("DELETE FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+        )
+        session.commit()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark MCQ question search against the sequential-scan approach.
+
+Seeds a throwaway category with generated questions in the database configured
+by CONNECTION_URL, then compares `McqRepository.search`, which uses the
+`ix_mcqs_question_tsv` GIN index, with an ILIKE filter that has to scan every
+question.
+
+Usage (from `src`):
+    python -m benchmarks.mcq_search --rows 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app.config.database import SessionLocal
+from app.models.data_models import MCQ
+from app.repositories.mcq_repository import McqRepository
+
+BENCHMARK_TYPE = "benchmark_search"
+QUERIES = ["decorator", "garbage collector", "immutable tuple", "question 424242"]
+
+
+def seed(session, rows: int) -> None:
+    """Insert `rows` questions built from a small vocabulary."""
+    session.execute(
+        text("DELETE FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+    )
+    session.execute(
+        text(
+            """
+            INSERT INTO mcqs (mcq_id, type, question, options, correct_option)
+            SELECT gen_random_uuid(), :type,
+                   'Question ' || n || ' about the ' ||
+                   (ARRAY['list', 'tuple', 'dict', 'set', 'string', 'generator',
+                          'decorator', 'class', 'module', 'thread'])[1 + n % 10] ||
+                   ' and the ' ||
+                   (ARRAY['garbage collector', 'interpreter', 'compiler', 'runtime',
+                          'immutable value', 'iterator', 'closure'])[1 + (n / 10) % 7],
+                   '{"a": "1", "b": "2", "c": "3", "d": "4"}', 'a'
+            FROM generate_series(1, :rows) AS n
+            """
+        ),
+        {"type": BENCHMARK_TYPE, "rows": rows},
+    )
+    session.commit()
+    with session.get_bind().connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(
+            text("VACUUM ANALYZE mcqs")
+        )
+
+
+def time_call(func, repeat: int) -> float:
+    """Return the median latency of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    repository = McqRepository(session)
+    try:
+        seed(session, args.rows)
+        print(f"{'query':>20} {'matches':>9} {'search (ms)':>12} {'ILIKE (ms)':>11}")
+        for query in QUERIES:
+            mcqs, total = repository.search(query, type_=BENCHMARK_TYPE)
+            search_ms = time_call(
+                lambda: repository.search(query, type_=BENCHMARK_TYPE), args.repeat
+            )
+            scan_ms = time_call(
+                lambda: session.query(MCQ)
+                .filter(MCQ.type == BENCHMARK_TYPE, MCQ.question.ilike(f"%{query}%"))
+                .limit(20)
+                .all(),
+                args.repeat,
+            )
+            session.expunge_all()
+            print(f"{query:>20} {total:>9} {search_ms:12.2f} {scan_ms:11.2f}")
+    finally:
+        session.rollback()
+        session.execute(
+            text("DELETE FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+        )
+        session.commit()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark near-duplicate detection with MinHash signatures and LSH buckets.
+
+Measures how fast signatures are computed, then seeds a throwaway category with
+generated questions in the database configured by CONNECTION_URL and times
+matching batches of reworded copies against it through the `ix_mcqs_lsh_buckets`
+GIN index. A brute-force check would compare every new question with every
+stored one.
+
+Usage (from `src`):
+    python -m benchmarks.near_duplicates --rows 1000000
+    python -m benchmarks.near_duplicates --rows 1000000 --signatures-only
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import text
+
+from app.repositories.mcq_repository import McqRepository
+from app.schemas.mcq_schemas import NearDuplicateMode
+from app.utils.minhash import lsh_buckets, minhash_signature
+
+BENCHMARK_TYPE = "benchmark_near_duplicates"
+OPTIONS = {"a": "1", "b": "2", "c": "3", "d": "4"}
+
+
+def make_questions(rows: int, seed: int = 0) -> list:
+    """Build `rows` questions of 8 to 16 words from a 5000-word vocabulary."""
+    rng = random.Random(seed)
+    vocabulary = [f"w{rng.getrandbits(32):x}" for _ in range(5_000)]
+    return [
+        " ".join(rng.choices(vocabulary, k=rng.randint(8, 16))) + "?"
+        for _ in range(rows)
+    ]
+
+
+def reword(question: str, rng: random.Random) -> str:
+    """Replace one word of a question, the way a second author might."""
+    words = question.split()
+    words[rng.randrange(len(words))] = "which"
+    return " ".join(words)
+
+
+def time_signatures(questions: list) -> float:
+    """Return the number of questions signed and bucketed per second."""
+    start = time.perf_counter()
+    for question in questions:
+        lsh_buckets(minhash_signature(question))
+    return len(questions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    parser.add_argument("--signatures-only", action="store_true")
+    args = parser.parse_args()
+
+    questions = make_questions(args.rows)
+    rate = time_signatures(questions)
+    print(f"signatures: {rate:,.0f} questions/s ({args.rows / rate:.1f} s in total)")
+    if args.signatures_only:
+        return
+
+    from app.config.database import SessionLocal
+
+    session = SessionLocal()
+    repository = McqRepository(session)
+    try:
+        start = time.perf_counter()
+        repository.bulk_ingest(
+            {
+                "type": BENCHMARK_TYPE,
+                "question": question,
+                "options": OPTIONS,
+                "correct_option": "a",
+            }
+            for question in questions
+        )
+        session.commit()
+        elapsed = time.perf_counter() - start
+        print(f"ingest: {args.rows / elapsed:,.0f} questions/s ({elapsed:.1f} s)")
+
+        rng = random.Random(1)
+        reworded = [
+            reword(question, rng) for question in rng.sample(questions, args.batch)
+        ]
+        fresh = make_questions(args.batch, seed=2)
+        for label, batch in (("reworded", reworded), ("new", fresh)):
+            start = time.perf_counter()
+            found = repository.bulk_ingest(
+                (
+                    {
+                        "type": BENCHMARK_TYPE,
+                        "question": question,
+                        "options": OPTIONS,
+                        "correct_option": "a",
+                    }
+                    for question in batch
+                ),
+                near_duplicates=NearDuplicateMode.reject,
+            ).near_duplicates
+            elapsed = time.perf_counter() - start
+            session.rollback()
+            print(
+                f"{label:>9}: {args.batch / elapsed:,.0f} questions/s, "
+                f"{len(found)}/{args.batch} rejected as near duplicates"
+            )
+    finally:
+        session.rollback()
+        session.execute(
+            text("DELETE FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+        )
+        session.execute(
+            text("DELETE FROM mcq_categories WHERE name = :type"),
+            {"type": BENCHMARK_TYPE},
+        )
+        session.commit()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Benchmark regrading past answers after an answer key changes.
+
+Seeds throwaway users, MCQs and histories with `--details` answers in the
+database configured by CONNECTION_URL, changes the key of `--changed` MCQs and
+times each step of the batches of `run_regrade_job`: flipping the affected
+answers, rescoring their histories and rebuilding the users' `user_stats`
+rows. The batches run in a transaction that is rolled back instead of
+committing, so the regrade can be repeated with `--repeat`. Rescoring a
+sample of the affected histories by loading each one and its answers through
+the ORM, which is what a per-history loop would do, is timed for comparison
+and extrapolated.
+
+Usage (from `src`):
+    python -m benchmarks.regrade --details 10000000 --changed 10
+"""
+
+import argparse
+import time
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.config.database import SessionLocal
+from app.models.data_models import UserHistory
+from app.repositories.history_details_repository import HistoryDetailsRepository
+from app.repositories.history_repository import HistoryRepository
+from app.repositories.user_stats_repository import UserStatsRepository
+from app.services.regrade import REGRADE_BATCH_SIZE
+from app.services.user_stats import USER_STATS_WINDOW
+
+BENCHMARK_TYPE = "benchmark_regrade"
+BENCHMARK_USER = "benchmark_regrade_"
+ANSWERS_PER_HISTORY = 10
+
+
+def cleanup(session) -> None:
+    """Delete everything `seed` inserted."""
+    parameters = {"type": BENCHMARK_TYPE, "user": f"{BENCHMARK_USER}%"}
+    for statement in (
+        """
+        DELETE FROM user_history_details WHERE history_id IN (
+            SELECT h.history_id FROM user_history AS h
+            JOIN submissions AS s ON s.submission_id = h.submission_id
+            WHERE s.type = :type
+        )
+        """,
+        """
+        DELETE FROM user_history WHERE submission_id IN (
+            SELECT submission_id FROM submissions WHERE type = :type
+        )
+        """,
+        "DELETE FROM submissions WHERE type = :type",
+        "DELETE FROM user_stats WHERE type = :type",
+        "DELETE FROM users WHERE username LIKE :user",
+        "DELETE FROM mcqs WHERE type = :type",
+    ):
+        session.execute(text(statement), parameters)
+    session.commit()
+
+
+def seed(session, details: int, mcqs: int, users: int) -> list:
+    """
+    Insert `details` answers spread over histories of `ANSWERS_PER_HISTORY`
+    answers, graded and scored against answer key "a", and return the MCQ ids.
+    """
+    histories = max(1, details // ANSWERS_PER_HISTORY)
+    parameters = {
+        "type": BENCHMARK_TYPE,
+        "user": BENCHMARK_USER,
+        "mcqs": mcqs,
+        "users": users,
+        "histories": histories,
+        "answers": ANSWERS_PER_HISTORY,
+    }
+    cleanup(session)
+    mcq_ids = session.scalars(
+        text(
+            """
+            INSERT INTO mcqs (mcq_id, type, question, options, correct_option)
+            SELECT gen_random_uuid(), :type, 'regrade question ' || n,
+                   '{"a": "1", "b": "2", "c": "3", "d": "4"}', 'a'
+            FROM generate_series(1, :mcqs) AS n
+            RETURNING mcq_id
+            """
+        ),
+        parameters,
+    ).all()
+    for statement in (
+        """
+        INSERT INTO users (user_id, username, email, password, role)
+        SELECT gen_random_uuid(), :user || n, :user || n || '@example.com', '', 'user'
+        FROM generate_series(1, :users) AS n
+        """,
+        """
+        INSERT INTO submissions (submission_id, user_id, total_questions, type)
+        SELECT gen_random_uuid(), u.user_ids[1 + n % cardinality(u.user_ids)],
+               :answers, :type
+        FROM generate_series(1, :histories) AS n,
+             (SELECT array_agg(user_id) AS user_ids FROM users
+              WHERE username LIKE :user || '%') AS u
+        """,
+        """
+        INSERT INTO user_history (
+            history_id, user_id, total_score, percentage, total_attempts,
+            submission_id, attempted_at
+        )
+        SELECT gen_random_uuid(), user_id, 0, 0, total_questions, submission_id,
+               current_timestamp - random() * interval '365 days'
+        FROM submissions WHERE type = :type
+        """,
+        """
+        INSERT INTO user_history_details (
+            detail_id, history_id, mcq_id, user_answer, is_correct
+        )
+        SELECT gen_random_uuid(), h.history_id, a.mcq_id, a.answer, a.answer = 'a'
+        FROM user_history AS h
+        JOIN submissions AS s ON s.submission_id = h.submission_id,
+             (SELECT array_agg(mcq_id) AS mcq_ids FROM mcqs WHERE type = :type) AS m,
+             LATERAL (
+                 SELECT m.mcq_ids[1 + floor(random() * cardinality(m.mcq_ids))::int]
+                            AS mcq_id,
+                        (ARRAY['a', 'b', 'c', 'd'])[1 + floor(random() * 4)::int]
+                            AS answer
+                 FROM generate_series(1, :answers)
+                 WHERE h.history_id IS NOT NULL
+             ) AS a
+        WHERE s.type = :type
+        """,
+        """
+        UPDATE user_history AS h
+        SET total_score = d.score,
+            percentage = CAST(d.score AS float8) / h.total_attempts * 100
+        FROM (
+            SELECT d.history_id, count(*) FILTER (WHERE d.is_correct) AS score
+            FROM user_history_details AS d
+            JOIN user_history AS h ON h.history_id = d.history_id
+            JOIN submissions AS s ON s.submission_id = h.submission_id
+            WHERE s.type = :type
+            GROUP BY d.history_id
+        ) AS d
+        WHERE h.history_id = d.history_id
+        """,
+    ):
+        session.execute(text(statement), parameters)
+    session.commit()
+    with session.get_bind().connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("mcqs", "users", "submissions", "user_history"):
+            connection.execute(text(f"VACUUM ANALYZE {table}"))
+        connection.execute(text("VACUUM ANALYZE user_history_details"))
+    return mcq_ids
+
+
+def regrade(session, changed: list) -> tuple:
+    """
+    Run the batches of `run_regrade_job` in the current transaction.
+
+    Returns: tuple
+        Per-step timings in seconds summed over the batches, the answers and
+        histories changed, and the ids of the regraded histories.
+    """
+    details = HistoryDetailsRepository(session)
+    history = HistoryRepository(session)
+    user_stats = UserStatsRepository(session)
+
+    timings = [0.0, 0.0, 0.0]
+    regraded = []
+    details_changed = histories_changed = 0
+    after_id = None
+    while True:
+        start = time.perf_counter()
+        page = details.get_regrade_page(changed, after_id, REGRADE_BATCH_SIZE)
+        if not page:
+            break
+        batch_details, history_ids = details.regrade(changed, page)
+        flipped = time.perf_counter()
+        changed_users = history.rescore(history_ids)
+        rescored = time.perf_counter()
+        user_stats.rebuild_users(sorted(set(changed_users)), USER_STATS_WINDOW)
+        rebuilt = time.perf_counter()
+
+        timings[0] += flipped - start
+        timings[1] += rescored - flipped
+        timings[2] += rebuilt - rescored
+        details_changed += batch_details
+        histories_changed += len(changed_users)
+        regraded.extend(history_ids)
+        after_id = page[-1]
+    return tuple(timings), details_changed, histories_changed, regraded
+
+
+def orm_rescore(session, history_ids: list) -> float:
+    """Rescore histories one at a time through the ORM and return the seconds taken."""
+    start = time.perf_counter()
+    for history_id in history_ids:
+        user_history = session.get(UserHistory, UUID(str(history_id)))
+        score = 0
+        for detail in user_history.details:
+            detail.is_correct = detail.user_answer == detail.mcq.correct_option
+            score += detail.is_correct
+        user_history.total_score = score
+        user_history.percentage = score / user_history.total_attempts * 100
+        session.flush()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--details", type=int, default=10_000_000)
+    parser.add_argument("--mcqs", type=int, default=1_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--orm-sample", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        start = time.perf_counter()
+        mcq_ids = seed(session, args.details, args.mcqs, args.users)
+        print(f"seeded {args.details:,} answers in {time.perf_counter() - start:.0f} s")
+
+        changed = [str(mcq_id) for mcq_id in mcq_ids[: args.changed]]
+        print(
+            f"{'answers changed':>16} {'histories changed':>18} {'flip (s)':>9} "
+            f"{'rescore (s)':>12} {'user_stats (s)':>15} {'total (s)':>10}"
+        )
+        for _ in range(args.repeat):
+            session.execute(
+                text(
+                    "UPDATE mcqs SET correct_option = 'b' "
+                    "WHERE mcq_id = ANY(CAST(:ids AS uuid[]))"
+                ),
+                {"ids": changed},
+            )
+            timings, details_changed, histories_changed, regraded = regrade(
+                session, changed
+            )
+            session.rollback()
+            print(
+                f"{details_changed:>16,} {histories_changed:>18,} "
+                f"{timings[0]:>9.2f} {timings[1]:>12.2f} {timings[2]:>15.2f} "
+                f"{sum(timings):>10.2f}"
+            )
+
+        session.execute(
+            text(
+                "UPDATE mcqs SET correct_option = 'b' "
+                "WHERE mcq_id = ANY(CAST(:ids AS uuid[]))"
+            ),
+            {"ids": changed},
+        )
+        sample = regraded[: args.orm_sample]
+        seconds = orm_rescore(session, sample)
+        session.rollback()
+        print(
+            f"ORM, one history at a time: {len(sample):,} histories in "
+            f"{seconds:.2f} s, about {seconds / len(sample) * len(regraded):.0f} s "
+            f"for all {len(regraded):,}"
+        )
+    finally:
+        session.rollback()
+        cleanup(session)
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark grading a submission as its number of answers grows.
+
+Seeds a throwaway category in the database configured by CONNECTION_URL and
+compares `grade_answers`, which reads every answer key missing from the cache
+with one batched query, with looking each MCQ up through `McqRepository.get`,
+which is what `process_submission` used to do. Both run without the question
+bank cache, and the number of SELECT statements is counted for each.
+
+Usage (from `src`):
+    python -m benchmarks.submit_grading --sizes 10 50 100 500
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import event, text
+
+from app.config.database import SessionLocal, engine
+from app.schemas.mcq_schemas import AttemptedMcq
+from app.services.mcq_services import grade_answers
+from app.services.unit_of_work import McqUnitOfWork
+
+BENCHMARK_TYPE = "benchmark_grading"
+
+
+def seed(session, rows: int) -> list:
+    """Insert `rows` questions and return their ids."""
+    session.execute(
+        text("DELETE FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+    )
+    mcq_ids = session.scalars(
+        text(
+            """
+            INSERT INTO mcqs (mcq_id, type, question, options, correct_option)
+            SELECT gen_random_uuid(), :type, 'grading question ' || n,
+                   '{"a": "1", "b": "2", "c": "3", "d": "4"}', 'a'
+            FROM generate_series(1, :rows) AS n
+            RETURNING mcq_id
+            """
+        ),
+        {"type": BENCHMARK_TYPE, "rows": rows},
+    ).all()
+    session.commit()
+    return mcq_ids
+
+
+def time_call(func, repeat: int) -> tuple:
+    """Return the median latency of `func` in milliseconds and its SELECT count."""
+    selects = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        timings = []
+        for _ in range(repeat):
+            selects.clear()
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return statistics.median(timings), len(selects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 500])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        mcq_ids = seed(session, max(args.sizes))
+        print(
+            f"{'answers':>8} {'batched (ms)':>13} {'selects':>8} "
+            f"{'per-id (ms)':>12} {'selects':>8}"
+        )
+        for size in sorted(args.sizes):
+            attempted = [
+                AttemptedMcq(mcq_id=mcq_id, user_answer=random.choice("abcd"))
+                for mcq_id in random.sample(mcq_ids, size)
+            ]
+
+            def batched():
+                with McqUnitOfWork() as unit_of_work:
+                    grade_answers(unit_of_work, None, attempted)
+
+            def per_id():
+                with McqUnitOfWork() as unit_of_work:
+                    for attempted_mcq in attempted:
+                        mcq = unit_of_work.mcq.get(attempted_mcq.mcq_id)
+                        attempted_mcq.user_answer.value == mcq.correct_option
+
+            batched_ms, batched_selects = time_call(batched, args.repeat)
+            per_id_ms, per_id_selects = time_call(per_id, args.repeat)
+            print(
+                f"{size:>8} {batched_ms:13.2f} {batched_selects:>8} "
+                f"{per_id_ms:12.2f} {per_id_selects:>8}"
+            )
+    finally:
+        session.rollback()
+        session.execute(
+            text("DELETE FROM mcqs WHERE type = :type"), {"type": BENCHMARK_TYPE}
+        )
+        session.commit()
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
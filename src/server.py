@@ -1,7 +1,31 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.routes import api
+from app.services.answer_counts import answer_counts, write_answer_counts
+from app.services.certificate_jobs import certificate_queue
+from app.services.certificate_rerender import rerender_job_queue
+from app.services.import_jobs import import_job_queue
+from app.services.leaderboard import leaderboards, load_changed_stats
+from app.services.quiz_session import load_warm_keys, paper_pool
+from app.services.regrade import regrade_job_queue
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    import_job_queue.start()
+    certificate_queue.start()
+    rerender_job_queue.start()
+    regrade_job_queue.start()
+    leaderboards.start(load_changed_stats)
+    answer_counts.start(write_answer_counts)
+    paper_pool.warm(load_warm_keys)
+    yield
+    leaderboards.save_snapshot()
+    answer_counts.flush(write_answer_counts)
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(api.router)
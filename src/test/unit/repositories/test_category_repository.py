@@ -0,0 +1,107 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import MCQ, MCQCategory, User, UserRole
+from app.repositories.category_repository import CategoryRepository
+from app.repositories.mcq_repository import McqRepository
+
+
+@pytest.fixture
+def session():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def categories(session):
+    """The names of two fresh registered categories without questions."""
+    names = [f"registry_{n}_{uuid4().hex[:8]}" for n in range(2)]
+    session.add_all([MCQCategory(name=name, question_count=0) for name in names])
+    session.flush()
+    return names
+
+
+def counts(session, names):
+    session.expire_all()
+    repository = CategoryRepository(session)
+    return [repository.get(name).question_count for name in names]
+
+
+def payloads(type_, count, created_by=None):
+    return [
+        {
+            "type": type_,
+            "question": f"registry question {uuid4()}",
+            "options": {"a": "1", "b": "2", "c": "3", "d": "4"},
+            "correct_option": "a",
+            "created_by": created_by,
+        }
+        for _ in range(count)
+    ]
+
+
+def test_counts_follow_bulk_inserts_and_skip_duplicates(session, categories):
+    repository = McqRepository(session)
+    rows = payloads(categories[0], 3) + payloads(categories[1], 2)
+
+    repository.bulk_ingest(rows)
+    repository.bulk_ingest(rows[:2])
+
+    assert counts(session, categories) == [3, 2]
+
+
+def test_counts_follow_deletes_and_type_changes(session, categories):
+    repository = McqRepository(session)
+    repository.bulk_ingest(payloads(categories[0], 3))
+    mcq_ids = [mcq_id for mcq_id, *_ in repository.get_question_bank(categories[0])]
+
+    assert repository.delete(mcq_ids[0])
+    session.flush()
+    session.execute(
+        update(MCQ).where(MCQ.mcq_id == mcq_ids[1]).values(type=categories[1])
+    )
+
+    assert counts(session, categories) == [1, 1]
+
+
+def test_counts_follow_cascade_deletes_of_a_users_mcqs(session, categories):
+    user = User(
+        username=f"registry-{uuid4()}",
+        email=f"{uuid4()}@example.com",
+        password="test",
+        role=UserRole.admin,
+    )
+    session.add(user)
+    session.flush()
+    McqRepository(session).bulk_ingest(
+        payloads(categories[0], 2, user.user_id) + payloads(categories[0], 1)
+    )
+    session.expire_all()
+
+    session.delete(session.get(User, user.user_id))
+    session.flush()
+
+    assert counts(session, categories) == [1, 0]
+
+
+def test_updates_that_keep_the_type_do_not_touch_the_registry(session, categories):
+    repository = McqRepository(session)
+    repository.bulk_ingest(payloads(categories[0], 2))
+    version = repository.get_question_bank_version()
+
+    session.execute(update(MCQ).where(MCQ.type == categories[0]).values(random_key=0.5))
+
+    assert repository.get_question_bank_version() == version
+    assert counts(session, categories) == [2, 0]
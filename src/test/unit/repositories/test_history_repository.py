@@ -0,0 +1,105 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import (
+    MCQ,
+    Submission,
+    User,
+    UserHistory,
+    UserHistoryDetail,
+    UserRole,
+)
+from app.repositories.history_repository import HistoryRepository
+
+QUESTIONS = 100
+
+
+@pytest.fixture
+def session():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def history_id(session):
+    user = User(
+        username=f"history-{uuid4()}",
+        email=f"{uuid4()}@example.com",
+        password="test",
+        role=UserRole.user,
+    )
+    session.add(user)
+    session.flush()
+    submission = Submission(
+        user_id=user.user_id, total_questions=QUESTIONS, type="history_test"
+    )
+    mcqs = [
+        MCQ(
+            type="history_test",
+            question=f"history question {n}",
+            options={"a": "1", "b": "2", "c": "3", "d": "4"},
+            correct_option="a",
+        )
+        for n in range(QUESTIONS)
+    ]
+    session.add_all([submission, *mcqs])
+    session.flush()
+    history = UserHistory(
+        user_id=user.user_id,
+        submission_id=submission.submission_id,
+        total_score=QUESTIONS,
+        percentage=100,
+        total_attempts=QUESTIONS,
+    )
+    session.add(history)
+    session.flush()
+    session.add_all(
+        UserHistoryDetail(
+            history_id=history.history_id,
+            mcq_id=mcq.mcq_id,
+            user_answer="a",
+            is_correct=True,
+        )
+        for mcq in mcqs
+    )
+    session.flush()
+    session.expunge_all()
+    return history.history_id
+
+
+def test_get_with_details_reads_history_details_and_mcqs_in_one_query(
+    session, history_id
+):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        history = HistoryRepository(session).get_with_details(history_id)
+        questions = [
+            (detail.mcq.type, detail.mcq.question, detail.mcq.correct_option)
+            for detail in history.details
+        ]
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(questions) == QUESTIONS
+    assert len(statements) == 1
+
+
+def test_get_with_details_returns_none_for_a_missing_history(session):
+    assert HistoryRepository(session).get_with_details(uuid4()) is None
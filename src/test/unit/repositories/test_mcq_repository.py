@@ -0,0 +1,290 @@
+from collections import Counter
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import MCQ
+from app.repositories.mcq_repository import McqRepository
+from app.schemas.mcq_schemas import NearDuplicateMode
+
+TYPE = "search_test"
+INGEST_TYPE = "ingest_test"
+
+
+@pytest.fixture
+def session():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def add_questions(session, questions, type_=TYPE):
+    mcqs = [
+        MCQ(
+            type=type_,
+            question=question,
+            options={"a": "1", "b": "2"},
+            correct_option="a",
+        )
+        for question in questions
+    ]
+    session.add_all(mcqs)
+    session.flush()
+    return mcqs
+
+
+def add_sampled_questions(session, count):
+    """Questions of a fresh type with evenly spread random keys."""
+    type_ = f"sample_test_{uuid4()}"
+    mcqs = add_questions(session, [f"sampled {n}" for n in range(count)], type_)
+    for n, mcq in enumerate(mcqs):
+        mcq.random_key = (n + 0.5) / count
+    session.flush()
+    return type_, [mcq.mcq_id for mcq in mcqs]
+
+
+def payload(question, type_=INGEST_TYPE, correct_option="a"):
+    return {
+        "type": type_,
+        "question": question,
+        "options": {"a": "1", "b": "2", "c": "3", "d": "4"},
+        "correct_option": correct_option,
+        "created_by": None,
+    }
+
+
+def test_bulk_ingest_counts_rows_returned_by_on_conflict(session):
+    prefix = uuid4()
+    repository = McqRepository(session)
+    repository.bulk_ingest([payload(f"{prefix} stored")])
+    count_before = repository.categories.get(INGEST_TYPE).question_count
+
+    result = repository.bulk_ingest(
+        [
+            payload(f"{prefix} stored"),
+            payload(f"{prefix} new 1"),
+            payload(f"{prefix} new 2"),
+            payload(f"{prefix} new 1"),
+            payload(f"{prefix} new 3", type_="ingest_other_test"),
+            payload(f"{prefix} new 2"),
+            payload(f"{prefix} new 4"),
+        ],
+        batch_size=2,
+    )
+
+    assert (result.added, result.skipped) == (4, 3)
+    assert result.near_duplicates == []
+    categories = repository.categories
+    assert categories.get(INGEST_TYPE).question_count == count_before + 3
+    assert categories.get("ingest_other_test").question_count >= 1
+
+
+def test_bulk_ingest_keeps_questions_with_other_options(session):
+    question = f"{uuid4()} same question"
+    repository = McqRepository(session)
+
+    result = repository.bulk_ingest(
+        [payload(question), payload(question, correct_option="b")]
+    )
+    changed = payload(question)
+    changed["options"] = {"a": "x", "b": "2", "c": "3", "d": "4"}
+    again = repository.bulk_ingest([changed])
+
+    assert (result.added, result.skipped) == (1, 1)
+    assert (again.added, again.skipped) == (1, 0)
+
+
+def test_search_ranks_the_most_relevant_matches_first(session):
+    once, twice = add_questions(
+        session,
+        [
+            f"Which list method sorts in place {uuid4()}?",
+            f"How does a sorted list differ from a list {uuid4()}?",
+        ],
+    )
+    add_questions(session, [f"What is a tuple {uuid4()}?"])
+
+    mcqs, total = McqRepository(session).search("list", type_=TYPE)
+
+    assert total == 2
+    assert [mcq.mcq_id for mcq in mcqs] == [twice.mcq_id, once.mcq_id]
+
+
+def test_search_matches_the_last_word_as_a_prefix(session):
+    (decorator,) = add_questions(session, [f"What does a decorator return {uuid4()}?"])
+
+    mcqs, total = McqRepository(session).search("decor", type_=TYPE)
+
+    assert (total, [mcq.mcq_id for mcq in mcqs]) == (1, [decorator.mcq_id])
+
+
+def test_search_pages_and_caps_the_ranked_matches(session):
+    add_questions(session, [f"Generator question {n} {uuid4()}" for n in range(7)])
+    repository = McqRepository(session)
+
+    first, total = repository.search(
+        "generator", type_=TYPE, limit=2, offset=0, max_matches=5
+    )
+    last, _ = repository.search(
+        "generator", type_=TYPE, limit=2, offset=4, max_matches=5
+    )
+    beyond, _ = repository.search(
+        "generator", type_=TYPE, limit=2, offset=6, max_matches=5
+    )
+
+    assert total == 5
+    assert len(first) == 2
+    assert len(last) == 1
+    assert beyond == []
+
+
+def test_search_only_ranks_the_capped_candidates(session):
+    add_questions(session, [f"Iterator question {n} {uuid4()}" for n in range(6)])
+    add_questions(session, [f"Iterator iterator iterator {uuid4()}"])
+    repository = McqRepository(session)
+
+    ranked, total = repository.search("iterator", type_=TYPE, max_candidates=7)
+    capped, capped_total = repository.search("iterator", type_=TYPE, max_candidates=3)
+
+    assert total == 7
+    assert ranked[0].question.startswith("Iterator iterator")
+    assert capped_total == 3
+    assert {mcq.mcq_id for mcq in capped} <= {mcq.mcq_id for mcq in ranked}
+
+
+def test_search_filters_by_type_and_ignores_punctuation(session):
+    add_questions(session, [f"Closure scope {uuid4()}"])
+    add_questions(session, [f"Closure scope {uuid4()}"], type_="other_search_test")
+    repository = McqRepository(session)
+
+    assert repository.search("closure!", type_=TYPE)[1] == 1
+    assert repository.search("?!", type_=TYPE) == ([], 0)
+
+
+def near_duplicate_payloads(prefix):
+    return [
+        payload(f"Which function returns the length of a list in Python {prefix}?"),
+        payload(f"Which function returns the length of a list in Python 3 {prefix}?"),
+        payload(f"Which function returns the length of a tuple in Python {prefix}?"),
+        payload(f"What does the yield keyword do in a generator {prefix}?"),
+    ]
+
+
+def test_bulk_ingest_ignores_oversized_buckets(session):
+    first, copy, *_ = near_duplicate_payloads(uuid4())
+    repository = McqRepository(session)
+    repository.bulk_ingest([first])
+
+    checked = repository.bulk_ingest(
+        [copy], near_duplicates=NearDuplicateMode.reject, threshold=0.5
+    )
+    capped = repository.bulk_ingest(
+        [copy],
+        near_duplicates=NearDuplicateMode.reject,
+        threshold=0.5,
+        max_bucket_size=0,
+    )
+
+    assert (checked.added, len(checked.near_duplicates)) == (0, 1)
+    assert (capped.added, capped.near_duplicates) == (1, [])
+
+
+def test_near_duplicate_pairs_streams_pages_and_keeps_the_most_similar(session):
+    repository = McqRepository(session)
+    repository.bulk_ingest(near_duplicate_payloads(uuid4()))
+
+    everything = repository.near_duplicate_pairs(type_=INGEST_TYPE, threshold=0.5)
+    paged = repository.near_duplicate_pairs(
+        type_=INGEST_TYPE, threshold=0.5, page_size=1
+    )
+    best = repository.near_duplicate_pairs(
+        type_=INGEST_TYPE, threshold=0.5, limit=1, page_size=1
+    )
+
+    assert len(everything) >= 1
+    assert all("yield" not in pair.question for pair in everything)
+    assert paged == everything
+    assert best == everything[:1]
+    similarities = [pair.similarity for pair in everything]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_near_duplicate_pairs_skips_oversized_buckets(session):
+    repository = McqRepository(session)
+    repository.bulk_ingest(near_duplicate_payloads(uuid4()))
+
+    assert (
+        repository.near_duplicate_pairs(
+            type_=INGEST_TYPE, threshold=0.5, max_bucket_size=1
+        )
+        == []
+    )
+
+
+def test_sample_returns_distinct_questions_without_the_excluded_ones(session):
+    type_, mcq_ids = add_sampled_questions(session, 6)
+    repository = McqRepository(session)
+
+    for _ in range(50):
+        sampled = [mcq.mcq_id for mcq in repository.sample(type_, 4, mcq_ids[:2])]
+
+        assert len(sampled) == len(set(sampled)) == 4
+        assert set(sampled) == set(mcq_ids[2:])
+    assert len(repository.sample(type_, 10)) == 6
+    assert repository.sample(f"missing_{uuid4()}", 3) == []
+
+
+def test_sample_top_up_starts_at_a_random_key(session):
+    type_, mcq_ids = add_sampled_questions(session, 6)
+    repository = McqRepository(session)
+    conditions = [MCQ.type == type_]
+
+    firsts = Counter()
+    for _ in range(600):
+        topped_up = repository._top_up(conditions, [mcq_ids[0]], 3)
+        assert len(topped_up) == len(set(topped_up)) == 3
+        assert mcq_ids[0] not in topped_up
+        firsts[topped_up[0]] += 1
+
+    # Each of the 5 candidates starts the run about 120 times; a top-up read
+    # from the lowest keys would always start at the same one.
+    assert sorted(firsts) == sorted(mcq_ids[1:])
+    assert min(firsts.values()) > 60
+
+
+def test_sample_spreads_left_out_questions_across_the_key_range(session):
+    type_, mcq_ids = add_sampled_questions(session, 6)
+    repository = McqRepository(session)
+
+    left_out = Counter()
+    for _ in range(600):
+        sampled = {mcq.mcq_id for mcq in repository.sample(type_, 5)}
+        left_out.update(set(mcq_ids) - sampled)
+
+    # About 100 each; with the top-up taken from the lowest keys the highest
+    # keys are left out far more often than the lowest.
+    assert sum(left_out.values()) == 600
+    assert all(30 < left_out[mcq_id] < 200 for mcq_id in mcq_ids)
+
+
+def test_record_answers_adds_to_the_counters_of_existing_mcqs(session):
+    type_ = f"counts_test_{uuid4()}"
+    answered, unanswered = add_questions(session, ["counted", "never answered"], type_)
+    repository = McqRepository(session)
+
+    repository.record_answers({answered.mcq_id: (2, 1), uuid4(): (1, 1)})
+    repository.record_answers({answered.mcq_id: (3, 3)})
+
+    assert sorted(repository.get_difficulty_counts(type_), key=lambda row: row[1]) == [
+        (unanswered.mcq_id, 0, 0),
+        (answered.mcq_id, 5, 4),
+    ]
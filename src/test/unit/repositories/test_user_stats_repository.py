@@ -0,0 +1,205 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import Submission, User, UserHistory, UserRole, UserStats
+from app.repositories.user_stats_repository import UserStatsRepository
+from app.services import user_stats
+
+COMPARED_COLUMNS = [
+    "type",
+    "attempts",
+    "score_sum",
+    "percentage_sum",
+    "best_percentage",
+    "latest_percentage",
+    "latest_attempted_at",
+    "recent_percentages",
+]
+
+
+@pytest.fixture
+def session():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def add_user(session):
+    user = User(
+        username=f"stats-{uuid4()}",
+        email=f"{uuid4()}@example.com",
+        password="test",
+        role=UserRole.user,
+    )
+    session.add(user)
+    session.flush()
+    return user.user_id
+
+
+def submit(session, user_id, history_id, type_, percentage, window):
+    """Write a history the way `process_submission` does, with its stats row."""
+    submission = Submission(user_id=user_id, total_questions=10, type=type_)
+    session.add(submission)
+    session.flush()
+    session.add(
+        UserHistory(
+            history_id=history_id,
+            user_id=user_id,
+            submission_id=submission.submission_id,
+            total_score=percentage / 10,
+            percentage=percentage,
+            total_attempts=10,
+        )
+    )
+    session.flush()
+    return UserStatsRepository(session).record(
+        user_id, type_, percentage / 10, percentage, window
+    )
+
+
+def stats_rows(session, user_id):
+    session.expire_all()
+    return [
+        {column: getattr(stats, column) for column in COMPARED_COLUMNS}
+        for stats in UserStatsRepository(session).get_all(user_id)
+    ]
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 10])
+def test_record_keeps_the_last_window_percentages(session, window):
+    user_id = add_user(session)
+    percentages = []
+    for n in range(window + 3):
+        percentage = float(n * 7 % 101)
+        percentages.append(percentage)
+        attempts, percentage_sum, best = submit(
+            session, user_id, uuid4(), "stats_test", percentage, window
+        )
+
+        stats = UserStatsRepository(session).get(user_id, "stats_test")
+        session.refresh(stats)
+        assert stats.recent_percentages == percentages[-window:]
+        assert (attempts, percentage_sum, best) == (
+            n + 1,
+            sum(percentages),
+            max(percentages),
+        )
+        assert stats.latest_percentage == percentage
+
+
+@pytest.mark.parametrize("window", [1, 3])
+def test_rebuild_equals_the_incremental_rows(session, window):
+    user_id = add_user(session)
+    history_ids = sorted(uuid4() for _ in range(9))
+    for n, history_id in enumerate(history_ids):
+        type_ = "stats_test" if n % 3 else "stats_other_test"
+        submit(session, user_id, history_id, type_, float(n * 10), window)
+    incremental = stats_rows(session, user_id)
+
+    UserStatsRepository(session).rebuild_users([user_id], window)
+
+    assert stats_rows(session, user_id) == incremental
+
+
+def test_rebuild_walks_users_in_batches(session):
+    user_ids = sorted(add_user(session) for _ in range(3))
+    for user_id in user_ids:
+        submit(session, user_id, uuid4(), "stats_test", 50.0, 10)
+    session.query(UserStats).filter(UserStats.user_id.in_(user_ids)).delete()
+    repository = UserStatsRepository(session)
+
+    last = repository.rebuild(user_ids[0], 1, 10)
+
+    # Other users of the database may sort between the test's users.
+    assert str(last) == str(
+        session.scalar(select(func.min(User.user_id)).where(User.user_id > user_ids[0]))
+    )
+    assert repository.get(user_ids[0], "stats_test") is None
+    assert repository.get(user_ids[2], "stats_test") is None
+    if str(last) == str(user_ids[1]):
+        assert repository.get(user_ids[1], "stats_test").attempts == 1
+
+
+def test_removals_carry_the_row_that_replaced_them(session):
+    user_id = add_user(session)
+    submit(session, user_id, uuid4(), "stats_test", 40.0, 10)
+    submit(session, user_id, uuid4(), "stats_other_test", 60.0, 10)
+    repository = UserStatsRepository(session)
+    since = session.scalar(select(func.localtimestamp()))
+
+    repository.rebuild_users([user_id], 10)
+    rebuilt = {
+        row.type: row[3:]
+        for row in repository.get_removed_since(since)
+        if row.user_id == user_id
+    }
+    session.delete(session.get(User, user_id))
+    session.flush()
+    deleted = {
+        row.type: row[3:]
+        for row in repository.get_removed_since(since)
+        if row.user_id == user_id
+    }
+
+    assert rebuilt == {
+        "stats_test": (1, 40.0, 40.0),
+        "stats_other_test": (1, 60.0, 60.0),
+    }
+    assert deleted == {
+        "stats_test": (None, None, None),
+        "stats_other_test": (None, None, None),
+    }
+
+
+class FakeHistoryUnitOfWork:
+    """Hands out users in batches from a list, like `rebuild` over `users`."""
+
+    def __init__(self, user_ids, calls):
+        self.user_ids = user_ids
+        self.calls = calls
+        self.user_stats = self
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def rebuild(self, after_user_id, limit, window):
+        self.calls.append((after_user_id, limit, window))
+        start = self.user_ids.index(after_user_id) + 1 if after_user_id else 0
+        batch = self.user_ids[start : start + limit]
+        return batch[-1] if batch else None
+
+
+def test_backfill_resumes_after_the_last_user_of_each_batch(monkeypatch, capsys):
+    user_ids = sorted(uuid4() for _ in range(5))
+    calls = []
+    monkeypatch.setattr(
+        user_stats, "HistoryUnitOfWork", FakeHistoryUnitOfWork(user_ids, calls)
+    )
+
+    batches = user_stats.backfill_user_stats(batch_size=2, after_user_id=user_ids[0])
+
+    assert batches == 2
+    window = user_stats.USER_STATS_WINDOW
+    assert calls == [
+        (user_ids[0], 2, window),
+        (user_ids[2], 2, window),
+        (user_ids[4], 2, window),
+    ]
+    assert f"rebuilt users up to {user_ids[4]}" in capsys.readouterr().out
@@ -1,24 +1,26 @@
-from src.app.repositories.user_repository import UserRepository
-from src.app.models.data_models import User, UserRole
 from uuid import uuid4
+
 from sqlalchemy.orm import Session
+
 from src.app.config.database import Base, engine
+from src.app.models.data_models import User, UserRole
+from src.app.repositories.user_repository import UserRepository
+
 
 def init_db():
     Base.metadata.create_all(bind=engine)
-    
+
+
 def test_add():
     init_db()
     session = Session()
     repo = UserRepository(session)
     new_user = User(
-        user_id=uuid4(),
-        username="kamalesh",
-        password="test",
-        role=UserRole.ADMIN
-        )
+        user_id=uuid4(), username="kamalesh", password="test", role=UserRole.ADMIN
+    )
     repo.add(new_user)
 
+
 if __name__ == "__main__":
     test_add()
 # from src.app.repositories.user_repository import UserRepository
@@ -0,0 +1,51 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.answer_counts import AnswerCountBuffer
+
+
+class FakeWriter:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, counts):
+        if self.fail:
+            raise OSError("database is down")
+        self.calls.append(dict(counts))
+
+
+def test_flush_writes_the_sum_of_everything_added_since_the_last_one():
+    first, second = uuid4(), uuid4()
+    buffer, writer = AnswerCountBuffer(flush_seconds=2), FakeWriter()
+
+    buffer.add({first: (1, 1), second: (1, 0)})
+    buffer.add({first: (1, 0)})
+    buffer.flush(writer)
+    buffer.flush(writer)
+    buffer.add({second: (1, 1)})
+    buffer.flush(writer)
+
+    assert writer.calls == [{first: (2, 1), second: (1, 0)}, {second: (1, 1)}]
+    assert buffer.stats() == {
+        "pending_mcqs": 0,
+        "flushes": 2,
+        "answers_written": 4,
+        "errors": 0,
+    }
+
+
+def test_failed_flush_keeps_its_counts_for_the_next_one():
+    mcq_id = uuid4()
+    buffer = AnswerCountBuffer(flush_seconds=2)
+    buffer.add({mcq_id: (2, 1)})
+
+    with pytest.raises(OSError):
+        buffer.flush(FakeWriter(fail=True))
+    buffer.add({mcq_id: (1, 1)})
+    writer = FakeWriter()
+    buffer.flush(writer)
+
+    assert writer.calls == [{mcq_id: (3, 2)}]
+    assert buffer.stats()["errors"] == 1
@@ -0,0 +1,179 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, update
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import (
+    CertificateStatus,
+    Submission,
+    User,
+    UserHistory,
+    UserRole,
+)
+from app.services import certificate_jobs, mcq_services
+from app.services.unit_of_work import HistoryUnitOfWork
+
+
+@pytest.fixture
+def connection():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def session_factory(connection):
+    """Sessions whose commits are savepoints of the test's transaction."""
+
+    def factory():
+        session = SessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            session.close()
+
+    return factory
+
+
+@pytest.fixture
+def session(session_factory):
+    return next(session_factory())
+
+
+@pytest.fixture
+def history(session):
+    """A history whose certificate is pending, as a submission leaves it."""
+    user = User(
+        username=f"certificate-{uuid4()}",
+        email=f"{uuid4()}@example.com",
+        password="test",
+        role=UserRole.user,
+    )
+    session.add(user)
+    session.flush()
+    submission = Submission(
+        user_id=user.user_id, total_questions=10, type="certificate_test"
+    )
+    session.add(submission)
+    session.flush()
+    history = UserHistory(
+        history_id=uuid4(),
+        user_id=user.user_id,
+        submission_id=submission.submission_id,
+        total_score=7,
+        percentage=70,
+        total_attempts=10,
+        certificate_status=CertificateStatus.pending.value,
+    )
+    session.add(history)
+    session.commit()
+    return SimpleNamespace(history_id=history.history_id, user=user)
+
+
+@pytest.fixture
+def renderer(monkeypatch, session_factory):
+    """Render certificates against the test transaction, failing on demand."""
+    renderer = SimpleNamespace(calls=[], fail=False)
+
+    def generate_certificate(data):
+        renderer.calls.append(data)
+        if renderer.fail:
+            raise OSError("renderer is down")
+        return {"body": {"object_name": f"certificates/{len(renderer.calls)}.jpg"}}
+
+    monkeypatch.setattr(
+        certificate_jobs,
+        "HistoryUnitOfWork",
+        lambda: HistoryUnitOfWork(session_factory),
+    )
+    monkeypatch.setattr(certificate_jobs, "generate_certificate", generate_certificate)
+    monkeypatch.setattr(
+        mcq_services,
+        "generate_presigned_url_func",
+        lambda file_key: {"url": f"https://example.com/{file_key}"},
+    )
+    return renderer
+
+
+def get_status(session_factory, history):
+    user = SimpleNamespace(user_id=history.user.user_id, role="user")
+    return mcq_services.generate_certificate_presigned_url(
+        HistoryUnitOfWork(session_factory), user, history.history_id
+    )
+
+
+def test_submitted_certificate_goes_from_pending_to_rendered(
+    session_factory, history, renderer
+):
+    assert get_status(session_factory, history)["status"] == "pending"
+
+    certificate_jobs.render_certificate(history.history_id)
+    certificate_jobs.render_certificate(history.history_id)
+
+    assert renderer.calls == [
+        {"name": history.user.username, "type": "certificate_test", "percentage": 70}
+    ]
+    assert get_status(session_factory, history) == {
+        "url": "https://example.com/certificates/1.jpg",
+        "status": "ready",
+    }
+
+
+def test_failed_certificate_is_requeued_and_rendered_again(
+    session_factory, history, renderer, monkeypatch
+):
+    submitted = []
+    monkeypatch.setattr(
+        mcq_services, "certificate_queue", SimpleNamespace(submit=submitted.append)
+    )
+    renderer.fail = True
+    with pytest.raises(OSError):
+        certificate_jobs.render_certificate(history.history_id)
+
+    assert get_status(session_factory, history)["status"] == "pending"
+    assert submitted == [history.history_id]
+    renderer.fail = False
+    certificate_jobs.render_certificate(history.history_id)
+
+    assert get_status(session_factory, history)["status"] == "ready"
+    assert len(renderer.calls) == 2
+
+
+def test_claimed_certificate_is_left_to_its_worker_until_it_goes_stale(
+    session, session_factory, history, renderer
+):
+    with HistoryUnitOfWork(session_factory) as unit_of_work:
+        assert unit_of_work.history.claim_certificate(history.history_id, 300)
+        assert not unit_of_work.history.claim_certificate(history.history_id, 300)
+
+    certificate_jobs.render_certificate(history.history_id)
+    assert renderer.calls == []
+
+    with HistoryUnitOfWork(session_factory) as unit_of_work:
+        unit_of_work.session.execute(
+            update(UserHistory)
+            .where(UserHistory.history_id == history.history_id)
+            .values(certificate_claimed_at=func.now() - timedelta(hours=1))
+        )
+        assert unit_of_work.history.get_pending_certificate_ids(300) == [
+            history.history_id
+        ]
+    certificate_jobs.render_certificate(history.history_id)
+
+    assert len(renderer.calls) == 1
+    session.expire_all()
+    assert (
+        session.get(UserHistory, history.history_id).certificate_status
+        == CertificateStatus.ready.value
+    )
@@ -0,0 +1,124 @@
+import io
+import random
+
+import pytest
+from PIL import Image
+
+from app.services.aws_services import (
+    FILES_DIR,
+    TEMPLATE_KEY,
+    CertificateStorage,
+    JpegRows,
+    PillowCertificateRenderer,
+    medal_for,
+)
+
+
+class MemoryStorage(CertificateStorage):
+    def __init__(self):
+        self.objects = {}
+
+    def put(self, key, data, content_type):
+        self.objects[key] = (data, content_type)
+
+
+@pytest.fixture
+def renderer():
+    return PillowCertificateRenderer(
+        lambda: (FILES_DIR / TEMPLATE_KEY).read_bytes(), MemoryStorage()
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_spliced_certificate_equals_the_whole_image_encoding(renderer, seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        data = {
+            "name": "".join(
+                rng.choice("AgjQy ÅÿW_") for _ in range(rng.randint(0, 30))
+            ),
+            "type": rng.choice(["python", "sql", "javascript"]),
+            "percentage": rng.choice([0, 49.6, 50, 74, 75, 89.5, 90, 100]),
+        }
+
+        assert renderer.encode(data) == renderer._save(renderer.draw(data))
+
+
+def test_render_writes_a_decodable_jpeg(renderer):
+    result = renderer.render({"name": "Ada", "type": "python", "percentage": 95})
+
+    object_name = result["body"]["object_name"]
+    data, content_type = renderer.storage.objects[object_name]
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    assert object_name.startswith("certificates/")
+    assert content_type == "image/jpeg"
+    assert image.format == "JPEG"
+
+
+def test_jpeg_rows_round_trip(renderer):
+    encoded = renderer._save(
+        renderer.draw({"name": "Ada", "type": "sql", "percentage": 60})
+    )
+    rows = JpegRows(encoded)
+
+    assert len(rows.rows) == -(-Image.open(io.BytesIO(encoded)).height // 16)
+    assert rows.join(rows.rows) == encoded
+
+
+def test_type_and_percentage_rows_are_cached(renderer, monkeypatch):
+    encoded = []
+    encode_rows = renderer._encode_rows
+
+    def count(base, first, last, y, text, size):
+        encoded.append(text)
+        return encode_rows(base, first, last, y, text, size)
+
+    monkeypatch.setattr(renderer, "_encode_rows", count)
+    renderer.encode({"name": "Ada", "type": "python", "percentage": 95})
+    renderer.encode({"name": "Grace", "type": "python", "percentage": 95})
+
+    assert encoded == ["Ada", "PYTHON QUIZ", "95%", "Grace"]
+
+
+def test_invalidate_drops_the_bases_and_cached_rows(renderer):
+    renderer.encode({"name": "Ada", "type": "python", "percentage": 95})
+
+    renderer.invalidate()
+
+    assert renderer._bases is None
+    assert not renderer._rows
+
+
+def test_row_cache_is_bounded(renderer):
+    renderer.max_cached_rows = 3
+    for percentage in range(5):
+        renderer.encode({"name": "Ada", "type": "python", "percentage": percentage})
+
+    assert len(renderer._rows) == 3
+
+
+def test_overlapping_lines_fall_back_to_the_whole_image(renderer, monkeypatch):
+    data = {"name": "Ada", "type": "python", "percentage": 95}
+    monkeypatch.setattr(
+        renderer,
+        "_lines",
+        lambda data: [(350, "Ada", 56, False), (360, "PYTHON QUIZ", 40, True)],
+    )
+
+    assert renderer.encode(data) == renderer._save(renderer.draw(data))
+
+
+@pytest.mark.parametrize(
+    "percentage, medal",
+    [
+        (100, "gold"),
+        (90, "gold"),
+        (89.9, "silver"),
+        (75, "silver"),
+        (50, "bronze"),
+        (49, None),
+    ],
+)
+def test_medal_for(percentage, medal):
+    assert medal_for(percentage) == medal
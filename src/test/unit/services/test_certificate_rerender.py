@@ -0,0 +1,269 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import (
+    CertificateRerenderJob,
+    CertificateStatus,
+    ImportJobStatus,
+    Submission,
+    User,
+    UserHistory,
+    UserRole,
+)
+from app.repositories.history_repository import HistoryRepository
+from app.services import certificate_rerender, mcq_services
+from app.services.unit_of_work import CertificateUnitOfWork
+
+HISTORIES = 7
+
+
+@pytest.fixture
+def connection():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def session_factory(connection):
+    """Sessions whose commits are savepoints of the test's transaction."""
+
+    def factory():
+        session = SessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            session.close()
+
+    return factory
+
+
+@pytest.fixture
+def session(session_factory):
+    return next(session_factory())
+
+
+@pytest.fixture
+def history_ids(session):
+    user = User(
+        username=f"rerender-{uuid4()}",
+        email=f"{uuid4()}@example.com",
+        password="test",
+        role=UserRole.user,
+    )
+    session.add(user)
+    session.flush()
+    history_ids = sorted(uuid4() for _ in range(HISTORIES + 1))
+    for n, history_id in enumerate(history_ids):
+        submission = Submission(
+            user_id=user.user_id, total_questions=10, type="rerender_test"
+        )
+        session.add(submission)
+        session.flush()
+        session.add(
+            UserHistory(
+                history_id=history_id,
+                user_id=user.user_id,
+                submission_id=submission.submission_id,
+                total_score=n,
+                percentage=n * 10,
+                total_attempts=10,
+                certificate=f"certificates/old-{n}.jpg",
+                certificate_status=(
+                    CertificateStatus.pending.value
+                    if n == HISTORIES
+                    else CertificateStatus.ready.value
+                ),
+            )
+        )
+    session.commit()
+    # The last history is pending and left to the certificate worker.
+    return history_ids[:HISTORIES], history_ids[HISTORIES]
+
+
+class InlinePool:
+    """Runs `map` in the calling thread instead of worker processes."""
+
+    def __init__(self, max_workers=None, mp_context=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def map(self, function, iterable, chunksize=1):
+        return [function(item) for item in iterable]
+
+
+@pytest.fixture
+def rendered(monkeypatch, session_factory):
+    """Run re-render jobs inline against the test transaction."""
+    rendered = []
+
+    def render(data):
+        if data["type"] != "rerender_test":
+            return "certificates/other.jpg", None
+        rendered.append(data["percentage"])
+        if data["percentage"] == 30:
+            return None, "template missing"
+        return f"certificates/new-{data['percentage']:.0f}.jpg", None
+
+    monkeypatch.setattr(
+        certificate_rerender,
+        "CertificateUnitOfWork",
+        lambda: CertificateUnitOfWork(session_factory),
+    )
+    monkeypatch.setattr(certificate_rerender, "ProcessPoolExecutor", InlinePool)
+    monkeypatch.setattr(certificate_rerender, "render_in_worker", render)
+    monkeypatch.setattr(certificate_rerender, "RERENDER_BATCH_SIZE", 3)
+    return rendered
+
+
+def add_job(session, **values):
+    job = CertificateRerenderJob(status=ImportJobStatus.pending.value, **values)
+    session.add(job)
+    session.commit()
+    return job.job_id
+
+
+def get_history(session, history_id):
+    session.expire_all()
+    return session.get(UserHistory, history_id)
+
+
+def test_certificate_pages_walk_history_ids_in_order(session, history_ids):
+    ready_ids, pending_id = history_ids
+    repository = HistoryRepository(session)
+
+    walked, checkpoint = [], None
+    while True:
+        page = repository.get_certificate_page(checkpoint, 2)
+        if not page:
+            break
+        assert len(page) <= 2
+        walked += [row[0] for row in page]
+        checkpoint = page[-1][0]
+
+    assert walked == sorted(walked)
+    assert len(walked) == len(set(walked))
+    assert [history_id for history_id in walked if history_id in ready_ids] == ready_ids
+    assert pending_id not in walked
+
+
+def test_job_renders_every_certificate_in_committed_batches(
+    session, history_ids, rendered
+):
+    ready_ids, pending_id = history_ids
+    job_id = add_job(session)
+
+    certificate_rerender.run_rerender_job(job_id)
+
+    session.expire_all()
+    job = session.get(CertificateRerenderJob, job_id)
+    assert job.status == ImportJobStatus.completed.value
+    assert job.rows_processed == job.total_rows >= HISTORIES
+    assert job.failed_count >= 1
+    assert f"History {ready_ids[3]}: template missing" in job.errors
+    assert job.last_history_id >= ready_ids[-1]
+    for n, history_id in enumerate(ready_ids):
+        expected = "old" if n == 3 else "new"
+        assert get_history(session, history_id).certificate.startswith(
+            f"certificates/{expected}-"
+        )
+    assert get_history(session, pending_id).certificate == (
+        f"certificates/old-{HISTORIES}.jpg"
+    )
+
+
+def test_job_resumes_after_its_checkpoint(
+    session, session_factory, history_ids, rendered
+):
+    ready_ids, _ = history_ids
+    job_id = add_job(
+        session,
+        status=ImportJobStatus.running.value,
+        last_history_id=ready_ids[4],
+        rows_processed=5,
+        total_rows=HISTORIES,
+    )
+    with CertificateUnitOfWork(session_factory) as unit_of_work:
+        unit_of_work.session.execute(
+            update(CertificateRerenderJob)
+            .where(CertificateRerenderJob.job_id == job_id)
+            .values(heartbeat_at=func.now() - timedelta(hours=1))
+        )
+
+    certificate_rerender.run_rerender_job(job_id)
+
+    assert get_history(session, ready_ids[4]).certificate.startswith(
+        "certificates/old-"
+    )
+    assert get_history(session, ready_ids[5]).certificate.startswith(
+        "certificates/new-"
+    )
+    assert rendered == [50, 60]
+
+
+def test_job_with_a_live_heartbeat_is_not_claimed(
+    session, session_factory, history_ids, rendered
+):
+    job_id = add_job(session)
+    with CertificateUnitOfWork(session_factory) as unit_of_work:
+        assert unit_of_work.certificate_job.claim(job_id, 300)
+
+    certificate_rerender.run_rerender_job(job_id)
+
+    assert rendered == []
+
+
+def test_record_batch_refuses_a_moved_checkpoint(session, session_factory, history_ids):
+    ready_ids, _ = history_ids
+    job_id = add_job(session)
+    with CertificateUnitOfWork(session_factory) as unit_of_work:
+        repository = unit_of_work.certificate_job
+        assert repository.record_batch(job_id, None, ready_ids[0], 1, 1, 0)
+        assert not repository.record_batch(job_id, None, ready_ids[1], 1, 1, 0)
+
+
+def test_only_one_job_can_be_active(session_factory, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(
+        mcq_services, "rerender_job_queue", SimpleNamespace(submit=submitted.append)
+    )
+    admin = SimpleNamespace(role="admin", user_id=None)
+    with CertificateUnitOfWork(session_factory) as unit_of_work:
+        for job in unit_of_work.certificate_job.get_all():
+            if job.status in (
+                ImportJobStatus.pending.value,
+                ImportJobStatus.running.value,
+            ):
+                unit_of_work.certificate_job.update(
+                    job.job_id, status=ImportJobStatus.completed.value
+                )
+
+    job = mcq_services.create_certificate_rerender_job(
+        CertificateUnitOfWork(session_factory), admin
+    )
+    with pytest.raises(HTTPException) as error:
+        mcq_services.create_certificate_rerender_job(
+            CertificateUnitOfWork(session_factory), admin
+        )
+
+    assert error.value.status_code == 409
+    assert submitted == [job.job_id]
@@ -0,0 +1,100 @@
+import random
+from uuid import uuid4
+
+import pytest
+
+from app.services.difficulty_index import (
+    DIFFICULTY_BUCKETS,
+    DifficultyIndex,
+    difficulty_bucket,
+    target_bucket,
+)
+
+
+@pytest.mark.parametrize(
+    "attempts, correct, bucket",
+    [
+        (0, 0, 2),
+        (98, 98, 0),
+        (98, 78, 1),
+        (98, 49, 2),
+        (98, 29, 3),
+        (98, 0, 4),
+        (1, 1, 1),
+        (1, 0, 3),
+    ],
+)
+def test_difficulty_bucket_smooths_the_correct_rate(attempts, correct, bucket):
+    assert difficulty_bucket(attempts, correct) == bucket
+
+
+@pytest.mark.parametrize(
+    "percentages, bucket",
+    [([], 2), ([0.0], 0), ([19.9], 0), ([20.0], 1), ([50.0, 70.0], 3), ([100.0], 4)],
+)
+def test_target_bucket_follows_recent_accuracy(percentages, bucket):
+    assert target_bucket(percentages) == bucket
+
+
+def make_index(sizes):
+    """Index with `sizes[b]` MCQs in bucket `b`, and the ids of each bucket."""
+    rows, ids = [], []
+    counters = [(98, 98), (98, 78), (98, 49), (98, 29), (98, 0)]
+    for bucket, size in enumerate(sizes):
+        bucket_ids = [uuid4() for _ in range(size)]
+        rows += [(mcq_id, *counters[bucket]) for mcq_id in bucket_ids]
+        ids.append(set(bucket_ids))
+    return DifficultyIndex(version=1, rows=rows), ids
+
+
+def test_rows_are_assigned_to_their_buckets():
+    index, ids = make_index([3, 1, 4, 0, 2])
+
+    assert len(index.buckets) == DIFFICULTY_BUCKETS
+    assert [set(bucket) for bucket in index.buckets] == ids
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sample_stays_in_a_bucket_that_is_large_enough(seed):
+    index, ids = make_index([10, 10, 10, 10, 10])
+
+    picked = index.sample(5, 3, random.Random(seed))
+
+    assert len(set(picked)) == 5
+    assert set(picked) <= ids[3]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sample_spills_into_neighbouring_buckets(seed):
+    index, ids = make_index([10, 2, 2, 2, 10])
+
+    picked = set(index.sample(6, 2, random.Random(seed)))
+
+    assert len(picked) == 6
+    assert ids[1] | ids[2] | ids[3] <= picked
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_sample_spills_past_empty_neighbours(seed):
+    index, ids = make_index([4, 0, 0, 0, 1])
+
+    picked = set(index.sample(3, 3, random.Random(seed)))
+
+    assert ids[4] <= picked
+    assert len(picked & ids[0]) == 2
+
+
+def test_sample_from_an_edge_bucket_only_spills_inward():
+    index, ids = make_index([1, 1, 1, 1, 1])
+
+    picked = index.sample(2, 0, random.Random(0))
+
+    assert set(picked) == ids[0] | ids[1]
+
+
+def test_sample_is_capped_at_the_index_size():
+    index, ids = make_index([1, 2, 0, 0, 1])
+
+    picked = index.sample(10, 2, random.Random(0))
+
+    assert sorted(picked) == sorted(set().union(*ids))
@@ -0,0 +1,146 @@
+from types import MappingProxyType, SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import MCQ
+from app.repositories.mcq_repository import McqRepository
+from app.schemas.mcq_schemas import AttemptedMcq
+from app.services.mcq_services import grade_answers
+from app.services.question_bank_cache import CachedMcq, QuestionBankSnapshot
+
+QUESTIONS = 50
+
+
+@pytest.fixture
+def session():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def make_snapshot(mcqs):
+    by_id = {mcq.mcq_id: mcq for mcq in mcqs}
+    return QuestionBankSnapshot(
+        type="python",
+        version=1,
+        mcq_ids=tuple(by_id),
+        mcqs=MappingProxyType(by_id),
+        ordinals=MappingProxyType({mcq_id: n for n, mcq_id in enumerate(by_id)}),
+    )
+
+
+class FakeMcqRepository:
+    def __init__(self, mcqs):
+        self.mcqs = {mcq.mcq_id: mcq for mcq in mcqs}
+        self.lookups = []
+
+    def get_answer_keys(self, mcq_ids):
+        mcq_ids = list(mcq_ids)
+        self.lookups.append(mcq_ids)
+        return [tuple(self.mcqs[mcq_id]) for mcq_id in mcq_ids if mcq_id in self.mcqs]
+
+
+def cached_mcq(correct_option="a"):
+    return CachedMcq(uuid4(), "python", "question", {"a": "1"}, correct_option)
+
+
+def test_snapshot_answers_are_graded_without_a_lookup():
+    mcqs = [cached_mcq("a"), cached_mcq("b")]
+    repository = FakeMcqRepository([])
+
+    graded = grade_answers(
+        SimpleNamespace(mcq=repository),
+        make_snapshot(mcqs),
+        [AttemptedMcq(mcq_id=mcq.mcq_id, user_answer="a") for mcq in mcqs],
+    )
+
+    assert [(mcq, answer, correct) for mcq, answer, correct in graded] == [
+        (mcqs[0], "a", True),
+        (mcqs[1], "a", False),
+    ]
+    assert repository.lookups == [[]]
+
+
+def test_uncached_answers_are_read_in_one_lookup():
+    cached, stored = cached_mcq(), [cached_mcq("c") for _ in range(3)]
+    repository = FakeMcqRepository(stored)
+
+    graded = grade_answers(
+        SimpleNamespace(mcq=repository),
+        make_snapshot([cached]),
+        [AttemptedMcq(mcq_id=mcq.mcq_id, user_answer="c") for mcq in [cached, *stored]],
+    )
+
+    assert repository.lookups == [[mcq.mcq_id for mcq in stored]]
+    assert [correct for _, _, correct in graded] == [False, True, True, True]
+
+
+def test_repeated_answers_are_graded_once_on_the_last_answer():
+    first, second = cached_mcq("b"), cached_mcq("a")
+    attempted = [
+        AttemptedMcq(mcq_id=first.mcq_id, user_answer="a"),
+        AttemptedMcq(mcq_id=second.mcq_id, user_answer="a"),
+        AttemptedMcq(mcq_id=first.mcq_id, user_answer="b"),
+    ]
+
+    graded = grade_answers(
+        SimpleNamespace(mcq=FakeMcqRepository([])),
+        make_snapshot([first, second]),
+        attempted,
+    )
+
+    assert graded == [(first, "b", True), (second, "a", True)]
+
+
+def test_unknown_mcq_is_not_found():
+    with pytest.raises(HTTPException) as error:
+        grade_answers(
+            SimpleNamespace(mcq=FakeMcqRepository([])),
+            None,
+            [AttemptedMcq(mcq_id=uuid4(), user_answer="a")],
+        )
+
+    assert error.value.status_code == 404
+
+
+def test_answer_keys_are_read_with_one_statement(session):
+    mcqs = [
+        MCQ(
+            type="grading_test",
+            question=f"grading question {n} {uuid4()}",
+            options={"a": "1", "b": "2", "c": "3", "d": "4"},
+            correct_option="abcd"[n % 4],
+        )
+        for n in range(QUESTIONS)
+    ]
+    session.add_all(mcqs)
+    session.flush()
+    attempted = [AttemptedMcq(mcq_id=mcq.mcq_id, user_answer="a") for mcq in mcqs]
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        graded = grade_answers(
+            SimpleNamespace(mcq=McqRepository(session)), None, attempted
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(graded) == QUESTIONS
+    assert sum(correct for _, _, correct in graded) == QUESTIONS // 4 + 1
+    assert len(statements) == 1
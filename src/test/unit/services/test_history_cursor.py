@@ -0,0 +1,152 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.mcq_schemas import HistorySortKey, SortOrder
+from app.services.mcq_services import (
+    decode_history_cursor,
+    encode_history_cursor,
+    view_history_of_submission_of_user,
+)
+
+
+def history(n=0):
+    return SimpleNamespace(
+        history_id=uuid4(),
+        user_id=uuid4(),
+        submission_id=uuid4(),
+        total_score=n,
+        percentage=n * 12.5,
+        total_attempts=8,
+        attempted_at=datetime(2026, 10, 1, 12, 30, 15, 123456) + timedelta(hours=n),
+        certificate=None,
+        certificate_status="ready",
+    )
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+
+@pytest.mark.parametrize("order", list(SortOrder))
+@pytest.mark.parametrize(
+    "sort_by, attribute",
+    [
+        (HistorySortKey.attempted_at, "attempted_at"),
+        (HistorySortKey.percentage, "percentage"),
+    ],
+)
+def test_cursor_round_trips_the_position(sort_by, attribute, order):
+    last = history(3)
+
+    cursor = encode_history_cursor(sort_by, order, last)
+
+    assert decode_history_cursor(cursor, sort_by, order) == (
+        getattr(last, attribute),
+        last.history_id,
+    )
+
+
+@pytest.mark.parametrize(
+    "sort_by, order",
+    [
+        (HistorySortKey.percentage, SortOrder.asc),
+        (HistorySortKey.attempted_at, SortOrder.desc),
+    ],
+)
+def test_cursor_issued_for_another_sort_is_rejected(sort_by, order):
+    cursor = encode_history_cursor(
+        HistorySortKey.attempted_at, SortOrder.asc, history()
+    )
+
+    with pytest.raises(HTTPException) as error:
+        decode_history_cursor(cursor, sort_by, order)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        "bm90IGpzb24=",
+        raw_cursor(["percentage", "asc", 50.0]),
+        raw_cursor(["percentage", "asc", "high", str(uuid4())]),
+        raw_cursor(["percentage", "asc", None, str(uuid4())]),
+        raw_cursor(["percentage", "asc", 50.0, "not a uuid"]),
+        raw_cursor({"sort": "percentage"}),
+        raw_cursor(7),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_history_cursor(cursor, HistorySortKey.percentage, SortOrder.asc)
+
+    assert error.value.status_code == 400
+
+
+def test_malformed_timestamp_is_rejected():
+    cursor = raw_cursor(["attempted_at", "desc", "yesterday", str(uuid4())])
+
+    with pytest.raises(HTTPException) as error:
+        decode_history_cursor(cursor, HistorySortKey.attempted_at, SortOrder.desc)
+
+    assert error.value.status_code == 400
+
+
+class FakeHistoryUnitOfWork:
+    def __init__(self, histories):
+        self.histories = histories
+        self.calls = []
+        self.history = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def get_page(self, user_id, sort_by, descending, after, limit):
+        self.calls.append((sort_by, descending, after, limit))
+        return self.histories[:limit]
+
+
+def test_next_cursor_points_after_the_last_history_of_a_full_page():
+    histories = [history(n) for n in range(3)]
+    unit_of_work = FakeHistoryUnitOfWork(histories)
+    user = SimpleNamespace(user_id=uuid4())
+
+    page = view_history_of_submission_of_user(
+        unit_of_work, user, HistorySortKey.percentage, SortOrder.desc, page_size=2
+    )
+
+    assert [item.history_id for item in page.data] == [
+        item.history_id for item in histories[:2]
+    ]
+    assert decode_history_cursor(
+        page.nextCursor, HistorySortKey.percentage, SortOrder.desc
+    ) == (histories[1].percentage, histories[1].history_id)
+    assert unit_of_work.calls == [("percentage", True, None, 3)]
+
+
+def test_last_page_has_no_next_cursor():
+    unit_of_work = FakeHistoryUnitOfWork([history(n) for n in range(2)])
+    cursor = encode_history_cursor(
+        HistorySortKey.attempted_at, SortOrder.asc, history()
+    )
+
+    page = view_history_of_submission_of_user(
+        unit_of_work,
+        SimpleNamespace(user_id=uuid4()),
+        page_size=2,
+        cursor=cursor,
+    )
+
+    assert len(page.data) == 2
+    assert page.nextCursor is None
+    assert unit_of_work.calls[0][2] is not None
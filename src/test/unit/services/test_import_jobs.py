@@ -0,0 +1,225 @@
+import csv
+import io
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, update
+from sqlalchemy.exc import OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import ImportJob, ImportJobStatus
+from app.repositories.import_job_repository import ImportJobRepository
+from app.services import import_jobs, mcq_services
+from app.services.aws_services import LocalImportFileStorage
+from app.services.mcq_import import REQUIRED_COLUMNS
+
+ROWS = 5
+
+
+@pytest.fixture
+def session():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    session = SessionLocal(bind=connection)
+    yield session
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+def add_job(session, **values):
+    job = ImportJob(filename="questions.csv", content_key="imports/test.csv", **values)
+    session.add(job)
+    session.flush()
+    return job.job_id
+
+
+def test_claim_skips_jobs_with_a_live_heartbeat(session):
+    repository = ImportJobRepository(session)
+    job_id = add_job(session, status=ImportJobStatus.pending.value)
+
+    assert repository.claim(job_id, 300)
+    assert not repository.claim(job_id, 300)
+    session.execute(
+        update(ImportJob)
+        .where(ImportJob.job_id == job_id)
+        .values(heartbeat_at=func.now() - timedelta(hours=1))
+    )
+    assert repository.get_resumable_ids(300) == [job_id]
+    assert repository.claim(job_id, 300)
+
+
+def test_record_chunk_and_heartbeat_refuse_moved_progress(session):
+    repository = ImportJobRepository(session)
+    job_id = add_job(session, status=ImportJobStatus.running.value)
+
+    assert repository.heartbeat(job_id, 0)
+    assert repository.record_chunk(job_id, 0, 2, 2, 0)
+    assert not repository.record_chunk(job_id, 0, 2, 2, 0)
+    assert not repository.heartbeat(job_id, 0)
+    assert repository.heartbeat(job_id, 2)
+    session.expire_all()
+    job = repository.get(job_id)
+    assert (job.rows_processed, job.added_count) == (2, 2)
+
+
+def csv_upload(rows=ROWS):
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(REQUIRED_COLUMNS)
+    for n in range(rows):
+        writer.writerow(["python", f"question {n}", "1", "2", "3", "4", "a"])
+    return io.BytesIO(text.getvalue().encode("utf-8"))
+
+
+class FakeImportUnitOfWork:
+    """One import job whose stored progress another worker can move."""
+
+    def __init__(self, rows_processed=0, lost_at=None):
+        self.job = SimpleNamespace(
+            content=None,
+            content_key="imports/job.csv",
+            created_by=None,
+            rows_processed=rows_processed,
+            filename="questions.csv",
+            near_duplicate_mode="off",
+        )
+        self.lost_at = lost_at
+        self.heartbeats = 0
+        self.ingested = []
+        self.chunks = []
+        self.updates = []
+        self.import_job = self.mcq = self.category = self
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def claim(self, job_id, stale_seconds):
+        return True
+
+    def get_with_content(self, job_id):
+        return self.job
+
+    def get_all(self):
+        return [SimpleNamespace(name="python")]
+
+    def heartbeat(self, job_id, rows_processed):
+        self.heartbeats += 1
+        return self.lost_at != "validation"
+
+    def bulk_ingest(self, payloads, near_duplicates, threshold):
+        self.ingested += [payload["question"] for payload in payloads]
+        return len(payloads), 0, []
+
+    def record_chunk(self, job_id, start, stop, added, skipped, near_duplicates=0):
+        if start == self.lost_at:
+            return False
+        self.chunks.append((start, stop))
+        return True
+
+    def update(self, job_id, **values):
+        self.updates.append(values)
+
+
+@pytest.fixture
+def storage(monkeypatch, tmp_path):
+    storage = LocalImportFileStorage(str(tmp_path))
+    storage.save("imports/job.csv", csv_upload())
+    monkeypatch.setattr(import_jobs, "import_file_storage", storage)
+    monkeypatch.setattr(import_jobs, "IMPORT_JOB_CHUNK_ROWS", 2)
+    monkeypatch.setattr(
+        import_jobs, "question_bank_cache", SimpleNamespace(invalidate=lambda: None)
+    )
+    return tmp_path
+
+
+def run(monkeypatch, unit_of_work):
+    monkeypatch.setattr(import_jobs, "McqUnitOfWork", unit_of_work)
+    import_jobs.run_import_job(uuid4())
+
+
+def test_job_resumes_after_the_rows_it_processed(monkeypatch, storage):
+    unit_of_work = FakeImportUnitOfWork(rows_processed=2)
+
+    run(monkeypatch, unit_of_work)
+
+    assert unit_of_work.ingested == ["question 2", "question 3", "question 4"]
+    assert unit_of_work.chunks == [(2, 4), (4, 5)]
+    assert unit_of_work.updates[-1] == {"status": ImportJobStatus.completed.value}
+    assert not (storage / "imports" / "job.csv").exists()
+
+
+def test_validation_sends_a_heartbeat_per_chunk(monkeypatch, storage):
+    unit_of_work = FakeImportUnitOfWork()
+
+    run(monkeypatch, unit_of_work)
+
+    assert unit_of_work.heartbeats == 3
+    assert unit_of_work.updates[0] == {"total_rows": ROWS}
+
+
+@pytest.mark.parametrize("lost_at", ["validation", 2])
+def test_lost_job_stops_without_failing(monkeypatch, storage, lost_at):
+    unit_of_work = FakeImportUnitOfWork(lost_at=lost_at)
+
+    run(monkeypatch, unit_of_work)
+
+    assert unit_of_work.chunks == ([] if lost_at == "validation" else [(0, 2)])
+    assert all("errors" not in values for values in unit_of_work.updates)
+    assert ImportJobStatus.completed.value not in [
+        values.get("status") for values in unit_of_work.updates
+    ]
+    assert (storage / "imports" / "job.csv").exists()
+
+
+class FakeJobUnitOfWork:
+    def __init__(self):
+        self.added = []
+        self.import_job = self
+        self.session = SimpleNamespace(flush=lambda: None, refresh=self.refresh)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add(self, job):
+        self.added.append(job)
+
+    def refresh(self, job):
+        job.rows_processed = job.added_count = job.skipped_count = 0
+        job.near_duplicate_count = 0
+
+
+def test_upload_is_streamed_to_storage_not_into_the_row(monkeypatch, tmp_path):
+    submitted = []
+    monkeypatch.setattr(
+        mcq_services, "import_file_storage", LocalImportFileStorage(str(tmp_path))
+    )
+    monkeypatch.setattr(
+        mcq_services, "import_job_queue", SimpleNamespace(submit=submitted.append)
+    )
+    unit_of_work = FakeJobUnitOfWork()
+    upload = SimpleNamespace(filename="questions.csv", file=csv_upload())
+
+    job = mcq_services.create_import_job(
+        unit_of_work, upload, SimpleNamespace(role="admin", user_id=None)
+    )
+
+    (added,) = unit_of_work.added
+    assert added.content is None
+    assert added.content_key == f"imports/{job.job_id}.csv"
+    assert (tmp_path / added.content_key).read_bytes() == csv_upload().getvalue()
+    assert submitted == [job.job_id]
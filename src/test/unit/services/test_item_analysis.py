@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services import item_analysis
+
+
+class FakeItemStatsUnitOfWork:
+    """Streams fixed response chunks and keeps the rows that replace `mcq_stats`."""
+
+    def __init__(self, mcq_ids, rows):
+        self.mcq_ids = mcq_ids
+        self.rows = np.array(rows, dtype=float)
+        self.chunk_sizes = []
+        self.replaced = None
+        self.item_stats = self
+        self.session = SimpleNamespace(connection=lambda execution_options: None)
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def get_item_ids(self):
+        return self.mcq_ids
+
+    def stream_responses(self, chunk_rows):
+        for start in range(0, len(self.rows), chunk_rows):
+            self.chunk_sizes.append(len(self.rows[start : start + chunk_rows]))
+            yield self.rows[start : start + chunk_rows]
+
+    def replace_all(self, rows):
+        self.replaced = rows
+
+
+def test_run_stores_the_statistics_of_answered_mcqs(monkeypatch):
+    mcq_ids = [uuid4() for _ in range(3)]
+    # (item, option, correct, score, attempts) of three two-question
+    # submissions; the last MCQ was never answered.
+    unit_of_work = FakeItemStatsUnitOfWork(
+        mcq_ids,
+        [
+            (0, 0, 1, 2, 2),
+            (1, 1, 1, 2, 2),
+            (0, 0, 1, 1, 2),
+            (1, 2, 0, 1, 2),
+            (0, 3, 0, 0, 2),
+            (1, 2, 0, 0, 2),
+        ],
+    )
+    monkeypatch.setattr(item_analysis, "McqUnitOfWork", unit_of_work)
+
+    assert item_analysis.run_item_analysis(chunk_rows=4) == 2
+
+    assert unit_of_work.chunk_sizes == [4, 2]
+    first, second = unit_of_work.replaced
+    assert first["mcq_id"] == mcq_ids[0]
+    assert first["responses"] == 3
+    assert first["difficulty"] == pytest.approx(2 / 3)
+    assert first["discrimination"] == pytest.approx(0.5)
+    assert first["option_counts"] == {"a": 2, "b": 0, "c": 0, "d": 1}
+    assert second["mcq_id"] == mcq_ids[1]
+    assert second["difficulty"] == pytest.approx(1 / 3)
+    assert second["option_counts"] == {"a": 0, "b": 1, "c": 2, "d": 0}
+
+
+def test_undefined_statistics_are_stored_as_null(monkeypatch):
+    unit_of_work = FakeItemStatsUnitOfWork(
+        [uuid4()], [(0, 0, 1, 1, 1), (0, 0, 1, 1, 1)]
+    )
+    monkeypatch.setattr(item_analysis, "McqUnitOfWork", unit_of_work)
+
+    item_analysis.run_item_analysis(chunk_rows=10)
+
+    (row,) = unit_of_work.replaced
+    assert (row["responses"], row["difficulty"], row["discrimination"]) == (
+        2,
+        1.0,
+        None,
+    )
@@ -0,0 +1,256 @@
+import random
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.services.leaderboard import (
+    REFRESH_OVERLAP,
+    Leaderboard,
+    LeaderboardCache,
+    LeaderboardEntry,
+    StatsChanges,
+    entry_from_stats,
+)
+
+UPDATED_AT = datetime(2026, 10, 1, 12, 0, 0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeStats:
+    """
+    `user_stats` rows of several users and their removals, read the way
+    `load_changed_stats` does.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.removals = {}
+        self.calls = []
+
+    def write(self, user_id, type_, attempts, percentage_sum, best, updated_at):
+        self.rows[(user_id, type_)] = (
+            user_id,
+            type_,
+            attempts,
+            percentage_sum,
+            best,
+            updated_at,
+        )
+
+    def remove(self, user_id, type_, removed_at):
+        del self.rows[(user_id, type_)]
+        self.removals[(user_id, type_)] = removed_at
+
+    def __call__(self, since):
+        self.calls.append(since)
+        rows = [row for row in self.rows.values() if since is None or row[5] > since]
+        removed = []
+        if since is not None:
+            for (user_id, type_), removed_at in self.removals.items():
+                if removed_at > since:
+                    row = self.rows.get((user_id, type_), (None,) * 6)
+                    removed.append((user_id, type_, removed_at, *row[2:5]))
+        return StatsChanges(rows, removed)
+
+
+def oracle_ranking(entries):
+    return sorted(entries.values(), key=lambda entry: entry.key)
+
+
+def make_cache(tmp_path=None, clock=None):
+    return LeaderboardCache(
+        refresh_seconds=5,
+        snapshot_path=str(tmp_path / "leaderboard.json") if tmp_path else "",
+        snapshot_seconds=300,
+        clock=clock or FakeClock(),
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_board_matches_a_sorted_list_of_entries(seed):
+    rng = random.Random(seed)
+    user_ids = [uuid4() for _ in range(60)]
+    board, entries = Leaderboard(), {}
+    for _ in range(600):
+        user_id = rng.choice(user_ids)
+        current = entries.get(user_id)
+        attempts = (current.attempts if current else 0) + rng.choice([-1, 1, 2])
+        entry = LeaderboardEntry(
+            user_id, rng.choice([40.0, 50.0, 75.0, 90.0]), rng.randint(0, 100), attempts
+        )
+
+        applied = board.set(entry)
+
+        assert applied == (current is None or attempts >= current.attempts)
+        if applied:
+            entries[user_id] = entry
+
+    ranking = oracle_ranking(entries)
+    assert board.top(len(ranking) + 5) == ranking
+    assert board.top(7) == ranking[:7]
+    for position, entry in enumerate(ranking):
+        assert board.rank(entry.user_id) == (position + 1, entry)
+    assert board.rank(uuid4()) is None
+
+
+def test_refresh_applies_rows_changed_since_the_watermark():
+    stats, clock = FakeStats(), FakeClock()
+    user_ids = [uuid4() for _ in range(4)]
+    for n, user_id in enumerate(user_ids):
+        stats.write(user_id, "python", 2, 100.0 + n, 50.0 + n, UPDATED_AT)
+    cache = make_cache(clock=clock)
+    cache.start(stats)
+
+    stats.write(user_ids[0], "python", 3, 300.0, 99.0, UPDATED_AT + timedelta(1))
+    stats.write(user_ids[1], "sql", 1, 10.0, 10.0, UPDATED_AT + timedelta(1))
+    cache.refresh(stats)
+    clock.now += 5
+    cache.refresh(stats)
+
+    assert stats.calls == [None, UPDATED_AT - REFRESH_OVERLAP]
+    top, total = cache.top("python", 10)
+    assert total == 4
+    assert [entry.user_id for entry in top] == [
+        user_ids[0],
+        user_ids[3],
+        user_ids[2],
+        user_ids[1],
+    ]
+    assert cache.rank("python", user_ids[0]) == (
+        1,
+        entry_from_stats(user_ids[0], 3, 300.0, 99.0),
+    )
+    assert cache.rank("sql", user_ids[1])[0] == 1
+    assert cache.rank("sql", user_ids[0]) is None
+    assert cache.watermark == UPDATED_AT + timedelta(1)
+
+
+def test_refresh_applies_removals_before_the_rows_that_replaced_them():
+    stats, clock = FakeStats(), FakeClock()
+    deleted, rebuilt, kept = uuid4(), uuid4(), uuid4()
+    for user_id in (deleted, rebuilt, kept):
+        stats.write(user_id, "python", 4, 360.0, 90.0, UPDATED_AT)
+    stats.write(deleted, "sql", 1, 80.0, 80.0, UPDATED_AT)
+    cache = make_cache(clock=clock)
+    cache.start(stats)
+
+    removed_at = UPDATED_AT + timedelta(1)
+    stats.remove(deleted, "python", removed_at)
+    stats.remove(deleted, "sql", removed_at)
+    stats.remove(rebuilt, "python", removed_at)
+    stats.write(rebuilt, "python", 2, 100.0, 60.0, removed_at)
+    cache.refresh(stats, force=True)
+
+    top, total = cache.top("python", 10)
+    assert total == 2
+    assert top == [
+        entry_from_stats(kept, 4, 360.0, 90.0),
+        entry_from_stats(rebuilt, 2, 100.0, 60.0),
+    ]
+    assert cache.rank("python", deleted) is None
+    assert cache.top("sql", 10) == ([], 0)
+    assert cache.stats()["types"] == 1
+    assert cache.stats()["removals_applied"] == 3
+    assert cache.watermark == removed_at
+
+
+def test_failed_refresh_is_counted_and_retried():
+    stats = FakeStats()
+    cache = make_cache()
+
+    def fail(since):
+        raise OSError("database is down")
+
+    cache.refresh(fail, force=True)
+    cache.refresh(stats, force=True)
+
+    assert cache.stats()["errors"] == 1
+    assert cache.loaded
+
+
+def test_refresh_does_not_write_a_snapshot(tmp_path):
+    stats, clock = FakeStats(), FakeClock()
+    stats.write(uuid4(), "python", 1, 50.0, 50.0, UPDATED_AT)
+    cache = make_cache(tmp_path, clock)
+    cache.refresh(stats, force=True)
+
+    clock.now += 10_000
+    cache.refresh(stats)
+
+    assert cache.snapshots_written == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_snapshot_round_trips_the_boards(tmp_path):
+    stats = FakeStats()
+    for n in range(20):
+        stats.write(uuid4(), "python", n + 1, n * 7.0, n % 5 * 20.0, UPDATED_AT)
+    cache = make_cache(tmp_path)
+    cache.refresh(stats, force=True)
+
+    cache.save_snapshot()
+    cache.save_snapshot()
+    restored = make_cache(tmp_path)
+
+    assert restored.load_snapshot()
+    assert restored.top("python", 100) == cache.top("python", 100)
+    assert restored.watermark == UPDATED_AT
+    assert [path.name for path in tmp_path.iterdir()] == ["leaderboard.json"]
+
+
+def test_failed_snapshot_leaves_the_previous_one(tmp_path, monkeypatch):
+    stats = FakeStats()
+    stats.write(uuid4(), "python", 1, 50.0, 50.0, UPDATED_AT)
+    cache = make_cache(tmp_path)
+    cache.refresh(stats, force=True)
+    cache.save_snapshot()
+    previous = (tmp_path / "leaderboard.json").read_text()
+    stats.write(uuid4(), "python", 1, 90.0, 90.0, UPDATED_AT + timedelta(1))
+    cache.refresh(stats, force=True)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("app.services.leaderboard.json.dump", fail)
+    with pytest.raises(OSError):
+        cache.save_snapshot()
+
+    assert [path.name for path in tmp_path.iterdir()] == ["leaderboard.json"]
+    assert (tmp_path / "leaderboard.json").read_text() == previous
+
+
+def test_removals_after_a_snapshot_apply_on_restart(tmp_path):
+    stats = FakeStats()
+    user_ids = [uuid4() for _ in range(3)]
+    for user_id in user_ids:
+        stats.write(user_id, "python", 1, 50.0, 50.0, UPDATED_AT)
+    cache = make_cache(tmp_path)
+    cache.refresh(stats, force=True)
+    cache.save_snapshot()
+
+    stats.remove(user_ids[0], "python", UPDATED_AT + timedelta(1))
+    restored = make_cache(tmp_path)
+    restored.start(stats)
+
+    assert restored.stats()["snapshot_loaded"]
+    assert restored.rank("python", user_ids[0]) is None
+    assert restored.top("python", 10)[1] == 2
+
+
+@pytest.mark.parametrize(
+    "content", ["not json", '{"version": 0, "boards": {}, "watermark": null}']
+)
+def test_unreadable_snapshot_is_ignored(tmp_path, content):
+    (tmp_path / "leaderboard.json").write_text(content)
+    cache = make_cache(tmp_path)
+
+    assert not cache.load_snapshot()
+    assert cache.top("python", 10) == ([], 0)
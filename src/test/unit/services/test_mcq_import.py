@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import random
+from uuid import uuid4
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from app.services.mcq_import import (
+    REQUIRED_COLUMNS,
+    build_mcq_payloads,
+    find_missing_columns,
+    iter_mcq_chunks,
+    open_mcq_sheet,
+    validate_mcq_file,
+    validate_mcq_frame,
+)
+
+
+def row_loop_validate(frame):
+    """The per-row check the column-wise masks replaced."""
+    invalid_entries = []
+    for index, row in frame.iterrows():
+        for column in REQUIRED_COLUMNS:
+            if row[column] == "" or (
+                column == "correct_option" and row[column] not in ["a", "b", "c", "d"]
+            ):
+                invalid_entries.append(f"Row {index + 2}, Column '{column}'")
+    return invalid_entries
+
+
+def make_frame(rows, index=None, extra_columns=()):
+    columns = list(extra_columns) + REQUIRED_COLUMNS
+    data = [[f"extra {n}" for n in extra_columns] + row for row in rows]
+    return pd.DataFrame(data, columns=columns, index=index)
+
+
+def valid_row(n):
+    return ["python", f"question {n}", "1", "2", "3", "4", "abcd"[n % 4]]
+
+
+def test_valid_frame_has_no_invalid_entries():
+    assert validate_mcq_frame(make_frame([valid_row(n) for n in range(5)])) == []
+
+
+def test_invalid_cells_are_reported_in_row_major_order():
+    rows = [valid_row(n) for n in range(3)]
+    rows[0][6] = "e"
+    rows[1][2] = ""
+    rows[1][6] = ""
+    rows[2][0] = ""
+
+    assert validate_mcq_frame(make_frame(rows)) == [
+        "Row 2, Column 'correct_option'",
+        "Row 3, Column 'option A'",
+        "Row 3, Column 'correct_option'",
+        "Row 4, Column 'category'",
+    ]
+
+
+def test_unregistered_categories_are_invalid_when_categories_are_given():
+    rows = [valid_row(n) for n in range(3)]
+    rows[1][0] = "golang"
+    frame = make_frame(rows)
+
+    assert validate_mcq_frame(frame) == []
+    assert validate_mcq_frame(frame, {"python"}) == ["Row 3, Column 'category'"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_masks_match_the_row_loop(seed):
+    rng = random.Random(seed)
+    rows = []
+    for n in range(200):
+        row = valid_row(n)
+        for column in range(len(row)):
+            if rng.random() < 0.05:
+                row[column] = ""
+        if rng.random() < 0.05:
+            row[6] = rng.choice(["A", "e", " a", "ab"])
+        rows.append(row)
+    index = sorted(rng.sample(range(10_000), len(rows)))
+    frame = make_frame(rows, index=index, extra_columns=["explanation"])
+
+    assert validate_mcq_frame(frame) == row_loop_validate(frame)
+
+
+def test_missing_columns_keep_the_required_order():
+    assert find_missing_columns(["question", "category", "option D"]) == [
+        "option A",
+        "option B",
+        "option C",
+        "correct_option",
+    ]
+
+
+def test_payloads_are_built_from_the_columns():
+    created_by = uuid4()
+    frame = make_frame([valid_row(0), valid_row(1)], extra_columns=["explanation"])
+
+    assert build_mcq_payloads(frame, created_by) == [
+        {
+            "type": "python",
+            "question": f"question {n}",
+            "options": {"a": "1", "b": "2", "c": "3", "d": "4"},
+            "correct_option": "abcd"[n],
+            "created_by": created_by,
+        }
+        for n in range(2)
+    ]
+
+
+def sheet_rows():
+    """A header and five data rows, with blank rows after the first and third."""
+    rows = [valid_row(n) for n in range(5)]
+    rows[1][6] = "e"
+    rows[4][1] = ""
+    blank = [""] * len(REQUIRED_COLUMNS)
+    return [REQUIRED_COLUMNS, rows[0], blank, rows[1], rows[2], blank] + rows[3:]
+
+
+def xlsx_file(rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append([value or None for value in row])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def csv_file(rows):
+    text = io.StringIO()
+    csv.writer(text).writerows(rows)
+    return io.BytesIO(text.getvalue().encode("utf-8"))
+
+
+def jsonl_file(rows):
+    lines = [
+        json.dumps(dict(zip(rows[0], row))) if any(row) else "" for row in rows[1:]
+    ]
+    return io.BytesIO("\n".join(lines).encode("utf-8"))
+
+
+# Spreadsheet row numbers of the five data rows, the header being row 1.
+ROW_NUMBERS = [2, 4, 5, 7, 8]
+
+
+@pytest.mark.parametrize(
+    "make_file, filename",
+    [(xlsx_file, "mcqs.xlsx"), (csv_file, "mcqs.csv"), (jsonl_file, "mcqs.jsonl")],
+)
+@pytest.mark.parametrize("chunk_rows", [1, 2, 10])
+def test_streamed_chunks_keep_spreadsheet_row_numbers(make_file, filename, chunk_rows):
+    sheet = open_mcq_sheet(make_file(sheet_rows()), filename)
+    chunks = list(iter_mcq_chunks(sheet, chunk_rows))
+
+    assert sheet.columns == REQUIRED_COLUMNS
+    assert all(len(chunk) <= chunk_rows for chunk in chunks)
+    assert [label + 2 for chunk in chunks for label in chunk.index] == ROW_NUMBERS
+    assert [question for chunk in chunks for question in chunk["question"]] == [
+        "question 0",
+        "question 1",
+        "question 2",
+        "question 3",
+        "",
+    ]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 10])
+def test_chunked_validation_reports_whole_sheet_rows(chunk_rows):
+    report = validate_mcq_file(csv_file(sheet_rows()), "mcqs.csv", chunk_rows)
+
+    assert report.missing_columns == []
+    assert report.total_rows == 5
+    assert report.invalid_entries == [
+        "Row 4, Column 'correct_option'",
+        "Row 8, Column 'question'",
+    ]
+
+
+def test_skip_rows_resumes_after_the_non_blank_rows():
+    sheet = open_mcq_sheet(csv_file(sheet_rows()), "mcqs.csv")
+
+    chunks = list(iter_mcq_chunks(sheet, chunk_rows=2, skip_rows=2))
+
+    assert [label + 2 for chunk in chunks for label in chunk.index] == [5, 7, 8]
+
+
+def test_short_rows_are_padded_to_the_header():
+    rows = [REQUIRED_COLUMNS, valid_row(0)[:3]]
+    sheet = open_mcq_sheet(csv_file(rows), "mcqs.csv")
+
+    (chunk,) = iter_mcq_chunks(sheet)
+
+    assert chunk.iloc[0].tolist() == valid_row(0)[:3] + [""] * 4
+
+
+def test_validation_rewinds_the_file_and_reports_missing_columns():
+    file = csv_file([["category", "question"], ["python", "question 0"]])
+
+    report = validate_mcq_file(file, "mcqs.csv")
+
+    assert report.missing_columns == REQUIRED_COLUMNS[2:]
+    assert report.total_rows == 0
+    assert file.tell() == 0
@@ -0,0 +1,200 @@
+import time
+from threading import Event
+from uuid import uuid4
+
+import pytest
+
+from app.services.paper_pool import PaperPool, QuizPaper
+from app.services.question_bank_cache import QuestionBankCache
+
+
+class FakeGenerator:
+    """Draws papers stamped with the cache version, recording every call."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, type_, size):
+        self.calls.append((type_, size))
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return QuizPaper(
+            version=self.cache.version,
+            seed=len(self.calls),
+            mcq_ids=tuple(uuid4() for _ in range(size)),
+        )
+
+
+def wait_idle(pool, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        # The pools under test have one worker, so this no-op finishes after
+        # every task queued before it, including warms that queue refills.
+        pool._executor.submit(lambda: None).result(timeout)
+        if not pool._refilling and not pool._executor._work_queue.qsize():
+            return
+        assert time.monotonic() < deadline, "paper pool refill did not finish"
+
+
+@pytest.fixture
+def cache():
+    return QuestionBankCache(max_questions=100)
+
+
+@pytest.fixture
+def generate(cache):
+    return FakeGenerator(cache)
+
+
+@pytest.fixture
+def pool(cache, generate):
+    pool = PaperPool(generate=generate, depth=3, max_workers=1, cache=cache)
+    yield pool
+    pool._executor.shutdown(wait=True)
+
+
+def warm(pool, *keys):
+    pool.warm(lambda: list(keys))
+    wait_idle(pool)
+
+
+def test_take_serves_then_refills_the_pool(pool, generate):
+    warm(pool, ("python", 5))
+
+    assert generate.calls == [("python", 5)] * 3
+    paper = pool.take("python", 5)
+    wait_idle(pool)
+
+    assert paper is not None
+    assert len(paper.mcq_ids) == 5
+    assert generate.calls == [("python", 5)] * 4
+    stats = pool.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 0
+    assert stats["refills"] == 2
+
+
+def test_take_tops_up_only_the_missing_papers(pool, generate):
+    warm(pool, ("python", 5))
+    pool.take("python", 5)
+    pool.take("python", 5)
+    wait_idle(pool)
+
+    assert len(generate.calls) == 5
+    assert pool.stats()["depths"] == {"python:5": 3}
+
+
+def test_pools_are_kept_per_type_and_size(pool):
+    warm(pool, ("python", 5), ("python", 10))
+
+    assert len(pool.take("python", 10).mcq_ids) == 10
+    assert len(pool.take("python", 5).mcq_ids) == 5
+
+
+def test_keys_that_were_not_warmed_get_no_pool(pool, cache, generate):
+    warm(pool, ("python", 5))
+
+    for n in range(100):
+        assert pool.take(f"made-up-{n}", 5) is None
+        assert pool.take("python", 6 + n) is None
+    wait_idle(pool)
+    cache.invalidate()
+    wait_idle(pool)
+
+    assert set(generate.calls) == {("python", 5)}
+    stats = pool.stats()
+    assert stats["known_pools"] == 1
+    assert stats["depths"] == {"python:5": 3}
+    assert stats["misses"] == 200
+
+
+def test_invalidation_loads_the_keys_again(pool, cache):
+    keys = [("python", 5)]
+    pool.warm(lambda: list(keys))
+    wait_idle(pool)
+
+    keys[:] = [("sql", 5)]
+    cache.invalidate()
+    wait_idle(pool)
+
+    assert pool.stats()["depths"] == {"sql:5": 3}
+    assert pool.take("python", 5) is None
+    assert pool.take("sql", 5) is not None
+
+
+def test_warm_fills_pools_before_the_first_take(pool, generate):
+    pool.warm(lambda: [("python", 5), ("sql", 10)])
+    wait_idle(pool)
+
+    assert pool.stats()["depths"] == {"python:5": 3, "sql:10": 3}
+    assert pool.take("sql", 10) is not None
+    assert pool.stats()["misses"] == 0
+
+
+def test_warm_counts_a_failing_key_loader(pool):
+    def fail():
+        raise RuntimeError("database unavailable")
+
+    pool.warm(fail)
+    wait_idle(pool)
+
+    assert pool.stats()["refill_errors"] == 1
+    assert pool.stats()["known_pools"] == 0
+
+
+def test_invalidation_drops_and_rewarms_known_pools(pool, cache, generate):
+    pool.warm(lambda: [("python", 5)])
+    wait_idle(pool)
+    old = pool.take("python", 5)
+    wait_idle(pool)
+
+    cache.invalidate()
+    wait_idle(pool)
+
+    assert pool.stats()["depths"] == {"python:5": 3}
+    paper = pool.take("python", 5)
+    assert paper.version == cache.version != old.version
+    assert pool.stats()["version"] == cache.version
+
+
+def test_papers_drawn_before_an_invalidation_are_dropped(cache):
+    started, release = Event(), Event()
+
+    def generate(type_, size):
+        version = cache.version
+        started.set()
+        release.wait(5)
+        return QuizPaper(version=version, seed=0, mcq_ids=(uuid4(),))
+
+    pool = PaperPool(generate=generate, depth=1, max_workers=1, cache=cache)
+    try:
+        pool.warm(lambda: [("python", 1)])
+        started.wait(5)
+        cache.invalidate()
+        release.set()
+        wait_idle(pool)
+
+        paper = pool.take("python", 1)
+        assert paper is not None
+        assert paper.version == cache.version
+    finally:
+        release.set()
+        pool._executor.shutdown(wait=True)
+
+
+def test_refill_errors_are_counted(pool, generate):
+    generate.fail = True
+    warm(pool, ("python", 5))
+
+    assert pool.stats()["refill_errors"] == 1
+    assert pool.take("python", 5) is None
+
+
+def test_zero_depth_disables_the_pool(cache, generate):
+    pool = PaperPool(generate=generate, depth=0, max_workers=1, cache=cache)
+    pool.warm(lambda: [("python", 5)])
+
+    assert pool.take("python", 5) is None
+    assert generate.calls == []
@@ -0,0 +1,91 @@
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import pytest
+import requests
+from botocore.config import Config
+from moto import mock_aws
+
+from app.services.presigned_url_cache import PresignedUrlCache
+
+BUCKET = "certificates"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def s3():
+    with mock_aws():
+        client = boto3.client(
+            "s3", region_name="us-east-1", config=Config(signature_version="s3v4")
+        )
+        client.create_bucket(Bucket=BUCKET)
+        for key in ("a.png", "b.png", "c.png"):
+            client.put_object(Bucket=BUCKET, Key=key, Body=key.encode())
+        yield client
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_cache(s3, clock, **kwargs):
+    options = {"expires_in": 300, "margin": 60, "max_entries": 10}
+    options.update(kwargs)
+    return PresignedUrlCache(client=s3, clock=clock, **options)
+
+
+def test_returns_a_working_url_with_the_configured_expiry(s3, clock):
+    cache = make_cache(s3, clock, expires_in=120, margin=30)
+
+    url = cache.get_url(BUCKET, "a.png")
+
+    assert parse_qs(urlparse(url).query)["X-Amz-Expires"] == ["120"]
+    assert requests.get(url).content == b"a.png"
+
+
+def test_reuses_the_url_until_the_margin_before_expiry(s3, clock):
+    cache = make_cache(s3, clock)
+    url = cache.get_url(BUCKET, "a.png")
+
+    clock.now += 239
+    assert cache.get_url(BUCKET, "a.png") == url
+
+    clock.now += 1
+    cache.get_url(BUCKET, "a.png")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 1)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_evicts_the_least_recently_used_url(s3, clock):
+    cache = make_cache(s3, clock, max_entries=2)
+    cache.get_url(BUCKET, "a.png")
+    cache.get_url(BUCKET, "b.png")
+    cache.get_url(BUCKET, "a.png")
+    cache.get_url(BUCKET, "c.png")
+
+    cache.get_url(BUCKET, "a.png")
+    cache.get_url(BUCKET, "b.png")
+
+    stats = cache.stats()
+    assert stats["cached_urls"] == 2
+    assert stats["evictions"] == 2
+    assert (stats["hits"], stats["misses"]) == (2, 4)
+
+
+def test_does_not_cache_when_the_margin_covers_the_expiry(s3, clock):
+    cache = make_cache(s3, clock, expires_in=60, margin=60)
+
+    cache.get_url(BUCKET, "a.png")
+    cache.get_url(BUCKET, "a.png")
+
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["cached_urls"] == 0
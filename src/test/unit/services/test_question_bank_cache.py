@@ -0,0 +1,170 @@
+from uuid import uuid4
+
+import pytest
+
+from app.services.question_bank_cache import QuestionBankCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBank:
+    """Question bank of several types that counts how often it is read."""
+
+    def __init__(self, sizes):
+        self.rows = {
+            type_: [
+                (uuid4(), f"{type_} question {n}", {"a": "1", "b": "2"}, "a")
+                for n in range(size)
+            ]
+            for type_, size in sizes.items()
+        }
+        self.loads = []
+        self.counts = []
+        self.version = 0
+
+    def load(self, type_, limit):
+        self.loads.append(type_)
+        return self.rows.get(type_, [])[:limit]
+
+    def count(self, type_):
+        self.counts.append(type_)
+        return len(self.rows.get(type_, []))
+
+    def load_version(self):
+        return self.version
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_snapshot_is_loaded_once_and_served_until_invalidated():
+    bank = FakeBank({"python": 3})
+    cache = QuestionBankCache(max_questions=10)
+
+    first = cache.get_snapshot("python", bank.load)
+    second = cache.get_snapshot("python", bank.load)
+    cache.invalidate()
+    third = cache.get_snapshot("python", bank.load)
+
+    assert second is first
+    assert third is not first and third.version == first.version + 1
+    assert [mcq.question for mcq in first.mcqs.values()] == [
+        row[1] for row in bank.rows["python"]
+    ]
+    assert bank.loads == ["python", "python"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_types_are_evicted_past_the_bound():
+    bank = FakeBank({"python": 4, "java": 4, "csharp": 4})
+    cache = QuestionBankCache(max_questions=10)
+
+    cache.get_snapshot("python", bank.load)
+    cache.get_snapshot("java", bank.load)
+    cache.get_snapshot("python", bank.load)
+    cache.get_snapshot("csharp", bank.load)
+
+    stats = cache.stats()
+    assert stats["cached_types"] == ["python", "csharp"]
+    assert stats["cached_questions"] == 8
+    assert stats["evictions"] == 1
+
+
+def test_types_without_questions_are_not_cached():
+    bank = FakeBank({"python": 4})
+    cache = QuestionBankCache(max_questions=10)
+    cache.get_snapshot("python", bank.load)
+
+    for _ in range(1_000):
+        snapshot = cache.get_snapshot(f"random-{uuid4()}", bank.load)
+        assert snapshot is not None and not snapshot.mcq_ids
+
+    stats = cache.stats()
+    assert stats["cached_types"] == ["python"]
+    assert stats["evictions"] == 0
+    assert cache.get_snapshot("python", bank.load) is not None
+    assert bank.loads.count("python") == 1
+
+
+def test_oversized_type_is_rechecked_by_count_after_invalidation():
+    bank = FakeBank({"python": 11})
+    cache = QuestionBankCache(max_questions=10)
+
+    assert cache.get_snapshot("python", bank.load, bank.count) is None
+    assert cache.get_snapshot("python", bank.load, bank.count) is None
+    cache.invalidate()
+    assert cache.get_snapshot("python", bank.load, bank.count) is None
+    assert cache.get_snapshot("python", bank.load, bank.count) is None
+
+    assert bank.loads == ["python"]
+    assert bank.counts == ["python"]
+    assert cache.stats()["oversized_types"] == ["python"]
+
+
+def test_oversized_type_that_shrank_is_cached_again():
+    bank = FakeBank({"python": 11})
+    cache = QuestionBankCache(max_questions=10)
+    cache.get_snapshot("python", bank.load, bank.count)
+
+    del bank.rows["python"][0]
+    cache.invalidate()
+    snapshot = cache.get_snapshot("python", bank.load, bank.count)
+
+    assert snapshot is not None and len(snapshot.mcq_ids) == 10
+    assert cache.stats()["oversized_types"] == []
+
+
+def test_shared_version_change_invalidates_after_check_interval(clock):
+    bank = FakeBank({"python": 3})
+    cache = QuestionBankCache(
+        max_questions=10,
+        version_loader=bank.load_version,
+        check_seconds=1.0,
+        clock=clock,
+    )
+    first = cache.get_snapshot("python", bank.load)
+
+    bank.rows["python"][0] = (bank.rows["python"][0][0], "edited", {"a": "1"}, "b")
+    bank.version += 1
+    clock.now += 0.5
+    assert cache.get_snapshot("python", bank.load) is first
+
+    clock.now += 0.5
+    second = cache.get_snapshot("python", bank.load)
+    assert second is not first
+    assert second.mcqs[second.mcq_ids[0]].correct_option == "b"
+    assert cache.stats()["shared_version"] == 1
+
+
+def test_unchanged_shared_version_keeps_snapshots(clock):
+    bank = FakeBank({"python": 3})
+    cache = QuestionBankCache(
+        max_questions=10, version_loader=bank.load_version, clock=clock
+    )
+    first = cache.get_snapshot("python", bank.load)
+    clock.now += 5
+    assert cache.get_snapshot("python", bank.load) is first
+    assert cache.version == 0
+
+
+def test_failed_version_check_keeps_serving(clock):
+    bank = FakeBank({"python": 3})
+
+    def failing_loader():
+        raise ConnectionError("database is down")
+
+    cache = QuestionBankCache(
+        max_questions=10, version_loader=failing_loader, clock=clock
+    )
+    snapshot = cache.get_snapshot("python", bank.load)
+
+    assert snapshot is not None
+    assert cache.stats()["version_errors"] == 1
@@ -0,0 +1,149 @@
+import base64
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.data_models import Submission
+from app.schemas.mcq_schemas import AttemptedMcq, QuizMode, SubmissionInput
+from app.services import quiz_session
+from app.services.mcq_services import find_submitted_quiz
+from app.services.question_bank_cache import QuestionBankCache
+from app.services.quiz_session import QuizSession, decode_cursor, encode_cursor
+
+
+def make_quiz(questions=5, user_id=None):
+    return Submission(
+        submission_id=uuid4(),
+        user_id=user_id or uuid4(),
+        total_questions=questions,
+        type="python",
+        question_order=[str(uuid4()) for _ in range(questions)],
+    )
+
+
+class FakeSubmissions:
+    def __init__(self, *quizzes):
+        self.quizzes = list(quizzes)
+
+    def get(self, submission_id):
+        return next(
+            (quiz for quiz in self.quizzes if quiz.submission_id == submission_id),
+            None,
+        )
+
+    def get_all(self, user_id=None, sort_by=None, order=None):
+        return [quiz for quiz in reversed(self.quizzes) if quiz.user_id == user_id]
+
+
+def test_cursor_round_trip():
+    submission_id = uuid4()
+    assert decode_cursor(encode_cursor(submission_id, 20)) == (submission_id, 20)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"no-separator").decode(),
+        base64.urlsafe_b64encode(f"{uuid4()}:ten".encode()).decode(),
+        base64.urlsafe_b64encode(f"{uuid4()}:-5".encode()).decode(),
+    ],
+)
+def test_malformed_or_negative_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_page_ids_walk_the_stored_order():
+    quiz = QuizSession(make_quiz(questions=5))
+    assert quiz.page_ids(0, 2) == quiz.question_order[:2]
+    assert quiz.page_ids(4, 2) == quiz.question_order[4:]
+    assert quiz.next_cursor(2, 2) == encode_cursor(quiz.submission_id, 4)
+    assert quiz.next_cursor(4, 2) is None
+
+
+@pytest.mark.parametrize("offset", [5, 10_000])
+def test_offset_past_the_quiz_is_rejected(offset):
+    quiz = QuizSession(make_quiz(questions=5))
+    with pytest.raises(HTTPException) as error:
+        quiz.page_ids(offset, 2)
+    assert error.value.status_code == 400
+
+
+def test_submission_is_graded_against_the_quiz_it_names():
+    user_id = uuid4()
+    first, latest = make_quiz(user_id=user_id), make_quiz(user_id=user_id)
+    unit_of_work = SimpleNamespace(submission=FakeSubmissions(first, latest))
+    submission = SubmissionInput(
+        submissionId=first.submission_id,
+        attempted=[AttemptedMcq(mcq_id=first.question_order[0], user_answer="a")],
+    )
+    assert find_submitted_quiz(unit_of_work, submission, user_id) is first
+
+
+def test_submission_without_id_falls_back_to_the_latest_quiz():
+    user_id = uuid4()
+    first, latest = make_quiz(user_id=user_id), make_quiz(user_id=user_id)
+    unit_of_work = SimpleNamespace(submission=FakeSubmissions(first, latest))
+    submission = SubmissionInput(
+        attempted=[AttemptedMcq(mcq_id=latest.question_order[0], user_answer="a")]
+    )
+    assert find_submitted_quiz(unit_of_work, submission, user_id) is latest
+
+
+def test_answers_outside_the_quiz_paper_are_rejected():
+    user_id = uuid4()
+    first, latest = make_quiz(user_id=user_id), make_quiz(user_id=user_id)
+    unit_of_work = SimpleNamespace(submission=FakeSubmissions(first, latest))
+    submission = SubmissionInput(
+        submissionId=latest.submission_id,
+        attempted=[AttemptedMcq(mcq_id=first.question_order[0], user_answer="a")],
+    )
+    with pytest.raises(HTTPException) as error:
+        find_submitted_quiz(unit_of_work, submission, user_id)
+    assert error.value.status_code == 400
+
+
+def test_quiz_of_another_user_is_not_found():
+    quiz = make_quiz()
+    unit_of_work = SimpleNamespace(submission=FakeSubmissions(quiz))
+    submission = SubmissionInput(submissionId=quiz.submission_id, attempted=[])
+    with pytest.raises(HTTPException) as error:
+        find_submitted_quiz(unit_of_work, submission, uuid4())
+    assert error.value.status_code == 404
+
+
+class FakeCategories:
+    def __init__(self, *categories):
+        self.categories = [
+            SimpleNamespace(name=name, question_count=count)
+            for name, count in categories
+        ]
+
+    def get_all(self):
+        return self.categories
+
+
+class UntouchedPool:
+    def take(self, type_, size):
+        raise AssertionError("the paper pool must not be used")
+
+
+@pytest.mark.parametrize("mode", list(QuizMode))
+@pytest.mark.parametrize("type_", ["made-up", "empty"])
+def test_type_without_questions_is_rejected_before_any_lookup(monkeypatch, mode, type_):
+    cache = QuestionBankCache(max_questions=10)
+    monkeypatch.setattr(quiz_session, "question_bank_cache", cache)
+    monkeypatch.setattr(quiz_session, "paper_pool", UntouchedPool())
+    unit_of_work = SimpleNamespace(
+        category=FakeCategories(("python", 3), ("empty", 0)), mcq=None, history=None
+    )
+
+    with pytest.raises(HTTPException) as error:
+        QuizSession.start(unit_of_work, type_, 10, uuid4(), mode)
+
+    assert error.value.status_code == 404
+    assert cache.stats()["cached_types"] == []
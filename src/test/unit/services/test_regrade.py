@@ -0,0 +1,380 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, update
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from app.config.database import SessionLocal, engine
+from app.models.data_models import (
+    MCQ,
+    ImportJobStatus,
+    MCQAnswerCounts,
+    RegradeJob,
+    Submission,
+    User,
+    UserHistory,
+    UserHistoryDetail,
+    UserRole,
+    UserStats,
+)
+from app.repositories.history_details_repository import HistoryDetailsRepository
+from app.repositories.mcq_repository import McqRepository
+from app.services import mcq_services, regrade
+from app.services.unit_of_work import RegradeUnitOfWork
+
+HISTORIES = 7
+
+
+@pytest.fixture
+def connection():
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"Database is not reachable: {e}")
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def session_factory(connection):
+    """Sessions whose commits are savepoints of the test's transaction."""
+
+    def factory():
+        session = SessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+        try:
+            yield session
+        finally:
+            session.close()
+
+    return factory
+
+
+@pytest.fixture
+def session(session_factory):
+    return next(session_factory())
+
+
+@pytest.fixture
+def bank(session):
+    """
+    Two MCQs keyed "a", answered "b" to the first and "a" to the second by
+    histories of two users, then the first MCQ's key is fixed to "b".
+    """
+    users = []
+    for _ in range(2):
+        user = User(
+            username=f"regrade-{uuid4()}",
+            email=f"{uuid4()}@example.com",
+            password="test",
+            role=UserRole.user,
+        )
+        session.add(user)
+        users.append(user)
+    mcqs = [
+        MCQ(
+            type="regrade_test",
+            question=f"regrade question {n} {uuid4()}",
+            options={"a": "1", "b": "2"},
+            correct_option="a",
+        )
+        for n in range(2)
+    ]
+    session.add_all(mcqs)
+    session.flush()
+    session.add_all(
+        [
+            MCQAnswerCounts(
+                mcq_id=mcq.mcq_id,
+                attempt_count=HISTORIES,
+                correct_count=HISTORIES * n,
+            )
+            for n, mcq in enumerate(mcqs)
+        ]
+    )
+    history_ids = sorted(uuid4() for _ in range(HISTORIES))
+    for n, history_id in enumerate(history_ids):
+        user_id = users[n % 2].user_id
+        submission = Submission(user_id=user_id, total_questions=2, type="regrade_test")
+        session.add(submission)
+        session.flush()
+        session.add(
+            UserHistory(
+                history_id=history_id,
+                user_id=user_id,
+                submission_id=submission.submission_id,
+                total_score=1,
+                percentage=50,
+                total_attempts=2,
+            )
+        )
+        session.flush()
+        session.add_all(
+            [
+                UserHistoryDetail(
+                    history_id=history_id,
+                    mcq_id=mcqs[0].mcq_id,
+                    user_answer="b",
+                    is_correct=False,
+                ),
+                UserHistoryDetail(
+                    history_id=history_id,
+                    mcq_id=mcqs[1].mcq_id,
+                    user_answer="a",
+                    is_correct=True,
+                ),
+            ]
+        )
+    session.flush()
+    mcqs[0].correct_option = "b"
+    session.commit()
+    return SimpleNamespace(
+        mcq_ids=[mcq.mcq_id for mcq in mcqs],
+        history_ids=history_ids,
+        user_ids=[user.user_id for user in users],
+    )
+
+
+@pytest.fixture
+def batches(monkeypatch, session_factory):
+    """Run regrade jobs in batches of 3 against the test transaction."""
+    monkeypatch.setattr(
+        regrade, "RegradeUnitOfWork", lambda: RegradeUnitOfWork(session_factory)
+    )
+    monkeypatch.setattr(regrade, "REGRADE_BATCH_SIZE", 3)
+
+
+def add_job(session, mcq_ids, **values):
+    values.setdefault("status", ImportJobStatus.pending.value)
+    job = RegradeJob(mcq_ids=mcq_ids, **values)
+    session.add(job)
+    session.commit()
+    return job.job_id
+
+
+def get_history(session, history_id):
+    session.expire_all()
+    return session.get(UserHistory, history_id)
+
+
+def test_regrade_pages_walk_history_ids_in_order(session, bank):
+    repository = HistoryDetailsRepository(session)
+
+    walked, checkpoint = [], None
+    while True:
+        page = repository.get_regrade_page(bank.mcq_ids, checkpoint, 2)
+        if not page:
+            break
+        assert len(page) <= 2
+        walked += page
+        checkpoint = page[-1]
+
+    assert [str(history_id) for history_id in walked] == [
+        str(history_id) for history_id in bank.history_ids
+    ]
+
+
+def test_job_regrades_every_answer_in_committed_batches(session, bank, batches):
+    job_id = add_job(session, [bank.mcq_ids[0]])
+
+    regrade.run_regrade_job(job_id)
+
+    session.expire_all()
+    job = session.get(RegradeJob, job_id)
+    assert job.status == ImportJobStatus.completed.value
+    assert (job.details_changed, job.histories_changed) == (HISTORIES, HISTORIES)
+    # Users alternate between histories, so the batches of 3, 3 and 1
+    # histories rebuild 2, 2 and 1 users.
+    assert job.users_changed == 5
+    assert str(job.last_history_id) == str(bank.history_ids[-1])
+    for history_id in bank.history_ids:
+        history = get_history(session, history_id)
+        assert (history.total_score, history.percentage) == (2, 100)
+    for mcq_id in bank.mcq_ids:
+        assert session.get(MCQAnswerCounts, mcq_id).correct_count == HISTORIES
+    stats = session.get(UserStats, (str(bank.user_ids[0]), "regrade_test"))
+    assert stats.best_percentage == 100
+
+
+def test_job_resumes_after_its_checkpoint(session, session_factory, bank, batches):
+    job_id = add_job(
+        session,
+        [bank.mcq_ids[0]],
+        status=ImportJobStatus.running.value,
+        last_history_id=bank.history_ids[3],
+    )
+    with RegradeUnitOfWork(session_factory) as unit_of_work:
+        unit_of_work.session.execute(
+            update(RegradeJob)
+            .where(RegradeJob.job_id == job_id)
+            .values(heartbeat_at=func.now() - timedelta(hours=1))
+        )
+
+    regrade.run_regrade_job(job_id)
+
+    assert get_history(session, bank.history_ids[3]).total_score == 1
+    assert get_history(session, bank.history_ids[4]).total_score == 2
+    job = session.get(RegradeJob, job_id)
+    assert (job.status, job.histories_changed) == (
+        ImportJobStatus.completed.value,
+        HISTORIES - 4,
+    )
+
+
+def test_job_with_a_live_heartbeat_is_not_claimed(
+    session, session_factory, bank, batches
+):
+    job_id = add_job(session, [bank.mcq_ids[0]])
+    with RegradeUnitOfWork(session_factory) as unit_of_work:
+        assert unit_of_work.regrade_job.claim(job_id, 300)
+
+    regrade.run_regrade_job(job_id)
+
+    assert get_history(session, bank.history_ids[0]).total_score == 1
+
+
+def test_record_batch_refuses_a_moved_checkpoint(session, session_factory, bank):
+    job_id = add_job(session, [bank.mcq_ids[0]])
+    with RegradeUnitOfWork(session_factory) as unit_of_work:
+        repository = unit_of_work.regrade_job
+        assert repository.record_batch(job_id, None, bank.history_ids[0], 1, 1, 1)
+        assert not repository.record_batch(job_id, None, bank.history_ids[1], 1, 1, 1)
+
+
+def test_creating_a_job_bumps_the_shared_question_bank_version(
+    session, session_factory, bank, monkeypatch
+):
+    submitted = []
+    monkeypatch.setattr(
+        mcq_services, "regrade_job_queue", SimpleNamespace(submit=submitted.append)
+    )
+    admin = SimpleNamespace(role="admin", user_id=None)
+    version = McqRepository(session).get_question_bank_version()
+
+    job = mcq_services.create_regrade_job(
+        RegradeUnitOfWork(session_factory), [bank.mcq_ids[0]], admin
+    )
+
+    session.expire_all()
+    assert McqRepository(session).get_question_bank_version() == version + 1
+    assert submitted == [job.job_id]
+
+
+class FakeRegradeUnitOfWork:
+    """Pages of history ids from a list, with a job whose checkpoint can move."""
+
+    def __init__(self, history_ids, lost_at=None, errors=()):
+        self.history_ids = history_ids
+        self.lost_at = lost_at
+        self.errors = list(errors)
+        self.job = SimpleNamespace(mcq_ids=["mcq"], last_history_id=None)
+        self.batches = []
+        self.updates = []
+        self.regrade_job = self.history_details = self.history = self
+        self.user_stats = self
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def claim(self, job_id, stale_seconds):
+        return True
+
+    def get(self, job_id):
+        return self.job
+
+    def lock(self):
+        pass
+
+    def get_regrade_page(self, mcq_ids, after_id, limit):
+        start = self.history_ids.index(after_id) + 1 if after_id else 0
+        return self.history_ids[start : start + limit]
+
+    def regrade(self, mcq_ids, history_ids):
+        if self.errors:
+            raise self.errors.pop(0)
+        return len(history_ids), history_ids
+
+    def rescore(self, history_ids):
+        return [f"user-{history_id % 2}" for history_id in history_ids]
+
+    def rebuild_users(self, user_ids, window):
+        pass
+
+    def record_batch(self, job_id, checkpoint, last_history_id, *counts):
+        if self.lost_at is not None and checkpoint == self.lost_at:
+            return False
+        self.batches.append((checkpoint, last_history_id, counts))
+        return True
+
+    def update(self, job_id, **values):
+        self.updates.append(values)
+
+
+def test_checkpoint_moves_past_each_batch(monkeypatch):
+    unit_of_work = FakeRegradeUnitOfWork(list(range(1, 8)))
+    monkeypatch.setattr(regrade, "RegradeUnitOfWork", unit_of_work)
+    monkeypatch.setattr(regrade, "REGRADE_BATCH_SIZE", 3)
+
+    regrade.run_regrade_job(uuid4())
+
+    assert unit_of_work.batches == [
+        (None, 3, (3, 3, 2)),
+        (3, 6, (3, 3, 2)),
+        (6, 7, (1, 1, 1)),
+    ]
+    assert unit_of_work.updates == [{"status": ImportJobStatus.completed.value}]
+
+
+def test_lost_job_stops_without_failing(monkeypatch):
+    unit_of_work = FakeRegradeUnitOfWork(list(range(1, 8)), lost_at=3)
+    monkeypatch.setattr(regrade, "RegradeUnitOfWork", unit_of_work)
+    monkeypatch.setattr(regrade, "REGRADE_BATCH_SIZE", 3)
+
+    regrade.run_regrade_job(uuid4())
+
+    assert unit_of_work.batches == [(None, 3, (3, 3, 2))]
+    assert unit_of_work.updates == []
+
+
+def database_error(pgcode):
+    orig = Exception("could not serialize access")
+    orig.pgcode = pgcode
+    return DBAPIError("UPDATE user_history_details", {}, orig)
+
+
+def test_batch_aborted_by_a_deadlock_is_retried(monkeypatch):
+    unit_of_work = FakeRegradeUnitOfWork(
+        list(range(1, 5)), errors=[database_error("40P01"), database_error("40001")]
+    )
+    monkeypatch.setattr(regrade, "RegradeUnitOfWork", unit_of_work)
+    monkeypatch.setattr(regrade, "REGRADE_BATCH_SIZE", 3)
+
+    regrade.run_regrade_job(uuid4())
+
+    assert [batch[:2] for batch in unit_of_work.batches] == [(None, 3), (3, 4)]
+    assert unit_of_work.updates == [{"status": ImportJobStatus.completed.value}]
+
+
+@pytest.mark.parametrize("pgcode, retries", [("23505", 3), ("40P01", 0)])
+def test_other_errors_and_exhausted_retries_fail_the_job(monkeypatch, pgcode, retries):
+    unit_of_work = FakeRegradeUnitOfWork(
+        list(range(1, 5)), errors=[database_error(pgcode)]
+    )
+    monkeypatch.setattr(regrade, "RegradeUnitOfWork", unit_of_work)
+    monkeypatch.setattr(regrade, "REGRADE_RETRIES", retries)
+
+    regrade.run_regrade_job(uuid4())
+
+    assert unit_of_work.batches == []
+    assert unit_of_work.updates[0]["status"] == ImportJobStatus.failed.value
@@ -0,0 +1,128 @@
+import random
+from types import MappingProxyType
+from uuid import uuid4
+
+import pytest
+
+from app.services.question_bank_cache import CachedMcq, QuestionBankSnapshot
+from app.services.seen_index import SeenIndex, SeenIndexCache
+
+
+def make_snapshot(size, type_="python", version=1):
+    mcqs = {}
+    for n in range(size):
+        mcq_id = uuid4()
+        mcqs[mcq_id] = CachedMcq(mcq_id, type_, f"question {n}", {"a": "1"}, "a")
+    return QuestionBankSnapshot(
+        type=type_,
+        version=version,
+        mcq_ids=tuple(mcqs),
+        mcqs=MappingProxyType(mcqs),
+        ordinals=MappingProxyType(
+            {mcq_id: ordinal for ordinal, mcq_id in enumerate(mcqs)}
+        ),
+    )
+
+
+def ordinals_of(snapshot, mcqs):
+    return [snapshot.ordinals[mcq.mcq_id] for mcq in mcqs]
+
+
+def test_bitmap_tracks_added_ordinals():
+    index = SeenIndex(make_snapshot(20))
+    for ordinal in (0, 7, 8, 19, 7):
+        index.add(ordinal)
+
+    assert len(index.bits) == 3
+    assert index.count == 4
+    assert [ordinal for ordinal in range(20) if ordinal in index] == [0, 7, 8, 19]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rejection_sampling_returns_only_unseen(seed):
+    snapshot = make_snapshot(100)
+    index = SeenIndex(snapshot)
+    for ordinal in range(0, 100, 2):
+        index.add(ordinal)
+
+    picked = ordinals_of(snapshot, index.sample(snapshot, 10, random.Random(seed)))
+
+    assert len(picked) == len(set(picked)) == 10
+    assert all(ordinal % 2 == 1 for ordinal in picked)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_mostly_seen_bank_lists_the_unseen_ordinals(seed):
+    snapshot = make_snapshot(100)
+    index = SeenIndex(snapshot)
+    for ordinal in range(90):
+        index.add(ordinal)
+
+    picked = ordinals_of(snapshot, index.sample(snapshot, 10, random.Random(seed)))
+
+    assert sorted(picked) == list(range(90, 100))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_seen_mcqs_fill_up_what_unseen_cannot(seed):
+    snapshot = make_snapshot(50)
+    index = SeenIndex(snapshot)
+    for ordinal in range(47):
+        index.add(ordinal)
+
+    picked = ordinals_of(snapshot, index.sample(snapshot, 10, random.Random(seed)))
+
+    assert len(picked) == len(set(picked)) == 10
+    assert {47, 48, 49} <= set(picked)
+
+
+def test_sample_is_capped_at_the_bank_size():
+    snapshot = make_snapshot(5)
+    index = SeenIndex(snapshot)
+
+    picked = ordinals_of(snapshot, index.sample(snapshot, 10, random.Random(1)))
+
+    assert sorted(picked) == list(range(5))
+
+
+def test_sample_is_reproducible_from_the_seed():
+    snapshot = make_snapshot(200)
+    index = SeenIndex(snapshot)
+    for ordinal in range(0, 200, 3):
+        index.add(ordinal)
+
+    first = index.sample(snapshot, 15, random.Random(42))
+    second = index.sample(snapshot, 15, random.Random(42))
+
+    assert first == second
+
+
+def test_cache_builds_once_and_marks_seen():
+    snapshot = make_snapshot(10)
+    user_id = uuid4()
+    loads = []
+
+    def loader(user, type_):
+        loads.append((user, type_))
+        return [snapshot.mcq_ids[1], uuid4()]
+
+    cache = SeenIndexCache(max_entries=10)
+    index = cache.get(user_id, snapshot, loader)
+    cache.mark_seen(user_id, snapshot, [snapshot.mcq_ids[4]])
+
+    assert cache.get(user_id, snapshot, loader) is index
+    assert loads == [(user_id, "python")]
+    assert [ordinal for ordinal in range(10) if ordinal in index] == [1, 4]
+
+
+def test_cache_rebuilds_for_a_new_snapshot_and_evicts_lru():
+    old, new = make_snapshot(10, version=1), make_snapshot(10, version=2)
+    users = [uuid4() for _ in range(3)]
+    cache = SeenIndexCache(max_entries=2)
+
+    index = cache.get(users[0], old, lambda user, type_: [])
+    assert cache.get(users[0], new, lambda user, type_: []) is not index
+
+    cache.get(users[1], new, lambda user, type_: [])
+    cache.get(users[2], new, lambda user, type_: [])
+    assert [key[0] for key in cache._indexes] == [str(users[1]), str(users[2])]
@@ -0,0 +1,53 @@
+import pytest
+
+from app.utils.content_hash import mcq_content_hash, normalize_text
+
+OPTIONS = {"a": "A list", "b": "A tuple", "c": "A set", "d": "A dict"}
+
+
+@pytest.mark.parametrize(
+    "text, normalized",
+    [
+        ("What is a tuple?", "what is a tuple?"),
+        ("  What   is\ta\ntuple? ", "what is a tuple?"),
+        ("STRASSE", "strasse"),
+        ("Straße", "strasse"),
+        ("", ""),
+        (42, "42"),
+    ],
+)
+def test_normalize_text_collapses_whitespace_and_case_folds(text, normalized):
+    assert normalize_text(text) == normalized
+
+
+def test_hash_is_16_bytes_and_stable():
+    digest = mcq_content_hash("What is a tuple?", OPTIONS)
+
+    assert len(digest) == 16
+    assert digest == mcq_content_hash("What is a tuple?", dict(OPTIONS))
+
+
+def test_hash_ignores_whitespace_case_and_option_order():
+    reordered = {"a": "a DICT", "b": " a  set", "c": "A tuple", "d": "a list"}
+
+    assert mcq_content_hash("  what IS a\ttuple? ", reordered) == mcq_content_hash(
+        "What is a tuple?", OPTIONS
+    )
+
+
+@pytest.mark.parametrize(
+    "question, options",
+    [
+        ("What is a list?", OPTIONS),
+        ("What is a tuple?", {**OPTIONS, "d": "A frozenset"}),
+        ("What is a tuple?", {"a": "A list", "b": "A tuple", "c": "A set"}),
+    ],
+)
+def test_hash_changes_with_the_question_or_options(question, options):
+    assert mcq_content_hash(question, options) != mcq_content_hash(
+        "What is a tuple?", OPTIONS
+    )
+
+
+def test_hash_separates_question_and_options():
+    assert mcq_content_hash("a b", {"a": "c"}) != mcq_content_hash("a", {"a": "b c"})
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from app.utils.item_analysis import OPTIONS, ItemAnalysis
+
+
+def answer_matrix(seed, submissions=40, items=6):
+    """Every submission answers every item, with items of varying difficulty."""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(size=(submissions, 1))
+    easiness = rng.normal(size=items)
+    correct = (ability + easiness + rng.normal(size=(submissions, items)) > 0).astype(
+        int
+    )
+    keys = rng.integers(len(OPTIONS), size=items)
+    wrong = (keys + rng.integers(1, len(OPTIONS), size=(submissions, items))) % len(
+        OPTIONS
+    )
+    option = np.where(correct == 1, keys, wrong)
+    return correct, option
+
+
+def responses(correct, option):
+    """The responses of a matrix as parallel arrays, in the order `add` takes."""
+    submissions, items = correct.shape
+    score = correct.sum(axis=1)
+    return (
+        np.tile(np.arange(items), submissions),
+        option.ravel(),
+        correct.ravel(),
+        np.repeat(score, items),
+        np.full(submissions * items, items),
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_streamed_statistics_match_the_answer_matrix(seed):
+    correct, option = answer_matrix(seed)
+    submissions, items = correct.shape
+    analysis = ItemAnalysis(items)
+    arrays = responses(correct, option)
+    for chunk in np.array_split(np.arange(submissions * items), 7):
+        analysis.add(*(array[chunk] for array in arrays))
+
+    results = analysis.results()
+
+    score = correct.sum(axis=1)
+    for item in range(items):
+        rest = (score - correct[:, item]) / (items - 1)
+        assert results["discrimination"][item] == pytest.approx(
+            np.corrcoef(correct[:, item], rest)[0, 1]
+        )
+        assert results["choices"][item].tolist() == [
+            int((option[:, item] == choice).sum()) for choice in range(len(OPTIONS))
+        ]
+    assert results["responses"].tolist() == [submissions] * items
+    np.testing.assert_allclose(results["difficulty"], correct.mean(axis=0))
+
+
+def test_items_everyone_got_right_or_nobody_answered_have_no_discrimination():
+    correct = np.array([[1, 1, 0], [1, 0, 1], [1, 1, 1], [1, 0, 0]])
+    option = np.zeros_like(correct)
+    analysis = ItemAnalysis(4)
+    analysis.add(*responses(correct, option))
+
+    results = analysis.results()
+
+    assert results["difficulty"][0] == 1
+    assert np.isnan(results["discrimination"][0])
+    assert not np.isnan(results["discrimination"][1])
+    assert results["responses"][3] == 0
+    assert np.isnan(results["difficulty"][3])
+    assert np.isnan(results["discrimination"][3])
+
+
+def test_single_answer_submissions_count_towards_difficulty_only():
+    correct, option = answer_matrix(0, submissions=20, items=3)
+    analysis = ItemAnalysis(3)
+    analysis.add(*responses(correct, option))
+    before = analysis.results()["discrimination"].copy()
+
+    analysis.add(
+        np.array([0, 0, 1]),
+        np.array([0, -1, 2]),
+        np.array([1, 0, 0]),
+        np.array([1, 0, 0]),
+        np.array([1, 1, 1]),
+    )
+    results = analysis.results()
+
+    np.testing.assert_allclose(results["discrimination"], before)
+    assert results["responses"].tolist() == [22, 21, 20]
+    assert results["difficulty"][0] == pytest.approx((correct[:, 0].sum() + 1) / 22)
+    # An option outside `OPTIONS` counts as a response but not as a choice.
+    assert results["choices"][0].sum() == 21
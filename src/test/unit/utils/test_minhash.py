@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from app.utils.minhash import (
+    LSH_BANDS,
+    LSH_ROWS,
+    NUM_PERMUTATIONS,
+    lsh_buckets,
+    minhash_signature,
+    shingles,
+    signature_similarity,
+)
+
+QUESTION = "Which built-in function returns the length of a list in Python?"
+
+
+def jaccard(first, second):
+    first, second = set(shingles(first).tolist()), set(shingles(second).tolist())
+    return len(first & second) / len(first | second)
+
+
+def test_shingles_ignore_case_spacing_and_punctuation():
+    variant = "  which BUILT in function returns the length of a list, in python "
+
+    assert np.array_equal(shingles(QUESTION), shingles(variant))
+
+
+def test_shingles_are_distinct_4_byte_windows():
+    values = shingles("abcdabcd")
+
+    assert values.dtype == np.uint32
+    assert sorted(values.tolist()) == sorted(
+        {int.from_bytes(w.encode(), "big") for w in ["abcd", "bcda", "cdab", "dabc"]}
+    )
+
+
+def test_short_questions_are_padded_to_one_shingle():
+    assert len(shingles("ab")) == 1
+    assert len(shingles("")) == 1
+
+
+def test_signature_is_deterministic_and_sized():
+    signature = minhash_signature(QUESTION)
+
+    assert len(signature) == NUM_PERMUTATIONS * 4
+    assert signature == minhash_signature(QUESTION.upper())
+    assert signature_similarity(signature, signature) == 1.0
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        "Which built-in function returns the length of a tuple in Python?",
+        "Which built-in function returns the size of a dict in Python 3?",
+        "What does the yield keyword do inside a generator function?",
+    ],
+)
+def test_signature_similarity_estimates_jaccard(other):
+    estimate = signature_similarity(
+        minhash_signature(QUESTION), minhash_signature(other)
+    )
+
+    assert estimate == pytest.approx(jaccard(QUESTION, other), abs=0.2)
+
+
+def test_lsh_buckets_are_one_signed_key_per_band():
+    keys = lsh_buckets(minhash_signature(QUESTION))
+
+    assert len(keys) == LSH_BANDS
+    assert all(-(2**63) <= key < 2**63 for key in keys)
+    assert keys == lsh_buckets(minhash_signature(QUESTION))
+
+
+def test_lsh_bucket_keys_only_change_with_their_band():
+    signature = bytearray(minhash_signature(QUESTION))
+    band_size = LSH_ROWS * 4
+    signature[3 * band_size] ^= 0xFF
+
+    before = lsh_buckets(minhash_signature(QUESTION))
+    after = lsh_buckets(bytes(signature))
+
+    assert [n for n in range(LSH_BANDS) if before[n] != after[n]] == [3]
+
+
+def test_lsh_bucket_keys_include_the_band_number():
+    signature = bytes(NUM_PERMUTATIONS * 4)
+
+    assert len(set(lsh_buckets(signature))) == LSH_BANDS
+
+
+def test_near_duplicates_share_a_bucket_and_unrelated_questions_do_not():
+    near = "Which builtin function returns the length of a list in Python 3?"
+    far = "What does the yield keyword do inside a generator function?"
+    keys = set(lsh_buckets(minhash_signature(QUESTION)))
+
+    assert keys & set(lsh_buckets(minhash_signature(near)))
+    assert not keys & set(lsh_buckets(minhash_signature(far)))
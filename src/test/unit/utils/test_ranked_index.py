@@ -0,0 +1,68 @@
+import bisect
+import random
+
+import pytest
+
+from app.utils.ranked_index import RankedIndex
+
+
+def assert_matches(index, oracle):
+    assert len(index) == len(oracle)
+    assert [key for key, _ in index.items()] == oracle
+    for position, key in enumerate(oracle):
+        assert index.rank(key) == position
+        assert list(index.items(position, position + 1)) == [(key, -key)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_inserts_and_removals_match_a_sorted_list(seed):
+    rng = random.Random(seed)
+    index, oracle = RankedIndex(random.Random(seed)), []
+    for _ in range(2000):
+        key = rng.randrange(500)
+        position = bisect.bisect_left(oracle, key)
+        if position < len(oracle) and oracle[position] == key:
+            index.remove(key)
+            del oracle[position]
+        else:
+            index.insert(key, -key)
+            oracle.insert(position, key)
+        probe = rng.randrange(-1, 501)
+        assert index.rank(probe) == bisect.bisect_left(oracle, probe)
+    assert_matches(index, oracle)
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 17, 300])
+def test_from_sorted_matches_a_sorted_list(size):
+    rng = random.Random(size)
+    oracle = sorted(rng.sample(range(10 * size + 1), size))
+
+    index = RankedIndex.from_sorted(((key, -key) for key in oracle), rng)
+
+    assert_matches(index, oracle)
+    for key in oracle[::3]:
+        index.remove(key)
+    for key in range(-1, 10 * size + 2, 7):
+        if key not in oracle:
+            index.insert(key, -key)
+    expected = sorted(
+        {key for key in oracle if key not in oracle[::3]}
+        | {key for key in range(-1, 10 * size + 2, 7) if key not in oracle}
+    )
+    assert_matches(index, expected)
+
+
+@pytest.mark.parametrize("start, stop", [(0, 0), (0, 3), (4, 9), (8, 100), (12, 15)])
+def test_items_slices_like_a_list(start, stop):
+    oracle = list(range(0, 30, 3))
+    index = RankedIndex.from_sorted((key, -key) for key in oracle)
+
+    assert [key for key, _ in index.items(start, stop)] == oracle[start:stop]
+
+
+def test_removing_a_missing_key_raises():
+    index = RankedIndex.from_sorted((key, None) for key in [1, 3, 5])
+
+    with pytest.raises(KeyError):
+        index.remove(4)
+    assert len(index) == 3